@@ -0,0 +1,30 @@
+"""
+File: batch_scoring_benchmark.py
+Author: Alexander Bulanov
+
+Usage (from repository root): python -m benchmarks.batch_scoring_benchmark
+"""
+
+# Global Imports #
+import time
+import numpy as np
+
+# Local Imports #
+import lib.blackjack_game_logic as bjl
+import lib.blackjack_game_objects as bjo
+
+
+def benchmark_batch_scoring(num_of_hands=10000000, max_cards=5, seed=0):
+    rng = np.random.default_rng(seed)
+    card_codes = np.array(list(bjo.card_codes.values()), dtype=np.int16)
+    hands = rng.choice(card_codes, size=(num_of_hands, max_cards))
+    hand_lengths = rng.integers(2, max_cards+1, num_of_hands, dtype=np.int8)
+    start_time = time.perf_counter()
+    hand_scores, soft_flags, bust_mask, blackjack_mask = bjl.highest_hand_scores_batch(hands, hand_lengths)
+    elapsed_time = time.perf_counter() - start_time
+    print(f"{num_of_hands:,} hands of up to {max_cards} cards in {elapsed_time:.2f}s ({num_of_hands/elapsed_time:,.0f} hands/sec)")
+    print(f"busts - {bust_mask.mean():.2%}, blackjacks - {blackjack_mask.mean():.2%}, soft - {soft_flags.mean():.2%}")
+
+
+if __name__ == '__main__':
+    benchmark_batch_scoring()
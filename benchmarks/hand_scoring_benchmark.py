@@ -0,0 +1,53 @@
+"""
+File: hand_scoring_benchmark.py
+Author: Alexander Bulanov
+
+Usage (from repository root): python -m benchmarks.hand_scoring_benchmark
+"""
+
+# Global Imports #
+import time
+
+# Local Imports #
+import lib.blackjack_game_logic as bjl
+import lib.blackjack_game_objects as bjo
+
+
+# Same hands as the explicit cases in tests/score_test.py
+score_test_hands = [
+    ['AS'], ['AH', 'JC'], ['8H', 'AC'], ['AH', 'AC'], ['3D', 'AS', '6S'], ['8C', '9S', 'AH'], ['AH', 'AC', 'AS'],
+    ['7D', '2S', 'AS', 'AD'], ['AH', '5H', '4C', '2D'], ['AH', 'AC', 'AS', 'AD'], ['AH', 'AC', 'JH', 'QD'],
+    ['JD', 'AS', 'AC', 'QH'], ['JD', 'QH', 'AS', 'AC'], ['3H', '2D', 'AC', '4D', 'AH'], ['2H', '2C', '2D', '2S', 'AD'],
+    ['3D', '3H', '3C', 'AS', 'JS'], ['7D'], ['QH'], ['7H', '8C'], ['4D', '9S'], ['KH', 'QD']
+]
+
+def rescore_after_every_card(encoded_hands):
+    # How a hand used to be scored while being hit - the full hand is re-walked after each new card
+    for hand in encoded_hands:
+        dealt_cards = []
+        for card in hand:
+            dealt_cards.append(card)
+            hand_score = bjl.highest_hand_score(dealt_cards)
+    return hand_score
+
+def add_every_card_to_hand_state(encoded_hands):
+    for hand in encoded_hands:
+        hand_state = bjl.empty_hand_state
+        for card in hand:
+            hand_state = bjl.add_card(hand_state, card)
+            hand_score = bjl.hand_state_score(hand_state)
+    return hand_score
+
+def benchmark_hand_scoring(num_of_repeats=20000):
+    encoded_hands = [bjo.encode_hand(hand) for hand in score_test_hands]
+    num_of_cards = num_of_repeats*sum(len(hand) for hand in encoded_hands)
+    for scoring_function in [rescore_after_every_card, add_every_card_to_hand_state]:
+        start_time = time.perf_counter()
+        for x in range(0, num_of_repeats):
+            scoring_function(encoded_hands)
+        elapsed_time = time.perf_counter() - start_time
+        print(f"{scoring_function.__name__} - {num_of_cards} cards in {elapsed_time:.2f}s ({num_of_cards/elapsed_time:,.0f} cards/sec)")
+
+
+if __name__ == '__main__':
+    benchmark_hand_scoring()
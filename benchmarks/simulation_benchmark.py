@@ -0,0 +1,44 @@
+"""
+File: simulation_benchmark.py
+Author: Alexander Bulanov
+
+Usage (from repository root): python -m benchmarks.simulation_benchmark
+"""
+
+# Global Imports #
+import time
+
+# Local Imports #
+import lib.blackjack_simulator as bjsim
+import lib.blackjack_policies as bjpol
+import lib.rng_backends as bjrng
+
+
+def benchmark_headless_rounds(num_of_decks=6, num_of_rounds=50000, seat_numbers=(1, 3, 5), num_of_runs=3, **table_options):
+    # Best hands/sec of num_of_runs runs - table_options are passed on to SimulatedBlackjackStateMachine
+    best_hands_per_second = 0
+    for run_number in range(0, num_of_runs):
+        seat_policies = {seat_number: bjpol.MimicTheDealerPolicy(f"Sim{seat_number}") for seat_number in seat_numbers}
+        test_machine = bjsim.SimulatedBlackjackStateMachine(num_of_decks, seat_policies, **table_options)
+        start_time = time.perf_counter()
+        stats = test_machine.run(num_of_rounds)
+        elapsed_time = time.perf_counter() - start_time
+        best_hands_per_second = max(best_hands_per_second, stats['hands']/elapsed_time)
+    options_description = ', '.join(f"{option_name}={option!r}" for option_name, option in table_options.items() if option_name != 'rng')
+    print(f"{num_of_decks}D shoe, {len(seat_numbers)} seats{', ' + options_description if options_description else ''} - "
+          f"{best_hands_per_second:,.0f} hands/sec")
+    return best_hands_per_second
+
+
+def benchmark_throughput_mode(num_of_decks=6, num_of_rounds=50000):
+    # Integer cent chip pools, no dealer rack and no card counting - rounds are played in a single step each
+    # (see SimulatedBlackjackStateMachine.play_cents_round), reshuffling with numpy when it's installed
+    rng_backend_name = 'numpy' if (bjrng.np != None) else 'python'
+    for seat_numbers in [(1, 3, 5), (1, 2, 3, 4, 5, 6, 7)]:
+        benchmark_headless_rounds(num_of_decks, num_of_rounds, seat_numbers, chip_model='cents', counting_system_names=[],
+                                  rng=bjrng.create_rng(rng_backend_name))
+
+
+if __name__ == '__main__':
+    benchmark_headless_rounds()
+    benchmark_throughput_mode()
@@ -0,0 +1,249 @@
+"""
+File: advantage_detection.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import array
+import collections
+import math
+try:
+    import numpy as np
+except ImportError:
+    np = None # rounds are folded in one at a time with pure Python loops instead
+
+
+### Advantage Play Detection ###
+# Counters raise their bets as the true count goes up, while everyone else's bets have nothing to do with the count. Each
+# player's main bet of every round is joined with the true count at deal time (see card_counting) and folded into that
+# player's co-moments - round count, means, and sums of squared deviations and co-deviations - so bet/count correlation
+# and bet ramp are always available in memory per player, not per round. Rounds are processed as columns, a chunk at a
+# time - a chunk's moments are grouped by player with bincount, then merged into the running ones like
+# RunningMoments.merge (see bankroll_stats), so a day of multi-table logs is worked through in seconds.
+default_chunk_size = 1 << 20 # rounds processed at a time
+default_correlation_threshold = 0.3 # flat and random bettors hover around 0
+default_bet_ramp_threshold = 2.0 # mean bet at high counts over mean bet at low counts
+default_min_rounds = 200 # rounds a player needs before they can be flagged
+high_true_count = 2 # rounds at this true count or above are high count rounds
+low_true_count = 0 # rounds at this true count or below are low count rounds
+
+# Tables know their players by index in their own known_players (see blackjack_fsm), so the same index at two tables is
+# two different players - tables and logs key a player by the table's id and that index together, and the detector takes
+# any non-negative integer keys, packing them into its own moment columns
+max_players_per_table = 1 << 15 # logged player ids are int16 (see round_log)
+
+AdvantagePlayAlert = collections.namedtuple('AdvantagePlayAlert', ['player_id', 'rounds', 'correlation', 'bet_ramp'])
+
+# Per-player running moments, each kept as one column - a player's moments sit at the same index (their column) in every one
+moment_names = ['rounds', 'true_count_mean', 'bet_mean_cents', 'true_count_m2', 'bet_m2', 'co_m2',
+                'high_count_rounds', 'high_count_bet_cents', 'low_count_rounds', 'low_count_bet_cents']
+
+
+def get_player_key(table_id, player_id):
+    # Player id unique across tables - works on table_id/player_id columns too
+    return table_id*max_players_per_table + player_id
+
+
+def get_table_player_id(player_key):
+    # (table_id, player_id) of a player key
+    return divmod(player_key, max_players_per_table)
+
+
+def get_chunk_moments(player_ids, main_bets_cents, true_counts, num_of_players):
+    # Moments of one chunk of rounds (numpy columns), grouped by player with bincount
+    rounds = np.bincount(player_ids, minlength=num_of_players).astype(np.float64)
+    safe_rounds = np.maximum(rounds, 1)
+    true_count_means = np.bincount(player_ids, true_counts, num_of_players)/safe_rounds
+    bet_means = np.bincount(player_ids, main_bets_cents, num_of_players)/safe_rounds
+    true_count_deviations = true_counts - true_count_means[player_ids]
+    bet_deviations = main_bets_cents - bet_means[player_ids]
+    high_count_rounds = true_counts >= high_true_count
+    low_count_rounds = true_counts <= low_true_count
+    return {
+        'rounds': rounds,
+        'true_count_mean': true_count_means,
+        'bet_mean_cents': bet_means,
+        'true_count_m2': np.bincount(player_ids, true_count_deviations*true_count_deviations, num_of_players),
+        'bet_m2': np.bincount(player_ids, bet_deviations*bet_deviations, num_of_players),
+        'co_m2': np.bincount(player_ids, true_count_deviations*bet_deviations, num_of_players),
+        'high_count_rounds': np.bincount(player_ids[high_count_rounds], minlength=num_of_players).astype(np.float64),
+        'high_count_bet_cents': np.bincount(player_ids[high_count_rounds], main_bets_cents[high_count_rounds], num_of_players),
+        'low_count_rounds': np.bincount(player_ids[low_count_rounds], minlength=num_of_players).astype(np.float64),
+        'low_count_bet_cents': np.bincount(player_ids[low_count_rounds], main_bets_cents[low_count_rounds], num_of_players)
+    }
+
+
+def merge_moments(moments, chunk_moments):
+    # Merges chunk_moments into moments (columns of the same length), in place
+    rounds, chunk_rounds = moments['rounds'], chunk_moments['rounds']
+    total_rounds = rounds + chunk_rounds
+    safe_total_rounds = np.maximum(total_rounds, 1)
+    true_count_deltas = chunk_moments['true_count_mean'] - moments['true_count_mean']
+    bet_deltas = chunk_moments['bet_mean_cents'] - moments['bet_mean_cents']
+    weights = rounds*chunk_rounds/safe_total_rounds
+    moments['true_count_m2'] += chunk_moments['true_count_m2'] + true_count_deltas*true_count_deltas*weights
+    moments['bet_m2'] += chunk_moments['bet_m2'] + bet_deltas*bet_deltas*weights
+    moments['co_m2'] += chunk_moments['co_m2'] + true_count_deltas*bet_deltas*weights
+    moments['true_count_mean'] += true_count_deltas*chunk_rounds/safe_total_rounds
+    moments['bet_mean_cents'] += bet_deltas*chunk_rounds/safe_total_rounds
+    for moment_name in ['high_count_rounds', 'high_count_bet_cents', 'low_count_rounds', 'low_count_bet_cents']:
+        moments[moment_name] += chunk_moments[moment_name]
+    rounds[:] = total_rounds
+
+
+class AdvantagePlayDetector:
+    # Player ids are any non-negative integers - tables use get_player_key of their table_id and the player's index in known_players
+    def __init__(self, correlation_threshold=default_correlation_threshold, bet_ramp_threshold=default_bet_ramp_threshold,
+                 min_rounds=default_min_rounds, chunk_size=default_chunk_size):
+        self.correlation_threshold = correlation_threshold
+        self.bet_ramp_threshold = bet_ramp_threshold
+        self.min_rounds = min_rounds
+        self.chunk_size = chunk_size
+        self.num_of_players = 0
+        self.player_columns = {} # player_id: index of the player's moments in every moment column
+        self.moments = {moment_name: (np.zeros(0) if (np != None) else []) for moment_name in moment_names}
+        self.alerts = [] # AdvantagePlayAlerts in the order players were flagged
+        self.flagged_player_ids = set()
+        # Rounds recorded one at a time wait here, as columns, until there's a chunk of them
+        self.buffered_player_ids = array.array('q')
+        self.buffered_main_bets_cents = array.array('d')
+        self.buffered_true_counts = array.array('d')
+
+    def add_players(self, num_of_players):
+        # Grows every moment column to fit num_of_players players
+        if num_of_players <= self.num_of_players:
+            return
+        for moment_name, moment_column in self.moments.items():
+            if np != None:
+                self.moments[moment_name] = np.concatenate([moment_column, np.zeros(num_of_players - self.num_of_players)])
+            else:
+                moment_column.extend([0]*(num_of_players - self.num_of_players))
+        self.num_of_players = num_of_players
+
+    def get_player_column(self, player_id):
+        if player_id not in self.player_columns:
+            if player_id < 0:
+                raise ValueError("Player ids must be non-negative integers")
+            self.player_columns[player_id] = len(self.player_columns)
+            self.add_players(len(self.player_columns))
+        return self.player_columns[player_id]
+
+    def get_player_columns(self, player_ids):
+        # Column of every round's player - one dictionary lookup per distinct player, not per round
+        unique_player_ids, unique_player_indices = np.unique(player_ids, return_inverse=True)
+        unique_player_columns = np.array([self.get_player_column(player_id) for player_id in unique_player_ids.tolist()], dtype=np.int64)
+        return unique_player_columns[unique_player_indices.reshape(-1)]
+
+    def record(self, player_id, main_bet_cents, true_count):
+        # One player's main bet with the true count at deal time - rounds sat out aren't recorded
+        self.buffered_player_ids.append(player_id)
+        self.buffered_main_bets_cents.append(main_bet_cents)
+        self.buffered_true_counts.append(true_count)
+        if len(self.buffered_player_ids) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if len(self.buffered_player_ids) == 0:
+            return
+        player_ids, main_bets_cents, true_counts = self.buffered_player_ids, self.buffered_main_bets_cents, self.buffered_true_counts
+        self.buffered_player_ids = array.array('q')
+        self.buffered_main_bets_cents = array.array('d')
+        self.buffered_true_counts = array.array('d')
+        self.add_rounds(player_ids, main_bets_cents, true_counts)
+
+    def add_rounds(self, player_ids, main_bets_cents, true_counts):
+        # Equal length columns of rounds (sequences or numpy arrays), such as a slice of a day's logs, chunk_size rounds at a time
+        if np == None:
+            self.add_rounds_without_numpy(player_ids, main_bets_cents, true_counts)
+            self.check_players()
+            return
+        player_ids = np.asarray(player_ids, dtype=np.int64)
+        main_bets_cents = np.asarray(main_bets_cents, dtype=np.float64)
+        true_counts = np.asarray(true_counts, dtype=np.float64)
+        if len(player_ids) == 0:
+            return
+        if player_ids.min() < 0:
+            raise ValueError("Player ids must be non-negative integers")
+        player_columns = self.get_player_columns(player_ids)
+        for chunk_start in range(0, len(player_ids), self.chunk_size):
+            chunk_end = chunk_start + self.chunk_size
+            merge_moments(self.moments, get_chunk_moments(player_columns[chunk_start:chunk_end], main_bets_cents[chunk_start:chunk_end],
+                                                          true_counts[chunk_start:chunk_end], self.num_of_players))
+        self.check_players()
+
+    def add_rounds_without_numpy(self, player_ids, main_bets_cents, true_counts):
+        # Welford's update of each player's co-moments, one round at a time
+        moments = self.moments
+        for player_id, main_bet_cents, true_count in zip(player_ids, main_bets_cents, true_counts):
+            player_column = self.get_player_column(player_id)
+            moments['rounds'][player_column] += 1
+            rounds = moments['rounds'][player_column]
+            true_count_deviation = true_count - moments['true_count_mean'][player_column]
+            bet_deviation = main_bet_cents - moments['bet_mean_cents'][player_column]
+            moments['true_count_mean'][player_column] += true_count_deviation/rounds
+            moments['bet_mean_cents'][player_column] += bet_deviation/rounds
+            moments['true_count_m2'][player_column] += true_count_deviation*(true_count - moments['true_count_mean'][player_column])
+            moments['bet_m2'][player_column] += bet_deviation*(main_bet_cents - moments['bet_mean_cents'][player_column])
+            moments['co_m2'][player_column] += true_count_deviation*(main_bet_cents - moments['bet_mean_cents'][player_column])
+            if true_count >= high_true_count:
+                moments['high_count_rounds'][player_column] += 1
+                moments['high_count_bet_cents'][player_column] += main_bet_cents
+            elif true_count <= low_true_count:
+                moments['low_count_rounds'][player_column] += 1
+                moments['low_count_bet_cents'][player_column] += main_bet_cents
+
+    def get_player_report(self, player_id):
+        # Correlation of bets with the true count, and bet ramp - mean bet at high counts over mean bet at low counts
+        # (None until the player has played rounds at both)
+        moments = self.moments
+        player_column = self.player_columns.get(player_id)
+        rounds = int(moments['rounds'][player_column]) if (player_column != None) else 0
+        if rounds == 0:
+            return {'rounds': 0, 'correlation': 0.0, 'bet_ramp': None, 'bet_per_true_count_cents': 0.0, 'mean_bet_cents': 0.0}
+        true_count_m2, bet_m2, co_m2 = float(moments['true_count_m2'][player_column]), float(moments['bet_m2'][player_column]), float(moments['co_m2'][player_column])
+        correlation = co_m2/math.sqrt(true_count_m2*bet_m2) if (true_count_m2*bet_m2 > 0) else 0.0
+        bet_ramp = None
+        high_count_rounds, low_count_rounds = moments['high_count_rounds'][player_column], moments['low_count_rounds'][player_column]
+        if (high_count_rounds > 0) and (low_count_rounds > 0) and (moments['low_count_bet_cents'][player_column] > 0):
+            bet_ramp = float((moments['high_count_bet_cents'][player_column]/high_count_rounds)
+                             /(moments['low_count_bet_cents'][player_column]/low_count_rounds))
+        return {
+            'rounds': rounds,
+            'correlation': correlation,
+            'bet_ramp': bet_ramp,
+            'bet_per_true_count_cents': co_m2/true_count_m2 if (true_count_m2 > 0) else 0.0, # least squares slope
+            'mean_bet_cents': float(moments['bet_mean_cents'][player_column])
+        }
+
+    def get_report(self):
+        self.flush()
+        return {player_id: self.get_player_report(player_id) for player_id in sorted(self.player_columns)
+                if self.moments['rounds'][self.player_columns[player_id]] > 0}
+
+    def player_crosses_thresholds(self, player_report):
+        return ((player_report['rounds'] >= self.min_rounds) and (player_report['correlation'] >= self.correlation_threshold)
+                and (player_report['bet_ramp'] != None) and (player_report['bet_ramp'] >= self.bet_ramp_threshold))
+
+    def check_players(self):
+        # Raise an alert for every player who has just crossed both thresholds - each player is flagged once
+        for player_id in sorted(self.player_columns):
+            if player_id not in self.flagged_player_ids:
+                player_report = self.get_player_report(player_id)
+                if self.player_crosses_thresholds(player_report):
+                    self.flagged_player_ids.add(player_id)
+                    self.alerts.append(AdvantagePlayAlert(player_id, player_report['rounds'], player_report['correlation'],
+                                                          player_report['bet_ramp']))
+
+    def get_alerts(self):
+        self.flush()
+        return list(self.alerts)
+
+
+def analyze_round_chunks(round_chunks, detector=None):
+    # Feeds (player_ids, main_bets_cents, true_counts) column chunks, such as those read off a day's logs, through detector
+    if detector == None:
+        detector = AdvantagePlayDetector()
+    for player_ids, main_bets_cents, true_counts in round_chunks:
+        detector.add_rounds(player_ids, main_bets_cents, true_counts)
+    detector.flush()
+    return detector
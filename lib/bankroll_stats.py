@@ -0,0 +1,180 @@
+"""
+File: bankroll_stats.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import math
+
+
+### Streaming Statistics ###
+# Every statistic below is updated one observation at a time in O(1) memory, so a session of 10^8 rounds is summarized
+# without keeping any of its rounds around.
+class RunningMoments:
+    # Count, mean and variance by Welford's method - numerically stable over very long runs, unlike summing squares
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.sum_of_squared_deviations = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        deviation = value - self.mean
+        self.mean += deviation/self.count
+        self.sum_of_squared_deviations += deviation*(value - self.mean)
+        if (self.min == None) or (value < self.min):
+            self.min = value
+        if (self.max == None) or (value > self.max):
+            self.max = value
+
+    def merge(self, other):
+        # Combines moments of two independent streams (such as shards of a parallel run - see simulation_runner), in place
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.sum_of_squared_deviations = other.count, other.mean, other.sum_of_squared_deviations
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        deviation = other.mean - self.mean
+        self.mean += deviation*other.count/count
+        self.sum_of_squared_deviations += other.sum_of_squared_deviations + deviation*deviation*self.count*other.count/count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def get_variance(self):
+        # Sample variance (0 until there are two values)
+        if self.count < 2:
+            return 0.0
+        return self.sum_of_squared_deviations/(self.count - 1)
+
+    def get_standard_deviation(self):
+        return math.sqrt(self.get_variance())
+
+
+class P2Quantile:
+    # P-square quantile sketch (Jain & Chlamtac) - five markers track the minimum, the p/2, p and (1+p)/2 quantiles and
+    # the maximum, and are nudged along a parabola as observations arrive, so a quantile is estimated from 5 numbers
+    def __init__(self, p):
+        if not (0 < p < 1):
+            raise ValueError(f"Quantile {p} must be strictly between 0 and 1")
+        self.p = p
+        self.count = 0
+        self.heights = [] # marker heights - the first 5 observations until there are 5 of them
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired_positions = [1, 1 + 2*p, 1 + 4*p, 3 + 2*p, 5]
+        self.desired_position_increments = [0, p/2, p, (1 + p)/2, 1]
+
+    def add(self, value):
+        self.count += 1
+        heights = self.heights
+        if self.count <= 5:
+            heights.append(value)
+            if self.count == 5:
+                heights.sort()
+            return
+        positions = self.positions
+        # Find the cell the value falls in, stretching the outer markers to cover it
+        if value < heights[0]:
+            heights[0] = value
+            cell_index = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell_index = 3
+        else:
+            cell_index = 0
+            while value >= heights[cell_index + 1]:
+                cell_index += 1
+        for marker_index in range(cell_index + 1, 5):
+            positions[marker_index] += 1
+        for marker_index in range(0, 5):
+            self.desired_positions[marker_index] += self.desired_position_increments[marker_index]
+        # Move the middle markers one position towards where they should be, if they're off by a whole position
+        for marker_index in range(1, 4):
+            position_offset = self.desired_positions[marker_index] - positions[marker_index]
+            if (((position_offset >= 1) and (positions[marker_index + 1] - positions[marker_index] > 1))
+                or ((position_offset <= -1) and (positions[marker_index - 1] - positions[marker_index] < -1))):
+                step = 1 if (position_offset > 0) else -1
+                height = self.get_parabolic_height(marker_index, step)
+                if not (heights[marker_index - 1] < height < heights[marker_index + 1]):
+                    height = heights[marker_index] + step*((heights[marker_index + step] - heights[marker_index])
+                                                           /(positions[marker_index + step] - positions[marker_index]))
+                heights[marker_index] = height
+                positions[marker_index] += step
+
+    def get_parabolic_height(self, marker_index, step):
+        heights, positions = self.heights, self.positions
+        return heights[marker_index] + step/(positions[marker_index + 1] - positions[marker_index - 1])*(
+            (positions[marker_index] - positions[marker_index - 1] + step)*(heights[marker_index + 1] - heights[marker_index])
+            /(positions[marker_index + 1] - positions[marker_index])
+            + (positions[marker_index + 1] - positions[marker_index] - step)*(heights[marker_index] - heights[marker_index - 1])
+            /(positions[marker_index] - positions[marker_index - 1]))
+
+    def get_quantile(self):
+        if self.count == 0:
+            return None
+        if self.count < 5:
+            return sorted(self.heights)[round(self.p*(self.count - 1))]
+        return self.heights[2]
+
+
+### Bankroll Analytics ###
+default_bankroll_quantiles = (0.05, 0.5, 0.95)
+
+class BankrollTracker:
+    # One player's session - fed each round's net result, the round's initial bets and the chip pool left after it
+    def __init__(self, quantiles=default_bankroll_quantiles):
+        self.round_results = RunningMoments() # net cents won per round (rebuys move cash to chips and don't count)
+        self.hand_results = RunningMoments() # net result per round in units of its initial bets - rounds sat out are skipped
+        self.bankrolls = RunningMoments() # chip pool after every round, in cents
+        self.bankroll_quantiles = {quantile: P2Quantile(quantile) for quantile in quantiles}
+        self.total_initial_bet_cents = 0
+
+    def add_round(self, net_cents, initial_bet_cents, bankroll_cents):
+        self.round_results.add(net_cents)
+        if initial_bet_cents > 0:
+            self.hand_results.add(net_cents/initial_bet_cents)
+            self.total_initial_bet_cents += initial_bet_cents
+        self.bankrolls.add(bankroll_cents)
+        for bankroll_quantile in self.bankroll_quantiles.values():
+            bankroll_quantile.add(bankroll_cents)
+
+    def get_risk_of_ruin(self, bankroll_cents):
+        # Chance of ever losing bankroll_cents playing on like this - the diffusion approximation exp(-2 * EV * B / variance)
+        # of the rounds seen so far (certain ruin for a session that doesn't win on average)
+        mean, variance = self.round_results.mean, self.round_results.get_variance()
+        if mean <= 0:
+            return 1.0
+        if variance == 0:
+            return 0.0
+        return math.exp(-2*mean*bankroll_cents/variance)
+
+    def get_n0(self):
+        # Rounds it takes for the expected win to catch up with one standard deviation of results (variance / EV^2)
+        mean = self.round_results.mean
+        if mean == 0:
+            return math.inf
+        return self.round_results.get_variance()/(mean*mean)
+
+    def get_report(self, bankroll_cents=None):
+        # bankroll_cents (None - the average chip pool) is what risk of ruin is worked out for
+        if bankroll_cents == None:
+            bankroll_cents = self.bankrolls.mean
+        return {
+            'rounds': self.round_results.count,
+            'hands': self.hand_results.count,
+            'ev_per_round_cents': self.round_results.mean,
+            'sd_per_round_cents': self.round_results.get_standard_deviation(),
+            'ev_per_hand_units': self.hand_results.mean,
+            'sd_per_hand_units': self.hand_results.get_standard_deviation(),
+            'average_initial_bet_cents': self.total_initial_bet_cents/self.hand_results.count if (self.hand_results.count > 0) else 0,
+            'n0_rounds': self.get_n0(),
+            'risk_of_ruin': self.get_risk_of_ruin(bankroll_cents),
+            'bankroll_mean_cents': self.bankrolls.mean,
+            'bankroll_min_cents': self.bankrolls.min,
+            'bankroll_max_cents': self.bankrolls.max,
+            'bankroll_quantiles_cents': {quantile: bankroll_quantile.get_quantile() for quantile, bankroll_quantile in self.bankroll_quantiles.items()}
+        }
@@ -4,18 +4,28 @@ Author: Alexander Bulanov
 """
 
 # Global Imports #
-import random
 import math
-import msvcrt # used to get single character input from stdin
+try:
+    import msvcrt # used to get single character input from stdin (Windows-only)
+except ImportError:
+    msvcrt = None # headless (simulated) tables never read keystrokes
+import pickle # table snapshots (see save_snapshot)
+import random
 import sys # used for writing messages to stderr
 #import time
 from enum import Enum
 
 # Local Imports #
+from . import advantage_detection as bjadv
 from . import blackjack_game_logic as bjl
 from . import blackjack_game_objects as bjo
 from . import blackjack_players as bjp
+from . import card_counting as bjcount
+from . import chip_ledger as bjcl
 from . import cut_helper as cut
+from . import dealer_rack as bjrack
+from . import shuffle_models as shm
+from . import side_bet_calculator as sbc
 from . import print_utils as prutils
 
 
@@ -34,12 +44,18 @@ class GameState(Enum):
 
 
 class BlackjackStateMachine:
-    def __init__(self, num_of_decks):
+    def __init__(self, num_of_decks, rng=None, counting_system_names=None, table_id=0):
         self.state = GameState.WAITING
+        self.table_id = table_id # number of this table on the floor - logged with every round, and part of every player's key for advantage play detection
         self.num_of_decks = num_of_decks
+        self.rng = rng if (rng != None) else random # every shuffle and cut of this table draws from it (a seeded backend from rng_backends makes a table replayable)
+        self.shuffle_model = 'perfect' # Options - 'perfect', 'riffle', 'strip', 'wash', 'casino' (see shuffle_models)
         self.pen = None # set in SHUFFLING within bounds specified for given num_of_decks
-        self.shoe = bjo.get_shoe_of_n_decks(self.num_of_decks)
+        self.first_cut_index = None # set in SHUFFLING - cards moved from the front of the shoe to the back by the first cut
+        self.shoe = bjo.Shoe(bjo.get_shoe_of_n_decks(self.num_of_decks, self.rng))
         self.discard = []
+        # Running/true counts of the cards dealt from the current shoe - only Hi-Lo (read by the advantage detector and the round log) unless told otherwise
+        self.card_counter = bjcount.CardCounter(self.num_of_decks, counting_system_names if (counting_system_names != None) else ['Hi-Lo'])
         self.min_table_bet = 1 # Options - 1 to 100
         self.max_table_bet = 100 # Options - 100 to 10000 (usually 100x the min_bet)
         self.blackjack_ratio = 3/2 # Options - 3/2, 6/5
@@ -106,8 +122,12 @@ class BlackjackStateMachine:
              '1 Non-Suited Match': 4
             }
         ] # Tables of up to 2 supported side bets copied over in INITIALIZING state (optionally updated)
+        self.table_active_side_bet_odds = self.validate_table_active_side_bets() # a pay table that favors players is rejected up front
         self.joining_restriction = 'NMSE' # Options - None, 'NMSE'
         self.dealer = bjp.Player.create_casino_dealer()
+        self.dealer_rack = bjrack.DealerRack() # fill/credit thresholds of the dealer's chips
+        self.advantage_detector = bjadv.AdvantagePlayDetector() # bet/true count correlation of every known player (None - off)
+        self.round_log = None # RoundLogWriter every round is appended to (see round_log)
         self.waiting_players = []
         self.seated_players = {1: None, 2: None, 3: None, 4: None, 5: None, 6: None, 7: None}
         self.known_players = [] # list of all players who have played a shoe, now or in the past
@@ -118,27 +138,35 @@ class BlackjackStateMachine:
         self.current_round_placed_side_bets_2 = {} # dictionary of players and all of their seats at which they placed a bet on Side Bet #2
         self.current_round_remaining_player_hands = None
         self.player_turn_actions = ['stand', 'hit', 'double', 'split', 'surrender']
-        self.side_bet_handlers = {
+        self.side_bet_handlers = self.get_side_bet_handlers()
+
+
+    def get_side_bet_handlers(self):
+        return {
             "Perfect Pairs": lambda player, seat_name: self.handle_perfect_pairs_side_bet(player, seat_name),
             "Match the Dealer": lambda player, seat_name: self.handle_match_the_dealer_side_bet(player, seat_name),
             "Lucky Ladies": lambda player, seat_name: self.handle_lucky_ladies_side_bet(player, seat_name),
             "King's Bounty": lambda player, seat_name: self.handle_kings_bounty_side_bet(player, seat_name),
             "Buster Blackjack": lambda player, seat_name: self.handle_buster_blackjack_side_bet(player, seat_name),
         }
-        
 
     def transition(self, next_state):
+        if self.round_log != None:
+            self.round_log.on_transition(self, next_state)
         self.state = next_state
 
     # Player Turn Actions #    
+    def log_action(self, action_name):
+        if self.round_log != None:
+            self.round_log.record_action(action_name)
+
     def stand(self, player):
         return True
             
 
     def hit(self, player, seat_name):
         # Todo AB: Add hand_index as a variable to account for a single player playing multiple hands at a table
-        self.handle_front_cut_card()
-        player.hands[seat_name].append([self.shoe.pop(0)])
+        self.deal_card_to_hand(player, seat_name)
 
         # Rescore hand internally after hit - if bust, return True
         #return True
@@ -161,12 +189,10 @@ class BlackjackStateMachine:
 
     # Other Player Actions #
     def color_up(self, player):
-        print("Colored up chips!")
-        pass
+        player.color_up(self.dealer)
 
     def break_down(self, player):
-        print("Broke down chips!")
-        pass
+        player.break_down(self.dealer)
     
     def skip_turn(self):
         pass
@@ -175,6 +201,44 @@ class BlackjackStateMachine:
         pass
 
 
+    # Snapshots #
+    # A snapshot is the whole table pickled - shoe, discard, dealer, every player's chips, bets and hands, round tracking,
+    # counts and the rng's state - so a table with its own rng restored from one plays on exactly as the original would
+    # have. Players, seats and hands shared between the round tracking dicts stay shared. Side bet handlers are rebuilt for
+    # the restored table, and the global random module (rng=None) and the round log are left out - a restored table on
+    # the global random state draws whatever that state holds by then, so it deals the same cards as the original only
+    # until its next shuffle (or every round, with a continuous shuffling machine). A restored table has no round log
+    # attached - whoever restores it attaches one.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['side_bet_handlers']
+        state['rng'] = None if (self.rng is random) else self.rng
+        state['round_log'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.rng == None:
+            self.rng = random
+        self.side_bet_handlers = self.get_side_bet_handlers()
+
+    def save_snapshot(self):
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def restore_snapshot(self, snapshot):
+        # Rolls this table back to a snapshot of itself. The round log attached to it is detached rather than rolled back
+        # (it already holds the rounds played since the snapshot) - callers reattach one to log the rounds played from here
+        restored_machine = load_snapshot(snapshot)
+        if type(restored_machine) != type(self):
+            raise TypeError(f"Snapshot of a {type(restored_machine).__name__} can't be restored to a {type(self).__name__}")
+        state = restored_machine.__getstate__()
+        state['rng'] = restored_machine.rng
+        self.__setstate__(state)
+
+    def fork(self):
+        # Independent copy of the table as it stands, for exploring a line of play without touching this one
+        return load_snapshot(self.save_snapshot())
+
     # Debug #
     def dump_state_machine_data(self):
         print("*  *  *  *  *")
@@ -196,6 +260,7 @@ class BlackjackStateMachine:
         print("START - DUMPING SHOE DATA")
         print('shoe_size:',len(self.shoe))
         print('discard_size:',len(self.discard))
+        print('counts:',self.card_counter.get_counts())
         for attr, value in self.__dict__.items():
             if attr == 'shoe':
                 print(attr+': '+str(value))
@@ -451,12 +516,16 @@ class BlackjackStateMachine:
         self.transition(GameState.SHUFFLING)
 
 
+    def shuffle_shoe(self):
+        # Any model but 'perfect' reorders the shoe the way a dealer's hands would, leaving clumps of cards together
+        if self.shuffle_model == 'perfect':
+            self.shoe.shuffle(self.rng)
+        else:
+            self.shoe.shuffle(shm.ShuffleModel(self.shuffle_model, self.rng))
+
     def shuffle_cut_and_burn(self, cut_percentage):
-        # Remove both cut cards as necessary
-        if 'front_cut_card' in self.discard:
-            self.discard.remove('front_cut_card')
-            self.shoe.remove('back_cut_card')
-            # Put discard pile back into the shoe to shuffle
+        # Put discard pile back into the shoe to shuffle
+        if len(self.discard) != 0:
             self.shoe.extend(self.discard)
             self.discard.clear()
             """
@@ -464,13 +533,15 @@ class BlackjackStateMachine:
             self.dump_deck_data()
             self.print_missing_cards_in_shoe_if_any()
             """
-        # Shuffle
-        random.shuffle(self.shoe)
+        # Shuffle (also takes the cut card out of the shoe)
+        self.shuffle_shoe()
         # Cut (twice)
-        cut.first_cut(self.shoe)
-        self.pen = cut.second_cut(self.shoe, cut_percentage)
-        # Burn (first card in the shoe)
-        self.discard.extend([self.shoe.pop(0)])
+        self.first_cut_index = cut.first_cut(self.shoe, self.rng)
+        self.pen = cut.second_cut(self.shoe, cut_percentage, rng=self.rng)
+        # Burn (first card in the shoe, unseen by the counters of a new shoe)
+        self.card_counter.reset()
+        self.discard.append(self.shoe.draw())
+        self.card_counter.observe_face_down()
         print("Burned card is", self.discard)
         self.transition(GameState.BETTING)
 
@@ -490,7 +561,8 @@ class BlackjackStateMachine:
         player.print_player_chip_pool()
         while True:
             # player_side_bet_index is None for main_bet, 0 if this is first side bet placed, 1 if this is second side bet
-            if player.get_bet_input_character(min_bet, max_bet, seat_name, player_side_bet_index):
+            # Chips are bought from the dealer a minimum bet's worth at a time
+            if player.get_bet_input_character(min_bet, max_bet, seat_name, player_side_bet_index, self.dealer, min_bet):
                 break
 
 
@@ -569,12 +641,63 @@ class BlackjackStateMachine:
         self.transition(GameState.DEALING)
 
 
-    def handle_front_cut_card(self):
-        if ('front_cut_card' == self.shoe[0]):
-            self.discard.extend([self.shoe.pop(0)])
+    def draw_card(self, face_up=True):
+        card = self.shoe.draw()
+        if face_up:
+            self.card_counter.observe(card)
+        else:
+            self.card_counter.observe_face_down() # the dealer's hole card is only counted once it's turned over
+        return card
+
+    def get_dealer_hand(self):
+        return self.dealer.hands['center_seat']
+
+    def get_dealer_hand_score(self):
+        return self.dealer.hand_scores['center_seat']
 
+    def deal_card_to_hand(self, player, seat_name, face_up=True):
+        # Hand state is updated with every card dealt, so re-scoring a hand after a hit is O(1)
+        if (player.hands[seat_name] == None):
+            player.hands[seat_name] = []
+        if (player.hand_states[seat_name] == None):
+            player.hand_states[seat_name] = bjl.get_hand_state(player.hands[seat_name])
+        card = self.draw_card(face_up)
+        player.hands[seat_name].append(card)
+        player.hand_states[seat_name] = bjl.add_card(player.hand_states[seat_name], card)
+
+
+    def get_round_main_bets(self):
+        # (seat_number, player_id, main_bet_cents) of every main bet placed this round - players are identified by their index in known_players
+        round_main_bets = []
+        for player in self.seated_players.values():
+            if (player != None):
+                player_id = self.known_players.index(player)
+                for seat_name, seat_number in player.occupied_seats.items():
+                    main_bet_cents = player.main_bet_cents[seat_name]
+                    if (seat_number != None) and (main_bet_cents != None) and (main_bet_cents > 0):
+                        round_main_bets.append((seat_number, player_id, main_bet_cents))
+        return round_main_bets
+
+    def record_advantage_play(self):
+        # Every main bet of the round joined with the true count at deal time
+        true_count = self.card_counter.get_true_count()
+        for seat_number, player_id, main_bet_cents in self.get_round_main_bets():
+            self.advantage_detector.record(bjadv.get_player_key(self.table_id, player_id), main_bet_cents, true_count)
+
+    def get_advantage_play_report(self):
+        # Report of every known player who has placed a bet, keyed by their index in known_players - a detector shared with
+        # other tables also holds their players, who are left out
+        advantage_play_report = {}
+        for player_key, player_report in self.advantage_detector.get_report().items():
+            table_id, player_id = bjadv.get_table_player_id(player_key)
+            if table_id == self.table_id:
+                player_report['name'] = self.known_players[player_id].name
+                advantage_play_report[player_id] = player_report
+        return advantage_play_report
 
     def deal(self):
+        if self.advantage_detector != None:
+            self.record_advantage_play()
         # Repeat the following twice:
         for x in range(0, 2):
             # Deal a card from shoe to each player
@@ -582,22 +705,35 @@ class BlackjackStateMachine:
                 if (player != None):
                     for seat_name, seat_number in player.occupied_seats.items():
                         if (seat_number != None):
-                            self.handle_front_cut_card() # Slide 'front_cut_card' to discard if encountered mid-shoe
-                            if (player.hands[seat_name] == None):
-                                player.hands[seat_name] = []
-                            player.hands[seat_name].append(self.shoe.pop(0))
-            # Deal a card from shoe to dealer
-            self.handle_front_cut_card() # Slide 'front_cut_card' to discard if encountered mid-shoe
-            if (self.dealer.hands['center_seat'] == None):
-                self.dealer.hands['center_seat'] = []
-            self.dealer.hands['center_seat'].append(self.shoe.pop(0))
+                            self.deal_card_to_hand(player, seat_name)
+            # Deal a card from shoe to dealer (the second one face down)
+            self.deal_card_to_hand(self.dealer, 'center_seat', face_up=(x == 0))
         # Print debug info on players hands and % of shoe dealt
         self.print_all_hands()
-        percentage_of_shoe_dealt = int(round(100-(100*(len(self.shoe)/(2+self.num_of_decks*52))), 0))
+        percentage_of_shoe_dealt = int(round(self.shoe.penetration(), 0))
         print(f"{percentage_of_shoe_dealt}% of the shoe dealt (reshuffling at round end past {str(self.pen)}%)")
         self.transition(GameState.PRE_SCORING)
 
 
+    def validate_table_active_side_bets(self, side_bet_names=None, payout_tables=None):
+        # Exact odds of each active side bet (or of side_bet_names about to be made active) for this table's shoe - raises
+        # ValueError on a payout table that favors players
+        if side_bet_names == None:
+            side_bet_names, payout_tables = self.table_active_side_bet_names, self.table_active_side_bet_payout_tables
+        table_active_side_bet_odds = {}
+        for side_bet_name, payout_table in zip(side_bet_names, payout_tables):
+            table_active_side_bet_odds[side_bet_name] = sbc.validate_side_bet_payout_table(side_bet_name, self.num_of_decks,
+                                                                                           payout_table, self.seventeen_rule)
+        return table_active_side_bet_odds
+
+    def set_table_active_side_bets(self, side_bet_names, side_bet_limits, payout_tables):
+        # Custom preset of up to 2 side bets - validated before any of it replaces the table's active side bets
+        table_active_side_bet_odds = self.validate_table_active_side_bets(side_bet_names, payout_tables)
+        self.table_active_side_bet_names = list(side_bet_names)
+        self.table_active_side_bet_limits = list(side_bet_limits)
+        self.table_active_side_bet_payout_tables = list(payout_tables)
+        self.table_active_side_bet_odds = table_active_side_bet_odds
+
     def handle_side_bet_if_placed(self, side_bet_name):
         if side_bet_name in self.table_active_side_bet_names:
             side_bet_index = self.table_active_side_bet_names.index(side_bet_name)
@@ -616,195 +752,55 @@ class BlackjackStateMachine:
             else:
                 sys.stderr.write(f"Side bet {side_bet_name} is not supported at this Casino!\n")
 
-    def handle_perfect_pairs_side_bet(self, player, seat_name):
-        # Variables for bet check logic compactness
-        first_hand_card = player.hands[seat_name][0]
-        second_hand_card = player.hands[seat_name][1]
-        first_hand_card_rank = first_hand_card[:-1]
-        second_hand_card_rank = second_hand_card[:-1]
-        first_hand_card_suit = first_hand_card[-1]
-        second_hand_card_suit = second_hand_card[-1]
-        if first_hand_card_suit in ['H', 'D']:
-            first_hand_card_color = 'Red'
-        else:
-            first_hand_card_color = 'Black'
-        if second_hand_card_suit in ['H', 'D']:
-            second_hand_card_color = 'Red'
-        else:
-            second_hand_card_color = 'Black'
-        # Bet value
-        player_side_bet_index = player.placed_side_bet_names[seat_name].index("Perfect Pairs")
-        player_side_bet_amount = player.side_bet_amounts[seat_name][player_side_bet_index]
-        # Perfect Pair
-        if first_hand_card == second_hand_card:
-            payout = player_side_bet_amount * self.supported_side_bet_payout_tables[0]['Perfect Pair']
-            self.pay_winning_player_bet(player, seat_name, "Perfect Pairs", payout)
-        elif first_hand_card_rank == second_hand_card_rank:
-            # Colored Pair
-            if first_hand_card_color == second_hand_card_color:
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[0]['Colored Pair']
-                self.pay_winning_player_bet(player, seat_name, "Perfect Pairs", payout)
-            # Red/Black Pair
-            else:
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[0]['Red/Black Pair']
-                self.pay_winning_player_bet(player, seat_name, "Perfect Pairs", payout)
+    def settle_side_bet_outcome(self, player, seat_name, side_bet_name, outcome):
+        # Pay out a winning side bet outcome (a key of the side bet's payout table), or collect the side bet if outcome is None
+        if outcome == None:
+            self.collect_losing_player_bet(player, seat_name, side_bet_name)
         else:
-            self.collect_losing_player_bet(player, seat_name, "Perfect Pairs")
+            player_side_bet_index = player.placed_side_bet_names[seat_name].index(side_bet_name)
+            player_side_bet_cents = player.side_bet_cents[seat_name][player_side_bet_index]
+            payout_table = self.supported_side_bet_payout_tables[self.supported_side_bet_names.index(side_bet_name)]
+            payout_cents = round(player_side_bet_cents * payout_table[outcome])
+            self.pay_winning_player_bet(player, seat_name, side_bet_name, payout_cents)
+
+    def handle_perfect_pairs_side_bet(self, player, seat_name):
+        outcome = bjl.get_perfect_pairs_outcome(player.hands[seat_name][0], player.hands[seat_name][1])
+        self.settle_side_bet_outcome(player, seat_name, "Perfect Pairs", outcome)
 
     def handle_match_the_dealer_side_bet(self, player, seat_name):
-        # Variables for bet check logic compactness
-        first_hand_card = player.hands[seat_name][0]
-        second_hand_card = player.hands[seat_name][1]
-        dealer_up_card = self.dealer.hands['center_seat'][0]
-        first_hand_card_rank = first_hand_card[:-1]
-        second_hand_card_rank = second_hand_card[:-1]
-        dealer_up_card_rank = dealer_up_card[:-1]
-        first_hand_card_suit = first_hand_card[-1]
-        second_hand_card_suit = second_hand_card[-1]
-        dealer_up_card_suit = dealer_up_card[-1]
-        # Conditionals for bet check logic compactness
-        first_hand_card_suited_match = first_hand_card == dealer_up_card
-        second_hand_card_suited_match = second_hand_card == dealer_up_card
-        first_hand_card_non_suited_match = (first_hand_card_rank == dealer_up_card_rank and 
-                                            first_hand_card_suit != dealer_up_card_suit)
-        second_hand_card_non_suited_match = (second_hand_card_rank == dealer_up_card_rank and 
-                                                second_hand_card_suit != dealer_up_card_suit)
-        first_hand_card_not_a_match = first_hand_card_rank != dealer_up_card_rank
-        second_hand_card_not_a_match = second_hand_card_rank != dealer_up_card_rank
-        # Bet value
-        player_side_bet_index = player.placed_side_bet_names[seat_name].index("Match the Dealer")
-        player_side_bet_amount = player.side_bet_amounts[seat_name][player_side_bet_index]
-        # 2 Suited Matches
-        if first_hand_card_suited_match and second_hand_card_suited_match:
-            payout = player_side_bet_amount * self.supported_side_bet_payout_tables[1]['2 Suited Matches']
-            self.pay_winning_player_bet(player, seat_name, "Match the Dealer", payout)
-        # 1 Non-Suited & 1 Suited Match
-        elif ((first_hand_card_suited_match and second_hand_card_non_suited_match) or 
-                (first_hand_card_non_suited_match and second_hand_card_suited_match)):
-            payout = player_side_bet_amount * self.supported_side_bet_payout_tables[1]['1 Non-Suited & 1 Suited Match']
-            self.pay_winning_player_bet(player, seat_name, "Match the Dealer", payout)
-        # 1 Suited Match
-        elif ((first_hand_card_suited_match and second_hand_card_not_a_match) or 
-                (first_hand_card_not_a_match and second_hand_card_suited_match)):
-            payout = player_side_bet_amount * self.supported_side_bet_payout_tables[1]['1 Suited Match']
-            self.pay_winning_player_bet(player, seat_name, "Match the Dealer", payout)
-        # 2 Non-Suited Matches
-        elif (first_hand_card_non_suited_match and second_hand_card_non_suited_match):
-            payout = player_side_bet_amount * self.supported_side_bet_payout_tables[1]['2 Non-Suited Matches']
-            self.pay_winning_player_bet(player, seat_name, "Match the Dealer", payout)
-        # 1 Non-Suited Match
-        elif ((first_hand_card_non_suited_match and second_hand_card_not_a_match) or 
-                (first_hand_card_not_a_match and second_hand_card_non_suited_match)):
-            payout = player_side_bet_amount * self.supported_side_bet_payout_tables[1]['1 Non-Suited Match']
-            self.pay_winning_player_bet(player, seat_name, "Match the Dealer", payout)
+        outcome = bjl.get_match_the_dealer_outcome(player.hands[seat_name][0], player.hands[seat_name][1],
+                                                   self.dealer.hands['center_seat'][0])
+        self.settle_side_bet_outcome(player, seat_name, "Match the Dealer", outcome)
+
+    def handle_dealer_blackjack_dependent_side_bet(self, player, seat_name, side_bet_name, get_outcome, top_pair_card_name):
+        # Shared by Lucky Ladies and King's Bounty - a pair of top_pair_card_name pays more against a dealer Blackjack,
+        # so it's settled only after the dealer checks for one (unless the dealer's up card rules a Blackjack out)
+        first_hand_card = bjo.encode_card(player.hands[seat_name][0])
+        second_hand_card = bjo.encode_card(player.hands[seat_name][1])
+        dealer_up_card = bjo.encode_card(self.dealer.hands['center_seat'][0])
+        is_top_pair = (first_hand_card == second_hand_card == bjo.card_codes[top_pair_card_name])
+        dealer_can_have_blackjack = bjo.card_high_value(dealer_up_card) in [10, 11]
+        if self.state == GameState.PRE_SCORING:
+            if not (is_top_pair and dealer_can_have_blackjack):
+                self.settle_side_bet_outcome(player, seat_name, side_bet_name, get_outcome(first_hand_card, second_hand_card))
+        elif (self.state == GameState.INITIAL_SCORING) and is_top_pair:
+            if dealer_can_have_blackjack:
+                dealer_has_blackjack = (self.dealer.hand_scores['center_seat'] == 21)
+                outcome = get_outcome(first_hand_card, second_hand_card, dealer_has_blackjack)
+                self.settle_side_bet_outcome(player, seat_name, side_bet_name, outcome)
         else:
-            self.collect_losing_player_bet(player, seat_name, "Match the Dealer")
+            sys.stderr.write(f"{side_bet_name} handler called from an unsupported state {self.state}\n")
 
     def handle_lucky_ladies_side_bet(self, player, seat_name):
-        # Variables for bet check logic compactness
-        first_hand_card = player.hands[seat_name][0]
-        second_hand_card = player.hands[seat_name][1]
-        dealer_up_card = self.dealer.hands['center_seat'][0]
-        first_hand_card_rank = first_hand_card[:-1]
-        second_hand_card_rank = second_hand_card[:-1]
-        dealer_up_card_rank = dealer_up_card[:-1]
-        first_hand_card_suit = first_hand_card[-1]
-        second_hand_card_suit = second_hand_card[-1]
-        first_hand_card_value = bjo.cards[first_hand_card_rank][-1]
-        if first_hand_card_rank == 'A' and second_hand_card_rank == 'A':
-            second_hand_card_value = bjo.cards[first_hand_card_rank][0]
-        else:
-            second_hand_card_value = bjo.cards[first_hand_card_rank][-1]
-        # Bet value
-        player_side_bet_index = player.placed_side_bet_names[seat_name].index("Lucky Ladies")
-        player_side_bet_amount = player.side_bet_amounts[seat_name][player_side_bet_index]
-        if self.state == GameState.PRE_SCORING:
-            if dealer_up_card_rank not in ['10', 'J', 'Q', 'K', 'A']:
-                # Handle non-Blackjack 'Queen of Hearts Pair' payout
-                if (first_hand_card == second_hand_card == 'QH'):
-                    payout = player_side_bet_amount * self.supported_side_bet_payout_tables[2]['Queen of Hearts Pair']
-                    self.pay_winning_player_bet(player, seat_name, "Lucky Ladies", payout)
-            # Handle payouts independent of dealer_up_card
-            elif ((first_hand_card == second_hand_card != 'QH') and (first_hand_card_value == second_hand_card_value == 10)):
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[2]['Matched 20']
-                self.pay_winning_player_bet(player, seat_name, "Lucky Ladies", payout)
-            elif ((first_hand_card_suit == second_hand_card_suit) and (first_hand_card_value + second_hand_card_value == 20)):
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[2]['Suited 20']
-                self.pay_winning_player_bet(player, seat_name, "Lucky Ladies", payout)
-            elif ((first_hand_card_suit != second_hand_card_suit) and (first_hand_card_value + second_hand_card_value == 20)):
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[2]['Unsuited 20']
-                self.pay_winning_player_bet(player, seat_name, "Lucky Ladies", payout)
-            else:
-                self.collect_losing_player_bet(player, seat_name, "Lucky Ladies")
-        # Handle all 'Queen of Hearts Pair' payouts after checking for Dealer Blackjack
-        elif (self.state == GameState.INITIAL_SCORING) and (first_hand_card == second_hand_card == 'QH'):
-            if self.dealer.hand_scores['center_seat'] == 21:
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[2]['Queen of Hearts Pair (with Dealer Blackjack)']
-                self.pay_winning_player_bet(player, seat_name, "Lucky Ladies", payout)
-            else:
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[2]['Queen of Hearts Pair']
-                self.pay_winning_player_bet(player, seat_name, "Lucky Ladies", payout)
-        else:
-            sys.stderr.write(f"Lucky ladies handler called from an unsupported state {self.state}\n")
+        self.handle_dealer_blackjack_dependent_side_bet(player, seat_name, "Lucky Ladies", bjl.get_lucky_ladies_outcome, 'QH')
 
     def handle_kings_bounty_side_bet(self, player, seat_name):
-        # Variables for bet check logic compactness
-        first_hand_card = player.hands[seat_name][0]
-        second_hand_card = player.hands[seat_name][1]
-        dealer_up_card = self.dealer.hands['center_seat'][0]
-        first_hand_card_rank = first_hand_card[:-1]
-        second_hand_card_rank = second_hand_card[:-1]
-        dealer_up_card_rank = dealer_up_card[:-1]
-        first_hand_card_suit = first_hand_card[-1]
-        second_hand_card_suit = second_hand_card[-1]
-        first_hand_card_value = bjo.cards[first_hand_card_rank][-1]
-        if first_hand_card_rank == 'A' and second_hand_card_rank == 'A':
-            second_hand_card_value = bjo.cards[first_hand_card_rank][0]
-        else:
-            second_hand_card_value = bjo.cards[first_hand_card_rank][-1]
-        # Bet value
-        player_side_bet_index = player.placed_side_bet_names[seat_name].index("King's Bounty")
-        player_side_bet_amount = player.side_bet_amounts[seat_name][player_side_bet_index]
-        if self.state == GameState.PRE_SCORING:
-            if dealer_up_card_rank not in ['10', 'J', 'Q', 'K', 'A']:
-                # Handle non-Blackjack 'King of Spades Pair' payout
-                if (first_hand_card == second_hand_card == 'KS'):
-                    payout = player_side_bet_amount * self.supported_side_bet_payout_tables[3]['King of Spades Pair']
-                    self.pay_winning_player_bet(player, seat_name, "King's Bounty", payout)
-            # Handle payouts independent of dealer_up_card
-            elif ((first_hand_card_suit == second_hand_card_suit != 'S') and (first_hand_card_rank == second_hand_card_rank == 'K')):
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[3]['Suited Kings Pair (not spades)']
-                self.pay_winning_player_bet(player, seat_name, "King's Bounty", payout)
-            elif ((first_hand_card_suit == second_hand_card_suit) 
-                  and (first_hand_card_value == second_hand_card_value == 10) 
-                  and (first_hand_card_rank == second_hand_card_rank != 'K')):
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[3]['Suited Qs, Js, or 10s Pair']
-                self.pay_winning_player_bet(player, seat_name, "King's Bounty", payout)
-            elif ((first_hand_card_suit == second_hand_card_suit) and (first_hand_card_value + second_hand_card_value == 20)):
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[3]['Suited 20']
-                self.pay_winning_player_bet(player, seat_name, "King's Bounty", payout)
-            elif ((first_hand_card_suit != second_hand_card_suit) and (first_hand_card_rank == second_hand_card_rank == 'K')):
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[3]['Unsuited Kings Pair']
-                self.pay_winning_player_bet(player, seat_name, "King's Bounty", payout)
-            elif ((first_hand_card_suit != second_hand_card_suit) and (first_hand_card_value + second_hand_card_value == 20)):
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[3]['Unsuited 20']
-                self.pay_winning_player_bet(player, seat_name, "King's Bounty", payout)
-            else:
-                self.collect_losing_player_bet(player, seat_name, "King's Bounty")
-        # Handle all 'King of Spades Pair' payouts after checking for Dealer Blackjack
-        elif (self.state == GameState.INITIAL_SCORING) and (first_hand_card == second_hand_card == 'KS'):
-            if self.dealer.hand_scores['center_seat'] == 21:
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[3]['King of Spades Pair (with Dealer Blackjack)']
-                self.pay_winning_player_bet(player, seat_name, "King's Bounty", payout)
-            else:
-                payout = player_side_bet_amount * self.supported_side_bet_payout_tables[3]['King of Spades Pair']
-                self.pay_winning_player_bet(player, seat_name, "King's Bounty", payout)
-        else:
-            sys.stderr.write(f"Lucky ladies handler called from an unsupported state {self.state}\n")
+        self.handle_dealer_blackjack_dependent_side_bet(player, seat_name, "King's Bounty", bjl.get_kings_bounty_outcome, 'KS')
 
     def handle_buster_blackjack_side_bet(self, player, seat_name):
-        # Todo AB: Implement Buster Blackjack side bet handling
-        pass
+        # Settled once the dealer's hand is final
+        outcome = bjl.get_buster_blackjack_outcome(self.dealer.hands['center_seat'])
+        self.settle_side_bet_outcome(player, seat_name, "Buster Blackjack", outcome)
 
     def score_all_hands_in_play(self):
         for player in self.seated_players.values():
@@ -812,13 +808,15 @@ class BlackjackStateMachine:
                 # Score each player's hands
                 for seat_name, seat_number in player.occupied_seats.items():
                     if (seat_number != None):
-                        player_hand_score = bjl.highest_hand_score(player.hands[seat_name])
+                        player.hand_states[seat_name] = bjl.get_hand_state(player.hands[seat_name])
+                        player_hand_score = bjl.hand_state_score(player.hand_states[seat_name])
                         player.hand_scores[seat_name] = player_hand_score
                         # Track natural blackjack hands for each player, as they're encountered
                         if (player_hand_score == 21):
                             self.current_round_natural_blackjacks[player].append(seat_name)
         #self.print_all_players_with_natural_blackjack_hands()
-        dealer_hand_score = bjl.highest_hand_score(self.dealer.hands['center_seat'])
+        self.dealer.hand_states['center_seat'] = bjl.get_hand_state(self.dealer.hands['center_seat'])
+        dealer_hand_score = bjl.hand_state_score(self.dealer.hand_states['center_seat'])
         self.dealer.hand_scores['center_seat'] = dealer_hand_score
 
 
@@ -831,20 +829,17 @@ class BlackjackStateMachine:
                 player_chip_bet = player.main_bets[seat_name]
                 for chip_color, chip_count in player_chip_bet.items():
                     # Move all bet chips from Player's betting circle to Dealer and update Dealer's balance
-                    chip_value = bjo.chips[chip_color]
                     player_chip_bet[chip_color] -= chip_count
                     self.dealer.chips[chip_color] += chip_count
-                    self.dealer.chip_pool_balance += chip_count*chip_value
+                    self.dealer.chip_pool_cents += chip_count*bjcl.chip_cents[chip_color]
                 # Refund Player half of their bet amount rounded down, placing it in the betting circle
                 
 
 
-                self.dealer.cast_whole_number_chip_pool_balance_to_int()
                 ## Reset losing player's bet ##
-                getattr(player, bets_name)[seat_name] = None # player.main_bets[seat_name] OR player.side_bets[seat_name]
-                bet_amounts_name = bet_type + '_bet_amounts'
-                getattr(player, bet_amounts_name)[seat_name] = None # player.main_bet_amounts[seat_name] OR player.side_bet_amounts[seat_name]
-                # No need to subtract chips and chip_pool_balance for Player - already done when a bet is submitted
+                player.main_bets[seat_name] = None
+                player.main_bet_cents[seat_name] = None
+                # No need to subtract chips and chip_pool_cents for Player - already done when a bet is submitted
                 
 
 
@@ -862,14 +857,14 @@ class BlackjackStateMachine:
 
     def offer_early_surrender_if_used_at_table_to_all_players(self): # Todo AB: Test offer_early_surrender_if_used_at_table_to_all_players()
         dealer_up_card = self.dealer.hands['center_seat'][0]
-        dealer_up_card_rank = dealer_up_card[:-1]
+        dealer_up_card_rank = bjo.card_rank_name(bjo.encode_card(dealer_up_card))
         if ((self.surrender_rule == 'ES') or ((self.surrender_rule == 'ES10') and (dealer_up_card_rank in ['10', 'J', 'Q', 'K']))):
             for player in self.seated_players.values():
                 if player != None:
                     for seat_name, seat_number in player.occupied_seats.items():
                         if seat_number != None:
                             print(f"Player '{player.name}', would you like to make an early surrender of hand {player.hands[seat_name]} at Seat ", end='')
-                            print(f"#{player.occupied_seats[seat_name]} and forfeit half of your bet of ${player.main_bet_amounts[seat_name]} (rounded up)?")
+                            print(f"#{player.occupied_seats[seat_name]} and forfeit half of your bet of ${bjcl.cents_to_dollars(player.main_bet_cents[seat_name])} (rounded up)?")
                             print("Press 'y' for Yes', 'n' for No.")
                             self.get_player_surrender_response(player, seat_name)
         else:
@@ -886,7 +881,10 @@ class BlackjackStateMachine:
             pass
 
     def reveal_dealer_hand(self):
+        self.card_counter.reveal(self.get_dealer_hand()[1])
         print(f"Dealer hand is {self.dealer.hands['center_seat']}")
+        if self.round_log != None:
+            self.round_log.record_dealer_hand(self.get_dealer_hand(), self.get_dealer_hand_score())
 
 
     def reset_natural_blackjack_tracking(self): # Removes all natural player blackjacks from being tracked this round
@@ -894,6 +892,14 @@ class BlackjackStateMachine:
             #print(f"Dealer pushes against player {player.name} with natural blackjack of {hand})
             self.current_round_natural_blackjacks[player].clear()
 
+    def record_dealer_rack(self):
+        # Track rack levels after every payout and collection, filling and crediting colors past their thresholds
+        dealer_chip_counts = bjcl.chip_dict_to_counts(self.dealer.chips)
+        rack_change_cents = self.dealer_rack.record(dealer_chip_counts)
+        if rack_change_cents != 0:
+            self.dealer.chips.update(bjcl.chip_counts_to_dict(dealer_chip_counts))
+            self.dealer.chip_pool_cents += rack_change_cents
+
     def collect_losing_player_bet(self, player, seat_name, side_bet_name = None):
         if seat_name not in ['right_seat', 'center_seat', 'left_seat']:
             sys.stderr.write(f"Invalid seat_name '{seat_name}' provided! Valid seat names are 'right_seat', 'center_seat', and 'left_seat'")     
@@ -908,18 +914,19 @@ class BlackjackStateMachine:
         if player_chip_bet != None:
             # Transfer chips from a losing bet dictionary to dealer chip pool; update dealer chip balance
             for chip_color, chip_count in player_chip_bet.items():
-                chip_value = bjo.chips[chip_color]
                 self.dealer.chips[chip_color] += chip_count
-                self.dealer.chip_pool_balance += chip_count*chip_value # No need to subtract chips and chip_pool_balance for Player - happened when bet was submitted
-            self.dealer.cast_whole_number_chip_pool_balance_to_int()
+                self.dealer.chip_pool_cents += chip_count*bjcl.chip_cents[chip_color] # No need to subtract chips and chip_pool_cents for Player - happened when bet was submitted
+            self.record_dealer_rack()
+            if (side_bet_name == None) and (self.round_log != None):
+                self.round_log.record_payout(player.occupied_seats[seat_name], -player.main_bet_cents[seat_name])
             # Reset player's losing bet dictionary and discard hand
             if side_bet_name == None:
                 getattr(player, 'main_bets')[seat_name] = None # player.main_bets[seat_name]
-                getattr(player, 'main_bet_amounts')[seat_name] = None # player.main_bet_amounts[seat_name]
+                getattr(player, 'main_bet_cents')[seat_name] = None # player.main_bet_cents[seat_name]
             elif side_bet_name in self.supported_side_bet_names:
                 player_side_bet_index = player.placed_side_bet_names[seat_name].index(side_bet_name)
                 getattr(player, 'side_bets')[seat_name][player_side_bet_index] = None # player.side_bets[seat_name][1] or player.side_bets[seat_name][2]
-                getattr(player, 'side_bet_amounts')[seat_name][player_side_bet_index] = None # player.side_bet_amounts[seat_name][1] or player.side_bet_amounts[seat_name][2]
+                getattr(player, 'side_bet_cents')[seat_name][player_side_bet_index] = None # player.side_bet_cents[seat_name][1] or player.side_bet_cents[seat_name][2]
             else:
                 sys.stderr.write(f"Unsupported side bet name '{side_bet_name}' provided! Valid side bet names - {self.supported_side_bet_names}")
             self.discard.extend(player.hands[seat_name])
@@ -950,7 +957,7 @@ class BlackjackStateMachine:
     # Chip transfer functions
     # Examples:
     # src_dict = dealer.chips // dst_dict = player.main_bet_winnings[seat_name]
-    # // Update dealer.chip_pool_balance AND player.main_bet_winnings_amounts[seat_name]
+    # // Update dealer.chip_pool_cents AND player.main_bet_winnings_cents[seat_name]
     # src_dict = dealer.chips // dst_dict = player.side_bet_winnings[seat_name][side_bet_index]
     # // Update 
     # src_dict = player.main_bets[seat_name] // dst_dict = dealer.chips
@@ -959,7 +966,7 @@ class BlackjackStateMachine:
     # // Update 
     # Todo AB: Test transfer_chips_from_dealer_to_player()
     
-    def pay_winning_player_bet(self, player, seat_name, side_bet_name, payout):
+    def pay_winning_player_bet(self, player, seat_name, side_bet_name, payout_cents):
         if seat_name not in ['right_seat', 'center_seat', 'left_seat']:
             sys.stderr.write(f"Invalid seat_name '{seat_name}' provided! Valid seat names are 'right_seat', 'center_seat', and 'left_seat'")
         # 1. Retrieve all fields involved in chip transfer
@@ -967,68 +974,57 @@ class BlackjackStateMachine:
             # For main bets
             player_chip_bet = getattr(player, 'main_bets')[seat_name] # player.main_bets[seat_name]
             player_chip_winnings = getattr(player, 'main_bet_winnings')[seat_name] # player.main_bet_winnings[seat_name]
-            player_bet_amount = getattr(player, 'main_bet_amounts')[seat_name] # player.main_bet_amounts[seat_name]
-            player_winnings_amount = getattr(player, 'main_bet_winnings_amounts')[seat_name] # player.main_bet_winnings_amounts[seat_name]
+            player_bet_cents = getattr(player, 'main_bet_cents')[seat_name] # player.main_bet_cents[seat_name]
+            player_winnings_cents = getattr(player, 'main_bet_winnings_cents')[seat_name] # player.main_bet_winnings_cents[seat_name]
         elif side_bet_name in self.supported_side_bet_names:
             # For side bets
             player_side_bet_index = player.placed_side_bet_names[seat_name].index(side_bet_name)
             player_chip_bet = getattr(player, 'side_bets')[seat_name][player_side_bet_index] # player.side_bets[seat_name][0] or player.side_bets[seat_name][1]
             player_chip_winnings = getattr(player, 'side_bet_winnings')[seat_name][player_side_bet_index] # player.side_bet_winnings[seat_name][0] or player.side_bet_winnings[seat_name][1]
-            player_bet_amount = getattr(player, 'side_bet_amounts')[seat_name][player_side_bet_index] # player.side_bet_amounts[seat_name][0] or player.side_bet_amounts[seat_name][1]
-            player_winnings_amount = getattr(player, 'side_bet_winnings_amounts')[seat_name][player_side_bet_index] # player.side_bet_winnings_amounts[seat_name][0] or player.side_bet_winnings_amounts[seat_name][1]
+            player_bet_cents = getattr(player, 'side_bet_cents')[seat_name][player_side_bet_index] # player.side_bet_cents[seat_name][0] or player.side_bet_cents[seat_name][1]
+            player_winnings_cents = getattr(player, 'side_bet_winnings_cents')[seat_name][player_side_bet_index] # player.side_bet_winnings_cents[seat_name][0] or player.side_bet_winnings_cents[seat_name][1]
         else:
             sys.stderr.write(f"Unsupported side bet name '{side_bet_name}' provided! Valid side bet names - {self.supported_side_bet_names}")
         # 2. Check that transfer can be completed - no involved player fields are set to None
-        if None in [player_chip_bet, player_chip_winnings, player_bet_amount, player_winnings_amount]:
+        if None in [player_chip_bet, player_chip_winnings, player_bet_cents, player_winnings_cents]:
             sys.stderr.write(f"Chip transfer couldn't be completed - one of the used transfer fields is set to None\n")
             sys.stderr.write(f"player_chip_bet --> {player_chip_bet}\n")
             sys.stderr.write(f"player_chip_winnings --> {player_chip_winnings}\n")
-            sys.stderr.write(f"player_bet_amount --> {player_bet_amount}\n")
-            sys.stderr.write(f"player_winnings_amount --> {player_winnings_amount}\n")
+            sys.stderr.write(f"player_bet_cents --> {player_bet_cents}\n")
+            sys.stderr.write(f"player_winnings_cents --> {player_winnings_cents}\n")
             return
-        # 3. Special Case for 3:2 Blackjack /w $1 bet - Swap $1 chip in betting circle /w a Pink chip
-        if (payout == 1.5):
-            player_chip_bet['White'] -= 1
-            self.dealer.chips['White'] += 1
-            self.dealer.chip_pool_balance += 1
-            self.dealer.chips['Pink'] -= 1
-            self.dealer.chip_pool_balance -= 2.5
-            self.dealer.cast_whole_number_chip_pool_balance_to_int() # Turns balances such as 37.5 - 2.5 = 35.0 to 35 w/o decimal
-            player_chip_bet['Pink'] += 1
-            player_winnings_amount = 1.5
+        # 3. Payouts that can't be made in chips (3:2 on a $1 bet is $1.5) are paid together with the bet - the bet's chips
+        #    go back to the dealer, who pays bet and winnings in one go, so the $1 White comes back as a $2.5 Pink
+        dealer_chip_counts = bjcl.chip_dict_to_counts(self.dealer.chips)
+        paid_cents = payout_cents
+        paid_chips = player_chip_winnings
+        if bjcl.get_chip_counts_for_cents(payout_cents) == None:
+            dealer_chip_counts = [dealer_chip_count + bet_chip_count for dealer_chip_count, bet_chip_count
+                                  in zip(dealer_chip_counts, bjcl.chip_dict_to_counts(player_chip_bet))]
+            paid_cents += player_bet_cents
+            paid_chips = player_chip_bet
+        # 4. Pay with the fewest chips the dealer's rack can cover
+        payout_chip_counts = bjcl.get_chip_counts_for_cents(paid_cents, dealer_chip_counts)
+        if (payout_chip_counts == None):
+            sys.stderr.write(f"Chip transfer couldn't be completed - dealer's chips can't cover a payout of ${bjcl.cents_to_dollars(payout_cents)}\n")
             return
-        # 4. Pay a Pink chip for a fractional bet (multiple of 0.5)
-        if (type(payout) == float and (payout % 0.5 == 0)):
-            self.dealer.chips['Pink'] -= 1
-            self.dealer.chip_pool_balance -= 2.5
-            self.dealer.cast_whole_number_chip_pool_balance_to_int() # Turns balances such as 37.5 - 2.5 = 35.0 to 35 w/o decimal
-            player_chip_winnings['Pink'] += 1
-            player_winnings_amount += 2.5
-            print(f"Paying a Pink chip for payout of ${payout}")
-            payout -= 2.5
-        # 5. Pay remaining part of winnings, if any
-        if (payout != 0):
-            print(f"Remaining payout is ${payout}")
-            for chip_name, chip_value in bjo.reverse_chips.items():
-                if chip_name != 'Pink':
-                    remainder = payout % chip_value
-                    if (remainder in range(0, payout)): # range() excludes upper bound in generated list
-                        chip_count = math.floor(payout/chip_value)
-                        self.dealer.chips[chip_name] -= chip_count
-                        self.dealer.chip_pool_balance -= chip_count*chip_value
-                        self.dealer.cast_whole_number_chip_pool_balance_to_int() # Turns balances such as 37.5 - 2.5 = 35.0 to 35 w/o decimal
-                        player_chip_winnings[chip_name] += chip_count
-                        player_winnings_amount += chip_count*chip_value
-                        print(f"Paying {chip_count} {chip_name} chips for remaining payout of ${payout}")
-                        payout -= chip_count*chip_value
-                        print(f"${payout} remaining to be paid out")
-                        if (payout == 0):
-                            player.cast_whole_number_bet_winnings_amount_to_int()
-                            break
-
-    """
-    player.cast_whole_number_chip_pool_balance_to_int() # Turns balances such as 37.5 + 2.5 = 40.0 to 40 w/o decimal
-    """
+        if paid_chips is player_chip_bet:
+            for chip_name, chip_count in player_chip_bet.items():
+                self.dealer.chips[chip_name] += chip_count
+                player_chip_bet[chip_name] = 0
+            self.dealer.chip_pool_cents += player_bet_cents
+        for chip_name, chip_count in bjcl.chip_counts_to_dict(payout_chip_counts).items():
+            self.dealer.chips[chip_name] -= chip_count
+            paid_chips[chip_name] += chip_count
+        self.dealer.chip_pool_cents -= paid_cents
+        player_winnings_cents += payout_cents
+        if side_bet_name == None:
+            player.main_bet_winnings_cents[seat_name] = player_winnings_cents
+            if self.round_log != None:
+                self.round_log.record_payout(player.occupied_seats[seat_name], payout_cents)
+        else:
+            player.side_bet_winnings_cents[seat_name][player_side_bet_index] = player_winnings_cents
+        self.record_dealer_rack()
 
 
 
@@ -1045,11 +1041,9 @@ class BlackjackStateMachine:
                     # In regular (3:2) payout ratio, fractional .5 payouts always involve a Pink chip
                     if (type(remaining_payout) == float):
                         self.dealer.chips['Pink'] -= 1
-                        self.dealer.chip_pool_balance -= 2.5
-                        self.dealer.clean_up_fractions('center_seat') # WILL THIS MESS UP EXISTING FRACTIONAL BALANCE?
+                        self.dealer.chip_pool_cents -= bjcl.pink_chip_cents
                         player.chips['Pink'] += 1
-                        player.chip_pool_balance += 2.5
-                        player.clean_up_fractions(seat_name) # WILL THIS MESS UP EXISTING FRACTIONAL BALANCE?
+                        player.chip_pool_cents += bjcl.pink_chip_cents
 
                         remaining_payout -= 1*2.5
                         remaining_payout = int(remaining_payout)
@@ -1063,11 +1057,9 @@ class BlackjackStateMachine:
                                     self.transfer_main_bet_chips_and_update_balance(self.dealer, 'center_seat', player)
 
                                     self.dealer.chips[chip_name] -= chip_count
-                                    self.dealer.chip_pool_balance -= chip_count*chip_value
-                                    self.dealer.clean_up_fractions('center_seat') # WILL THIS MESS UP EXISTING FRACTIONAL BALANCE?
+                                    self.dealer.chip_pool_cents -= chip_count*bjcl.chip_cents[chip_name]
                                     player.chips[chip_name] += chip_count
-                                    player.chip_pool_balance += chip_count*chip_value
-                                    player.clean_up_fractions(seat_name) # WILL THIS MESS UP EXISTING FRACTIONAL BALANCE?
+                                    player.chip_pool_cents += chip_count*bjcl.chip_cents[chip_name]
 
                                     remaining_payout -= chip_count*chip_value
                                     if (remaining_payout == 0):
@@ -1077,10 +1069,9 @@ class BlackjackStateMachine:
                     for chip_color, chip_count in player.main_bets[seat_name].items():
                         self.dealer.chips[chip_color] += chip_count
                         player.main_bets[seat_name][chip_color] -= chip_count
-                    # Update dealer.chip_pool_balance
-                    self.dealer.chip_pool_balance += player.main_bet_amounts[seat_name]
-                    self.dealer.clean_up_fractions('center_seat')
-                    player.main_bet_amounts[seat_name] = 0
+                    # Update dealer.chip_pool_cents
+                    self.dealer.chip_pool_cents += player.main_bet_cents[seat_name]
+                    player.main_bet_cents[seat_name] = 0
                     """
         elif self.state == GameState.FINAL_SCORING:
             pass
@@ -1092,6 +1083,7 @@ class BlackjackStateMachine:
             self.discard.extend(player.hands[seat_name])
             player.hands[seat_name].clear()
             player.hand_scores[seat_name] = 0
+            player.hand_states[seat_name] = None
         else:
             sys.stderr.write(f"Invalid seat_name '{seat_name}' provided! Valid seat names are 'right_seat', 'center_seat', and 'left_seat'")
 
@@ -1104,7 +1096,7 @@ class BlackjackStateMachine:
         self.discard_hand_and_reset_score(self.dealer, 'center_seat')
 
     def handle_round_end_transition(self):
-        if 'front_cut_card' in self.discard:
+        if self.shoe.cut_card_reached():
             print("SHOE END, reshuffling!")
             self.transition(GameState.SHUFFLING)
         else:
@@ -1151,18 +1143,23 @@ class BlackjackStateMachine:
         match key:
             case '1':
                 print(f"Executing action 'stand' for player '{player.name}' at Seat #{seat_number} (their '{seat_name}')")
+                self.log_action('stand')
                 return True # alternatively self.stand(player) returning True
             case '2':
                 print(f"Executing action 'hit' for player '{player.name}' at Seat #{seat_number} (their '{seat_name}')")
+                self.log_action('hit')
                 self.hit(player, seat_name)
             case '3':
                 print(f"Executing action 'double' for player '{player.name}' at Seat #{seat_number} (their '{seat_name}')")
+                self.log_action('double')
                 self.double(player, seat_name)
             case '4':
                 print(f"Executing action 'split' for player '{player.name}' at Seat #{seat_number} (their '{seat_name}')")
+                self.log_action('split')
                 self.split(player, seat_name)
             case '5':
                 print(f"Executing action 'surrender' for player '{player.name}' at Seat #{seat_number} (their '{seat_name}')")
+                self.log_action('surrender')
                 self.surrender(player, seat_name)
             case 'v':
                 prutils.view_player_turn_action_options()
@@ -1170,15 +1167,16 @@ class BlackjackStateMachine:
                 player.print_current_bet(seat_name, None)
                 #player.print_current_main_bet(seat_name)
             case 'c':
-                self.color_up(player) # Todo AB: implement color_up()
+                self.color_up(player)
             case 'b':
-                self.break_down(player) # Todo AB: implement break_down()
+                self.break_down(player)
             case other:
                 sys.stderr.write(f"Invalid input '{key}'\n")
                 print("Provide a valid key or press 'v' to see valid key input options")
 
 
     def dealer_plays(self):
+        self.card_counter.reveal(self.get_dealer_hand()[1]) # hole card is turned over before the dealer plays
         initial_dealer_hand_score = self.dealer.hand_scores['center_seat']
         if self.seventeen_rule == 'S17':
             print(f"{self.seventeen_rule} rule is in play")
@@ -1190,11 +1188,8 @@ class BlackjackStateMachine:
                     # Execute 'hit'
                     print(f"Hitting Dealer's hand of {self.dealer.hands['center_seat']}")
                     self.hit(self.dealer, 'center_seat')
-                    # Score the updated hand
-                    new_dealer_hand_score = bjl.highest_hand_score(self.dealer.hands['center_seat'])
-                    # Overwrite old score value with new one
-                    self.dealer.hand_scores['center_seat'].clear()
-                    self.dealer.hand_scores['center_seat'].append(new_dealer_hand_score)
+                    # Overwrite old score value with the one of the updated hand state
+                    self.dealer.hand_scores['center_seat'] = bjl.hand_state_score(self.dealer.hand_states['center_seat'])
                     print("Dealer's hand is now", self.dealer.hands['center_seat'],
                         "and has a score of", self.dealer.hand_scores['center_seat'])
                 if (self.dealer.hand_scores['center_seat'] == 21):
@@ -1217,11 +1212,8 @@ class BlackjackStateMachine:
                     # Execute 'hit'
                     print(f"Hitting Dealer's hand of {self.dealer.hands['center_seat']}")
                     self.hit(self.dealer, 'center_seat')
-                    # Score the updated hand
-                    new_dealer_hand_score = bjl.highest_hand_score(self.dealer.hands['center_seat'])
-                    # Overwrite old score value with new one
-                    self.dealer.hand_scores['center_seat'].clear()
-                    self.dealer.hand_scores['center_seat'].append(new_dealer_hand_score)
+                    # Overwrite old score value with the one of the updated hand state
+                    self.dealer.hand_scores['center_seat'] = bjl.hand_state_score(self.dealer.hand_states['center_seat'])
                     print("Dealer's hand is now", self.dealer.hands['center_seat'],
                         "and has a score of", self.dealer.hand_scores['center_seat'])
                 if (self.dealer.hand_scores['center_seat'] < 0):
@@ -1281,13 +1273,13 @@ class BlackjackStateMachine:
         # Pay all winning blackjack bets right-to-left
         for player, seat_name_list in self.current_round_natural_blackjacks.keys():
             for seat_name in reversed(seat_name_list):
-                payout = player.main_bet_amounts[seat_name] * self.blackjack_ratio
+                payout_cents = round(player.main_bet_cents[seat_name] * self.blackjack_ratio)
                 if self.blackjack_ratio == 1.2: # Rounding only applies to 6:5 Blackjack payout ratio
-                    payout = round(payout)
-                    print(f"Paying Blackjack 6:5 of ${payout} to player {player.name} with hand of {player.hands[seat_name]}")
+                    payout_cents = bjcl.dollars_to_cents(round(bjcl.cents_to_dollars(payout_cents)))
+                    print(f"Paying Blackjack 6:5 of ${bjcl.cents_to_dollars(payout_cents)} to player {player.name} with hand of {player.hands[seat_name]}")
                 else:
-                    print(f"Paying Blackjack 3:2 of ${payout} to player {player.name} with hand of {player.hands[seat_name]}")
-                self.pay_winning_player_bet(player, seat_name, None, payout)
+                    print(f"Paying Blackjack 3:2 of ${bjcl.cents_to_dollars(payout_cents)} to player {player.name} with hand of {player.hands[seat_name]}")
+                self.pay_winning_player_bet(player, seat_name, None, payout_cents)
         # Collect winning blackjack player hands right-to-left
         for player, seat_name_list in self.current_round_natural_blackjacks.keys():
             for seat_name in reversed(seat_name_list):
@@ -1335,7 +1327,7 @@ class BlackjackStateMachine:
                 self.score_all_hands_in_play()
                 self.offer_early_surrender_if_used_at_table_to_all_players()
                 if self.current_round_remaining_player_hands != 0:
-                    dealer_up_card_rank = self.dealer.hands['center_seat'][0][:-1]
+                    dealer_up_card_rank = bjo.card_rank_name(bjo.encode_card(self.dealer.hands['center_seat'][0]))
                     if dealer_up_card_rank == 'A':
                         print("Dealer's face card is an Ace!")
                         print("Offering 'insurance' side bet and 'even money':")
@@ -1383,6 +1375,11 @@ class BlackjackStateMachine:
                 print("\nExiting state machine...")
 
 
+def load_snapshot(snapshot):
+    # Table (of whichever BlackjackStateMachine class took the snapshot) from BlackjackStateMachine.save_snapshot
+    return pickle.loads(snapshot)
+
+
 
 """
 def add_state(self, prev_state, next_state, transition_condition, transition_output):
@@ -4,73 +4,269 @@ Author: Alexander Bulanov
 """
 
 ### Imports ###
+import collections
 import itertools
+import math
+try:
+    import numpy as np # only needed for batch scoring
+except ImportError:
+    np = None
 #import blackjack_game_objects as bjo
 from . import blackjack_game_objects as bjo
+from . import chip_ledger as bjcl
+
+
+### Hand States ###
+# A hand state packs a hand's best total and its soft flag (an Ace counted as 11) into one int - (total << 1) | soft_flag.
+# Scoring a card is a single lookup in hand_state_transitions[hand_state][card_high_value], so a hit costs O(1)
+# instead of re-walking the whole hand. Blackjack (21) and bust states are absorbing - once a hand reaches either,
+# any further cards leave it unchanged.
+empty_hand_state = 0
+bust_hand_state = 22 << 1 # total of 22 stands in for a busted hand (scored as -1)
+num_of_hand_states = bust_hand_state + 2
+
+def next_hand_total_and_soft_flag(hand_total, soft_flag, high_value):
+    # Case ladder that highest_hand_score() used to walk for every card of a hand
+    is_ace = (high_value == 11)
+    low_value = 1 if is_ace else high_value
+    # Case Group A - Hard Hands (w/o Aces at Value of 11)
+    if (soft_flag == 0):
+        # Case 1A - Hard hand, busts even on 1 from an Ace
+        if (hand_total+low_value > 21):
+            return 22, 0
+        # Case 2A - Hard hand, adding a new Ace's low value makes Blackjack
+        elif (is_ace and (hand_total+low_value == 21)):
+            return 21, 0
+        # Case 3A - Hard hand, adding any high value makes Blackjack
+        elif (hand_total+high_value == 21):
+            return 21, int(is_ace)
+        # Case 4A - Hard hand, adding a new Ace's high value would bust
+        elif (is_ace and (hand_total+high_value > 21)):
+            return hand_total+low_value, 0
+        # Case 5A - Hard hand, adding any high card value doesn't bust or make Blackjack
+        else:
+            return hand_total+high_value, int(is_ace)
+    # Case Group B - Soft Hands (containing an Ace /w Value of 11)
+    else:
+        # Case 1B - Soft hand, adding a new Ace's low value makes Blackjack
+        if (is_ace and (hand_total+low_value == 21)):
+            return 21, 1
+        # Case 2B - Soft hand, adding any non-Ace's high value makes Blackjack
+        elif ((not is_ace) and (hand_total+high_value == 21)):
+            return 21, 1
+        # Case 3B - Soft hand, adding a new Ace's high value would bust
+        elif is_ace:
+            return hand_total+low_value, 1
+        # Case 4B - Soft hand, adding non-Ace's high value would bust
+        elif (hand_total+high_value > 21):
+            return hand_total-10+high_value, 0
+        # Case 5B - Soft hand, adding any non-Ace's high value doesn't bust or make Blackjack
+        else:
+            return hand_total+high_value, 1
+
+hand_state_transitions = [] # indexed by [hand_state][card_high_value], card values 0-1 unused
+for hand_state in range(0, num_of_hand_states):
+    hand_total, soft_flag = hand_state >> 1, hand_state & 1
+    next_hand_states = [hand_state]*12
+    if (hand_total < 21):
+        for high_value in range(2, 12):
+            next_hand_total, next_soft_flag = next_hand_total_and_soft_flag(hand_total, soft_flag, high_value)
+            next_hand_states[high_value] = (next_hand_total << 1) | next_soft_flag
+    hand_state_transitions.append(next_hand_states)
+
+def add_card(hand_state, card):
+    # Accepts either a shorthand card name ('10H') or a card code
+    if type(card) is str:
+        card = bjo.card_codes[card]
+    return hand_state_transitions[hand_state][card >> bjo.card_value_shift]
+
+def get_hand_state(player_hand):
+    hand_state = empty_hand_state
+    for card in player_hand:
+        if type(card) is str:
+            card = bjo.card_codes[card]
+        hand_state = hand_state_transitions[hand_state][card >> bjo.card_value_shift] # add_card, inlined for whole hands
+    return hand_state
+
+def hand_state_score(hand_state):
+    return -1 if (hand_state == bust_hand_state) else (hand_state >> 1)
+
+def hand_state_is_soft(hand_state):
+    return (hand_state & 1) == 1
+
+
+### Batch Scoring ###
+def highest_hand_scores_batch(hands, hand_lengths):
+    # Scores N hands at once - hands is an (N, max_cards) int array of card codes (padding past each hand's length
+    # can hold any value, it's never looked up) and hand_lengths holds the number of cards in each hand. Applies the
+    # hand state transition table one card column at a time, so every hand is scored exactly like highest_hand_score()
+    # would score it.
+    # Returns (hand_scores, soft_flags, bust_mask, blackjack_mask) - blackjack_mask marks two-card 21s (naturals).
+    if np == None:
+        raise ImportError("highest_hand_scores_batch() requires NumPy")
+    hands = np.asarray(hands)
+    hand_lengths = np.asarray(hand_lengths)
+    transition_table = np.asarray(hand_state_transitions, dtype=np.int8).ravel()
+    hand_states = np.full(len(hands), empty_hand_state, dtype=np.int8)
+    for card_index in range(0, hands.shape[1]):
+        # Padding is looked up as high value 0, which leaves every hand state as it is
+        card_high_values = np.where(card_index < hand_lengths, hands[:, card_index] >> bjo.card_value_shift, 0).astype(np.intp)
+        hand_states = transition_table[hand_states.astype(np.intp)*12 + card_high_values]
+    bust_mask = (hand_states == bust_hand_state)
+    hand_scores = np.where(bust_mask, -1, hand_states >> 1).astype(np.int8)
+    soft_flags = (hand_states & 1).astype(bool)
+    blackjack_mask = (hand_lengths == 2) & (hand_scores == 21)
+    return hand_scores, soft_flags, bust_mask, blackjack_mask
 
 
 ### Functions ###
 def highest_hand_score(player_hand):
-    highest_hand_score = 0
-    soft_hand = 0
+    # Full-hand scoring, kept for callers that don't track a hand state
+    return hand_state_score(get_hand_state(player_hand))
+
+
+def is_soft_hand(player_hand):
+    # A hand is soft when one of its Aces can still count as 11 without busting
+    low_hand_score = 0
+    has_ace = False
     for card in player_hand:
-        key = card[:-1] # key to access value of a card from bjo.cards dictionary
-        low_value = bjo.cards[key][0] # 1-9 - 1-9, 10/J/Q/K - 10, A - 1
-        high_value = bjo.cards[key][-1] # same as above, except A - 11
-        # Case Group A - Hard Hands (w/o Aces at Value of 11)
-        if (soft_hand == 0):
-            # Case 1A - Hard hand, busts even on 1 from an Ace
-            if (highest_hand_score+low_value > 21):
-                return -1
-            # Case 2A - Hard hand, adding a new Ace's low value makes Blackjack
-            elif ((key == 'A') and (highest_hand_score+low_value == 21)):
-                return 21
-            # Case 3A - Hard hand, adding any non-Ace's high value makes Blackjack
-            elif (highest_hand_score+high_value == 21):
-                return 21
-            # Case 4A - Hard hand, adding a new Ace's high value would bust
-            elif ((key == 'A') and (highest_hand_score+high_value > 21)):
-                highest_hand_score += low_value
-            # Case 5A - Hard hand, adding any high card value doesn't bust or make Blackjack
-            elif (highest_hand_score+high_value < 21):
-                highest_hand_score += high_value
-                # Update count of high-value aces in the hand as needed
-                if (key == 'A'):
-                    soft_hand += 1
-        # Case Group B - Soft Hands (containing an Ace /w Value of 11)
+        if type(card) is str:
+            card = bjo.card_codes[card]
+        high_value = card >> bjo.card_value_shift
+        if (high_value == 11):
+            low_hand_score += 1
+            has_ace = True
         else:
-            # Case 1B - Soft hand, adding a new Ace's low value makes Blackjack
-            if ((key == 'A') and (highest_hand_score+low_value == 21)):
-                return 21
-            # Case 2B - Soft hand, adding any non-Ace's high value makes Blackjack
-            elif ((key != 'A') and (highest_hand_score+high_value == 21)):
-                return 21
-            # Case 3B - Soft hand, adding a new Ace's high value would bust
-            elif ((key == 'A') and (highest_hand_score+high_value > 21)):
-                highest_hand_score += low_value
-            # Case 4B - Soft hand, adding non-Ace's high value would bust
-            elif ((key != 'A') and (highest_hand_score+high_value > 21)):
-                highest_hand_score -= 10
-                highest_hand_score += high_value
-                soft_hand = 0
-            # Case 5B - Soft hand, adding any non-Ace's high value doesn't bust or make Blackjack
-            elif ((key != 'A') and (highest_hand_score+high_value < 21)):
-                highest_hand_score += high_value
-    return highest_hand_score
+            low_hand_score += high_value
+    return has_ace and (low_hand_score+10 <= 21)
+
+
+def get_chips_for_amount(amount, available_chips=None):
+    # Break a dollar amount (a multiple of $0.5) into chips, largest denominations first
+    # Returns a chip_color: chip_count dictionary, or None if available_chips can't cover the amount exactly
+    available_chip_counts = None if (available_chips == None) else bjcl.chip_dict_to_counts(available_chips)
+    amount_chip_counts = bjcl.get_chip_counts_for_cents(bjcl.dollars_to_cents(amount), available_chip_counts)
+    if amount_chip_counts == None:
+        return None
+    return bjcl.chip_counts_to_dict(amount_chip_counts)
+
 
 
+### Side Bet Outcomes ###
+# Each classifier takes card codes (or shorthand card names) and returns the key of the winning outcome in the
+# side bet's payout table, or None if the side bet loses
+def get_perfect_pairs_outcome(first_card, second_card):
+    first_card = bjo.encode_card(first_card)
+    second_card = bjo.encode_card(second_card)
+    if bjo.card_rank_index(first_card) != bjo.card_rank_index(second_card):
+        return None
+    if first_card == second_card:
+        return 'Perfect Pair'
+    if bjo.card_color(first_card) == bjo.card_color(second_card):
+        return 'Colored Pair'
+    return 'Red/Black Pair'
+
+
+def get_match_the_dealer_outcome(first_card, second_card, dealer_up_card):
+    dealer_up_card = bjo.encode_card(dealer_up_card)
+    suited_matches = 0
+    non_suited_matches = 0
+    for card in [bjo.encode_card(first_card), bjo.encode_card(second_card)]:
+        if card == dealer_up_card:
+            suited_matches += 1
+        elif bjo.card_rank_index(card) == bjo.card_rank_index(dealer_up_card):
+            non_suited_matches += 1
+    if suited_matches == 2:
+        return '2 Suited Matches'
+    elif (suited_matches == 1) and (non_suited_matches == 1):
+        return '1 Non-Suited & 1 Suited Match'
+    elif suited_matches == 1:
+        return '1 Suited Match'
+    elif non_suited_matches == 2:
+        return '2 Non-Suited Matches'
+    elif non_suited_matches == 1:
+        return '1 Non-Suited Match'
+    return None
+
+
+def get_lucky_ladies_outcome(first_card, second_card, dealer_has_blackjack=False):
+    first_card = bjo.encode_card(first_card)
+    second_card = bjo.encode_card(second_card)
+    if first_card == second_card == bjo.card_codes['QH']:
+        if dealer_has_blackjack:
+            return 'Queen of Hearts Pair (with Dealer Blackjack)'
+        return 'Queen of Hearts Pair'
+    if highest_hand_score([first_card, second_card]) != 20:
+        return None
+    if first_card == second_card:
+        return 'Matched 20'
+    if bjo.card_suit_index(first_card) == bjo.card_suit_index(second_card):
+        return 'Suited 20'
+    return 'Unsuited 20'
+
+
+def get_kings_bounty_outcome(first_card, second_card, dealer_has_blackjack=False):
+    first_card = bjo.encode_card(first_card)
+    second_card = bjo.encode_card(second_card)
+    if first_card == second_card == bjo.card_codes['KS']:
+        if dealer_has_blackjack:
+            return 'King of Spades Pair (with Dealer Blackjack)'
+        return 'King of Spades Pair'
+    if highest_hand_score([first_card, second_card]) != 20:
+        return None
+    is_suited = bjo.card_suit_index(first_card) == bjo.card_suit_index(second_card)
+    is_pair = bjo.card_rank_index(first_card) == bjo.card_rank_index(second_card)
+    is_kings_pair = is_pair and (bjo.card_rank_name(first_card) == 'K')
+    if is_suited and is_kings_pair:
+        return 'Suited Kings Pair (not spades)'
+    elif is_suited and is_pair:
+        return 'Suited Qs, Js, or 10s Pair'
+    elif is_suited:
+        return 'Suited 20'
+    elif is_kings_pair:
+        return 'Unsuited Kings Pair'
+    return 'Unsuited 20'
+
+
+def get_buster_blackjack_outcome(dealer_hand):
+    # Pays only when the dealer busts, by number of cards in the busted hand
+    if highest_hand_score(dealer_hand) != -1:
+        return None
+    num_of_cards = len(dealer_hand)
+    if num_of_cards >= 8:
+        return '8 or More Cards'
+    elif num_of_cards <= 4:
+        return '3 or 4 Cards'
+    return f"{num_of_cards} Cards"
+
 
 ### Generators ###
+# Combinations are streamed straight out of itertools, one at a time, so even an 8-deck shoe never has to be held in memory
+def all_card_combinations(combination_size, num_of_decks=1):
+    # Every combination of combination_size physical cards out of an n-deck shoe - for n > 1, identical cards
+    # from different decks are told apart, so a hand such as ('AS', 'AS') is yielded once per pair of decks
+    shoe_cards = bjo.base_deck*num_of_decks
+    yield from itertools.combinations(shoe_cards, combination_size)
+
+
+def all_rank_combinations(combination_size, num_of_decks=1):
+    # Every distinct multiset of ranks yielded once as (ranks, weight) - weight is the number of physical card
+    # combinations from an n-deck shoe sharing those ranks, so weights add up to comb(52*n, combination_size)
+    cards_per_rank = len(bjo.suit_names)*num_of_decks
+    for ranks in itertools.combinations_with_replacement(bjo.card_names, combination_size):
+        weight = 1
+        for rank, rank_count in collections.Counter(ranks).items():
+            weight *= math.comb(cards_per_rank, rank_count)
+        if weight > 0:
+            yield ranks, weight
+
+
 def all_two_card_combinations_single_deck():
-    combinations = list(itertools.combinations(bjo.base_deck, 2))
-    for combination in combinations:
-        yield combination
+    yield from all_card_combinations(2)
 
 
 def all_three_card_combinations_single_deck():
-    combinations = list(itertools.combinations(bjo.base_deck, 3))
-    for combination in combinations:
-        yield combination
+    yield from all_card_combinations(3)
 
 
 """
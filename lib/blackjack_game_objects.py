@@ -13,6 +13,8 @@ chip_names = ['White', 'Pink', 'Red', 'Blue', 'Green', 'Black', 'Purple', 'Yello
 chip_values = [1, 2.5, 5, 10, 25, 100, 500, 1000, 5000]
 chips = dict(zip(chip_names, chip_values))
 reverse_chips = dict(zip(reversed(chip_names), reversed(chip_values)))
+num_of_chip_colors = len(chip_names)
+chip_indices = dict(zip(chip_names, range(0, num_of_chip_colors))) # position of each color in a chip count array
 
 # Cards and their values #
 card_names = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
@@ -22,19 +24,254 @@ cards = dict(zip(card_names,card_values))
 # Card Suits #
 suit_names = ['Clubs', 'Diamonds', 'Hearts', 'Spades']
 
-# Base Deck (as reference) #
+# Integer-Encoded Cards #
+# Each card is packed into one small int - suit index in bits 0-1, rank index in bits 2-5 and
+# high value (2-11) in bits 6-9, so hot paths read rank/suit/value with a shift instead of slicing strings
+card_suit_shift = 0
+card_rank_shift = 2
+card_value_shift = 6
+card_suits = [s[0] for s in suit_names] # ['C', 'D', 'H', 'S']
+suit_colors = ['Black', 'Red', 'Red', 'Black'] # indexed by suit index
+ace_rank_index = card_names.index('A')
+card_codes = {} # shorthand card name to card code, such as '10H' --> 674
+card_code_names = [None]*(12 << card_value_shift) # card code to shorthand card name (None for unused codes)
+for rank_index, c in enumerate(card_names):
+    for suit_index, s in enumerate(card_suits):
+        card_code = (cards[c][-1] << card_value_shift) | (rank_index << card_rank_shift) | (suit_index << card_suit_shift)
+        card_codes[c+s] = card_code
+        card_code_names[card_code] = c+s
+
+def encode_card(card):
+    # Accepts either a shorthand card name ('10H') or an already-encoded card
+    if type(card) is int:
+        return card
+    return card_codes[card]
+
+def decode_card(card_code):
+    return card_code_names[card_code]
+
+def encode_hand(hand):
+    return [encode_card(card) for card in hand]
+
+def decode_hand(hand):
+    return [card_code_names[card_code] for card_code in hand]
+
+def card_suit_index(card_code):
+    return (card_code >> card_suit_shift) & 3
+
+def card_rank_index(card_code):
+    return (card_code >> card_rank_shift) & 15
+
+def card_high_value(card_code):
+    return card_code >> card_value_shift # 2-10, A - 11
+
+def card_low_value(card_code):
+    return 1 if (card_code >> card_value_shift) == 11 else (card_code >> card_value_shift) # 2-10, A - 1
+
+def card_rank_name(card_code):
+    return card_names[(card_code >> card_rank_shift) & 15]
+
+def card_color(card_code):
+    return suit_colors[(card_code >> card_suit_shift) & 3]
+
+# Base Deck (as reference, in a fixed order so that importing this module never draws random numbers) #
 base_deck = []
 for s in suit_names:
     for c in card_names:
         base_deck.extend([c+s[0]])
-random.shuffle(base_deck)
 
 ### Game Object Constructors ###
-def get_shoe_of_n_decks(n):
+def get_shoe_of_n_decks(n, rng=None):
+    # rng is a backend from rng_backends or a random.Random (None - the global random state)
+    if rng == None:
+        rng = random
     shoe = []
     for s in suit_names:
         for c in card_names:
             for count in range(0, n):
                 shoe.extend([c+s[0]])
-    random.shuffle(shoe)
-    return shoe
\ No newline at end of file
+    rng.shuffle(shoe)
+    return shoe
+
+
+def get_encoded_shoe_of_n_decks(n, rng=None):
+    shoe = [card_codes[card] for card in get_shoe_of_n_decks(n, rng)]
+    return shoe
+
+
+### Shoe ###
+# Cards are dealt by advancing a read cursor rather than popping the front of a list (O(1) per card),
+# and the front cut card is held as an index into the shoe instead of a 'front_cut_card' sentinel.
+# Indexing, iteration, len() and 'in' only ever see the cards still left to be dealt.
+class Shoe:
+    def __init__(self, cards=None):
+        self.cards = list(cards) if (cards != None) else []
+        self.cursor = 0 # index (into self.cards) of the next card to be dealt
+        self.cut_card_index = None # number of cards in front of the front cut card (None - cut card not placed)
+
+    def __len__(self):
+        return len(self.cards) - self.cursor
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.cards[self.cursor:][index]
+        if index < 0:
+            index += len(self)
+        if (index < 0) or (index >= len(self)):
+            raise IndexError("shoe index out of range")
+        return self.cards[self.cursor+index]
+
+    def __iter__(self):
+        for index in range(self.cursor, len(self.cards)):
+            yield self.cards[index]
+
+    def __contains__(self, card):
+        try:
+            self.cards.index(card, self.cursor)
+        except ValueError:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"Shoe({self.cards[self.cursor:]}, cut_card_index={self.cut_card_index})"
+
+    # Dealing #
+    def draw(self):
+        if self.cursor >= len(self.cards):
+            raise IndexError("draw from an empty shoe")
+        card = self.cards[self.cursor]
+        self.cursor += 1
+        return card
+
+    def pop(self, index=0):
+        # pop(0) is a draw - any other index pulls a card out of the middle of the shoe (used to stack hands in tests)
+        if index == 0:
+            return self.draw()
+        if index < 0:
+            index += len(self)
+        if (index < 0) or (index >= len(self)):
+            raise IndexError("pop index out of range")
+        card_index = self.cursor+index
+        if (self.cut_card_index != None) and (card_index < self.cut_card_index):
+            self.cut_card_index -= 1
+        return self.cards.pop(card_index)
+
+    def index(self, card):
+        return self.cards.index(card, self.cursor) - self.cursor
+
+    def remove(self, card):
+        self.pop(self.index(card))
+
+    # Shuffling and Cutting #
+    def extend(self, cards):
+        self.cards.extend(cards)
+
+    def compact(self):
+        # Drop already dealt cards so that the cursor points at index 0 again
+        if self.cut_card_index != None:
+            self.cut_card_index = max(self.cut_card_index - self.cursor, 0)
+        del self.cards[:self.cursor]
+        self.cursor = 0
+
+    def shuffle(self, rng=None):
+        self.compact()
+        self.cut_card_index = None
+        if rng == None:
+            rng = random
+        rng.shuffle(self.cards)
+
+    def cut(self, cut_index):
+        # Move every card in front of cut_index to the back of the shoe
+        self.compact()
+        self.cards[:] = self.cards[cut_index:] + self.cards[:cut_index]
+
+    def place_cut_card(self, cut_index):
+        self.cut_card_index = self.cursor + cut_index
+
+    # Penetration #
+    def cards_dealt(self):
+        return self.cursor
+
+    def penetration(self):
+        # Percentage of the shoe dealt since it was last shuffled
+        if len(self.cards) == 0:
+            return 0.0
+        return 100*self.cursor/len(self.cards)
+
+    def cut_card_reached(self):
+        # Cut card comes out as soon as the first card behind it is dealt
+        return (self.cut_card_index != None) and (self.cursor > self.cut_card_index)
+
+
+### Continuous Shuffling Machine ###
+# Cards are kept as an unordered bag. Drawing picks a uniformly random card and fills its slot with the last card
+# (swap-remove), so both drawing and reloading discards are O(1) - since every draw is uniform over the cards loaded,
+# appending discards is the same as inserting each at a random position. There's no cut card and nothing to reshuffle.
+class ContinuousShufflingMachine:
+    def __init__(self, cards=None, rng=None):
+        self.cards = list(cards) if (cards != None) else []
+        self.rng = rng if (rng != None) else random # backend from rng_backends or a random.Random
+        self.cut_card_index = None # never placed - kept so that a CSM can stand in for a Shoe
+        self.num_of_cards_dealt = 0
+        self.dealt_cards = None # list every card drawn is appended to, while a round log needs them (see round_log)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(list(self.cards)) # in no particular order
+
+    def __contains__(self, card):
+        return card in self.cards
+
+    def __repr__(self):
+        return f"ContinuousShufflingMachine({len(self.cards)} cards)"
+
+    # Snapshots #
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['rng'] = None if (self.rng is random) else self.rng # the global random module can't be pickled
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.rng == None:
+            self.rng = random
+
+    # Dealing #
+    def draw(self):
+        if len(self.cards) == 0:
+            raise IndexError("draw from an empty continuous shuffling machine")
+        card_index = self.rng.randrange(0, len(self.cards))
+        card = self.cards[card_index]
+        self.cards[card_index] = self.cards[-1]
+        self.cards.pop()
+        self.num_of_cards_dealt += 1
+        if self.dealt_cards != None:
+            self.dealt_cards.append(card)
+        return card
+
+    def pop(self, index=0):
+        return self.draw()
+
+    def remove(self, card):
+        card_index = self.cards.index(card)
+        self.cards[card_index] = self.cards[-1]
+        self.cards.pop()
+
+    # Loading Discards #
+    def extend(self, cards):
+        self.cards.extend(cards)
+
+    def shuffle(self, rng=None):
+        pass # cards are shuffled as they're drawn
+
+    # Penetration #
+    def cards_dealt(self):
+        return self.num_of_cards_dealt
+
+    def penetration(self):
+        return 0.0
+
+    def cut_card_reached(self):
+        return False
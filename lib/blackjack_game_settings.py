@@ -30,10 +30,14 @@ casino_deck_pen_percentage_bounds = {
 }
 
 
+def get_random_pen_percentage(num_of_decks, rng=None):
+    # Drawn when a preset is put to use rather than at import, so that a seeded rng can replay it
+    if rng == None:
+        rng = random
+    return rng.randrange(casino_deck_pen_percentage_bounds[num_of_decks][0], casino_deck_pen_percentage_bounds[num_of_decks][1], 1)
+
+
 # CASINO (DEFAULT) Game Settings Preset #
-new_var = random.randrange(casino_deck_pen_percentage_bounds[casino_num_of_decks][0], 
-                                        casino_deck_pen_percentage_bounds[casino_num_of_decks][1], 1)
-                     
 casino_game_preset = {
     'preset_name': ['casino'],
     'player_min': [1],
@@ -45,7 +49,7 @@ casino_game_preset = {
     'game_payout': ['default'], # all players' chips converted into equivalent $
     'num_of_decks': [casino_num_of_decks],
     'card_storage': ['shoe'],
-    'pen_percentage': [new_var],
+    'pen_percentage': [None], # None - drawn with get_random_pen_percentage() on every shuffle
     'min_bet': [casino_min_bet],
     'max_bet': [casino_max_bet],
     'blackjack_ratio': [casino_blackjack_ratio],
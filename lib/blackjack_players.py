@@ -4,84 +4,76 @@ Author: Alexander Bulanov
 """
 
 # Global Imports #
-import msvcrt
+from array import array
+try:
+    import msvcrt # Windows-only
+except ImportError:
+    msvcrt = None # headless (simulated) tables never read keystrokes
 import sys
 
 # Local Imports #
 from . import blackjack_game_objects as bjo
+from . import chip_ledger as bjcl
 from . import print_utils as prutils
 
+### Seats ###
+# Each player can take up to three table seats - the seat they joined at, and the seats to its right and left
+seat_names = ('right_seat', 'center_seat', 'left_seat')
+seat_indices = dict(zip(seat_names, range(0, len(seat_names))))
+
+def get_seat_dict(default=None):
+    # seat_name: default for every seat a player can take up - list defaults are copied, so no two seats share one
+    if isinstance(default, list):
+        return {seat_name: list(default) for seat_name in seat_names}
+    return dict.fromkeys(seat_names, default)
+
+def get_dollar_seat_dict(seat_dict_cents):
+    # Dollar view of a seat_name: cents dict (or of a seat_name: list of cents dict) - None stays None
+    dollar_seat_dict = {}
+    for seat_name, seat_cents in seat_dict_cents.items():
+        if isinstance(seat_cents, list):
+            dollar_seat_dict[seat_name] = [bjcl.cents_to_dollars(cents) if (cents != None) else None for cents in seat_cents]
+        else:
+            dollar_seat_dict[seat_name] = bjcl.cents_to_dollars(seat_cents) if (seat_cents != None) else None
+    return dollar_seat_dict
+
+
 ### Defining Players for Tracking ###
 class Player:
     def __init__(self):
         self.name = None
         self.is_dealer = False
-        self.cash_balance = None
+        # Balances, bets and winnings are kept in integer cents (see bjcl) - dollar views are below
+        self.cash_cents = 0
         self.chips = dict.fromkeys(bjo.chip_names, 0)
-        self.chip_pool_balance = 0
+        self.chip_pool_cents = 0
         self.hole_card_face_down = False
-        self.occupied_seats = {
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None
-        }
-        self.main_bets = { # each bet is stored as a dictionary in format of chip_color: chip_count
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        self.main_bet_amounts = { # each bet amount is stored as an integer (betting of $2.5 chips is restricted to pairs only)
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        self.main_bet_winnings = { # each set of winnings is stored as a dictionary in format of chip_color: chip_count
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        self.main_bet_winnings_amounts = { # each set of winnings has dollar value stored as an integer or a float
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        self.placed_side_bet_names = { # each group of names is stored in a list in format of ['Perfect Pairs', 'Lucky Ladies', etc.]
-            'right_seat': [], # side_bet_names keeps track of which group of chips in side_bets is tied to which bet
-            'center_seat': [], # Side bet options - 'Perfect Pairs', 'Match the Dealer', 'Lucky Ladies', 'King's Bounty', 'Buster Blackjack', '21+3'
-            'left_seat': []
-        }
-        self.side_bets = { # each bet is stored as a list of dictionaries in format of chip_color: chip_count
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        self.side_bet_amounts = { # each bet amount is stored as a list of integers (betting of $2.5 chips is restricted to pairs only) - [2, 10, 20]
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        self.side_bet_winnings = { # each set of winnings is stored as list of dictionaries in format of chip_color: chip_count
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        self.side_bet_winnings_amounts = { # each set of winnings is stored as a list of integers or floats, as appropriate - [3, 15, 30]
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        self.hands = { # each hand is stored as a list of shorthand card names, such as ['8H', 'JC']
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None
-        }
-        self.hand_scores = {
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None
-        }
+        self.occupied_seats = get_seat_dict() # seat_name: table seat number (None - not occupied)
+        self.main_bets = get_seat_dict() # each bet is stored as a dictionary in format of chip_color: chip_count
+        self.main_bet_cents = get_seat_dict() # each bet amount is stored in cents (betting of $2.5 chips is restricted to pairs only)
+        self.main_bet_winnings = get_seat_dict() # each set of winnings is stored as a dictionary in format of chip_color: chip_count
+        self.main_bet_winnings_cents = get_seat_dict() # each set of winnings has its value stored in cents
+        # side_bet_names keeps track of which group of chips in side_bets is tied to which bet
+        # Side bet options - 'Perfect Pairs', 'Match the Dealer', 'Lucky Ladies', 'King's Bounty', 'Buster Blackjack', '21+3'
+        self.placed_side_bet_names = get_seat_dict([]) # each group of names is stored in a list in format of ['Perfect Pairs', 'Lucky Ladies', etc.]
+        self.side_bets = get_seat_dict([]) # each bet is stored as a list of dictionaries in format of chip_color: chip_count
+        self.side_bet_cents = get_seat_dict([]) # each bet amount is stored as a list of cents (betting of $2.5 chips is restricted to pairs only) - [200, 1000, 2000]
+        self.side_bet_winnings = get_seat_dict([]) # each set of winnings is stored as list of dictionaries in format of chip_color: chip_count
+        self.side_bet_winnings_cents = get_seat_dict([]) # each set of winnings is stored as a list of cents - [300, 1500, 3000]
+        self.hands = get_seat_dict() # each hand is stored as a list of shorthand card names, such as ['8H', 'JC']
+        self.hand_scores = get_seat_dict()
+        self.hand_states = get_seat_dict() # each hand state is stored as an integer (see bjl.add_card), so hits are scored incrementally
         self.action = None
 
+    # Dollar views of the cent balances
+    @property
+    def cash_balance(self):
+        return bjcl.cents_to_dollars(self.cash_cents)
+
+    @property
+    def chip_pool_balance(self):
+        return bjcl.cents_to_dollars(self.chip_pool_cents)
+
     # Player actions are:
         # Out-of-Round:
             # Join ('j')
@@ -101,147 +93,27 @@ class Player:
         Dealer = Player()
         Dealer.name = 'Dealer'
         Dealer.is_dealer = True
-        Dealer.cash_balance = 10000
+        Dealer.cash_cents = bjcl.dollars_to_cents(10000)
         Dealer.chips = dict.fromkeys(bjo.chip_names, 1000)
-        Dealer.chip_pool_balance = 1000*(1+2.5+5+10+25+100+500+1000+5000) # $6,643,500.00
+        Dealer.chip_pool_cents = 1000*sum(bjcl.chip_values_cents) # $6,643,500.00
         Dealer.hole_card_face_down = True
-        Dealer.occupied_seats = {
-            'right_seat': None,
-            'center_seat': 8,
-            'left_seat': None
-        }
-        Dealer.main_bets = { # each bet is stored as a dictionary in format of chip_color: chip_count
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        Dealer.main_bet_amounts = { # each bet amount is stored as an integer (betting of $2.5 chips is restricted to pairs only)
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        Dealer.main_bet_winnings = { # each set of winnings is stored as a dictionary in format of chip_color: chip_count
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        Dealer.main_bet_winnings_amounts = { # each set of winnings has dollar value stored as an integer or a float
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        Dealer.placed_side_bet_names = { # each group of names is stored in a list in format of ['Perfect Pairs', 'Lucky Ladies', etc.]
-            'right_seat': [], # side_bet_names keeps track of which group of chips in side_bets is tied to which bet
-            'center_seat': [], # Side bet options - 'Perfect Pairs', 'Match the Dealer', 'Lucky Ladies', 'King's Bounty', 'Buster Blackjack', '21+3'
-            'left_seat': []
-        }
-        Dealer.side_bets = { # each bet is stored as a list of dictionaries in format of chip_color: chip_count
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        Dealer.side_bet_amounts = { # each bet amount is stored as a list of integers (betting of $2.5 chips is restricted to pairs only) - [2, 10, 20]
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        Dealer.side_bet_winnings = { # each set of winnings is stored as list of dictionaries in format of chip_color: chip_count
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        Dealer.side_bet_winnings_amounts = { # each set of winnings is stored as a list of integers or floats, as appropriate - [3, 15, 30]
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        Dealer.hands = { # each hand is stored as a list of shorthand card names, such as ['8H', 'JC']
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None
-        }
-        Dealer.hand_scores = {
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None
-        }
-        Dealer.action = None
+        Dealer.occupied_seats['center_seat'] = 8
         return Dealer
     
     def create_new_player_from_template(player_username, preferred_seat):
         NewPlayer = Player()
         NewPlayer.name = player_username
         NewPlayer.is_dealer = False
-        NewPlayer.cash_balance = 100
+        NewPlayer.cash_cents = bjcl.dollars_to_cents(100)
         NewPlayer.chips = dict.fromkeys(bjo.chip_names, 0)
         NewPlayer.chips['White'] = 50
         NewPlayer.chips['Pink'] = 30
         NewPlayer.chips['Red'] = 20
         NewPlayer.chips['Blue'] = 15
         NewPlayer.chips['Green'] = 5
-        NewPlayer.chip_pool_balance = int(50*1 + 30*2.5 + 20*5 + 15*10 + 5*25)
+        NewPlayer.chip_pool_cents = bjcl.get_chip_counts_value_cents(bjcl.chip_dict_to_counts(NewPlayer.chips)) # $500
         NewPlayer.hole_card_face_down = False
-        NewPlayer.occupied_seats = {
-            'right_seat': None,
-            'center_seat': preferred_seat,
-            'left_seat': None
-        }
-        NewPlayer.main_bets = { # each bet is stored as a dictionary in format of chip_color: chip_count
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        NewPlayer.main_bet_amounts = { # each bet amount is stored as an integer (betting of $2.5 chips is restricted to pairs only)
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        NewPlayer.main_bet_winnings = { # each set of winnings is stored as a dictionary in format of chip_color: chip_count
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        NewPlayer.main_bet_winnings_amounts = { # each set of winnings has dollar value stored as an integer or a float
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None,
-        }
-        NewPlayer.placed_side_bet_names = { # each group of names is stored in a list in format of ['Perfect Pairs', 'Lucky Ladies', etc.]
-            'right_seat': [], # side_bet_names keeps track of which group of chips in side_bets is tied to which bet
-            'center_seat': [], # Side bet options - 'Perfect Pairs', 'Match the Dealer', 'Lucky Ladies', 'King's Bounty', 'Buster Blackjack', '21+3'
-            'left_seat': []
-        }
-        NewPlayer.side_bets = { # each bet is stored as a list of dictionaries in format of chip_color: chip_count
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        NewPlayer.side_bet_amounts = { # each bet amount is stored as a list of integers (betting of $2.5 chips is restricted to pairs only) - [2, 10, 20]
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        NewPlayer.side_bet_winnings = { # each set of winnings is stored as list of dictionaries in format of chip_color: chip_count
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        NewPlayer.side_bet_winnings_amounts = { # each set of winnings is stored as a list of integers or floats, as appropriate - [3, 15, 30]
-            'right_seat': [],
-            'center_seat': [],
-            'left_seat': [],
-        }
-        NewPlayer.hands = { # each hand is stored as a list of shorthand card names, such as ['8H', 'JC']
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None
-        }
-        NewPlayer.hand_scores = {
-            'right_seat': None,
-            'center_seat': None,
-            'left_seat': None
-        }
-        NewPlayer.action = None
+        NewPlayer.occupied_seats['center_seat'] = preferred_seat
         return NewPlayer
     
     def player_has_no_main_bets_in_play(self):
@@ -280,8 +152,8 @@ class Player:
                 case 'name' | 'is_dealer' | 'hole_card_face_down':
                     if (flag == 'v'):
                         print(f"{key}: {value}")
-                case 'cash_balance' | 'chip_pool_balance':
-                    print(f"{key}: ${value}")
+                case 'cash_cents' | 'chip_pool_cents':
+                    print(f"{key}: ${bjcl.cents_to_dollars(value)}")
                 case 'chips':
                     if (flag == 'v'):
                         print(f"{key}: {value}")
@@ -332,19 +204,19 @@ class Player:
                                             non_zero_bet_chips[chip_color] = chip_count
                                 print(f"\n    '{seat}': {non_zero_bet_chips}", end='')
                     print("")
-                case 'main_bet_amounts' | 'side_bet_amounts':
+                case 'main_bet_cents' | 'side_bet_cents':
                     print(f"{key}:", end='')
-                    bet_type_amount = getattr(self, key) # player.main_bet_amounts or player.side_bet_amounts
+                    bet_type_amount = get_dollar_seat_dict(value) # player.main_bet_cents or player.side_bet_cents, in dollars
                     for seat, seat_number in self.occupied_seats.items():
                         if (flag == 'v'):
                             if (bet_type_amount[seat] != None):
                                 print(f"\n    '{seat}': ${bet_type_amount[seat]}", end='')
                             else:
                                 print(f"\n    '{seat}': {bet_type_amount[seat]}", end='')
-                        elif ((key == 'main_bet_amounts') and (self.player_has_no_main_bets_in_play())):
+                        elif ((key == 'main_bet_cents') and (self.player_has_no_main_bets_in_play())):
                             print(" None", end='')
                             break
-                        elif ((key == 'side_bet_amounts') and (self.player_has_no_side_bets_in_play())):
+                        elif ((key == 'side_bet_cents') and (self.player_has_no_side_bets_in_play())):
                             print(" None", end='')
                             break
                         else:
@@ -379,15 +251,15 @@ class Player:
     def print_current_bet(self, seat_name, side_bet_index):
         if side_bet_index == None:
             player_bet = self.main_bets[seat_name]
-            player_bet_amount = self.main_bet_amounts[seat_name]
+            player_bet_cents = self.main_bet_cents[seat_name]
         else:
             player_bet = self.side_bets[seat_name][side_bet_index]
-            player_bet_amount = self.side_bet_amounts[seat_name][side_bet_index]
+            player_bet_cents = self.side_bet_cents[seat_name][side_bet_index]
         displayed_bet = {}
         for chip_color, chip_count in player_bet.items():
             if (chip_count > 0):
                 displayed_bet[chip_color] = chip_count
-        print(f"{self.name}'s ${player_bet_amount} bet - {displayed_bet}")
+        print(f"{self.name}'s ${bjcl.cents_to_dollars(player_bet_cents)} bet - {displayed_bet}")
 
 
     """
@@ -397,7 +269,7 @@ class Player:
         for chip_color, chip_count in player_bet.items():
             if (chip_count > 0):
                 displayed_bet[chip_color] = chip_count
-        print(f"{self.name}'s ${self.main_bet_amounts[seat]} bet - {displayed_bet}")
+        print(f"{self.name}'s ${bjcl.cents_to_dollars(self.main_bet_cents[seat])} bet - {displayed_bet}")
 
     def print_current_side_bet(self, seat, side_bet_index):
         player_bet = self.side_bets[seat][side_bet_index]
@@ -405,7 +277,7 @@ class Player:
         for chip_color, chip_count in player_bet.items():
             if (chip_count > 0):
                 displayed_bet[chip_color] = chip_count
-        print(f"{self.name}'s ${self.side_bet_amounts[seat][side_bet_index]} bet - {displayed_bet}")
+        print(f"{self.name}'s ${bjcl.cents_to_dollars(self.side_bet_cents[seat][side_bet_index])} bet - {displayed_bet}")
     """
 
     # Seat assignment helper functions
@@ -416,59 +288,20 @@ class Player:
         
 
 
-    # Whole number float cleanup helper functions
-    def cast_whole_number_chip_pool_balance_to_int(self):
-        chip_pool_balance_fraction = self.chip_pool_balance % 1
-        if (chip_pool_balance_fraction == 0 and type(chip_pool_balance_fraction) == float):
-            self.chip_pool_balance = int(self.chip_pool_balance)
-
-    def clean_up_bet_amount_and_chip_pool_balance_fractions(self, seat_name, player_side_bet_index):
-        # Clean up bet amounts /w trailing 0s for display --> 10.0 to 10, 3.0 to 3, etc.
-        if player_side_bet_index == None:
-            if self.main_bet_amounts[seat_name] != None:
-                bet_amount_fraction = self.main_bet_amounts[seat_name] % 1
-                if (bet_amount_fraction == 0 and type(bet_amount_fraction) == float):
-                    self.main_bet_amounts[seat_name] = int(self.main_bet_amounts[seat_name])
-        else:
-            if self.side_bet_amounts[seat_name][player_side_bet_index] != None:
-                bet_amount_fraction = self.side_bet_amounts[seat_name][player_side_bet_index] % 1
-                if (bet_amount_fraction == 0 and type(bet_amount_fraction) == float):
-                    self.side_bet_amounts[seat_name][player_side_bet_index] = (
-                        int(self.side_bet_amounts[seat_name][player_side_bet_index]))
-        # Clean up chip balance /w trailing 0s for display --> 98.0 to 98, etc.
-        self.cast_whole_number_chip_pool_balance_to_int()
-
-
-
-
-
-    def cast_whole_number_bet_winnings_amount_to_int(self):
-
-        # Todo AB: write cast function for bet_winnings_amount after chip transfer is complete in pay_winning_bet()
-
-        chip_pool_balance_fraction = self.chip_pool_balance % 1
-        if (chip_pool_balance_fraction == 0 and type(chip_pool_balance_fraction) == float):
-            self.chip_pool_balance = int(self.chip_pool_balance)
-
-
-
-
-
     # Bet initialization helper functions
     def init_main_bet_fields(self, seat_name):
-        empty_bet = dict.fromkeys(bjo.chip_names, 0)
-        self.main_bets[seat_name] = empty_bet
-        self.main_bet_amounts[seat_name] = 0
-        self.main_bet_winnings[seat_name] = empty_bet
-        self.main_bet_winnings_amounts[seat_name] = 0
+        # Bet and winnings each get their own chips, so winnings paid out never land in the betting circle's bet
+        self.main_bets[seat_name] = dict.fromkeys(bjo.chip_names, 0)
+        self.main_bet_cents[seat_name] = 0
+        self.main_bet_winnings[seat_name] = dict.fromkeys(bjo.chip_names, 0)
+        self.main_bet_winnings_cents[seat_name] = 0
 
     def init_side_bet_fields(self, seat_name, side_bet_name):
         self.placed_side_bet_names[seat_name].append(side_bet_name)
-        empty_bet = dict.fromkeys(bjo.chip_names, 0)
-        self.side_bets[seat_name].append(empty_bet)
-        self.side_bet_amounts[seat_name].append(0)
-        self.side_bet_winnings[seat_name].append(empty_bet)
-        self.side_bet_winnings_amounts[seat_name].append(0)
+        self.side_bets[seat_name].append(dict.fromkeys(bjo.chip_names, 0))
+        self.side_bet_cents[seat_name].append(0)
+        self.side_bet_winnings[seat_name].append(dict.fromkeys(bjo.chip_names, 0))
+        self.side_bet_winnings_cents[seat_name].append(0)
 
     # Bet clear isn't needed unless Player moves seats or leaves the game
 
@@ -487,13 +320,12 @@ class Player:
         else:
             self.chips[chip_color] -= 1
             player_bet[chip_color] += 1
-            chip_worth = bjo.chips[chip_color]
-            self.chip_pool_balance -= chip_worth
+            chip_worth_cents = bjcl.chip_cents[chip_color]
+            self.chip_pool_cents -= chip_worth_cents
             if player_side_bet_index == None:
-                self.main_bet_amounts[seat_name] += chip_worth
+                self.main_bet_cents[seat_name] += chip_worth_cents
             else:
-                self.side_bet_amounts[seat_name][player_side_bet_index] += chip_worth
-            self.clean_up_bet_amount_and_chip_pool_balance_fractions(seat_name, player_side_bet_index)
+                self.side_bet_cents[seat_name][player_side_bet_index] += chip_worth_cents
             self.print_current_bet(seat_name, player_side_bet_index)
             #self.print_current_main_bet(seat_name)
 
@@ -507,13 +339,12 @@ class Player:
         if player_bet[chip_color] > 0:
             player_bet[chip_color] -= 1
             self.chips[chip_color] += 1
-            chip_worth = bjo.chips[chip_color]
+            chip_worth_cents = bjcl.chip_cents[chip_color]
             if player_side_bet_index == None:
-                self.main_bet_amounts[seat_name] -= chip_worth
+                self.main_bet_cents[seat_name] -= chip_worth_cents
             else:
-                self.side_bet_amounts[seat_name][player_side_bet_index] -= chip_worth
-            self.chip_pool_balance += chip_worth
-            self.clean_up_bet_amount_and_chip_pool_balance_fractions(seat_name, player_side_bet_index)
+                self.side_bet_cents[seat_name][player_side_bet_index] -= chip_worth_cents
+            self.chip_pool_cents += chip_worth_cents
             self.print_current_bet(seat_name, player_side_bet_index)
             #self.print_current_main_bet(seat_name)
     
@@ -521,40 +352,88 @@ class Player:
         # Adapt this function to work for side bets
         if player_side_bet_index == None:
             player_bet = self.main_bets[seat_name]
-            player_bet_values = self.main_bet_amounts
+            player_bet_values = self.main_bet_cents
         else:
             player_bet = self.side_bets[seat_name][player_side_bet_index]
-            player_bet_values = self.side_bet_amounts
+            player_bet_values = self.side_bet_cents
         #print(player_bet)
         for chip_color, chip_count in player_bet.items():
-            chip_worth = bjo.chips[chip_color]
             self.chips[chip_color] += chip_count
-            self.chip_pool_balance += chip_worth*chip_count
-            """
-            for chip in range(0, chip_count):
-                self.chips[chip_color] += 1
-                self.chip_pool_balance += chip_worth
-            """
+            self.chip_pool_cents += bjcl.chip_cents[chip_color]*chip_count
             player_bet[chip_color] = 0
         if player_side_bet_index == None:
             player_bet_values[seat_name] = 0
-            self.clean_up_bet_amount_and_chip_pool_balance_fractions(seat_name, player_side_bet_index)
-            print(f"Reset {self.name}'s main bet to ${self.main_bet_amounts[seat_name]}!")
+            print(f"Reset {self.name}'s main bet to $0!")
         else:
             player_bet_values[seat_name][player_side_bet_index] = 0
-            self.clean_up_bet_amount_and_chip_pool_balance_fractions(seat_name, player_side_bet_index)
             print(f"Reset {self.name}'s side bet of '{self.placed_side_bet_names[seat_name][player_side_bet_index]}'", end='')
-            print(f" to ${self.side_bet_amounts[seat_name][player_side_bet_index]}!")
+            print(f" to $0!")
             
 
-    def get_chips(self):
-        pass
-
-    def color_up(self):
-        pass
-
-    def break_down(self):
-        pass
+    # Chip exchanges with the dealer (see bjcl) - without the dealer at hand they can't be made
+    def exchange_chips_with_dealer(self, dealer, exchanged_chips, new_chip_counts):
+        chip_counts = bjcl.chip_dict_to_counts(self.chips)
+        dealer_chip_counts = bjcl.chip_dict_to_counts(dealer.chips)
+        bjcl.exchange_chips(chip_counts, dealer_chip_counts, bjcl.chip_dict_to_counts(exchanged_chips), new_chip_counts)
+        self.chips.update(bjcl.chip_counts_to_dict(chip_counts))
+        dealer.chips.update(bjcl.chip_counts_to_dict(dealer_chip_counts))
+
+    def get_chips(self, dealer=None, amount=None):
+        # Buy amount dollars' worth of chips from the dealer's rack with cash
+        if (dealer == None) or (amount == None):
+            sys.stderr.write("Chips can only be bought from the dealer for a chosen amount\n")
+            return
+        amount_cents = bjcl.dollars_to_cents(amount)
+        if amount_cents > self.cash_cents:
+            sys.stderr.write(f"{self.name}'s ${self.cash_balance} cash balance can't cover ${amount} of chips\n")
+            return
+        amount_chip_counts = bjcl.get_chip_counts_for_cents(amount_cents, bjcl.chip_dict_to_counts(dealer.chips))
+        if amount_chip_counts == None:
+            sys.stderr.write(f"Dealer's chips can't make up ${amount} of chips\n")
+            return
+        for chip_name, chip_count in bjcl.chip_counts_to_dict(amount_chip_counts).items():
+            dealer.chips[chip_name] -= chip_count
+            self.chips[chip_name] += chip_count
+        self.cash_cents -= amount_cents
+        self.chip_pool_cents += amount_cents
+        dealer.cash_cents += amount_cents
+        dealer.chip_pool_cents -= amount_cents
+        print(f"{self.name} bought ${amount} of chips!")
+
+    def color_up(self, dealer=None):
+        # Trade all chips for the fewest chips of the same value - chip pool balances don't change
+        if dealer == None:
+            sys.stderr.write("Chips can only be colored up with the dealer\n")
+            return
+        new_chip_counts = bjcl.get_color_up_chip_counts(bjcl.chip_dict_to_counts(self.chips), bjcl.chip_dict_to_counts(dealer.chips))
+        self.exchange_chips_with_dealer(dealer, dict(self.chips), new_chip_counts)
+        print(f"Colored up {self.name}'s chips!")
+
+    def break_down(self, dealer=None, chip_name=None, chip_names=None):
+        # Trade one chip_name chip (None - the largest chip held) for the fewest chips of the colors in chip_names
+        # (None - every color worth less)
+        if dealer == None:
+            sys.stderr.write("Chips can only be broken down with the dealer\n")
+            return
+        if chip_name == None:
+            held_chip_names = [held_chip_name for held_chip_name in bjo.chip_names if self.chips[held_chip_name] > 0]
+            if len(held_chip_names) == 0:
+                sys.stderr.write(f"{self.name} has no chips to break down\n")
+                return
+            chip_name = held_chip_names[-1]
+        elif self.chips[chip_name] == 0:
+            sys.stderr.write(f"{self.name} has no {chip_name} chips to break down\n")
+            return
+        if chip_names == None:
+            chip_names = bjo.chip_names[:bjo.chip_indices[chip_name]]
+        exchanged_chips = {chip_name: 1}
+        new_chip_counts = bjcl.get_break_down_chip_counts(bjcl.chip_dict_to_counts(exchanged_chips), chip_names,
+                                                          bjcl.chip_dict_to_counts(dealer.chips))
+        if new_chip_counts == None:
+            sys.stderr.write(f"Dealer's chips can't break down a {chip_name} chip into {chip_names}\n")
+            return
+        self.exchange_chips_with_dealer(dealer, exchanged_chips, new_chip_counts)
+        print(f"Broke down {self.name}'s {chip_name} chip!")
 
     def skip_bet(self):
         # Todo AB: Write out skip_bet()
@@ -583,7 +462,7 @@ class Player:
     """
 
 
-    def get_bet_input_character(self, min_bet, max_bet, seat_name, player_side_bet_index):
+    def get_bet_input_character(self, min_bet, max_bet, seat_name, player_side_bet_index, dealer=None, chip_purchase_amount=None):
         # Todo AB: Make sure the above code scales with player making multiple hand bets
         key = msvcrt.getch().decode('utf-8') # Get a key (as a byte string) and decode it
         match key:
@@ -597,11 +476,11 @@ class Player:
                 self.reset_current_bet(seat_name, player_side_bet_index)
             case 'f':
                 if player_side_bet_index == None:
-                    player_bet_value = self.main_bet_amounts[seat_name]
+                    player_bet_cents = self.main_bet_cents[seat_name]
                 else:
-                    player_bet_value = self.side_bet_amounts[seat_name][player_side_bet_index]
-                fraction = player_bet_value % 1
-                if (fraction != 0):
+                    player_bet_cents = self.side_bet_cents[seat_name][player_side_bet_index]
+                player_bet_value = bjcl.cents_to_dollars(player_bet_cents)
+                if (player_bet_cents % bjcl.cents_per_dollar != 0):
                     sys.stderr.write(f"Invalid (fractional) bet amount of ${player_bet_value} - please resubmit a bet /w an even number of Pink chips!\n")
                 elif (player_bet_value < min_bet):
                     sys.stderr.write(f"{self.name}'s ${player_bet_value} bet is below allowed minimum, please submit a bet between inclusive bounds of ${min_bet} and ${max_bet}\n")
@@ -622,11 +501,11 @@ class Player:
             case 'g' | 'c' | 'b' | 'm' | 'a' | 'l':
                 match key:
                     case 'g':
-                        self.get_chips() # Todo AB: implement get_chips()
+                        self.get_chips(dealer, chip_purchase_amount)
                     case 'c':
-                        self.color_up() # Todo AB: implement color_up()
+                        self.color_up(dealer)
                     case 'b':
-                        self.break_down() # Todo AB: implement break_down()
+                        self.break_down(dealer)
                     case 'm':
                         self.skip_bet() # Todo AB: implement skip_bet()
                     case 'a':
@@ -638,7 +517,7 @@ class Player:
                 print("Provide a valid key or press 'v' to see valid key input options")
 
     """
-    def get_main_bet_input_character(self, min_table_bet, max_table_bet, seat_name):
+    def get_main_bet_input_character(self, min_table_bet, max_table_bet, seat_name, dealer=None, chip_purchase_amount=None):
         # Todo AB: Make sure the above code scales with player making multiple hand bets
         key = msvcrt.getch().decode('utf-8') # Get a key (as a byte string) and decode it
         match key:
@@ -651,7 +530,7 @@ class Player:
             case 'r':
                 self.reset_current_bet(seat_name)
             case 'f':
-                player_bet_value = self.main_bet_amounts[seat_name]
+                player_bet_value = bjcl.cents_to_dollars(self.main_bet_cents[seat_name])
                 fraction = player_bet_value % 1
                 if (fraction != 0):
                     sys.stderr.write(f"Invalid (fractional) bet amount of ${player_bet_value} - please resubmit a bet /w an even number of Pink chips!\n")
@@ -674,11 +553,11 @@ class Player:
             case 'g' | 'c' | 'b' | 'm' | 'a' | 'l':
                 match key:
                     case 'g':
-                        self.get_chips() # Todo AB: implement get_chips()
+                        self.get_chips(dealer, chip_purchase_amount)
                     case 'c':
-                        self.color_up() # Todo AB: implement color_up()
+                        self.color_up(dealer)
                     case 'b':
-                        self.break_down() # Todo AB: implement break_down()
+                        self.break_down(dealer)
                     case 'm':
                         self.skip_bet() # Todo AB: implement skip_bet()
                     case 'a':
@@ -690,7 +569,7 @@ class Player:
                 print("Provide a valid key or press 'v' to see valid key input options")
 
 
-    def get_side_bet_input_character(self, min_side_bet, max_side_bet, seat_name, side_bet_index):
+    def get_side_bet_input_character(self, min_side_bet, max_side_bet, seat_name, side_bet_index, dealer=None, chip_purchase_amount=None):
         # Todo AB: Make sure the above code scales with player making multiple hand bets
         key = msvcrt.getch().decode('utf-8') # Get a key (as a byte string) and decode it
         match key:
@@ -703,7 +582,7 @@ class Player:
             case 'r':
                 self.reset_current_bet(seat_name)
             case 'f':
-                player_bet_value = self.main_bet_amounts[seat_name]
+                player_bet_value = bjcl.cents_to_dollars(self.main_bet_cents[seat_name])
                 fraction = player_bet_value % 1
                 if (fraction != 0):
                     sys.stderr.write(f"Invalid (fractional) bet amount of ${player_bet_value} - please resubmit a bet /w an even number of Pink chips!\n")
@@ -726,11 +605,11 @@ class Player:
             case 'g' | 'c' | 'b' | 'm' | 'a' | 'l':
                 match key:
                     case 'g':
-                        self.get_chips() # Todo AB: implement get_chips()
+                        self.get_chips(dealer, chip_purchase_amount)
                     case 'c':
-                        self.color_up() # Todo AB: implement color_up()
+                        self.color_up(dealer)
                     case 'b':
-                        self.break_down() # Todo AB: implement break_down()
+                        self.break_down(dealer)
                     case 'm':
                         self.skip_bet() # Todo AB: implement skip_bet()
                     case 'a':
@@ -740,4 +619,97 @@ class Player:
             case other:
                 sys.stderr.write(f"Invalid input '{key}'\n")
                 print("Provide a valid key or press 'v' to see valid key input options")
-    """
\ No newline at end of file
+    """
+
+
+### Compact Simulated Players ###
+# Headless tables create and touch players far more often than a person ever could, so simulated players keep
+# every per-seat field together on a Seat (instead of one seat-name-keyed dict per field) and hold their chips as a
+# fixed-size int array indexed like bjo.chip_names. __slots__ keeps each object small and its attribute access fast.
+simulated_player_cash_balance = 10000 # dollars of cash a simulated player sits down with - buy-ins come out of it
+
+def new_chip_counts(chip_counts=None):
+    # Chip count array (int64) indexed like bjo.chip_names - chip_counts may be a list of counts or a chip_color: chip_count dict
+    if chip_counts == None:
+        return array('q', bytes(8*bjo.num_of_chip_colors))
+    if isinstance(chip_counts, dict):
+        return array('q', [chip_counts.get(chip_name, 0) for chip_name in bjo.chip_names])
+    return array('q', chip_counts)
+
+
+class Hand:
+    # One hand in play - a seat's first hand, or a hand split off from it. Money is in integer cents (see bjcl).
+    __slots__ = ('player', 'seat', 'cards', 'hand_state', 'bet_cents', 'bet_chips', 'is_doubled', 'is_split',
+                 'is_split_aces', 'outcome', 'net_cents')
+
+    def __init__(self, player, seat, cards, hand_state, bet_cents, bet_chips):
+        self.player = player
+        self.seat = seat
+        self.cards = cards # list of card codes, shared with seat.hand for the first hand at a seat
+        self.hand_state = hand_state # updated with every card dealt to the hand (see bjl.add_card)
+        self.bet_cents = bet_cents
+        self.bet_chips = bet_chips # chip count array
+        self.is_doubled = False
+        self.is_split = False
+        self.is_split_aces = False
+        self.outcome = None # None while in play, then 'stand', 'bust', 'surrender' or 'blackjack'
+        self.net_cents = 0 # won (+) or lost (-) once settled
+
+
+class Seat:
+    __slots__ = ('seat_name', 'seat_number', 'hand', 'hand_state', 'hand_score', 'main_bet', 'main_bet_cents')
+
+    def __init__(self, seat_name, seat_number=None):
+        self.seat_name = seat_name
+        self.seat_number = seat_number # table seat taken up by this seat (None - not occupied)
+        self.hand = None # list of card codes
+        self.hand_state = None
+        self.hand_score = None
+        self.main_bet = None # chip count array
+        self.main_bet_cents = None
+
+    def clear_hand(self):
+        self.hand = None
+        self.hand_state = None
+        self.hand_score = None
+        self.main_bet = None
+        self.main_bet_cents = None
+
+
+class SimulatedPlayer:
+    __slots__ = ('name', 'is_dealer', 'cash_cents', 'chips', 'chip_pool_cents', 'seats')
+
+    def __init__(self, name, seat_number=None, cash_balance=simulated_player_cash_balance):
+        self.name = name
+        self.is_dealer = False
+        self.cash_cents = bjcl.dollars_to_cents(cash_balance)
+        self.chips = new_chip_counts()
+        self.chip_pool_cents = 0
+        self.seats = tuple(Seat(seat_name) for seat_name in seat_names)
+        self.seats[seat_indices['center_seat']].seat_number = seat_number
+
+    def create_casino_dealer(num_of_chips_per_color=1000):
+        Dealer = SimulatedPlayer('Dealer', 8, 10000)
+        Dealer.is_dealer = True
+        Dealer.chips = new_chip_counts([num_of_chips_per_color]*bjo.num_of_chip_colors)
+        Dealer.chip_pool_cents = num_of_chips_per_color*sum(bjcl.chip_values_cents)
+        return Dealer
+
+    # Dollar views of the cent balances
+    @property
+    def cash_balance(self):
+        return bjcl.cents_to_dollars(self.cash_cents)
+
+    @property
+    def chip_pool_balance(self):
+        return bjcl.cents_to_dollars(self.chip_pool_cents)
+
+    def get_seat(self, seat_name):
+        return self.seats[seat_indices[seat_name]]
+
+    def get_occupied_seats(self):
+        return [seat for seat in self.seats if seat.seat_number != None]
+
+    def get_chips_dict(self):
+        # chip_color: chip_count view of the chip array, as interactive players hold their chips
+        return dict(zip(bjo.chip_names, self.chips))
@@ -0,0 +1,109 @@
+"""
+File: blackjack_policies.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import abc
+import random
+
+# Local Imports #
+from . import blackjack_game_logic as bjl
+from . import blackjack_game_objects as bjo
+from . import blackjack_players as bjp
+from . import blackjack_strategy as bjstrat
+
+
+### Seat Policies ###
+# A policy stands in for a human at a simulated (headless) table - every decision that the
+# interactive state machine reads from msvcrt.getch() is answered by one of the methods below.
+class SeatPolicy(abc.ABC):
+    def __init__(self, name, main_bet=5, buy_in=500, rebuy=True, color_up=False, cash=bjp.simulated_player_cash_balance):
+        self.name = name
+        self.main_bet = main_bet # flat main bet placed every round
+        self.cash = cash # dollars of cash the player sits down with
+        self.buy_in = buy_in # dollar amount of chips bought from the dealer with cash when sitting down (and on each rebuy)
+        self.rebuy = rebuy # buy in again once chip pool can no longer cover the next bet
+        self.color_up = color_up # trade chips for the fewest chips of the same value at the end of every round
+        self.counting_system_names = [] # counting systems the table's card counter has to follow for this policy (see card_counting)
+
+    def get_main_bet(self, machine, player, seat_name):
+        # Return main bet amount for the round, or 0 to sit the round out
+        return self.main_bet
+
+    def get_early_surrender_response(self, machine, player, seat_name, hand):
+        # Return True to surrender hand before the dealer checks for Blackjack ('ES'/'ES10' tables only)
+        return False
+
+    @abc.abstractmethod
+    def get_action(self, machine, player, seat_name, hand, allowed_actions):
+        # Return one of allowed_actions - a subset of ['stand', 'hit', 'double', 'split', 'surrender']
+        pass
+
+
+class MimicTheDealerPolicy(SeatPolicy):
+    # Hits below 17 (and soft 17 on H17 tables) exactly like the dealer, never doubles, splits or surrenders
+    def get_action(self, machine, player, seat_name, hand, allowed_actions):
+        hand_state = bjl.get_hand_state(hand)
+        hand_score = bjl.hand_state_score(hand_state)
+        if (hand_score < 17):
+            return 'hit'
+        if ((hand_score == 17) and (machine.seventeen_rule == 'H17') and bjl.hand_state_is_soft(hand_state)):
+            return 'hit'
+        return 'stand'
+
+
+class NeverBustPolicy(SeatPolicy):
+    # Stands on any hard 12 or more, hits everything else
+    def get_action(self, machine, player, seat_name, hand, allowed_actions):
+        hand_state = bjl.get_hand_state(hand)
+        hand_score = bjl.hand_state_score(hand_state)
+        if (hand_score >= 12) and not bjl.hand_state_is_soft(hand_state):
+            return 'stand'
+        if (hand_score >= 18):
+            return 'stand'
+        return 'hit'
+
+
+class RandomActionPolicy(SeatPolicy):
+    # Picks uniformly among allowed actions - useful for exercising every rule path of the state machine
+    def __init__(self, name, main_bet=5, buy_in=500, rebuy=True, rng=None, color_up=False, cash=bjp.simulated_player_cash_balance):
+        super().__init__(name, main_bet, buy_in, rebuy, color_up, cash)
+        self.rng = rng if (rng != None) else random.Random()
+
+    def get_action(self, machine, player, seat_name, hand, allowed_actions):
+        return self.rng.choice(allowed_actions)
+
+
+class BasicStrategyPolicy(SeatPolicy):
+    # Plays the basic strategy worked out for the table's rules (see blackjack_strategy) - each decision is a table lookup
+    def get_hand_lookup(self, machine, hand):
+        strategy = bjstrat.get_table_basic_strategy(machine)
+        up_card_value = bjo.card_high_value(bjo.encode_card(machine.get_dealer_hand()[0]))
+        return strategy, bjl.get_hand_state(hand), bjstrat.get_pair_value(hand, machine.split_10s_rule), up_card_value
+
+    def get_early_surrender_response(self, machine, player, seat_name, hand):
+        strategy, hand_state, pair_value, up_card_value = self.get_hand_lookup(machine, hand)
+        return strategy.should_surrender_early(hand_state, pair_value, up_card_value)
+
+    def get_action(self, machine, player, seat_name, hand, allowed_actions):
+        strategy, hand_state, pair_value, up_card_value = self.get_hand_lookup(machine, hand)
+        if 'split' not in allowed_actions:
+            pair_value = None # seat is at its hand limit (or can't afford to split) - play the pair as a total
+        return strategy.get_action(hand_state, len(hand), pair_value, up_card_value, allowed_actions)
+
+
+class CardCountingPolicy(BasicStrategyPolicy):
+    # Plays basic strategy and ramps its bet with the true count read off the table's card counter (see card_counting) -
+    # one unit at a true count of 1 or less, one more unit per true count above that, up to bet_spread units
+    def __init__(self, name, main_bet=5, buy_in=500, rebuy=True, color_up=False, counting_system_name='Hi-Lo', bet_spread=8,
+                 cash=bjp.simulated_player_cash_balance):
+        super().__init__(name, main_bet, buy_in, rebuy, color_up, cash)
+        self.counting_system_name = counting_system_name
+        self.counting_system_names = [counting_system_name]
+        self.bet_spread = bet_spread
+
+    def get_main_bet(self, machine, player, seat_name):
+        true_count = machine.card_counter.get_true_count(self.counting_system_name)
+        num_of_units = min(max(int(true_count), 1), self.bet_spread)
+        return min(num_of_units*self.main_bet, machine.max_table_bet)
@@ -0,0 +1,919 @@
+"""
+File: blackjack_simulator.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import itertools
+import time
+
+# Local Imports #
+from . import bankroll_stats as bjbank
+from . import blackjack_fsm as bjfsm
+from . import blackjack_game_logic as bjl
+from . import blackjack_game_objects as bjo
+from . import blackjack_players as bjp
+from . import chip_ledger as bjcl
+from . import cut_helper as cut
+from . import dealer_rack as bjrack
+
+GameState = bjfsm.GameState
+
+
+### Simulation Helpers ###
+
+def new_simulation_stats():
+    return {
+        'rounds': 0,
+        'hands': 0,
+        'wins': 0,
+        'losses': 0,
+        'pushes': 0,
+        'player_blackjacks': 0,
+        'dealer_blackjacks': 0,
+        'dealer_busts': 0,
+        'doubles': 0,
+        'splits': 0,
+        'surrenders': 0,
+        'shuffles': 0,
+        'rebuys': 0,
+        'chip_exchanges': 0,
+        'color_ups': 0,
+        'rack_fills': 0,
+        'rack_credits': 0,
+        'total_wagered_cents': 0, # money is tracked in integer cents throughout (see bjcl)
+        'total_won_cents': 0,
+        'total_lost_cents': 0
+    }
+
+def new_round_hand(player, seat, cards, bet_cents, bet_chips):
+    return bjp.Hand(player, seat, cards, bjl.get_hand_state(cards), bet_cents, bet_chips)
+
+
+### Headless Blackjack State Machine ###
+class SimulatedBlackjackStateMachine(bjfsm.BlackjackStateMachine):
+    def __init__(self, num_of_decks, seat_policies, pen_percentage=None, rng=None, card_storage='shoe', dealer_rack=None,
+                 track_bankrolls=False, advantage_detector=None, round_log=None, counting_system_names=None, table_id=0, chip_model='chips'):
+        if chip_model not in ('chips', 'cents'):
+            raise ValueError(f"Chip model '{chip_model}' is not supported! Supported chip models are ['chips', 'cents']")
+        if (chip_model == 'cents') and ((dealer_rack != None) or (round_log != None)):
+            raise ValueError("A 'cents' table has no chips to rack and plays a whole round in one step - it takes no dealer_rack or round_log")
+        if counting_system_names == None:
+            # Follow only the counting systems something at the table reads - the seat policies' own, and Hi-Lo for the
+            # advantage detector and the round log (a round log attached later needs 'Hi-Lo' passed in here)
+            counting_system_names = []
+            for policy in seat_policies.values():
+                counting_system_names.extend(name for name in policy.counting_system_names if name not in counting_system_names)
+            if ((advantage_detector != None) or (round_log != None)) and ('Hi-Lo' not in counting_system_names):
+                counting_system_names.append('Hi-Lo')
+        super().__init__(num_of_decks, rng, counting_system_names, table_id)
+        self.card_storage = card_storage # Options - 'shoe', 'csm' (continuous shuffling machine - discards go back in after every round)
+        self.chip_model = chip_model # Options - 'chips', 'cents' (throughput mode - chip pools are plain balances, see play_cents_round)
+        if card_storage == 'shoe':
+            self.shoe = bjo.Shoe(bjo.get_encoded_shoe_of_n_decks(num_of_decks, self.rng)) # headless tables deal integer card codes (see bjo)
+        elif card_storage == 'csm':
+            self.shoe = bjo.ContinuousShufflingMachine(bjo.get_encoded_shoe_of_n_decks(num_of_decks, self.rng), self.rng)
+        else:
+            raise ValueError(f"Card storage '{card_storage}' is not supported! Supported card storages are ['shoe', 'csm']")
+        self.seat_policies = seat_policies # dictionary of seat_number: SeatPolicy, replacing keyboard input at each seat
+        self.player_policies = {} # dictionary of player: SeatPolicy, filled in WAITING
+        self.pen_percentage = pen_percentage # pen % used on every reshuffle (None - randomized within bounds for num_of_decks)
+        self.table_active_side_bet_names = [] # headless tables don't offer side bets
+        self.table_active_side_bet_limits = []
+        self.table_active_side_bet_payout_tables = []
+        self.table_active_side_bet_odds = {}
+        self.current_round_hands = [] # every player hand of the current round (split hands included), in playing order
+        self.simulation_stats = new_simulation_stats()
+        self.dealer = bjp.SimulatedPlayer.create_casino_dealer()
+        self.dealer_seat = self.dealer.get_seat('center_seat')
+        self.dealer_rack = None # a 'cents' table has no chips to rack
+        if chip_model == 'chips':
+            self.dealer_rack = dealer_rack if (dealer_rack != None) else bjrack.DealerRack() # fill/credit thresholds of the dealer's chips
+        self.bankroll_trackers = {seat_number: bjbank.BankrollTracker() for seat_number in seat_policies} if track_bankrolls else None
+        self.round_start_wealths = {} # seat_number: player's cash and chips in cents at the start of the round
+        self.advantage_detector = advantage_detector # AdvantagePlayDetector fed every main bet at deal time (None - off)
+        self.round_log = round_log # RoundLogWriter every round is appended to (None - off)
+
+
+    # WAITING/STARTING #
+    def seat_simulated_players(self):
+        for seat_number, policy in sorted(self.seat_policies.items()):
+            if self.seated_players[seat_number] != None:
+                raise ValueError(f"Seat #{seat_number} is already occupied by '{self.seated_players[seat_number].name}'")
+            player = bjp.SimulatedPlayer(policy.name, seat_number, policy.cash)
+            self.buy_in(player, bjcl.dollars_to_cents(policy.buy_in))
+            self.seated_players[seat_number] = player
+            self.player_policies[player] = policy
+            self.round_start_wealths[seat_number] = player.cash_cents + player.chip_pool_cents
+        self.transition(GameState.STARTING)
+
+    def start_simulated_game(self):
+        for seated_player in self.seated_players.values():
+            if seated_player != None:
+                self.current_round_natural_blackjacks[seated_player] = []
+                if self.active_player == None:
+                    self.active_player = seated_player
+                if seated_player not in self.known_players:
+                    self.known_players.append(seated_player)
+        for seat_number, player in reversed(list(self.seated_players.items())):
+            if player != None:
+                self.last_occupied_seat = seat_number
+                break
+        if self.card_storage == 'csm':
+            self.transition(GameState.BETTING) # a CSM is never cut and has no burn card
+        else:
+            self.transition(GameState.SHUFFLING)
+
+
+    # SHUFFLING #
+    def shuffle_cut_and_burn(self, cut_percentage):
+        # Same procedure as the interactive table, minus console output
+        if len(self.discard) != 0:
+            self.shoe.extend(self.discard)
+            self.discard.clear()
+        self.shuffle_shoe()
+        self.first_cut_index = cut.first_cut(self.shoe, self.rng)
+        self.pen = cut.second_cut(self.shoe, cut_percentage, verbose=False, rng=self.rng)
+        self.card_counter.reset()
+        self.discard.append(self.shoe.draw())
+        self.card_counter.observe_face_down()
+        self.simulation_stats['shuffles'] += 1
+        self.transition(GameState.BETTING)
+
+
+    # Chip Transfer Helpers #
+    # Chip counts are arrays indexed like bjo.chip_names (see bjp.new_chip_counts) and amounts are in integer cents
+    def fill_dealer_rack(self, needed_chips):
+        # Bring more chips to the table for every color the dealer can't cover
+        self.dealer.chip_pool_cents += self.dealer_rack.fill_to_cover(self.dealer.chips, needed_chips, self.simulation_stats['rounds'])
+        self.simulation_stats['rack_fills'] = self.dealer_rack.total_fills
+
+    def record_dealer_rack(self, changed_chips=None):
+        # Track rack levels after every payout and collection, filling and crediting colors past their thresholds
+        self.dealer.chip_pool_cents += self.dealer_rack.record(self.dealer.chips, changed_chips, self.simulation_stats['rounds'])
+        self.simulation_stats['rack_fills'] = self.dealer_rack.total_fills
+        self.simulation_stats['rack_credits'] = self.dealer_rack.total_credits
+
+    def buy_in(self, player, amount_cents):
+        # Buy amount_cents of chips from the dealer with cash - capped at what the player's cash can cover (in amounts
+        # chips come in), and returns False if that's nothing at all
+        amount_cents = min(amount_cents, player.cash_cents - player.cash_cents % bjcl.half_dollar_cents)
+        if amount_cents <= 0:
+            return False
+        player.cash_cents -= amount_cents
+        self.dealer.cash_cents += amount_cents
+        if self.chip_model == 'cents':
+            self.dealer.chip_pool_cents -= amount_cents
+            player.chip_pool_cents += amount_cents
+        else:
+            self.pay_chips_from_dealer(player, amount_cents)
+        return True
+
+    def exchange_player_chips_for_bet(self, player, amount_cents):
+        # Swap player's whole chip pool with the dealer for one that can cover amount_cents exactly
+        bet_chips = bjcl.get_chip_counts_for_cents(amount_cents)
+        remaining_chips = bjcl.get_chip_counts_for_cents(player.chip_pool_cents - amount_cents)
+        if (bet_chips == None) or (remaining_chips == None):
+            return False
+        new_chips = [bet_chip_count + remaining_chip_count for bet_chip_count, remaining_chip_count in zip(bet_chips, remaining_chips)]
+        self.fill_dealer_rack(new_chips)
+        bjcl.exchange_chips(player.chips, self.dealer.chips, list(player.chips), new_chips)
+        self.simulation_stats['chip_exchanges'] += 1
+        return True
+
+    def color_up(self, player):
+        # Trade all of player's chips for the fewest chips of the same value - chip pool balances don't change
+        bjcl.exchange_chips(player.chips, self.dealer.chips, list(player.chips), bjcl.get_color_up_chip_counts(player.chips, self.dealer.chips))
+        self.simulation_stats['color_ups'] += 1
+
+    def break_down(self, player, chip_name, chip_names):
+        # Trade one of player's chip_name chips for the fewest chips of the colors in chip_names, or return False
+        # if the player has no such chip or the dealer can't make the change
+        if player.chips[bjo.chip_indices[chip_name]] == 0:
+            return False
+        exchanged_chips = bjp.new_chip_counts()
+        exchanged_chips[bjo.chip_indices[chip_name]] = 1
+        new_chips = bjcl.get_break_down_chip_counts(exchanged_chips, chip_names, self.dealer.chips)
+        if new_chips == None:
+            return False
+        bjcl.exchange_chips(player.chips, self.dealer.chips, exchanged_chips, new_chips)
+        self.simulation_stats['chip_exchanges'] += 1
+        return True
+
+    def color_up_players(self, players):
+        # Colors up many players in one batch (see bjcl.get_color_up_batch)
+        if len(players) == 0:
+            return
+        chips_batch = [player.chips for player in players]
+        new_chips_batch = bjcl.get_color_up_batch(chips_batch, self.dealer.chips)
+        bjcl.exchange_chips_batch(chips_batch, self.dealer.chips, new_chips_batch)
+        self.simulation_stats['color_ups'] += len(players)
+
+    def take_chips_from_player(self, player, amount_cents):
+        amount_chips = bjcl.get_chip_counts_for_cents(amount_cents, player.chips)
+        if (amount_chips == None):
+            if not self.exchange_player_chips_for_bet(player, amount_cents):
+                return None
+            amount_chips = bjcl.get_chip_counts_for_cents(amount_cents, player.chips)
+        player_chips = player.chips
+        for chip_index, chip_count in enumerate(amount_chips):
+            player_chips[chip_index] -= chip_count
+        player.chip_pool_cents -= amount_cents
+        return amount_chips
+
+    def give_chips_to_player(self, player, amount_chips, amount_cents):
+        player_chips = player.chips
+        for chip_index, chip_count in enumerate(amount_chips):
+            player_chips[chip_index] += chip_count
+        player.chip_pool_cents += amount_cents
+
+    def give_chips_to_dealer(self, amount_chips, amount_cents):
+        dealer_chips = self.dealer.chips
+        for chip_index, chip_count in enumerate(amount_chips):
+            dealer_chips[chip_index] += chip_count
+        self.dealer.chip_pool_cents += amount_cents
+        self.record_dealer_rack(amount_chips)
+
+    def pay_chips_from_dealer(self, player, amount_cents):
+        payout_chips = bjcl.get_chip_counts_for_cents(amount_cents, self.dealer.chips)
+        if (payout_chips == None):
+            payout_chips = bjcl.get_chip_counts_for_cents(amount_cents)
+            self.fill_dealer_rack(payout_chips)
+        dealer_chips = self.dealer.chips
+        for chip_index, chip_count in enumerate(payout_chips):
+            dealer_chips[chip_index] -= chip_count
+        self.dealer.chip_pool_cents -= amount_cents
+        self.record_dealer_rack(payout_chips)
+        self.give_chips_to_player(player, payout_chips, amount_cents)
+
+    def player_can_afford(self, player, amount_cents):
+        return player.chip_pool_cents >= amount_cents
+
+
+    # BETTING #
+    def get_all_simulated_players_bets(self):
+        for player in self.seated_players.values():
+            if player == None:
+                continue
+            policy = self.player_policies[player]
+            for seat in player.get_occupied_seats():
+                bet_amount = policy.get_main_bet(self, player, seat.seat_name) # policies bet in dollars
+                if (bet_amount > 0) and ((bet_amount < self.min_table_bet) or (bet_amount > self.max_table_bet)):
+                    raise ValueError(f"Policy of '{player.name}' bet ${bet_amount} outside of table limits ${self.min_table_bet}-${self.max_table_bet}")
+                bet_cents = bjcl.dollars_to_cents(bet_amount)
+                if (bet_cents > 0) and not self.player_can_afford(player, bet_cents) and policy.rebuy:
+                    if self.buy_in(player, bjcl.dollars_to_cents(policy.buy_in)):
+                        self.simulation_stats['rebuys'] += 1
+                bet_chips = None
+                if (bet_cents > 0) and (player.chip_pool_cents >= bet_cents):
+                    bet_chips = self.take_chips_from_player(player, bet_cents)
+                if bet_chips == None:
+                    seat.main_bet = None
+                    seat.main_bet_cents = None
+                else:
+                    seat.main_bet = bet_chips
+                    seat.main_bet_cents = bet_cents
+        self.transition(GameState.DEALING)
+
+
+    # DEALING #
+    def get_dealer_hand(self):
+        return self.dealer_seat.hand
+
+    def get_dealer_hand_score(self):
+        return self.dealer_seat.hand_score
+
+    def deal_card_to_round_hand(self, round_hand):
+        card = self.shoe.draw()
+        self.card_counter.observe(card)
+        round_hand.cards.append(card)
+        round_hand.hand_state = bjl.add_card(round_hand.hand_state, card)
+
+    def deal_card_to_dealer(self, face_up=True):
+        # The hole card is dealt face down - counters only see it once the round is over (see end_simulated_round)
+        card = self.draw_card(face_up)
+        self.dealer_seat.hand.append(card)
+        self.dealer_seat.hand_state = bjl.add_card(self.dealer_seat.hand_state, card)
+
+    def get_round_main_bets(self):
+        round_main_bets = []
+        for player in self.seated_players.values():
+            if player != None:
+                for seat in player.get_occupied_seats():
+                    if seat.main_bet_cents != None:
+                        round_main_bets.append((seat.seat_number, self.known_players.index(player), seat.main_bet_cents))
+        return round_main_bets
+
+    def deal(self):
+        self.current_round_hands = []
+        for player in self.seated_players.values():
+            if player != None:
+                for seat in player.get_occupied_seats():
+                    if seat.main_bet_cents != None:
+                        seat.hand = []
+                        self.current_round_hands.append(new_round_hand(player, seat, seat.hand, seat.main_bet_cents, seat.main_bet))
+        if self.advantage_detector != None:
+            self.record_advantage_play()
+        self.dealer_seat.hand = []
+        self.dealer_seat.hand_state = bjl.empty_hand_state
+        for x in range(0, 2):
+            for round_hand in self.current_round_hands:
+                self.deal_card_to_round_hand(round_hand)
+            self.deal_card_to_dealer(face_up=(x == 0))
+        self.transition(GameState.PRE_SCORING)
+
+
+    # INITIAL_SCORING #
+    def score_initial_hands(self):
+        dealer_hand = self.dealer_seat.hand
+        dealer_up_card_value = bjo.card_high_value(dealer_hand[0])
+        # Early surrender is offered before dealer checks for Blackjack
+        if ((self.surrender_rule == 'ES') or ((self.surrender_rule == 'ES10') and (dealer_up_card_value == 10))):
+            for round_hand in self.current_round_hands:
+                policy = self.player_policies[round_hand.player]
+                surrender_response = policy.get_early_surrender_response(self, round_hand.player, round_hand.seat.seat_name, round_hand.cards)
+                if self.round_log != None:
+                    self.round_log.record_action('surrender' if surrender_response else 'no_surrender')
+                if surrender_response:
+                    round_hand.outcome = 'surrender'
+        dealer_hand_score = bjl.hand_state_score(self.dealer_seat.hand_state)
+        self.dealer_seat.hand_score = dealer_hand_score
+        for round_hand in self.current_round_hands:
+            player = round_hand.player
+            player_hand_score = bjl.hand_state_score(round_hand.hand_state)
+            round_hand.seat.hand_state = round_hand.hand_state
+            round_hand.seat.hand_score = player_hand_score
+            if (player_hand_score == 21) and (round_hand.outcome == None):
+                round_hand.outcome = 'blackjack'
+                self.current_round_natural_blackjacks[player].append(round_hand.seat.seat_name)
+        if (dealer_hand_score == 21):
+            # Dealer checks hole card and has Blackjack - nobody gets to play
+            self.transition(GameState.FINAL_SCORING)
+        elif any(round_hand.outcome == None for round_hand in self.current_round_hands):
+            self.transition(GameState.PLAYERS_PLAYING)
+        else:
+            self.transition(GameState.FINAL_SCORING)
+
+
+    # PLAYERS_PLAYING #
+    def count_seat_hands(self, seat):
+        seat_hand_count = 0
+        for round_hand in self.current_round_hands:
+            if round_hand.seat is seat:
+                seat_hand_count += 1
+        return seat_hand_count
+
+    def hand_is_splittable_pair(self, cards):
+        if self.split_10s_rule == 'Value':
+            return bjo.card_high_value(cards[0]) == bjo.card_high_value(cards[1])
+        return bjo.card_rank_index(cards[0]) == bjo.card_rank_index(cards[1])
+
+    def get_allowed_actions(self, round_hand):
+        player = round_hand.player
+        cards = round_hand.cards
+        bet_cents = round_hand.bet_cents
+        allowed_actions = ['stand']
+        if not round_hand.is_split_aces:
+            allowed_actions.append('hit')
+        if len(cards) != 2:
+            return allowed_actions
+        can_afford_another_bet = player.chip_pool_cents >= bet_cents # player_can_afford, inlined - this runs on every two-card hand
+        # Doubling
+        hand_score = round_hand.hand_state >> 1 # a two-card hand can't be bust
+        if self.doubling_rule == 'D9':
+            doubling_allowed = hand_score in (9, 10, 11)
+        elif self.doubling_rule == 'D10':
+            doubling_allowed = hand_score in (10, 11)
+        else:
+            doubling_allowed = True
+        if round_hand.is_split and (self.double_after_split_rule != 'DAS'):
+            doubling_allowed = False
+        if round_hand.is_split_aces:
+            doubling_allowed = False
+        if doubling_allowed and can_afford_another_bet:
+            allowed_actions.append('double')
+        # Splitting
+        if can_afford_another_bet and self.hand_is_splittable_pair(cards):
+            max_seat_hands = 2 if self.splitting_rule == 'SP2' else 4
+            if round_hand.is_split_aces and (bjo.card_rank_index(cards[0]) == bjo.ace_rank_index):
+                if self.ace_resplit_rule == 'NRSA':
+                    max_seat_hands = 0
+                elif self.ace_resplit_rule == 'RSA3':
+                    max_seat_hands = min(max_seat_hands, 3)
+            if self.count_seat_hands(round_hand.seat) < max_seat_hands:
+                allowed_actions.append('split')
+        # Late surrender
+        if (self.surrender_rule == 'LS') and not round_hand.is_split:
+            allowed_actions.append('surrender')
+        return allowed_actions
+
+    def split_round_hand(self, round_hand):
+        player = round_hand.player
+        split_bet_chips = self.take_chips_from_player(player, round_hand.bet_cents)
+        split_hand = new_round_hand(player, round_hand.seat, [round_hand.cards.pop()],
+                                    round_hand.bet_cents, split_bet_chips)
+        round_hand.hand_state = bjl.get_hand_state(round_hand.cards)
+        round_hand.is_split = split_hand.is_split = True
+        if bjo.card_rank_index(split_hand.cards[0]) == bjo.ace_rank_index:
+            round_hand.is_split_aces = split_hand.is_split_aces = True
+        self.current_round_hands.insert(self.current_round_hands.index(round_hand) + 1, split_hand)
+        self.deal_card_to_round_hand(round_hand)
+        self.simulation_stats['splits'] += 1
+
+    def double_round_hand(self, round_hand):
+        double_bet_chips = self.take_chips_from_player(round_hand.player, round_hand.bet_cents)
+        round_hand.bet_chips = [bet_chip_count + double_chip_count for bet_chip_count, double_chip_count in zip(round_hand.bet_chips, double_bet_chips)]
+        round_hand.bet_cents *= 2
+        round_hand.is_doubled = True
+        self.deal_card_to_round_hand(round_hand)
+        self.simulation_stats['doubles'] += 1
+
+    def play_simulated_hand(self, round_hand):
+        player = round_hand.player
+        seat_name = round_hand.seat.seat_name
+        policy = self.player_policies[player]
+        cards = round_hand.cards
+        # Split hands receive their second card once they come up to be played
+        if len(cards) == 1:
+            self.deal_card_to_round_hand(round_hand)
+        while True:
+            hand_score = bjl.hand_state_score(round_hand.hand_state)
+            if hand_score == -1:
+                round_hand.outcome = 'bust'
+                break
+            if (hand_score == 21) or round_hand.is_doubled:
+                round_hand.outcome = 'stand'
+                break
+            allowed_actions = self.get_allowed_actions(round_hand)
+            if allowed_actions == ['stand']:
+                round_hand.outcome = 'stand'
+                break
+            action = policy.get_action(self, player, seat_name, cards, allowed_actions)
+            if action not in allowed_actions:
+                raise ValueError(f"Policy of '{player.name}' chose action '{action}' outside of allowed actions {allowed_actions}")
+            if self.round_log != None:
+                self.round_log.record_action(action)
+            match action:
+                case 'stand':
+                    round_hand.outcome = 'stand'
+                    break
+                case 'hit':
+                    self.deal_card_to_round_hand(round_hand)
+                case 'double':
+                    self.double_round_hand(round_hand)
+                case 'split':
+                    self.split_round_hand(round_hand)
+                case 'surrender':
+                    round_hand.outcome = 'surrender'
+                    break
+        if cards is round_hand.seat.hand:
+            round_hand.seat.hand_state = round_hand.hand_state
+            round_hand.seat.hand_score = bjl.hand_state_score(round_hand.hand_state)
+
+    def play_all_simulated_hands(self):
+        # Split hands are inserted right after the hand they came from, so they're played in order
+        hand_index = 0
+        while hand_index < len(self.current_round_hands):
+            round_hand = self.current_round_hands[hand_index]
+            if round_hand.outcome == None:
+                self.play_simulated_hand(round_hand)
+            hand_index += 1
+        if any(round_hand.outcome == 'stand' for round_hand in self.current_round_hands):
+            self.transition(GameState.DEALER_PLAYING)
+        else:
+            self.transition(GameState.FINAL_SCORING)
+
+
+    # DEALER_PLAYING #
+    def dealer_plays(self):
+        dealer_seat = self.dealer_seat
+        dealer_hand_score = bjl.hand_state_score(dealer_seat.hand_state)
+        while (dealer_hand_score > 0) and ((dealer_hand_score < 17) or
+               ((dealer_hand_score == 17) and (self.seventeen_rule == 'H17') and bjl.hand_state_is_soft(dealer_seat.hand_state))):
+            self.deal_card_to_dealer()
+            dealer_hand_score = bjl.hand_state_score(dealer_seat.hand_state)
+        dealer_seat.hand_score = dealer_hand_score
+        self.transition(GameState.FINAL_SCORING)
+
+
+    # FINAL_SCORING #
+    def win_round_hand(self, round_hand, payout_cents):
+        player = round_hand.player
+        if bjcl.get_chip_counts_for_cents(payout_cents) == None:
+            # Payout such as $1.5 can't be paid in chips - dealer takes the bet and pays out bet and winnings together
+            self.give_chips_to_dealer(round_hand.bet_chips, round_hand.bet_cents)
+            self.pay_chips_from_dealer(player, round_hand.bet_cents + payout_cents)
+        else:
+            self.give_chips_to_player(player, round_hand.bet_chips, round_hand.bet_cents)
+            self.pay_chips_from_dealer(player, payout_cents)
+        round_hand.net_cents = payout_cents
+        self.simulation_stats['wins'] += 1
+        self.simulation_stats['total_won_cents'] += payout_cents
+
+    def lose_round_hand(self, round_hand):
+        self.give_chips_to_dealer(round_hand.bet_chips, round_hand.bet_cents)
+        round_hand.net_cents = -round_hand.bet_cents
+        self.simulation_stats['losses'] += 1
+        self.simulation_stats['total_lost_cents'] += round_hand.bet_cents
+
+    def push_round_hand(self, round_hand):
+        self.give_chips_to_player(round_hand.player, round_hand.bet_chips, round_hand.bet_cents)
+        self.simulation_stats['pushes'] += 1
+
+    def surrender_round_hand(self, round_hand):
+        # Forfeit half of the bet (rounded up to the nearest amount that can be refunded in chips)
+        player = round_hand.player
+        refund_cents = round_hand.bet_cents // 2
+        if bjcl.get_chip_counts_for_cents(refund_cents) == None:
+            refund_cents -= refund_cents % bjcl.cents_per_dollar
+        self.give_chips_to_dealer(round_hand.bet_chips, round_hand.bet_cents)
+        if refund_cents > 0:
+            self.pay_chips_from_dealer(player, refund_cents)
+        round_hand.net_cents = refund_cents - round_hand.bet_cents
+        self.simulation_stats['surrenders'] += 1
+        self.simulation_stats['losses'] += 1
+        self.simulation_stats['total_lost_cents'] += round_hand.bet_cents - refund_cents
+
+    def get_blackjack_payout_cents(self, bet_cents):
+        if self.blackjack_ratio == 1.2:
+            return bjcl.cents_per_dollar*round(bet_cents*6/(5*bjcl.cents_per_dollar)) # 6:5 payouts are rounded to whole dollars
+        return round(bet_cents*self.blackjack_ratio)
+
+    def settle_round_hand(self, round_hand, dealer_hand_score, dealer_has_blackjack):
+        outcome = round_hand.outcome
+        if outcome == 'surrender':
+            self.surrender_round_hand(round_hand)
+        elif outcome == 'bust':
+            self.lose_round_hand(round_hand)
+        elif outcome == 'blackjack':
+            self.simulation_stats['player_blackjacks'] += 1
+            if dealer_has_blackjack:
+                self.push_round_hand(round_hand)
+            else:
+                self.win_round_hand(round_hand, self.get_blackjack_payout_cents(round_hand.bet_cents))
+        elif dealer_has_blackjack:
+            self.lose_round_hand(round_hand)
+        else:
+            player_hand_score = bjl.hand_state_score(round_hand.hand_state)
+            if (dealer_hand_score == -1) or (player_hand_score > dealer_hand_score):
+                self.win_round_hand(round_hand, round_hand.bet_cents)
+            elif player_hand_score == dealer_hand_score:
+                self.push_round_hand(round_hand)
+            else:
+                self.lose_round_hand(round_hand)
+
+    def settle_all_hands(self):
+        dealer_hand = self.dealer_seat.hand
+        dealer_hand_score = self.dealer_seat.hand_score
+        dealer_has_blackjack = (len(dealer_hand) == 2) and (dealer_hand_score == 21)
+        if dealer_has_blackjack:
+            self.simulation_stats['dealer_blackjacks'] += 1
+        elif dealer_hand_score == -1:
+            self.simulation_stats['dealer_busts'] += 1
+        for round_hand in self.current_round_hands:
+            self.settle_round_hand(round_hand, dealer_hand_score, dealer_has_blackjack)
+            self.simulation_stats['hands'] += 1
+            self.simulation_stats['total_wagered_cents'] += round_hand.bet_cents
+        if self.round_log != None:
+            for round_hand in self.current_round_hands:
+                self.round_log.record_payout(round_hand.seat.seat_number, round_hand.net_cents)
+        self.end_simulated_round()
+
+    def record_bankrolls(self):
+        # Feed each tracked player's round result and chip pool to their bankroll tracker (see bjbank)
+        for seat_number, bankroll_tracker in self.bankroll_trackers.items():
+            player = self.seated_players[seat_number]
+            wealth_cents = player.cash_cents + player.chip_pool_cents
+            initial_bet_cents = sum(seat.main_bet_cents for seat in player.seats if seat.main_bet_cents != None)
+            bankroll_tracker.add_round(wealth_cents - self.round_start_wealths[seat_number], initial_bet_cents, player.chip_pool_cents)
+            self.round_start_wealths[seat_number] = wealth_cents
+
+    def end_simulated_round(self):
+        if self.bankroll_trackers != None:
+            self.record_bankrolls()
+        for round_hand in self.current_round_hands:
+            self.discard.extend(round_hand.cards)
+            round_hand.seat.clear_hand()
+        self.discard.extend(self.dealer_seat.hand)
+        self.card_counter.reveal(self.dealer_seat.hand[1])
+        if self.card_storage == 'csm':
+            self.shoe.extend(self.discard)
+            self.discard.clear()
+            self.card_counter.reset() # every card is back in the machine
+        self.dealer_seat.clear_hand()
+        self.current_round_hands = []
+        self.reset_natural_blackjack_tracking()
+        self.color_up_players([self.seated_players[seat_number] for seat_number, policy in self.seat_policies.items() if policy.color_up])
+        self.simulation_stats['rounds'] += 1
+        if self.shoe.cut_card_reached():
+            self.transition(GameState.SHUFFLING)
+        else:
+            self.transition(GameState.BETTING)
+
+
+    # Throughput Mode #
+    # A 'cents' table plays a whole round, BETTING through FINAL_SCORING, in one step with the round's state in locals -
+    # bets are taken and paid straight out of chip pool balances in integer cents (no chip counts, no dealer rack, no
+    # chip exchanges or color ups), and the card counter is only told the number of cards dealt at the end of the round
+    # when it follows no counting systems. Every hand is dealt, played and settled exactly like at a 'chips' table (which
+    # only differs when it turns a bet down because the dealer can't make change for it).
+    def play_cents_round(self):
+        stats = self.simulation_stats
+        dealer = self.dealer
+        dealer_seat = self.dealer_seat
+        player_policies = self.player_policies
+        shoe = self.shoe
+        if isinstance(shoe, bjo.Shoe):
+            # Cards are read straight off the shoe's list, and its cursor is moved past them once the round is over
+            round_start_cursor = shoe.cursor
+            draw = map(shoe.cards.__getitem__, itertools.count(round_start_cursor)).__next__
+        else:
+            draw = shoe.draw
+        card_counter = self.card_counter
+        counting = len(card_counter.counting_system_names) > 0
+        observe = card_counter.observe
+        transitions = bjl.hand_state_transitions
+        value_shift = bjo.card_value_shift
+        bust_hand_state = bjl.bust_hand_state
+        # Rules get_allowed_actions checks on every two-card hand, looked up once a round
+        doubling_scores = {'D9': (9, 10, 11), 'D10': (10, 11)}.get(self.doubling_rule) # None - any two cards
+        doubles_after_split = self.double_after_split_rule == 'DAS'
+        max_seat_hands = 2 if self.splitting_rule == 'SP2' else 4
+        max_split_aces_seat_hands = {'NRSA': 0, 'RSA3': min(max_seat_hands, 3)}.get(self.ace_resplit_rule, max_seat_hands)
+        late_surrender = self.surrender_rule == 'LS'
+        # Betting
+        round_hands = []
+        for player in self.seated_players.values():
+            if player == None:
+                continue
+            policy = player_policies[player]
+            for seat in player.seats:
+                if seat.seat_number == None:
+                    continue
+                bet_amount = policy.get_main_bet(self, player, seat.seat_name) # policies bet in dollars
+                if (bet_amount > 0) and ((bet_amount < self.min_table_bet) or (bet_amount > self.max_table_bet)):
+                    raise ValueError(f"Policy of '{player.name}' bet ${bet_amount} outside of table limits ${self.min_table_bet}-${self.max_table_bet}")
+                bet_cents = bjcl.dollars_to_cents(bet_amount)
+                if (bet_cents > 0) and (player.chip_pool_cents < bet_cents) and policy.rebuy:
+                    if self.buy_in(player, bjcl.dollars_to_cents(policy.buy_in)):
+                        stats['rebuys'] += 1
+                seat.main_bet = None
+                if (bet_cents > 0) and (player.chip_pool_cents >= bet_cents):
+                    player.chip_pool_cents -= bet_cents
+                    seat.main_bet_cents = bet_cents
+                    seat.hand = []
+                    round_hands.append(bjp.Hand(player, seat, seat.hand, bjl.empty_hand_state, bet_cents, None))
+                else:
+                    seat.main_bet_cents = None
+        self.current_round_hands = round_hands
+        # Dealing
+        if self.advantage_detector != None:
+            self.record_advantage_play()
+        first_cards = [draw() for round_hand in round_hands]
+        dealer_up_card = draw()
+        second_cards = [draw() for round_hand in round_hands]
+        dealer_hand = dealer_seat.hand = [dealer_up_card, draw()]
+        dealer_hand_state = bjl.get_hand_state(dealer_hand)
+        for round_hand, first_card, second_card in zip(round_hands, first_cards, second_cards):
+            round_hand.cards += (first_card, second_card)
+            round_hand.hand_state = transitions[transitions[bjl.empty_hand_state][first_card >> value_shift]][second_card >> value_shift]
+        if counting:
+            for card in first_cards + [dealer_up_card] + second_cards:
+                observe(card)
+            card_counter.observe_face_down() # the hole card is counted once it's turned over
+        # Initial scoring
+        if ((self.surrender_rule == 'ES') or ((self.surrender_rule == 'ES10') and (bjo.card_high_value(dealer_hand[0]) == 10))):
+            for round_hand in round_hands:
+                if player_policies[round_hand.player].get_early_surrender_response(self, round_hand.player, round_hand.seat.seat_name, round_hand.cards):
+                    round_hand.outcome = 'surrender'
+        dealer_has_blackjack = (dealer_hand_state >> 1) == 21
+        for round_hand in round_hands:
+            if ((round_hand.hand_state >> 1) == 21) and (round_hand.outcome == None):
+                round_hand.outcome = 'blackjack'
+        # Players playing - split hands are inserted right after the hand they came from, so they're played in order
+        hand_index = 0
+        any_hand_stands = False
+        while (hand_index < len(round_hands)) and not dealer_has_blackjack:
+            round_hand = round_hands[hand_index]
+            hand_index += 1
+            if round_hand.outcome != None:
+                continue
+            player = round_hand.player
+            policy = player_policies[player]
+            seat_name = round_hand.seat.seat_name
+            cards = round_hand.cards
+            hand_state = round_hand.hand_state
+            draw_card = len(cards) == 1 # split hands receive their second card once they come up to be played
+            while True:
+                if draw_card:
+                    card = draw()
+                    if counting:
+                        observe(card)
+                    cards.append(card)
+                    hand_state = transitions[hand_state][card >> value_shift]
+                if hand_state == bust_hand_state:
+                    round_hand.outcome = 'bust'
+                    break
+                if ((hand_state >> 1) == 21) or round_hand.is_doubled:
+                    round_hand.outcome = 'stand'
+                    any_hand_stands = True
+                    break
+                round_hand.hand_state = hand_state
+                # Same actions get_allowed_actions offers
+                is_split_aces = round_hand.is_split_aces
+                allowed_actions = ['stand'] if is_split_aces else ['stand', 'hit']
+                if len(cards) == 2:
+                    can_afford_another_bet = player.chip_pool_cents >= round_hand.bet_cents
+                    if (can_afford_another_bet and (not is_split_aces) and (doubles_after_split or not round_hand.is_split)
+                        and ((doubling_scores == None) or ((hand_state >> 1) in doubling_scores))):
+                        allowed_actions.append('double')
+                    if can_afford_another_bet and ((cards[0] >> value_shift) == (cards[1] >> value_shift)) and self.hand_is_splittable_pair(cards):
+                        resplitting_aces = is_split_aces and (bjo.card_rank_index(cards[0]) == bjo.ace_rank_index)
+                        if self.count_seat_hands(round_hand.seat) < (max_split_aces_seat_hands if resplitting_aces else max_seat_hands):
+                            allowed_actions.append('split')
+                    if late_surrender and not round_hand.is_split:
+                        allowed_actions.append('surrender')
+                if allowed_actions == ['stand']:
+                    round_hand.outcome = 'stand'
+                    any_hand_stands = True
+                    break
+                action = policy.get_action(self, player, seat_name, cards, allowed_actions)
+                if action not in allowed_actions:
+                    raise ValueError(f"Policy of '{player.name}' chose action '{action}' outside of allowed actions {allowed_actions}")
+                if action == 'hit':
+                    draw_card = True
+                elif action == 'stand':
+                    round_hand.outcome = 'stand'
+                    any_hand_stands = True
+                    break
+                elif action == 'double':
+                    player.chip_pool_cents -= round_hand.bet_cents
+                    round_hand.bet_cents *= 2
+                    round_hand.is_doubled = True
+                    stats['doubles'] += 1
+                    draw_card = True
+                elif action == 'split':
+                    player.chip_pool_cents -= round_hand.bet_cents
+                    split_hand = bjp.Hand(player, round_hand.seat, [cards.pop()], bjl.empty_hand_state, round_hand.bet_cents, None)
+                    split_hand.hand_state = transitions[split_hand.hand_state][split_hand.cards[0] >> value_shift]
+                    hand_state = bjl.get_hand_state(cards)
+                    round_hand.is_split = split_hand.is_split = True
+                    if bjo.card_rank_index(split_hand.cards[0]) == bjo.ace_rank_index:
+                        round_hand.is_split_aces = split_hand.is_split_aces = True
+                    round_hands.insert(hand_index, split_hand)
+                    stats['splits'] += 1
+                    draw_card = True
+                else:
+                    round_hand.outcome = 'surrender'
+                    break
+            round_hand.hand_state = hand_state
+        # Dealer playing
+        if any_hand_stands:
+            hits_soft_17 = self.seventeen_rule == 'H17'
+            while (dealer_hand_state != bust_hand_state) and (((dealer_hand_state >> 1) < 17) or
+                   (((dealer_hand_state >> 1) == 17) and hits_soft_17 and bjl.hand_state_is_soft(dealer_hand_state))):
+                card = draw()
+                if counting:
+                    observe(card)
+                dealer_hand.append(card)
+                dealer_hand_state = transitions[dealer_hand_state][card >> value_shift]
+        dealer_hand_score = bjl.hand_state_score(dealer_hand_state)
+        dealer_seat.hand_state = dealer_hand_state
+        dealer_seat.hand_score = dealer_hand_score
+        # Final scoring
+        if dealer_has_blackjack:
+            stats['dealer_blackjacks'] += 1
+        elif dealer_hand_score == -1:
+            stats['dealer_busts'] += 1
+        wins = losses = pushes = player_blackjacks = surrenders = wagered_cents = won_cents = lost_cents = 0
+        round_cards = len(dealer_hand)
+        for round_hand in round_hands:
+            bet_cents = round_hand.bet_cents
+            outcome = round_hand.outcome
+            if outcome == 'blackjack':
+                player_blackjacks += 1
+            if outcome == 'surrender':
+                refund_cents = bet_cents // 2
+                if bjcl.get_chip_counts_for_cents(refund_cents) == None:
+                    refund_cents -= refund_cents % bjcl.cents_per_dollar # rounded like a refund paid in chips
+                net_cents = refund_cents - bet_cents
+                surrenders += 1
+            elif (outcome == 'blackjack') and not dealer_has_blackjack:
+                net_cents = self.get_blackjack_payout_cents(bet_cents)
+            elif (outcome == 'blackjack') or (outcome == 'bust') or dealer_has_blackjack:
+                net_cents = 0 if (outcome == 'blackjack') else -bet_cents
+            else:
+                player_hand_score = round_hand.hand_state >> 1
+                if (dealer_hand_score == -1) or (player_hand_score > dealer_hand_score):
+                    net_cents = bet_cents
+                elif player_hand_score == dealer_hand_score:
+                    net_cents = 0
+                else:
+                    net_cents = -bet_cents
+            if net_cents > 0:
+                wins += 1
+                won_cents += net_cents
+            elif (net_cents < 0) or (outcome == 'surrender'):
+                losses += 1
+                lost_cents -= net_cents
+            else:
+                pushes += 1
+            round_hand.player.chip_pool_cents += bet_cents + net_cents
+            dealer.chip_pool_cents -= net_cents
+            round_hand.net_cents = net_cents
+            wagered_cents += bet_cents
+            round_cards += len(round_hand.cards)
+        stats['hands'] += len(round_hands)
+        stats['wins'] += wins
+        stats['losses'] += losses
+        stats['pushes'] += pushes
+        stats['player_blackjacks'] += player_blackjacks
+        stats['surrenders'] += surrenders
+        stats['total_wagered_cents'] += wagered_cents
+        stats['total_won_cents'] += won_cents
+        stats['total_lost_cents'] += lost_cents
+        # End of round
+        if self.bankroll_trackers != None:
+            self.record_bankrolls()
+        discard = self.discard
+        for round_hand in round_hands:
+            discard.extend(round_hand.cards)
+            round_hand.seat.clear_hand()
+        discard.extend(dealer_hand)
+        if counting:
+            card_counter.reveal(dealer_hand[1])
+        else:
+            card_counter.cards_dealt += round_cards
+            card_counter.cards_seen += round_cards
+        if isinstance(shoe, bjo.Shoe):
+            shoe.cursor = round_start_cursor + round_cards
+        if self.card_storage == 'csm':
+            shoe.extend(discard)
+            discard.clear()
+            card_counter.reset() # every card is back in the machine
+        dealer_seat.clear_hand()
+        self.current_round_hands = []
+        stats['rounds'] += 1
+        if shoe.cut_card_reached():
+            self.transition(GameState.SHUFFLING)
+        else:
+            self.transition(GameState.BETTING)
+
+
+    # State Machine Driver #
+    def step(self):
+        match self.state:
+            case GameState.WAITING:
+                self.seat_simulated_players()
+            case GameState.STARTING:
+                self.start_simulated_game()
+            case GameState.SHUFFLING:
+                self.shuffle_cut_and_burn(self.pen_percentage)
+            case GameState.BETTING:
+                if self.chip_model == 'cents':
+                    self.play_cents_round()
+                else:
+                    self.get_all_simulated_players_bets()
+            case GameState.DEALING:
+                self.deal()
+            case GameState.PRE_SCORING:
+                self.transition(GameState.INITIAL_SCORING) # no side bets to resolve at a headless table
+            case GameState.INITIAL_SCORING:
+                self.score_initial_hands()
+            case GameState.PLAYERS_PLAYING:
+                self.play_all_simulated_hands()
+            case GameState.DEALER_PLAYING:
+                self.dealer_plays()
+            case GameState.FINAL_SCORING:
+                self.settle_all_hands()
+            case other:
+                raise NameError(f"Invalid state '{self.state}'!")
+
+    def play_round(self):
+        # Step until one full round (BETTING through FINAL_SCORING) has been played
+        if (self.chip_model == 'cents') and (self.state is GameState.BETTING):
+            self.play_cents_round() # the whole round is a single step
+            return
+        rounds_played = self.simulation_stats['rounds']
+        while self.simulation_stats['rounds'] == rounds_played:
+            self.step()
+
+    def play_shoe(self):
+        # Play rounds until the cut card comes out and the table goes back to SHUFFLING
+        if self.card_storage == 'csm':
+            raise ValueError("A continuous shuffling machine has no end of shoe - play rounds with run() instead")
+        self.play_round()
+        while self.state != GameState.SHUFFLING:
+            self.play_round()
+
+    def run(self, num_of_rounds):
+        for round_number in range(0, num_of_rounds):
+            self.play_round()
+        return self.simulation_stats
+
+
+def measure_rounds_per_second(machine, num_of_rounds):
+    # Throughput of a simulated table, such as a CSM table against one dealing out of a hand-shuffled shoe
+    start_time = time.perf_counter()
+    machine.run(num_of_rounds)
+    return num_of_rounds/(time.perf_counter() - start_time)
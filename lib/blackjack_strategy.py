@@ -0,0 +1,268 @@
+"""
+File: blackjack_strategy.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import functools
+
+# Local Imports #
+from . import blackjack_game_logic as bjl
+from . import blackjack_game_objects as bjo
+from . import dealer_probabilities as bjdp
+
+
+### Basic Strategy ###
+# Basic strategy is worked out from expected values rather than copied from the strategy charts. For each dealer
+# up card, the dealer's outcome distribution (see dealer_probabilities) gives the EV of standing on each total, and
+# hitting, doubling and splitting are scored by recursing over the player's next card, drawn with the value
+# proportions of a full shoe. Decisions are total-dependent (hand state + up card) and, since the dealer peeks
+# at the table, conditioned on the dealer not having Blackjack. Up card and card values are high values 2-11.
+dealer_up_card_values = list(range(2, 12))
+ten_card_value = 10
+ace_card_value = 11
+chart_action_codes = {'stand': 'S', 'hit': 'H', 'double': 'D', 'split': 'P', 'surrender': 'R'}
+
+
+def get_card_value_probabilities(num_of_decks):
+    # Chance of drawing each high value 2-11 off a full shoe, indexed by high value (0-1 unused)
+    value_counts = bjdp.get_shoe_value_counts(num_of_decks)
+    num_of_cards = 52*num_of_decks
+    return [0.0, 0.0] + [value_count/num_of_cards for value_count in value_counts]
+
+
+def doubling_allowed_on_score(doubling_rule, hand_score):
+    # 'DA2' - double on any first two cards, 'D9' - only on totals of 9-11, 'D10' - only on totals of 10-11
+    if doubling_rule == 'D9':
+        return hand_score in [9, 10, 11]
+    elif doubling_rule == 'D10':
+        return hand_score in [10, 11]
+    return True
+
+
+def get_max_split_hands(splitting_rule, ace_resplit_rule, pair_value):
+    max_split_hands = 2 if (splitting_rule == 'SP2') else 4
+    if pair_value == ace_card_value:
+        if ace_resplit_rule == 'NRSA':
+            max_split_hands = 2
+        elif ace_resplit_rule == 'RSA3':
+            max_split_hands = min(max_split_hands, 3)
+    return max_split_hands
+
+
+def rank_actions(action_evs):
+    # Actions sorted from best to worst EV, so a caller takes the first one it's allowed to make
+    return tuple(sorted(action_evs, key=action_evs.get, reverse=True))
+
+
+class BasicStrategy:
+    def __init__(self, num_of_decks, seventeen_rule='H17', doubling_rule='DA2', double_after_split_rule='DAS',
+                 splitting_rule='SP4', surrender_rule='LS', ace_resplit_rule='RSA', split_10s_rule='Rank'):
+        self.num_of_decks = num_of_decks
+        self.seventeen_rule = seventeen_rule
+        self.doubling_rule = doubling_rule
+        self.double_after_split_rule = double_after_split_rule
+        self.splitting_rule = splitting_rule
+        self.surrender_rule = surrender_rule
+        self.ace_resplit_rule = ace_resplit_rule
+        self.split_10s_rule = split_10s_rule
+        self.card_value_probabilities = get_card_value_probabilities(num_of_decks)
+        # Lookup tables indexed by [hand_state or pair value][up card value] (up card values 0-1 unused) #
+        self.two_card_action_evs = [[None]*12 for hand_state in range(0, bjl.num_of_hand_states)] # {action: EV}
+        self.two_card_actions = [[None]*12 for hand_state in range(0, bjl.num_of_hand_states)] # ranked actions
+        self.multi_card_actions = [[None]*12 for hand_state in range(0, bjl.num_of_hand_states)] # only stand or hit
+        self.pair_action_evs = [[None]*12 for pair_value in range(0, 12)]
+        self.pair_actions = [[None]*12 for pair_value in range(0, 12)]
+        self.two_card_early_surrenders = [[False]*12 for hand_state in range(0, bjl.num_of_hand_states)]
+        self.pair_early_surrenders = [[False]*12 for pair_value in range(0, 12)]
+        for up_card_value in dealer_up_card_values:
+            self.fill_up_card_tables(up_card_value)
+
+    def fill_up_card_tables(self, up_card_value):
+        dealer_up_card_name = 'A' if (up_card_value == ace_card_value) else str(up_card_value)
+        dealer_outcomes = bjdp.get_dealer_probability_table(self.num_of_decks, self.seventeen_rule, True)[dealer_up_card_name]
+        dealer_blackjack_probability = bjdp.get_dealer_probability_table(self.num_of_decks, self.seventeen_rule, False)[dealer_up_card_name]['Blackjack']
+        stand_evs = self.get_stand_evs(dealer_outcomes)
+        hit_evs = self.get_hit_evs(stand_evs)
+        double_evs = self.get_double_evs(stand_evs)
+        for hand_state in range(0, bjl.bust_hand_state):
+            hand_score = bjl.hand_state_score(hand_state)
+            if (hand_score < 4) or (hand_state == bjl.empty_hand_state):
+                continue
+            self.multi_card_actions[hand_state][up_card_value] = rank_actions({'stand': stand_evs[hand_state], 'hit': hit_evs[hand_state]})
+            action_evs = {'stand': stand_evs[hand_state], 'hit': hit_evs[hand_state]}
+            if doubling_allowed_on_score(self.doubling_rule, hand_score):
+                action_evs['double'] = double_evs[hand_state]
+            if self.surrender_rule == 'LS':
+                action_evs['surrender'] = -0.5
+            self.two_card_action_evs[hand_state][up_card_value] = action_evs
+            self.two_card_actions[hand_state][up_card_value] = rank_actions(action_evs)
+            self.two_card_early_surrenders[hand_state][up_card_value] = self.get_early_surrender_decision(
+                action_evs, up_card_value, dealer_blackjack_probability)
+        for pair_value in range(2, 12):
+            pair_hand_state = bjl.hand_state_transitions[bjl.hand_state_transitions[bjl.empty_hand_state][pair_value]][pair_value]
+            action_evs = dict(self.two_card_action_evs[pair_hand_state][up_card_value])
+            action_evs['split'] = self.get_split_ev(pair_value, stand_evs, hit_evs, double_evs)
+            self.pair_action_evs[pair_value][up_card_value] = action_evs
+            self.pair_actions[pair_value][up_card_value] = rank_actions(action_evs)
+            self.pair_early_surrenders[pair_value][up_card_value] = self.get_early_surrender_decision(
+                action_evs, up_card_value, dealer_blackjack_probability)
+
+    def get_stand_evs(self, dealer_outcomes):
+        # EV of standing on every hand state against the dealer's outcome distribution (a bust scores -1)
+        stand_evs = [-1.0]*bjl.num_of_hand_states
+        for hand_state in range(0, bjl.bust_hand_state):
+            hand_score = bjl.hand_state_score(hand_state)
+            stand_ev = dealer_outcomes['Bust'] - dealer_outcomes['Blackjack']
+            for dealer_score in range(17, 22):
+                if hand_score > dealer_score:
+                    stand_ev += dealer_outcomes[str(dealer_score)]
+                elif hand_score < dealer_score:
+                    stand_ev -= dealer_outcomes[str(dealer_score)]
+            stand_evs[hand_state] = stand_ev
+        return stand_evs
+
+    def get_hit_evs(self, stand_evs):
+        # EV of hitting once and then playing on optimally (hit or stand). A hit can take a soft hand down to a lower
+        # hard total, so hand states are worked out recursively rather than in order of their totals
+        hit_evs = [None]*bjl.num_of_hand_states
+        hit_evs[bjl.bust_hand_state] = -1.0
+
+        def get_hit_ev(hand_state):
+            if hit_evs[hand_state] == None:
+                if bjl.hand_state_score(hand_state) == 21:
+                    hit_evs[hand_state] = stand_evs[hand_state] # a hand of 21 is done - no more cards are dealt to it
+                else:
+                    hit_ev = 0.0
+                    for card_value in range(2, 12):
+                        next_hand_state = bjl.hand_state_transitions[hand_state][card_value]
+                        hit_ev += self.card_value_probabilities[card_value]*max(stand_evs[next_hand_state], get_hit_ev(next_hand_state))
+                    hit_evs[hand_state] = hit_ev
+            return hit_evs[hand_state]
+
+        for hand_state in range(0, bjl.bust_hand_state):
+            get_hit_ev(hand_state)
+        return hit_evs
+
+    def get_double_evs(self, stand_evs):
+        double_evs = [-2.0]*bjl.num_of_hand_states
+        for hand_state in range(0, bjl.bust_hand_state):
+            double_ev = 0.0
+            for card_value in range(2, 12):
+                double_ev += 2*self.card_value_probabilities[card_value]*stand_evs[bjl.hand_state_transitions[hand_state][card_value]]
+            double_evs[hand_state] = double_ev
+        return double_evs
+
+    def get_split_ev(self, pair_value, stand_evs, hit_evs, double_evs):
+        # Split hands are played one at a time - each gets its second card and is then played on its own (split
+        # Aces only stand), unless that card makes another pair and the seat is still under its hand limit, in
+        # which case it may be resplit into two more pending hands
+        max_split_hands = get_max_split_hands(self.splitting_rule, self.ace_resplit_rule, pair_value)
+        split_card_hand_state = bjl.hand_state_transitions[bjl.empty_hand_state][pair_value]
+        resplit_probability = self.card_value_probabilities[pair_value]
+        if (pair_value == ten_card_value) and (self.split_10s_rule == 'Rank'):
+            resplit_probability /= 4 # only the same rank (such as K-K) is a pair
+
+        def get_played_split_hand_ev(hand_state):
+            if (pair_value == ace_card_value) or (bjl.hand_state_score(hand_state) == 21):
+                return stand_evs[hand_state] # split Aces and hands of 21 get no more cards
+            played_hand_ev = max(stand_evs[hand_state], hit_evs[hand_state])
+            if (self.double_after_split_rule == 'DAS') and doubling_allowed_on_score(self.doubling_rule, bjl.hand_state_score(hand_state)):
+                played_hand_ev = max(played_hand_ev, double_evs[hand_state])
+            return played_hand_ev
+
+        @functools.lru_cache(maxsize=None)
+        def get_pending_split_hands_ev(num_of_split_hands, num_of_pending_hands):
+            # Total EV of the pending hands when num_of_split_hands hands have been made at the seat so far
+            if num_of_pending_hands == 0:
+                return 0.0
+            pending_hands_ev = 0.0
+            for card_value in range(2, 12):
+                hand_state = bjl.hand_state_transitions[split_card_hand_state][card_value]
+                card_value_probability = self.card_value_probabilities[card_value]
+                played_ev = get_played_split_hand_ev(hand_state) + get_pending_split_hands_ev(num_of_split_hands, num_of_pending_hands-1)
+                if (card_value == pair_value) and (num_of_split_hands < max_split_hands):
+                    resplit_ev = max(get_pending_split_hands_ev(num_of_split_hands+1, num_of_pending_hands+1), played_ev)
+                    pending_hands_ev += resplit_probability*resplit_ev + (card_value_probability-resplit_probability)*played_ev
+                else:
+                    pending_hands_ev += card_value_probability*played_ev
+            return pending_hands_ev
+
+        return get_pending_split_hands_ev(2, 2)
+
+    def get_early_surrender_decision(self, action_evs, up_card_value, dealer_blackjack_probability):
+        # Early surrender comes before the peek, so playing on has to be weighed against losing the bet to Blackjack
+        if (self.surrender_rule == 'ES') or ((self.surrender_rule == 'ES10') and (up_card_value == ten_card_value)):
+            playing_ev = max(action_ev for action, action_ev in action_evs.items() if action != 'surrender')
+            return -0.5 > dealer_blackjack_probability*-1 + (1-dealer_blackjack_probability)*playing_ev
+        return False
+
+    # Lookups #
+    def get_ranked_actions(self, hand_state, num_of_cards, pair_value, up_card_value):
+        # pair_value is the high value of a two-card pair that may be split, or None
+        if num_of_cards != 2:
+            return self.multi_card_actions[hand_state][up_card_value]
+        if pair_value != None:
+            return self.pair_actions[pair_value][up_card_value]
+        return self.two_card_actions[hand_state][up_card_value]
+
+    def get_action(self, hand_state, num_of_cards, pair_value, up_card_value, allowed_actions):
+        for action in self.get_ranked_actions(hand_state, num_of_cards, pair_value, up_card_value):
+            if action in allowed_actions:
+                return action
+        return 'stand'
+
+    def should_surrender_early(self, hand_state, pair_value, up_card_value):
+        if pair_value != None:
+            return self.pair_early_surrenders[pair_value][up_card_value]
+        return self.two_card_early_surrenders[hand_state][up_card_value]
+
+    def get_chart_code(self, ranked_actions):
+        # Chart notation, such as 'Dh' for double (otherwise hit) or 'Rs' for surrender (otherwise stand)
+        chart_code = chart_action_codes[ranked_actions[0]]
+        if ranked_actions[0] in ['double', 'surrender', 'split']:
+            fallback_action = next(action for action in ranked_actions[1:] if action in ['stand', 'hit', 'split'])
+            if (ranked_actions[0] != 'split') or (fallback_action == 'surrender'):
+                chart_code += chart_action_codes[fallback_action].lower()
+            if (ranked_actions[0] == 'surrender') and (fallback_action == 'split'):
+                chart_code = 'Rp'
+        return chart_code
+
+    def get_chart(self):
+        # Rows of the printed charts - hard 5-17, soft 13-20 (A-2 to A-9) and pairs 2-2 to A-A - by up card 2 to A
+        chart = {'hard': {}, 'soft': {}, 'pairs': {}}
+        for hand_score in range(5, 18):
+            chart['hard'][hand_score] = [self.get_chart_code(self.two_card_actions[hand_score << 1][up_card_value])
+                                         for up_card_value in dealer_up_card_values]
+        for hand_score in range(13, 21):
+            chart['soft'][hand_score] = [self.get_chart_code(self.two_card_actions[(hand_score << 1) | 1][up_card_value])
+                                         for up_card_value in dealer_up_card_values]
+        for pair_value in range(2, 12):
+            chart['pairs'][pair_value] = [self.get_chart_code(self.pair_actions[pair_value][up_card_value])
+                                          for up_card_value in dealer_up_card_values]
+        return chart
+
+
+@functools.lru_cache(maxsize=None)
+def get_basic_strategy(num_of_decks, seventeen_rule='H17', doubling_rule='DA2', double_after_split_rule='DAS',
+                       splitting_rule='SP4', surrender_rule='LS', ace_resplit_rule='RSA', split_10s_rule='Rank'):
+    # Built once per rule set, every later call with the same rules returns the same tables
+    return BasicStrategy(num_of_decks, seventeen_rule, doubling_rule, double_after_split_rule,
+                         splitting_rule, surrender_rule, ace_resplit_rule, split_10s_rule)
+
+
+def get_table_basic_strategy(machine):
+    return get_basic_strategy(machine.num_of_decks, machine.seventeen_rule, machine.doubling_rule, machine.double_after_split_rule,
+                              machine.splitting_rule, machine.surrender_rule, machine.ace_resplit_rule, machine.split_10s_rule)
+
+
+def get_pair_value(hand, split_10s_rule='Rank'):
+    # High value of a two-card pair (by rank, or by value on 'Value' tables), otherwise None
+    if len(hand) != 2:
+        return None
+    first_card, second_card = bjo.encode_card(hand[0]), bjo.encode_card(hand[1])
+    if split_10s_rule == 'Value':
+        is_pair = bjo.card_high_value(first_card) == bjo.card_high_value(second_card)
+    else:
+        is_pair = bjo.card_rank_index(first_card) == bjo.card_rank_index(second_card)
+    return bjo.card_high_value(first_card) if is_pair else None
@@ -0,0 +1,112 @@
+"""
+File: card_counting.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import operator
+
+# Local Imports #
+from . import blackjack_game_objects as bjo
+
+
+### Counting Systems ###
+# Tags by card value (2-10, A - 11). Balanced systems add up to 0 over a deck, so the running count is turned into a
+# true count by dividing by the decks left to be dealt. KO is unbalanced (+4 per deck) - it starts from 4 - 4*decks
+# instead, so that its running count is used as is and reaches the same key count with any number of decks.
+counting_systems = {
+    'Hi-Lo': {
+        'tags': {2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 0, 8: 0, 9: 0, 10: -1, 11: -1},
+        'balanced': True
+    },
+    'KO': {
+        'tags': {2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 1, 8: 0, 9: 0, 10: -1, 11: -1},
+        'balanced': False
+    },
+    'Omega II': {
+        'tags': {2: 1, 3: 1, 4: 2, 5: 2, 6: 2, 7: 1, 8: 0, 9: -1, 10: -2, 11: 0},
+        'balanced': True
+    },
+    'Wong Halves': {
+        'tags': {2: 0.5, 3: 1, 4: 1, 5: 1.5, 6: 1, 7: 0.5, 8: 0, 9: -0.5, 10: -1, 11: -1},
+        'balanced': True
+    }
+}
+cards_per_deck = 52
+
+
+def get_initial_running_count(counting_system_name, num_of_decks):
+    if counting_systems[counting_system_name]['balanced']:
+        return 0
+    return 4 - 4*num_of_decks
+
+
+### Card Counter ###
+# Follows the counting systems it's given (every supported system by default) as cards leave the shoe - one tag lookup
+# per card, so counts are always current and never need the shoe rescanned. Cards dealt face down (the burn card, the
+# dealer's hole card) leave the shoe without being seen - they only count once they're revealed. A counter given no
+# counting systems only keeps track of the cards dealt, which is all a table nobody counts at has to pay for.
+class CardCounter:
+    def __init__(self, num_of_decks, counting_system_names=None):
+        if counting_system_names == None:
+            counting_system_names = list(counting_systems.keys())
+        for counting_system_name in counting_system_names:
+            if counting_system_name not in counting_systems:
+                raise ValueError(f"Counting system '{counting_system_name}' is not supported! Supported counting systems are {list(counting_systems.keys())}")
+        self.num_of_decks = num_of_decks
+        self.counting_system_names = list(counting_system_names)
+        self.counting_system_indices = {counting_system_name: counting_system_index
+                                        for counting_system_index, counting_system_name in enumerate(self.counting_system_names)}
+        # Card name or card code: tuple of its tag in every counting system followed
+        self.tags_by_card = {}
+        for card_name, card_code in bjo.card_codes.items():
+            card_tags = tuple(counting_systems[counting_system_name]['tags'][bjo.card_high_value(card_code)]
+                              for counting_system_name in self.counting_system_names)
+            self.tags_by_card[card_name] = card_tags
+            self.tags_by_card[card_code] = card_tags
+        self.reset()
+
+    def reset(self):
+        # New shoe - nothing has been dealt yet
+        self.running_counts = [get_initial_running_count(counting_system_name, self.num_of_decks)
+                               for counting_system_name in self.counting_system_names]
+        self.cards_dealt = 0 # seen or not
+        self.cards_seen = 0
+
+    def observe(self, card):
+        # A card dealt face up
+        self.cards_dealt += 1
+        self.cards_seen += 1
+        if self.counting_system_names:
+            self.running_counts = list(map(operator.add, self.running_counts, self.tags_by_card[card]))
+
+    def observe_face_down(self):
+        # A card dealt without being seen, such as the burn card
+        self.cards_dealt += 1
+
+    def reveal(self, card):
+        # A card dealt face down earlier being turned over
+        if self.counting_system_names:
+            self.running_counts = list(map(operator.add, self.running_counts, self.tags_by_card[card]))
+        self.cards_seen += 1
+
+    def get_running_count(self, counting_system_name='Hi-Lo'):
+        if counting_system_name not in self.counting_system_indices:
+            raise ValueError(f"Counting system '{counting_system_name}' isn't followed by this counter! Followed counting systems are {self.counting_system_names}")
+        return self.running_counts[self.counting_system_indices[counting_system_name]]
+
+    def get_decks_remaining(self):
+        # Decks left to be dealt, never less than half a deck so that a nearly dealt out shoe doesn't blow up the true count
+        return max(self.num_of_decks - self.cards_dealt/cards_per_deck, 0.5)
+
+    def get_true_count(self, counting_system_name='Hi-Lo'):
+        # Running count per deck remaining - unbalanced systems (KO) are played off the running count instead
+        running_count = self.get_running_count(counting_system_name)
+        if not counting_systems[counting_system_name]['balanced']:
+            return running_count
+        return running_count/self.get_decks_remaining()
+
+    def get_counts(self):
+        # counting_system_name: (running_count, true_count) for every counting system followed
+        return {counting_system_name: (self.get_running_count(counting_system_name), self.get_true_count(counting_system_name))
+                for counting_system_name in self.counting_system_names}
@@ -0,0 +1,241 @@
+"""
+File: chip_ledger.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import array
+try:
+    import numpy as np
+except ImportError:
+    np = None # the payout table and bounded change-making fall back to pure Python loops
+
+# Local Imports #
+from . import blackjack_game_objects as bjo
+
+
+### Integer Cents Ledger ###
+# Every chip value, bet and payout at the table is a multiple of $0.5, so money is kept as an integer number of cents.
+# Adding and subtracting ints is exact, so balances never need to be cleaned up after a $2.5 chip moves (37.5 - 2.5
+# is 3500, not 35.0), and long simulations can't drift. Dollars only appear at the edges - policies, limits and display.
+cents_per_dollar = 100
+chip_values_cents = [int(chip_value*cents_per_dollar) for chip_value in bjo.chip_values] # indexed like bjo.chip_names
+chip_cents = dict(zip(bjo.chip_names, chip_values_cents))
+pink_chip_index = bjo.chip_indices['Pink']
+pink_chip_cents = chip_values_cents[pink_chip_index]
+half_dollar_cents = 50 # every amount at the table is a multiple of this
+whole_dollar_chip_indices = [chip_index for chip_index in reversed(range(0, bjo.num_of_chip_colors)) if chip_index != pink_chip_index]
+
+
+def dollars_to_cents(amount):
+    # Exact for any amount in whole cents - raises ValueError for fractions of a cent
+    amount_cents = round(amount*cents_per_dollar)
+    if abs(amount*cents_per_dollar - amount_cents) > 1e-6:
+        raise ValueError(f"${amount} is not a whole number of cents")
+    return amount_cents
+
+
+def cents_to_dollars(amount_cents):
+    # Whole dollar amounts come back as ints, others as floats (such as 7.5) - for display and dollar-facing APIs
+    if amount_cents % cents_per_dollar == 0:
+        return amount_cents // cents_per_dollar
+    return amount_cents / cents_per_dollar
+
+
+def get_chip_counts_value_cents(chip_counts):
+    # chip_counts is a list/array indexed like bjo.chip_names
+    return sum(chip_count*chip_value_cents for chip_count, chip_value_cents in zip(chip_counts, chip_values_cents))
+
+
+### Change Making ###
+# Payouts are made with the fewest chips. Greedy is optimal for the whole-dollar chip values (the tests check it against
+# the bounded DP below), and a $x.5 amount always takes exactly one Pink chip on top - two Pinks are worth one Red, so
+# more are only ever used when the chips at hand are short. Whole-dollar breakdowns up to the largest side bet win are
+# precomputed, so paying an amount from a full rack is a single table lookup.
+max_payout_table_dollars = 100000 # largest side bet win - a $100 King's Bounty bet paying 1000:1
+payout_table = None # flat, num_of_chip_colors chip counts per whole-dollar amount - built on first use
+
+
+def get_greedy_whole_dollar_chip_counts(amount_dollars):
+    amount_chip_counts = [0]*bjo.num_of_chip_colors
+    for chip_index in whole_dollar_chip_indices:
+        amount_chip_counts[chip_index], amount_dollars = divmod(amount_dollars, chip_values_cents[chip_index]//cents_per_dollar)
+    return amount_chip_counts
+
+
+def build_payout_table(max_payout_dollars=max_payout_table_dollars):
+    if np != None:
+        table = np.zeros((max_payout_dollars+1, bjo.num_of_chip_colors), dtype=np.uint16)
+        remaining_dollars = np.arange(max_payout_dollars+1)
+        for chip_index in whole_dollar_chip_indices:
+            table[:, chip_index], remaining_dollars = np.divmod(remaining_dollars, chip_values_cents[chip_index]//cents_per_dollar)
+        return table.ravel()
+    table = array.array('H')
+    for amount_dollars in range(0, max_payout_dollars+1):
+        table.extend(get_greedy_whole_dollar_chip_counts(amount_dollars))
+    return table
+
+
+def get_unbounded_chip_counts(amount_cents):
+    # Fewest chips for amount_cents from an unlimited rack, or None if it isn't payable in chips (such as $1.5)
+    global payout_table
+    if (amount_cents < 0) or (amount_cents % half_dollar_cents != 0):
+        return None
+    num_of_pinks = 0
+    if amount_cents % cents_per_dollar != 0:
+        num_of_pinks = 1
+        amount_cents -= pink_chip_cents
+        if amount_cents < 0:
+            return None
+    amount_dollars = amount_cents // cents_per_dollar
+    if amount_dollars <= max_payout_table_dollars:
+        if payout_table is None:
+            payout_table = build_payout_table()
+        table_index = amount_dollars*bjo.num_of_chip_colors
+        amount_chip_counts = payout_table[table_index:table_index+bjo.num_of_chip_colors].tolist()
+    else:
+        amount_chip_counts = get_greedy_whole_dollar_chip_counts(amount_dollars)
+    amount_chip_counts[pink_chip_index] = num_of_pinks
+    return amount_chip_counts
+
+
+def get_bounded_chip_counts(amount_cents, available_chip_counts):
+    # Fewest chips for amount_cents using at most available_chip_counts of each color, or None if they can't cover it.
+    # Bounded change-making DP over half-dollar units - each color's stack is split into bundles of 1, 2, 4, ... chips
+    # that are taken or left like 0/1 knapsack items, so a run costs O(units * colors * log(chips per color)).
+    if (amount_cents < 0) or (amount_cents % half_dollar_cents != 0):
+        return None
+    num_of_units = amount_cents // half_dollar_cents
+    bundles = [] # (chip_index, num_of_chips, num_of_units)
+    for chip_index, chip_value_cents in enumerate(chip_values_cents):
+        chip_units = chip_value_cents // half_dollar_cents
+        num_of_chips_left = min(available_chip_counts[chip_index], num_of_units // chip_units)
+        bundle_size = 1
+        while num_of_chips_left > 0:
+            bundle_size = min(bundle_size, num_of_chips_left)
+            bundles.append((chip_index, bundle_size, bundle_size*chip_units))
+            num_of_chips_left -= bundle_size
+            bundle_size *= 2
+    unreachable = num_of_units + 1 # more chips than any combination can hold
+    bundles_taken = [] # bundles_taken[bundle][units] - whether the bundle improved the fewest chips for units
+    if np != None:
+        min_chips = np.full(num_of_units+1, unreachable, dtype=np.int64)
+        min_chips[0] = 0
+        for chip_index, bundle_size, bundle_units in bundles:
+            with_bundle = min_chips[:num_of_units+1-bundle_units] + bundle_size
+            bundle_taken = np.zeros(num_of_units+1, dtype=bool)
+            bundle_taken[bundle_units:] = with_bundle < min_chips[bundle_units:]
+            min_chips[bundle_units:] = np.minimum(min_chips[bundle_units:], with_bundle)
+            bundles_taken.append(bundle_taken)
+        fewest_chips = int(min_chips[num_of_units])
+    else:
+        min_chips = [0] + [unreachable]*num_of_units
+        for chip_index, bundle_size, bundle_units in bundles:
+            bundle_taken = [False]*(num_of_units+1)
+            for units in range(num_of_units, bundle_units-1, -1): # high to low, so each bundle is used at most once
+                with_bundle = min_chips[units-bundle_units] + bundle_size
+                if with_bundle < min_chips[units]:
+                    min_chips[units] = with_bundle
+                    bundle_taken[units] = True
+            bundles_taken.append(bundle_taken)
+        fewest_chips = min_chips[num_of_units]
+    if fewest_chips >= unreachable:
+        return None
+    # Walk the bundles back from the last one to recover which were taken
+    amount_chip_counts = [0]*bjo.num_of_chip_colors
+    units = num_of_units
+    for (chip_index, bundle_size, bundle_units), bundle_taken in zip(reversed(bundles), reversed(bundles_taken)):
+        if bundle_taken[units]:
+            amount_chip_counts[chip_index] += bundle_size
+            units -= bundle_units
+    return amount_chip_counts
+
+
+def get_chip_counts_for_cents(amount_cents, available_chip_counts=None):
+    # Fewest chips adding up to amount_cents, as a list of chip counts indexed like bjo.chip_names - or None if the
+    # amount can't be paid in chips, or available_chip_counts can't cover it exactly
+    amount_chip_counts = get_unbounded_chip_counts(amount_cents)
+    if (amount_chip_counts == None) or (available_chip_counts == None):
+        return amount_chip_counts
+    for chip_count, available_chip_count in zip(amount_chip_counts, available_chip_counts):
+        if chip_count > available_chip_count:
+            return get_bounded_chip_counts(amount_cents, available_chip_counts)
+    return amount_chip_counts
+
+
+### Chip Exchanges ###
+# Colors are exchanged between a player's chips and the dealer's chips at equal value, so neither chip pool balance
+# changes and an exchange only costs a pass over the chip colors. The dealer's chips plus the chips handed in are
+# always enough to give back the same chips, so coloring up never fails.
+def get_color_up_chip_counts(chip_counts, dealer_chip_counts):
+    # Fewest chips worth the same as chip_counts
+    available_chip_counts = [chip_count + dealer_chip_count for chip_count, dealer_chip_count in zip(chip_counts, dealer_chip_counts)]
+    return get_chip_counts_for_cents(get_chip_counts_value_cents(chip_counts), available_chip_counts)
+
+
+def get_break_down_chip_counts(chip_counts, chip_names, dealer_chip_counts):
+    # Fewest chips of only the colors in chip_names worth the same as chip_counts, or None if the dealer can't make it
+    available_chip_counts = [chip_count + dealer_chip_count if (chip_name in chip_names) else 0
+                             for chip_name, chip_count, dealer_chip_count in zip(bjo.chip_names, chip_counts, dealer_chip_counts)]
+    return get_chip_counts_for_cents(get_chip_counts_value_cents(chip_counts), available_chip_counts)
+
+
+def get_color_up_batch(chip_counts_batch, dealer_chip_counts):
+    # Color ups for many players at once (such as every seated player at round end). Everyone gets their full-rack
+    # breakdown when the dealer's chips plus all the chips handed in cover them together - otherwise players are
+    # colored up one at a time against what's left of the dealer's chips.
+    new_chip_counts_batch = [get_unbounded_chip_counts(get_chip_counts_value_cents(chip_counts)) for chip_counts in chip_counts_batch]
+    pooled_chip_counts = list(dealer_chip_counts)
+    needed_chip_counts = [0]*bjo.num_of_chip_colors
+    for chip_counts, new_chip_counts in zip(chip_counts_batch, new_chip_counts_batch):
+        for chip_index in range(0, bjo.num_of_chip_colors):
+            pooled_chip_counts[chip_index] += chip_counts[chip_index]
+            needed_chip_counts[chip_index] += new_chip_counts[chip_index]
+    if all(needed_chip_count <= pooled_chip_count for needed_chip_count, pooled_chip_count in zip(needed_chip_counts, pooled_chip_counts)):
+        return new_chip_counts_batch
+    remaining_dealer_chip_counts = list(dealer_chip_counts)
+    for player_index, chip_counts in enumerate(chip_counts_batch):
+        new_chip_counts = get_color_up_chip_counts(chip_counts, remaining_dealer_chip_counts)
+        for chip_index in range(0, bjo.num_of_chip_colors):
+            remaining_dealer_chip_counts[chip_index] += chip_counts[chip_index] - new_chip_counts[chip_index]
+        new_chip_counts_batch[player_index] = new_chip_counts
+    return new_chip_counts_batch
+
+
+def exchange_chips(chip_counts, dealer_chip_counts, exchanged_chip_counts, new_chip_counts):
+    # Hands exchanged_chip_counts over to the dealer in return for new_chip_counts of the same value, in place.
+    # chip_counts and dealer_chip_counts are chip count lists/arrays indexed like bjo.chip_names.
+    if get_chip_counts_value_cents(exchanged_chip_counts) != get_chip_counts_value_cents(new_chip_counts):
+        raise ValueError("Exchanged chips and new chips must be worth the same")
+    for chip_index in range(0, bjo.num_of_chip_colors):
+        if ((exchanged_chip_counts[chip_index] > chip_counts[chip_index])
+            or (new_chip_counts[chip_index] > dealer_chip_counts[chip_index] + exchanged_chip_counts[chip_index])):
+            raise ValueError(f"Not enough {bjo.chip_names[chip_index]} chips for the exchange")
+    for chip_index in range(0, bjo.num_of_chip_colors):
+        chip_count_change = new_chip_counts[chip_index] - exchanged_chip_counts[chip_index]
+        chip_counts[chip_index] += chip_count_change
+        dealer_chip_counts[chip_index] -= chip_count_change
+
+
+def exchange_chips_batch(chip_counts_batch, dealer_chip_counts, new_chip_counts_batch):
+    # Every player hands in all of their chips before any are given back (see get_color_up_batch), in place
+    for chip_counts, new_chip_counts in zip(chip_counts_batch, new_chip_counts_batch):
+        if get_chip_counts_value_cents(chip_counts) != get_chip_counts_value_cents(new_chip_counts):
+            raise ValueError("Exchanged chips and new chips must be worth the same")
+    for chip_index in range(0, bjo.num_of_chip_colors):
+        handed_in_chip_count = sum(chip_counts[chip_index] for chip_counts in chip_counts_batch)
+        given_back_chip_count = sum(new_chip_counts[chip_index] for new_chip_counts in new_chip_counts_batch)
+        if given_back_chip_count > dealer_chip_counts[chip_index] + handed_in_chip_count:
+            raise ValueError(f"Not enough {bjo.chip_names[chip_index]} chips for the exchange")
+    for chip_counts, new_chip_counts in zip(chip_counts_batch, new_chip_counts_batch):
+        for chip_index in range(0, bjo.num_of_chip_colors):
+            dealer_chip_counts[chip_index] += chip_counts[chip_index] - new_chip_counts[chip_index]
+            chip_counts[chip_index] = new_chip_counts[chip_index]
+
+
+def chip_counts_to_dict(chip_counts):
+    return dict(zip(bjo.chip_names, chip_counts))
+
+
+def chip_dict_to_counts(chips):
+    return [chips.get(chip_name, 0) for chip_name in bjo.chip_names]
@@ -0,0 +1,160 @@
+"""
+File: dealer_probabilities.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import json
+import os
+
+# Local Imports #
+from . import blackjack_game_logic as bjl
+from . import blackjack_game_objects as bjo
+
+
+### Dealer Outcome Probabilities ###
+# The dealer's play is fixed by the table rules, so the chance of each final dealer outcome given an up card is
+# found exactly by recursing over every hole card and hit card, tracking the remaining shoe as counts of each
+# card value (2-9, 10, A). Values are indexed 0-9 for high values 2-11 throughout this module.
+dealer_outcome_names = ['17', '18', '19', '20', '21', 'Bust', 'Blackjack']
+dealer_up_card_names = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'A'] # J, Q and K play exactly like a 10
+dealer_up_card_values = dict(zip(dealer_up_card_names, range(2, 12)))
+supported_num_of_decks = [1, 2, 4, 6, 8]
+supported_seventeen_rules = ['S17', 'H17']
+bust_outcome_index = dealer_outcome_names.index('Bust')
+blackjack_outcome_index = dealer_outcome_names.index('Blackjack')
+
+# Directory built tables are kept in between runs, one JSON file per rule set (None - kept in memory only). Callers
+# that want tables on disk pass their own cache_dir.
+default_cache_dir = None
+dealer_probability_tables = {} # rule set key --> table, for tables already built or loaded during this run
+
+
+def get_shoe_value_counts(num_of_decks, removed_cards=[]):
+    # Count of each card value left in a shoe of num_of_decks once removed_cards (names or codes) are taken out
+    value_counts = [4*num_of_decks]*10
+    value_counts[8] = 16*num_of_decks
+    for card in removed_cards:
+        value_index = bjo.card_high_value(bjo.encode_card(card)) - 2
+        if value_counts[value_index] == 0:
+            raise ValueError(f"More cards of value {value_index+2} removed than there are in {num_of_decks} deck(s)")
+        value_counts[value_index] -= 1
+    return tuple(value_counts)
+
+
+def get_dealer_outcome_probabilities_from_hand_state(hand_state, num_of_dealt_cards, value_counts, seventeen_rule, dealer_peeks, memo):
+    # Returns a tuple of probabilities lined up with dealer_outcome_names. num_of_dealt_cards only matters up to 2
+    # (when the hole card still has to come, and Blackjack), so it's capped to let deeper draws share the memo.
+    # memo is any mapping with get() and item assignment, keyed by every argument but itself
+    memo_key = (hand_state, num_of_dealt_cards, value_counts, seventeen_rule, dealer_peeks)
+    memoized_outcome_probabilities = memo.get(memo_key)
+    if memoized_outcome_probabilities != None:
+        return memoized_outcome_probabilities
+    hand_score = bjl.hand_state_score(hand_state)
+    outcome_probabilities = [0.0]*len(dealer_outcome_names)
+    if hand_score == -1:
+        outcome_probabilities[bust_outcome_index] = 1.0
+    elif (num_of_dealt_cards == 2) and (hand_score == 21):
+        outcome_probabilities[blackjack_outcome_index] = 1.0
+    elif (num_of_dealt_cards >= 2) and ((hand_score > 17) or
+                                        ((hand_score == 17) and not ((seventeen_rule == 'H17') and bjl.hand_state_is_soft(hand_state)))):
+        outcome_probabilities[hand_score-17] = 1.0
+    else:
+        # A peeking dealer has already shown not to have Blackjack, so the hole card can't be the one that completes it
+        excluded_value_index = None
+        if (num_of_dealt_cards == 1) and dealer_peeks:
+            if hand_score == 11:
+                excluded_value_index = 8 if bjl.hand_state_is_soft(hand_state) else 9
+            elif hand_score == 10:
+                excluded_value_index = 9
+        num_of_drawable_cards = sum(value_counts)
+        if excluded_value_index != None:
+            num_of_drawable_cards -= value_counts[excluded_value_index]
+        next_num_of_dealt_cards = min(num_of_dealt_cards+1, 3)
+        next_hand_states = bjl.hand_state_transitions[hand_state]
+        for value_index, value_count in enumerate(value_counts):
+            if (value_count == 0) or (value_index == excluded_value_index):
+                continue
+            next_value_counts = value_counts[:value_index] + (value_count-1,) + value_counts[value_index+1:]
+            next_outcome_probabilities = get_dealer_outcome_probabilities_from_hand_state(next_hand_states[value_index+2], next_num_of_dealt_cards,
+                                                                                          next_value_counts, seventeen_rule, dealer_peeks, memo)
+            draw_probability = value_count/num_of_drawable_cards
+            for outcome_index, outcome_probability in enumerate(next_outcome_probabilities):
+                outcome_probabilities[outcome_index] += outcome_probability*draw_probability
+    outcome_probabilities = tuple(outcome_probabilities)
+    memo[memo_key] = outcome_probabilities
+    return outcome_probabilities
+
+
+def get_dealer_outcome_probabilities(up_card_name, value_counts, seventeen_rule='H17', dealer_peeks=True, memo=None):
+    # Distribution of the dealer's final outcome for an up card, with value_counts describing the shoe behind it
+    # (the up card itself already taken out). With dealer_peeks, it's conditioned on the dealer not having Blackjack.
+    # Passing the same memo to related calls lets them share the subresults of their recursions.
+    if memo == None:
+        memo = {}
+    up_card_value = dealer_up_card_values[up_card_name]
+    up_card_hand_state = bjl.hand_state_transitions[bjl.empty_hand_state][up_card_value]
+    outcome_probabilities = get_dealer_outcome_probabilities_from_hand_state(up_card_hand_state, 1, tuple(value_counts),
+                                                                             seventeen_rule, dealer_peeks, memo)
+    return dict(zip(dealer_outcome_names, outcome_probabilities))
+
+
+def build_dealer_probability_table(num_of_decks, seventeen_rule='H17', dealer_peeks=True):
+    # {up card name: {outcome name: probability}} for a freshly shuffled shoe of num_of_decks
+    dealer_probability_table = {}
+    memo = {}
+    for up_card_name in dealer_up_card_names:
+        value_counts = list(get_shoe_value_counts(num_of_decks))
+        value_counts[dealer_up_card_values[up_card_name]-2] -= 1
+        dealer_probability_table[up_card_name] = get_dealer_outcome_probabilities(up_card_name, value_counts,
+                                                                                  seventeen_rule, dealer_peeks, memo)
+    return dealer_probability_table
+
+
+def get_rule_set_key(num_of_decks, seventeen_rule, dealer_peeks):
+    # Such as '6D_H17_peek', also used as the name of the table's cache file
+    return f"{num_of_decks}D_{seventeen_rule}_{'peek' if dealer_peeks else 'no_peek'}"
+
+
+def get_dealer_probability_table(num_of_decks, seventeen_rule='H17', dealer_peeks=True, cache_dir=default_cache_dir):
+    # Looks in memory first, then in cache_dir, and only builds (and saves) the table when neither has it
+    rule_set_key = get_rule_set_key(num_of_decks, seventeen_rule, dealer_peeks)
+    if rule_set_key in dealer_probability_tables:
+        return dealer_probability_tables[rule_set_key]
+    cache_file_path = None if (cache_dir == None) else os.path.join(cache_dir, rule_set_key+'.json')
+    dealer_probability_table = None
+    if (cache_file_path != None) and os.path.isfile(cache_file_path):
+        try:
+            with open(cache_file_path, 'r') as cache_file:
+                dealer_probability_table = json.load(cache_file)
+        except (OSError, ValueError):
+            dealer_probability_table = None # unreadable or corrupt cache file - rebuild it below
+        if (dealer_probability_table != None) and (list(dealer_probability_table.keys()) != dealer_up_card_names):
+            dealer_probability_table = None
+    if dealer_probability_table == None:
+        dealer_probability_table = build_dealer_probability_table(num_of_decks, seventeen_rule, dealer_peeks)
+        if cache_file_path != None:
+            save_dealer_probability_table(dealer_probability_table, cache_file_path)
+    dealer_probability_tables[rule_set_key] = dealer_probability_table
+    return dealer_probability_table
+
+
+def save_dealer_probability_table(dealer_probability_table, cache_file_path):
+    # Written to a temporary file first so an interrupted run never leaves a half-written cache file behind
+    os.makedirs(os.path.dirname(cache_file_path), exist_ok=True)
+    temp_file_path = cache_file_path+'.tmp'
+    with open(temp_file_path, 'w') as temp_file:
+        json.dump(dealer_probability_table, temp_file, indent=1)
+    os.replace(temp_file_path, cache_file_path)
+
+
+def build_all_dealer_probability_tables(cache_dir=default_cache_dir):
+    # Every supported deck count under both seventeen rules, with and without a dealer peek
+    all_dealer_probability_tables = {}
+    for num_of_decks in supported_num_of_decks:
+        for seventeen_rule in supported_seventeen_rules:
+            for dealer_peeks in [True, False]:
+                rule_set_key = get_rule_set_key(num_of_decks, seventeen_rule, dealer_peeks)
+                all_dealer_probability_tables[rule_set_key] = get_dealer_probability_table(num_of_decks, seventeen_rule,
+                                                                                           dealer_peeks, cache_dir)
+    return all_dealer_probability_tables
@@ -0,0 +1,139 @@
+"""
+File: dealer_rack.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import collections
+
+# Local Imports #
+from . import blackjack_game_objects as bjo
+from . import chip_ledger as bjcl
+
+
+### Dealer Chip Rack Inventory ###
+# The pit keeps every color in a table's rack between a fill level and a credit level - a color running below its fill
+# level is filled back up to par with chips from the cage, and a color piling up above its credit level has everything
+# over par credited back to the cage. Rack levels are folded into running per-color statistics after every payout and
+# collection, so millions of rounds take constant memory - only the latest fill/credit events are kept for inspection.
+default_par_chip_count = 1000 # chips of each color the casino dealer is seeded with (see create_casino_dealer)
+default_fill_fraction = 0.25 # fill a color once it drops below a quarter of par
+default_credit_fraction = 2 # credit a color once it piles up past twice its par
+max_logged_rack_events = 1000
+
+RackEvent = collections.namedtuple('RackEvent', ['round_number', 'event_type', 'chip_name', 'chip_count'])
+
+
+class DealerRack:
+    def __init__(self, par_chip_counts=None, fill_levels=None, credit_levels=None, max_logged_events=max_logged_rack_events):
+        if par_chip_counts == None:
+            par_chip_counts = [default_par_chip_count]*bjo.num_of_chip_colors
+        self.par_chip_counts = list(par_chip_counts)
+        if fill_levels == None:
+            fill_levels = [int(par_chip_count*default_fill_fraction) for par_chip_count in self.par_chip_counts]
+        self.fill_levels = list(fill_levels) # a color is filled once it drops below its fill level
+        if credit_levels == None:
+            credit_levels = [int(par_chip_count*default_credit_fraction) for par_chip_count in self.par_chip_counts]
+        self.credit_levels = list(credit_levels) # a color is credited once it goes above its credit level
+        self.events = collections.deque(maxlen=max_logged_events) # latest RackEvents
+        self.reset_stats()
+
+    def reset_stats(self):
+        num_of_chip_colors = bjo.num_of_chip_colors
+        self.num_of_records = 0
+        self.total_fills = 0
+        self.total_credits = 0
+        # Levels summed over every record for mean levels - a color's level is only added up when it changes, with
+        # the level it held since the record it last changed at
+        self.level_totals = [0]*num_of_chip_colors
+        self.last_levels = list(self.par_chip_counts)
+        self.last_changed_records = [0]*num_of_chip_colors
+        self.min_levels = list(self.par_chip_counts)
+        self.max_levels = list(self.par_chip_counts)
+        self.num_of_fills = [0]*num_of_chip_colors
+        self.num_of_credits = [0]*num_of_chip_colors
+        self.filled_chip_counts = [0]*num_of_chip_colors
+        self.credited_chip_counts = [0]*num_of_chip_colors
+        # Chips each color has gained from play since the rack started, as if it had never been filled or credited -
+        # the lowest and highest it got to are how deep a rack would have to be to never need a fill or a credit
+        self.min_net_chip_flows = [0]*num_of_chip_colors
+        self.max_net_chip_flows = [0]*num_of_chip_colors
+
+    def fill(self, chip_counts, chip_index, chip_count, round_number=None):
+        chip_counts[chip_index] += chip_count
+        self.total_fills += 1
+        self.num_of_fills[chip_index] += 1
+        self.filled_chip_counts[chip_index] += chip_count
+        self.events.append(RackEvent(round_number, 'fill', bjo.chip_names[chip_index], chip_count))
+        return chip_count*bjcl.chip_values_cents[chip_index]
+
+    def credit(self, chip_counts, chip_index, chip_count, round_number=None):
+        chip_counts[chip_index] -= chip_count
+        self.total_credits += 1
+        self.num_of_credits[chip_index] += 1
+        self.credited_chip_counts[chip_index] += chip_count
+        self.events.append(RackEvent(round_number, 'credit', bjo.chip_names[chip_index], chip_count))
+        return chip_count*bjcl.chip_values_cents[chip_index]
+
+    def fill_to_cover(self, chip_counts, needed_chip_counts, round_number=None):
+        # Fills every color that can't cover needed_chip_counts (such as a large payout) back up to par on top of what's
+        # needed, in place - returns the cents brought to the table
+        filled_cents = 0
+        for chip_index, needed_chip_count in enumerate(needed_chip_counts):
+            if chip_counts[chip_index] < needed_chip_count:
+                filled_cents += self.fill(chip_counts, chip_index, needed_chip_count - chip_counts[chip_index] + self.par_chip_counts[chip_index], round_number)
+        return filled_cents
+
+    def record(self, chip_counts, changed_chip_counts=None, round_number=None):
+        # Records the rack's levels after a payout or collection of changed_chip_counts (None - any color may have
+        # changed), then fills and credits colors past their levels in place - returns the net cents brought to the
+        # table (fills minus credits). Only changed colors are looked at, which keeps a record cheap.
+        self.num_of_records += 1
+        rack_change_cents = 0
+        for chip_index in range(0, bjo.num_of_chip_colors):
+            if (changed_chip_counts != None) and (changed_chip_counts[chip_index] == 0):
+                continue
+            chip_count = chip_counts[chip_index]
+            self.level_totals[chip_index] += (self.last_levels[chip_index]*(self.num_of_records - 1 - self.last_changed_records[chip_index])
+                                              + chip_count)
+            self.last_changed_records[chip_index] = self.num_of_records
+            if chip_count < self.min_levels[chip_index]:
+                self.min_levels[chip_index] = chip_count
+            elif chip_count > self.max_levels[chip_index]:
+                self.max_levels[chip_index] = chip_count
+            net_chip_flow = (chip_count - self.par_chip_counts[chip_index] - self.filled_chip_counts[chip_index]
+                             + self.credited_chip_counts[chip_index])
+            if net_chip_flow < self.min_net_chip_flows[chip_index]:
+                self.min_net_chip_flows[chip_index] = net_chip_flow
+            elif net_chip_flow > self.max_net_chip_flows[chip_index]:
+                self.max_net_chip_flows[chip_index] = net_chip_flow
+            if chip_count < self.fill_levels[chip_index]:
+                rack_change_cents += self.fill(chip_counts, chip_index, self.par_chip_counts[chip_index] - chip_count, round_number)
+            elif chip_count > self.credit_levels[chip_index]:
+                rack_change_cents -= self.credit(chip_counts, chip_index, chip_count - self.par_chip_counts[chip_index], round_number)
+            self.last_levels[chip_index] = chip_counts[chip_index]
+        return rack_change_cents
+
+    def get_mean_level(self, chip_index):
+        if self.num_of_records == 0:
+            return self.last_levels[chip_index]
+        level_total = self.level_totals[chip_index] + self.last_levels[chip_index]*(self.num_of_records - self.last_changed_records[chip_index])
+        return level_total/self.num_of_records
+
+    def get_report(self):
+        # chip_name: rack statistics, for sizing the rack of a table
+        report = {}
+        for chip_index, chip_name in enumerate(bjo.chip_names):
+            report[chip_name] = {
+                'par': self.par_chip_counts[chip_index],
+                'mean_level': self.get_mean_level(chip_index),
+                'min_level': self.min_levels[chip_index],
+                'max_level': self.max_levels[chip_index],
+                'fills': self.num_of_fills[chip_index],
+                'credits': self.num_of_credits[chip_index],
+                'chips_filled': self.filled_chip_counts[chip_index],
+                'chips_credited': self.credited_chip_counts[chip_index],
+                'chips_to_never_fill': -self.min_net_chip_flows[chip_index], # par that would have covered every payout
+                'chips_to_never_credit': self.max_net_chip_flows[chip_index] # room above par that would have held every collection
+            }
+        return report
@@ -0,0 +1,493 @@
+"""
+File: ev_solver.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import collections
+import functools
+try:
+    import numpy as np # only needed for the fast dealer outcome path
+except ImportError:
+    np = None
+
+# Local Imports #
+from . import blackjack_game_logic as bjl
+from . import blackjack_game_objects as bjo
+from . import blackjack_strategy as bjstrat
+from . import dealer_probabilities as bjdp
+
+
+### Bounded Memo ###
+default_cache_size = 500000 # memo entries kept by a solver, about 100MB at most
+
+class LRUCache:
+    # Mapping that keeps at most max_size entries, evicting the least recently used one first
+    def __init__(self, max_size=default_cache_size):
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        value = self.entries.get(key)
+        if value == None:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+### Composition-Dependent Expected Values ###
+# Unlike basic strategy (see blackjack_strategy), which assumes a full shoe, the solver scores a hand against the
+# exact cards left to play - a tuple of how many cards of each value (2-9, 10, A) remain unseen. Every card the
+# player or dealer draws is taken out of that tuple, so the dealer's outcomes after each player draw are recomputed
+# exactly. With numpy, each decision is solved over all the sets of cards the hand could draw at once (see Removal
+# Lattice) and its EVs go to a bounded memo; without it, the recursion keeps both players' and dealer's subproblems in
+# that memo, so later decisions from the same shoe reuse whatever subresults they share with earlier ones.
+def get_value_counts(cards):
+    # Value count tuple of any cards (names or codes), such as the undealt part of a shoe
+    value_counts = [0]*10
+    for card in cards:
+        value_counts[bjo.card_high_value(bjo.encode_card(card)) - 2] += 1
+    return tuple(value_counts)
+
+
+def remove_card_value(value_counts, card_value):
+    value_index = card_value - 2
+    if value_counts[value_index] == 0:
+        raise ValueError(f"No cards of value {card_value} left to remove from {value_counts}")
+    return value_counts[:value_index] + (value_counts[value_index]-1,) + value_counts[value_index+1:]
+
+
+def get_unseen_value_counts(machine):
+    # Cards a player at the table hasn't seen - the undealt part of the shoe plus the dealer's hole card
+    unseen_cards = list(machine.shoe)
+    dealer_hand = machine.get_dealer_hand()
+    if len(dealer_hand) == 2:
+        unseen_cards.append(dealer_hand[1])
+    return get_value_counts(unseen_cards)
+
+
+def get_dealer_draw_multisets(up_card_value, seventeen_rule, dealer_peeks):
+    # Drawing without replacement, every order of the same cards is equally likely, so the dealer's play after an
+    # up card boils down to the multisets of card values the dealer can draw. Returns (value_multiplicities - one row
+    # of per-value counts per multiset, num_of_draws per multiset, outcome_orderings - how many orders of each multiset
+    # end in each dealer outcome). With dealer_peeks, orders starting with a Blackjack-making hole card are left out.
+    finished_multisets = {}
+    up_card_hand_state = bjl.hand_state_transitions[bjl.empty_hand_state][up_card_value]
+    dealer_nodes = {(up_card_hand_state, 1, (0,)*10): 1} # (hand_state, capped num_of_dealt_cards, drawn values) --> orderings
+    while len(dealer_nodes) != 0:
+        next_dealer_nodes = collections.defaultdict(int)
+        for (hand_state, num_of_dealt_cards, drawn_value_counts), num_of_orderings in dealer_nodes.items():
+            hand_score = bjl.hand_state_score(hand_state)
+            outcome_index = None
+            if hand_score == -1:
+                outcome_index = bjdp.bust_outcome_index
+            elif (num_of_dealt_cards == 2) and (hand_score == 21):
+                outcome_index = bjdp.blackjack_outcome_index
+            elif (num_of_dealt_cards >= 2) and ((hand_score > 17) or
+                                                ((hand_score == 17) and not ((seventeen_rule == 'H17') and bjl.hand_state_is_soft(hand_state)))):
+                outcome_index = hand_score-17
+            if outcome_index != None:
+                finished_multisets.setdefault(drawn_value_counts, [0]*len(bjdp.dealer_outcome_names))[outcome_index] += num_of_orderings
+                continue
+            for card_value in range(2, 12):
+                if (num_of_dealt_cards == 1) and dealer_peeks and (hand_score + card_value == 21):
+                    continue
+                next_drawn_value_counts = drawn_value_counts[:card_value-2] + (drawn_value_counts[card_value-2]+1,) + drawn_value_counts[card_value-1:]
+                next_dealer_nodes[(bjl.hand_state_transitions[hand_state][card_value], min(num_of_dealt_cards+1, 3),
+                                   next_drawn_value_counts)] += num_of_orderings
+        dealer_nodes = next_dealer_nodes
+    return list(finished_multisets.keys()), list(finished_multisets.values())
+
+
+### Dealer Outcome Contraction ###
+# Card values in the order their falling factorials are summed out - 10s, 9s down to 2s, then Aces. Out of the orders
+# tried, this one leaves the fewest partial sums to work out over the hands a player can draw.
+dealer_contraction_value_order = [8, 7, 6, 5, 4, 3, 2, 1, 0, 9]
+
+@functools.lru_cache(maxsize=None)
+def get_dealer_draw_multiset_contraction(up_card_value, seventeen_rule, dealer_peeks):
+    # Every multiset ends in exactly one dealer outcome, so each one is keyed (outcome, num_of_draws, multiplicities
+    # in reverse contraction order) and the keys are sorted. Taking one card value's multiplicity off the end of every
+    # key, multisets that are left with the same key sit next to each other - each step lists the multiplicities it
+    # takes off and where each group of equal keys starts. Returns (orderings - one per sorted multiset, steps,
+    # outcome indices and num_of_draws of the groups left after the last step).
+    drawn_value_counts, outcome_orderings = get_dealer_draw_multisets(up_card_value, seventeen_rule, dealer_peeks)
+    drawn_value_counts = np.array(drawn_value_counts, dtype=np.intp)
+    outcome_orderings = np.array(outcome_orderings, dtype=np.float64)
+    multiset_keys = np.concatenate([outcome_orderings.argmax(axis=1)[:, None], drawn_value_counts.sum(axis=1)[:, None],
+                                    drawn_value_counts[:, dealer_contraction_value_order[::-1]]], axis=1)
+    key_order = np.lexsort(multiset_keys.T[::-1])
+    multiset_keys = multiset_keys[key_order]
+    contraction_steps = []
+    for value_index in dealer_contraction_value_order:
+        multiplicities = multiset_keys[:, -1]
+        multiset_keys = multiset_keys[:, :-1]
+        group_starts = np.flatnonzero(np.concatenate([[True], (multiset_keys[1:] != multiset_keys[:-1]).any(axis=1)]))
+        contraction_steps.append((value_index, multiplicities, group_starts))
+        multiset_keys = multiset_keys[group_starts]
+    return outcome_orderings.max(axis=1)[key_order], contraction_steps, multiset_keys[:, 0], multiset_keys[:, 1]
+
+
+def get_dealer_outcome_probability_array(up_card_value, value_counts, removed_value_counts, seventeen_rule, dealer_peeks):
+    # Dealer outcome probabilities (one row per row of removed_value_counts) once those cards are out of value_counts.
+    # A multiset's probability is a product of one falling factorial per card value over the falling factorial of the
+    # shoe size, so the sum over multisets is taken one card value at a time. After each step, removals that agree on
+    # the card values summed out so far share one partial sum for every group of multisets that draw the same of the
+    # card values still left - far fewer products than one per multiset and removal.
+    orderings, contraction_steps, outcome_indices, num_of_draws = get_dealer_draw_multiset_contraction(
+        up_card_value, seventeen_rule, dealer_peeks)
+    value_counts = np.array(value_counts, dtype=np.float64)
+    removed_value_counts = np.array(removed_value_counts, dtype=np.intp).reshape(-1, 10)
+    partial_sums = orderings[None, :]
+    removal_keys = np.zeros(1, dtype=np.intp)
+    removal_ids = np.zeros(len(removed_value_counts), dtype=np.intp)
+    for value_index, multiplicities, group_starts in contraction_steps:
+        # Removals are told apart by what they took of the card values summed out so far, and sorted by what they
+        # took of this one, so that each count removed is one run of rows
+        num_of_removal_ids = len(removal_keys)
+        removal_keys, removal_ids = np.unique(removed_value_counts[:, value_index]*num_of_removal_ids + removal_ids,
+                                              return_inverse=True)
+        removed_counts = removal_keys // num_of_removal_ids
+        run_starts = np.searchsorted(removed_counts, np.arange(0, removed_counts[-1]+2))
+        falling_factorials = np.ones((removed_counts[-1]+1, multiplicities.max()+1)) # [num_of_removed_cards, multiplicity]
+        falling_factorials[:, 1:] = np.cumprod(np.maximum(value_counts[value_index] - np.arange(0, removed_counts[-1]+1)[:, None]
+                                                          - np.arange(0, multiplicities.max()), 0), axis=1)
+        partial_sums = np.take(partial_sums, removal_keys % num_of_removal_ids, axis=0)
+        for removed_count in range(0, removed_counts[-1]+1):
+            partial_sums[run_starts[removed_count]:run_starts[removed_count+1]] *= falling_factorials[removed_count, multiplicities]
+        partial_sums = np.add.reduceat(partial_sums, group_starts, axis=1)
+    num_of_remaining_cards = np.zeros(len(removal_keys))
+    num_of_remaining_cards[removal_ids] = value_counts.sum() - removed_value_counts.sum(axis=1)
+    shoe_falling_factorials = np.ones((len(removal_keys), num_of_draws.max()+1))
+    shoe_falling_factorials[:, 1:] = np.cumprod(np.maximum(num_of_remaining_cards[:, None] - np.arange(0, num_of_draws.max()), 1), axis=1)
+    outcome_starts = np.flatnonzero(np.concatenate([[True], outcome_indices[1:] != outcome_indices[:-1]]))
+    outcome_probabilities = np.zeros((len(removal_keys), len(bjdp.dealer_outcome_names)))
+    outcome_probabilities[:, outcome_indices[outcome_starts]] = np.add.reduceat(partial_sums / shoe_falling_factorials[:, num_of_draws],
+                                                                                outcome_starts, axis=1)
+    outcome_probabilities = outcome_probabilities[removal_ids]
+    if dealer_peeks and (up_card_value in [10, 11]):
+        # Condition on the hole card not making Blackjack (those orders were left out of the orderings)
+        blackjack_value_index = 11-2 if (up_card_value == 10) else 10-2
+        remaining_value_counts = value_counts - removed_value_counts
+        outcome_probabilities /= (1 - remaining_value_counts[:, blackjack_value_index]/remaining_value_counts.sum(axis=1))[:, None]
+    return outcome_probabilities
+
+
+def get_dealer_outcome_probabilities_from_multisets(up_card_value, value_counts_batch, seventeen_rule, dealer_peeks):
+    # Returns one tuple of outcome probabilities per composition in value_counts_batch, each composition taken as the
+    # cards it lacks from the largest counts in the batch
+    value_counts_batch = np.array(value_counts_batch, dtype=np.intp).reshape(-1, 10)
+    value_counts = value_counts_batch.max(axis=0)
+    outcome_probabilities = get_dealer_outcome_probability_array(up_card_value, value_counts, value_counts - value_counts_batch,
+                                                                 seventeen_rule, dealer_peeks)
+    return [tuple(composition_outcome_probabilities) for composition_outcome_probabilities in outcome_probabilities.tolist()]
+
+
+def hit_beats_standing(hand_state):
+    # Standing on 16 or less only wins when the dealer busts, and a random card taken out of the shoe leaves the
+    # dealer's bust chance the same on average - so when the next card can't bust the hand (hard 11 or less, soft
+    # 16 or less), hitting and then standing is never worse, and the stand EV doesn't need to be worked out
+    hand_score = bjl.hand_state_score(hand_state)
+    return (hand_score <= 11) or (bjl.hand_state_is_soft(hand_state) and (hand_score <= 16))
+
+
+### Removal Lattice ###
+# With numpy, a whole decision is worked out at once over every set of cards the hand can still draw. The hand's
+# score and the cards left only depend on which cards were drawn, not in what order, so each set of drawn cards is
+# one node - kept as a removal key with removal_key_bits per card value (no hand draws more than 21 cards of a value).
+# Nodes of the hand and of a split hand that remove the same cards share one row of dealer outcomes.
+removal_key_bits = 5
+low_card_values = [2, 3, 4, 5, 6, 7, 8, 9, 10, 1] # what a card of each value index adds to a hand's low total
+
+def get_hand_scores(low_totals, has_aces):
+    # (hand scores, soft flags) from low totals (Aces as 1) - an Ace counts 11 if that doesn't bust the hand
+    is_soft = has_aces & (low_totals + 10 <= 21)
+    return np.where(is_soft, low_totals + 10, np.where(low_totals > 21, -1, low_totals)), is_soft
+
+
+def hits_beat_standing(hand_scores, is_soft):
+    # hit_beats_standing() for arrays of hands
+    return (hand_scores <= 11) | (is_soft & (hand_scores <= 16))
+
+
+def get_removal_lattice(value_counts, low_total, has_ace, max_num_of_draws=None, draws_first_card=False):
+    # Every set of cards a hand can draw while hitting scores under 21 (busted hands left out), level by level (by
+    # number of cards drawn). Returns (removed_value_counts, removal keys, hand scores, soft flags, level_starts).
+    # draws_first_card - the first card is drawn whatever the hand's score (to double on it)
+    card_low_values = np.array(low_card_values)
+    card_removal_keys = np.int64(1) << (removal_key_bits*np.arange(0, 10, dtype=np.int64))
+    removed_value_counts = np.zeros((1, 10), dtype=np.intp)
+    removal_keys = np.zeros(1, dtype=np.int64)
+    removal_levels = []
+    while (len(removal_keys) != 0) and ((max_num_of_draws == None) or (len(removal_levels) <= max_num_of_draws)):
+        low_totals = low_total + removed_value_counts @ card_low_values
+        hand_scores, is_soft = get_hand_scores(low_totals, has_ace | (removed_value_counts[:, 9] > 0))
+        if (len(removal_levels) == 1) and (removal_levels[0][2][0] == 21):
+            # A 21 is only drawn on to double, and stays 21 as in bjl's hand state transitions
+            hand_scores, is_soft = np.full(len(removal_keys), 21), np.full(len(removal_keys), removal_levels[0][3][0])
+        removal_levels.append((removed_value_counts, removal_keys, hand_scores, is_soft))
+        can_draw = (hand_scores != -1) & (hand_scores < 21)
+        if draws_first_card and (len(removal_levels) == 1):
+            can_draw[:] = True
+        parent_indices, value_indices = np.nonzero(can_draw[:, None] & (removed_value_counts < value_counts))
+        not_busted = (low_totals[parent_indices] + card_low_values[value_indices] <= 21) | (hand_scores[parent_indices] == 21)
+        parent_indices, value_indices = parent_indices[not_busted], value_indices[not_busted]
+        removal_keys, first_indices = np.unique(removal_keys[parent_indices] + card_removal_keys[value_indices], return_index=True)
+        removed_value_counts = removed_value_counts[parent_indices[first_indices]].copy()
+        removed_value_counts[np.arange(0, len(first_indices)), value_indices[first_indices]] += 1
+    level_starts = np.cumsum([0] + [len(removal_level[1]) for removal_level in removal_levels]).tolist()
+    return tuple(np.concatenate(level_arrays) for level_arrays in zip(*removal_levels)) + (level_starts,)
+
+
+def get_next_card_lookups(removal_lattice, value_counts):
+    # (next_indices, draw_probabilities) - for every node and card value, the node that card leads to (one past the
+    # last node where it busts the hand or the hand doesn't draw) and the chance of drawing it
+    removed_value_counts, removal_keys = removal_lattice[:2]
+    card_removal_keys = np.int64(1) << (removal_key_bits*np.arange(0, 10, dtype=np.int64))
+    key_order = np.argsort(removal_keys)
+    next_keys = removal_keys[:, None] + card_removal_keys
+    next_positions = key_order[np.minimum(np.searchsorted(removal_keys[key_order], next_keys), len(removal_keys)-1)]
+    next_indices = np.where(removal_keys[next_positions] == next_keys, next_positions, len(removal_keys))
+    remaining_value_counts = value_counts - removed_value_counts
+    return next_indices, remaining_value_counts/remaining_value_counts.sum(axis=1)[:, None]
+
+
+def get_lattice_evs(removal_lattice, next_card_lookups, stand_evs):
+    # (hit_evs, double_evs, played_evs) for every node of a removal lattice, worked out from the deepest level up. A
+    # node's played EV is what the hand is worth once a hit leads to it, as in get_hit_ev
+    hand_scores, is_soft, level_starts = removal_lattice[2:]
+    next_indices, draw_probabilities = next_card_lookups
+    hit_evs, double_evs = np.zeros(len(hand_scores)), np.zeros(len(hand_scores))
+    played_evs = np.full(len(hand_scores)+1, -1.0) # the extra node is where busted hands lead
+    stand_evs = np.append(stand_evs, -1.0)
+    can_only_hit = hits_beat_standing(hand_scores, is_soft)
+    for level_start, level_end in reversed(list(zip(level_starts[:-1], level_starts[1:]))):
+        level_next_indices, level_draw_probabilities = next_indices[level_start:level_end], draw_probabilities[level_start:level_end]
+        level_hit_evs = (level_draw_probabilities*played_evs[level_next_indices]).sum(axis=1)
+        double_evs[level_start:level_end] = 2*(level_draw_probabilities*stand_evs[level_next_indices]).sum(axis=1)
+        level_stand_evs = stand_evs[level_start:level_end]
+        played_evs[level_start:level_end] = np.where(can_only_hit[level_start:level_end], level_hit_evs,
+                                                     np.where(hand_scores[level_start:level_end] == 21, level_stand_evs,
+                                                              np.maximum(level_stand_evs, level_hit_evs)))
+        hit_evs[level_start:level_end] = level_hit_evs
+    return hit_evs, double_evs, played_evs[:-1]
+
+
+def get_stand_evs(hand_scores, dealer_outcome_probabilities):
+    # get_stand_ev() for arrays of hands, one row of dealer outcome probabilities each
+    stand_evs = dealer_outcome_probabilities[:, bjdp.bust_outcome_index] - dealer_outcome_probabilities[:, bjdp.blackjack_outcome_index]
+    for dealer_score in range(17, 22):
+        stand_evs += np.sign(hand_scores - dealer_score)*dealer_outcome_probabilities[:, dealer_score-17]
+    return stand_evs
+
+
+class CompositionDependentSolver:
+    def __init__(self, seventeen_rule='H17', doubling_rule='DA2', double_after_split_rule='DAS', surrender_rule='LS',
+                 dealer_peeks=True, cache_size=default_cache_size):
+        self.seventeen_rule = seventeen_rule
+        self.doubling_rule = doubling_rule
+        self.double_after_split_rule = double_after_split_rule
+        self.surrender_rule = surrender_rule
+        self.dealer_peeks = dealer_peeks
+        self.memo = LRUCache(cache_size)
+
+    @classmethod
+    def create_table_solver(cls, machine, cache_size=default_cache_size):
+        return cls(machine.seventeen_rule, machine.doubling_rule, machine.double_after_split_rule, machine.surrender_rule,
+                   True, cache_size)
+
+    def get_dealer_outcome_probabilities(self, up_card_value, value_counts):
+        if np == None:
+            # Same exact result through the dealer recursion, only slower
+            up_card_hand_state = bjl.hand_state_transitions[bjl.empty_hand_state][up_card_value]
+            return bjdp.get_dealer_outcome_probabilities_from_hand_state(up_card_hand_state, 1, value_counts, self.seventeen_rule,
+                                                                         self.dealer_peeks, self.memo)
+        memo_key = ('dealer', up_card_value, value_counts)
+        dealer_outcome_probabilities = self.memo.get(memo_key)
+        if dealer_outcome_probabilities == None:
+            dealer_outcome_probabilities = get_dealer_outcome_probabilities_from_multisets(up_card_value, [value_counts],
+                                                                                           self.seventeen_rule, self.dealer_peeks)[0]
+            self.memo[memo_key] = dealer_outcome_probabilities
+        return dealer_outcome_probabilities
+
+    def get_stand_ev(self, hand_state, up_card_value, value_counts):
+        hand_score = bjl.hand_state_score(hand_state)
+        if hand_score == -1:
+            return -1.0
+        dealer_outcome_probabilities = self.get_dealer_outcome_probabilities(up_card_value, value_counts)
+        stand_ev = dealer_outcome_probabilities[bjdp.bust_outcome_index] - dealer_outcome_probabilities[bjdp.blackjack_outcome_index]
+        for dealer_score in range(17, 22):
+            if hand_score > dealer_score:
+                stand_ev += dealer_outcome_probabilities[dealer_score-17]
+            elif hand_score < dealer_score:
+                stand_ev -= dealer_outcome_probabilities[dealer_score-17]
+        return stand_ev
+
+    def get_hit_ev(self, hand_state, up_card_value, value_counts):
+        # EV of hitting once and then playing on optimally (hit or stand) with the cards that are left
+        memo_key = ('hit', hand_state, up_card_value, value_counts)
+        hit_ev = self.memo.get(memo_key)
+        if hit_ev != None:
+            return hit_ev
+        hit_ev = 0.0
+        num_of_remaining_cards = sum(value_counts)
+        for value_index, value_count in enumerate(value_counts):
+            if value_count == 0:
+                continue
+            next_hand_state = bjl.hand_state_transitions[hand_state][value_index+2]
+            next_hand_score = bjl.hand_state_score(next_hand_state)
+            if next_hand_score == -1:
+                next_hand_ev = -1.0
+            else:
+                next_value_counts = remove_card_value(value_counts, value_index+2)
+                if hit_beats_standing(next_hand_state):
+                    next_hand_ev = self.get_hit_ev(next_hand_state, up_card_value, next_value_counts)
+                else:
+                    next_hand_ev = self.get_stand_ev(next_hand_state, up_card_value, next_value_counts)
+                    if next_hand_score < 21:
+                        next_hand_ev = max(next_hand_ev, self.get_hit_ev(next_hand_state, up_card_value, next_value_counts))
+            hit_ev += next_hand_ev*value_count/num_of_remaining_cards
+        self.memo[memo_key] = hit_ev
+        return hit_ev
+
+    def get_double_ev(self, hand_state, up_card_value, value_counts):
+        double_ev = 0.0
+        num_of_remaining_cards = sum(value_counts)
+        for value_index, value_count in enumerate(value_counts):
+            if value_count == 0:
+                continue
+            next_hand_state = bjl.hand_state_transitions[hand_state][value_index+2]
+            if next_hand_state == bjl.bust_hand_state:
+                next_hand_ev = -1.0
+            else:
+                next_hand_ev = self.get_stand_ev(next_hand_state, up_card_value, remove_card_value(value_counts, value_index+2))
+            double_ev += 2*next_hand_ev*value_count/num_of_remaining_cards
+        return double_ev
+
+    def get_split_ev(self, pair_value, up_card_value, value_counts):
+        # Both split hands are scored alike - each gets one card off value_counts and is then played on its own
+        # (split Aces only stand). Resplits aren't followed, so this slightly undervalues splits where resplitting helps.
+        split_hand_ev = 0.0
+        split_card_hand_state = bjl.hand_state_transitions[bjl.empty_hand_state][pair_value]
+        num_of_remaining_cards = sum(value_counts)
+        for value_index, value_count in enumerate(value_counts):
+            if value_count == 0:
+                continue
+            hand_state = bjl.hand_state_transitions[split_card_hand_state][value_index+2]
+            next_value_counts = remove_card_value(value_counts, value_index+2)
+            played_hand_ev = self.get_stand_ev(hand_state, up_card_value, next_value_counts)
+            if (pair_value != bjstrat.ace_card_value) and (bjl.hand_state_score(hand_state) != 21):
+                played_hand_ev = max(played_hand_ev, self.get_hit_ev(hand_state, up_card_value, next_value_counts))
+                if ((self.double_after_split_rule == 'DAS')
+                    and bjstrat.doubling_allowed_on_score(self.doubling_rule, bjl.hand_state_score(hand_state))):
+                    played_hand_ev = max(played_hand_ev, self.get_double_ev(hand_state, up_card_value, next_value_counts))
+            split_hand_ev += played_hand_ev*value_count/num_of_remaining_cards
+        return 2*split_hand_ev
+
+    def get_lattice_action_evs(self, hand_state, pair_value, up_card_value, value_counts, can_double):
+        # The same EVs as get_stand_ev, get_hit_ev, get_double_ev and get_split_ev, for every node of the hand's removal
+        # lattice (and the split hand's) at once
+        value_counts = np.array(value_counts, dtype=np.intp)
+        hand_score = bjl.hand_state_score(hand_state)
+        hand_is_soft = bjl.hand_state_is_soft(hand_state)
+        # (lattice, last level that's stood on whatever the hand - the hand itself and the hands it doubles into)
+        removal_lattices = [(get_removal_lattice(value_counts, hand_score-10 if hand_is_soft else hand_score, hand_is_soft,
+                                                 draws_first_card=can_double), 1 if can_double else 0)]
+        if pair_value != None:
+            split_aces = pair_value == bjstrat.ace_card_value
+            split_lattice = get_removal_lattice(value_counts, 1 if split_aces else pair_value, split_aces, 1 if split_aces else None)
+            removal_lattices.append((split_lattice, 2 if (self.double_after_split_rule == 'DAS') else 1))
+        # One row of dealer outcomes for every set of removed cards either hand could stand on
+        stand_masks = []
+        for (_, _, hand_scores, is_soft, level_starts), stand_depth in removal_lattices:
+            stood_on_levels_end = level_starts[min(stand_depth+1, len(level_starts)-1)]
+            stand_masks.append(~hits_beat_standing(hand_scores, is_soft) | (np.arange(0, len(hand_scores)) < stood_on_levels_end))
+        stood_removed_value_counts = np.concatenate([removal_lattice[0][stand_mask]
+                                                     for (removal_lattice, _), stand_mask in zip(removal_lattices, stand_masks)])
+        dealer_removal_keys, first_indices = np.unique(np.concatenate([removal_lattice[1][stand_mask] for (removal_lattice, _), stand_mask
+                                                                       in zip(removal_lattices, stand_masks)]), return_index=True)
+        dealer_outcome_probabilities = get_dealer_outcome_probability_array(up_card_value, value_counts, stood_removed_value_counts[first_indices],
+                                                                            self.seventeen_rule, self.dealer_peeks)
+        lattice_evs = []
+        for (removal_lattice, _), stand_mask in zip(removal_lattices, stand_masks):
+            stand_evs = np.full(len(stand_mask), np.nan) # not needed where hitting beats standing
+            stand_evs[stand_mask] = get_stand_evs(removal_lattice[2][stand_mask], dealer_outcome_probabilities[
+                np.searchsorted(dealer_removal_keys, removal_lattice[1][stand_mask])])
+            next_card_lookups = get_next_card_lookups(removal_lattice, value_counts)
+            lattice_evs.append((stand_evs, next_card_lookups) + get_lattice_evs(removal_lattice, next_card_lookups, stand_evs))
+        stand_evs, _, hit_evs, double_evs, _ = lattice_evs[0]
+        action_evs = {'stand': stand_evs[0].item()}
+        if hand_score != 21:
+            action_evs['hit'] = hit_evs[0].item()
+        if can_double:
+            action_evs['double'] = double_evs[0].item()
+        if pair_value != None:
+            # Each split hand draws its second card onto the split card, then it's played on as in get_split_ev
+            hand_scores = split_lattice[2]
+            stand_evs, (next_indices, draw_probabilities), hit_evs, double_evs, _ = lattice_evs[1]
+            played_evs = stand_evs.copy()
+            if not split_aces:
+                can_play_on = hand_scores != 21
+                played_evs = np.where(can_play_on, np.maximum(stand_evs, hit_evs), stand_evs)
+                if self.double_after_split_rule == 'DAS':
+                    doubling_allowed = np.array([bjstrat.doubling_allowed_on_score(self.doubling_rule, split_hand_score)
+                                                 for split_hand_score in range(0, 22)] + [False]) # [hand_score], -1 last
+                    can_double_split = can_play_on & doubling_allowed[hand_scores]
+                    played_evs = np.where(can_double_split, np.maximum(played_evs, double_evs), played_evs)
+            action_evs['split'] = 2*(draw_probabilities[0]*np.append(played_evs, -1.0)[next_indices[0]]).sum().item()
+        return action_evs
+
+    def get_action_evs(self, hand, dealer_up_card, value_counts, split_10s_rule='Rank'):
+        # {action: EV per unit of the original bet} for a hand, given the counts of the unseen cards (the hand and the
+        # dealer's up card already taken out). Doubling, splitting and surrender are only scored for a first two cards.
+        value_counts = tuple(value_counts)
+        hand_state = bjl.get_hand_state(hand)
+        up_card_value = bjo.card_high_value(bjo.encode_card(dealer_up_card))
+        can_double = (len(hand) == 2) and bjstrat.doubling_allowed_on_score(self.doubling_rule, bjl.hand_state_score(hand_state))
+        pair_value = bjstrat.get_pair_value(hand, split_10s_rule)
+        if (np != None) and (bjl.hand_state_score(hand_state) != -1):
+            memo_key = ('actions', hand_state, len(hand) == 2, pair_value, up_card_value, value_counts)
+            action_evs = self.memo.get(memo_key)
+            if action_evs == None:
+                action_evs = self.get_lattice_action_evs(hand_state, pair_value, up_card_value, value_counts, can_double)
+                self.memo[memo_key] = action_evs
+            action_evs = dict(action_evs)
+        else:
+            action_evs = {'stand': self.get_stand_ev(hand_state, up_card_value, value_counts)}
+            if bjl.hand_state_score(hand_state) not in [-1, 21]:
+                action_evs['hit'] = self.get_hit_ev(hand_state, up_card_value, value_counts)
+            if can_double:
+                action_evs['double'] = self.get_double_ev(hand_state, up_card_value, value_counts)
+            if pair_value != None:
+                action_evs['split'] = self.get_split_ev(pair_value, up_card_value, value_counts)
+        if (len(hand) == 2) and (self.surrender_rule == 'LS'):
+            action_evs['surrender'] = -0.5
+        return action_evs
+
+    def get_best_action(self, hand, dealer_up_card, value_counts, allowed_actions, split_10s_rule='Rank'):
+        action_evs = self.get_action_evs(hand, dealer_up_card, value_counts, split_10s_rule)
+        for action in bjstrat.rank_actions(action_evs):
+            if action in allowed_actions:
+                return action
+        return 'stand'
@@ -4,7 +4,10 @@ Author: Alexander Bulanov
 """
 
 # Global Imports #
-import msvcrt
+try:
+    import msvcrt # Windows-only
+except ImportError:
+    msvcrt = None # headless (simulated) tables never read keystrokes
 import sys
 
 # Local Imports #
@@ -0,0 +1,91 @@
+"""
+File: rng_backends.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import abc
+import random
+try:
+    import numpy as np
+except ImportError:
+    np = None # only NumpyRandomBackend needs it
+
+
+### Random Number Generator Backends ###
+# Anything that shuffles or cuts a shoe takes an rng with the interface below (random.Random happens to fit it too),
+# so a table can be replayed by seeding its backend, and the backend can be swapped for a faster one. A backend missing
+# one of the abstract methods can't be created, rather than failing the first time a shoe is shuffled or cut.
+class RandomBackend(abc.ABC):
+    @abc.abstractmethod
+    def shuffle(self, cards):
+        # Shuffle a list of cards in place
+        pass
+
+    @abc.abstractmethod
+    def randrange(self, start, stop, step=1):
+        pass
+
+    def choice(self, options):
+        return options[self.randrange(0, len(options))]
+
+    @abc.abstractmethod
+    def getrandbits(self, num_of_bits):
+        pass
+
+
+class PythonRandomBackend(RandomBackend):
+    # Mersenne Twister from the standard library - same sequence as random.Random(seed)
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    def shuffle(self, cards):
+        self.rng.shuffle(cards)
+
+    def randrange(self, start, stop, step=1):
+        return self.rng.randrange(start, stop, step)
+
+    def choice(self, options):
+        return self.rng.choice(options)
+
+    def getrandbits(self, num_of_bits):
+        return self.rng.getrandbits(num_of_bits)
+
+
+class NumpyRandomBackend(RandomBackend):
+    # PCG64 Generator - a shuffle is one vectorized permutation of card positions instead of a Python-level
+    # Fisher-Yates loop, which makes reshuffling an 8-deck shoe several times faster
+    def __init__(self, seed=None):
+        if np == None:
+            raise ImportError("NumpyRandomBackend requires numpy - use PythonRandomBackend instead")
+        self.seed = seed
+        self.generator = np.random.default_rng(seed)
+
+    def shuffle(self, cards):
+        card_order = self.generator.permutation(len(cards)).tolist()
+        cards[:] = [cards[card_index] for card_index in card_order]
+
+    def randrange(self, start, stop, step=1):
+        num_of_options = len(range(start, stop, step))
+        if num_of_options == 0:
+            raise ValueError(f"Empty range for randrange({start}, {stop}, {step})")
+        return start + step*int(self.generator.integers(num_of_options))
+
+    def getrandbits(self, num_of_bits):
+        random_bits = 0
+        for chunk_shift in range(0, num_of_bits, 32):
+            random_bits |= int(self.generator.integers(1 << 32)) << chunk_shift
+        return random_bits & ((1 << num_of_bits) - 1)
+
+
+rng_backends = {
+    'python': PythonRandomBackend,
+    'numpy': NumpyRandomBackend
+}
+
+def create_rng(backend_name='python', seed=None):
+    # Seeded backends replay the same shuffles and cuts on every run - seed None draws fresh entropy from the OS
+    if backend_name not in rng_backends:
+        raise ValueError(f"RNG backend '{backend_name}' is not supported! Supported backends are {list(rng_backends.keys())}")
+    return rng_backends[backend_name](seed)
@@ -0,0 +1,260 @@
+"""
+File: round_log.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import os
+import struct
+try:
+    import numpy as np
+except ImportError:
+    np = None # round logs can still be written, but reading them back needs numpy
+
+# Local Imports #
+from . import advantage_detection as bjadv
+from . import blackjack_fsm as bjfsm
+from . import blackjack_game_objects as bjo
+
+GameState = bjfsm.GameState
+
+
+### Binary Round Log ###
+# Every round played at a table is appended to a log file as one fixed-width little-endian record - the cards dealt in
+# order (burn card and cut positions of the shoe included), every seat's main bet, the actions taken and every seat's
+# net payout. A record is laid out exactly like a packed NumPy structured dtype, so a log is read back by memory-mapping
+# it as an array of records - analytics over a billion rounds slice columns straight out of the page cache, with no
+# parsing and no copying. Records are packed with struct and written a buffer at a time, so writing needs no numpy.
+log_magic = b'BJROUNDS'
+log_version = 2
+log_header_struct = struct.Struct('<8sHHI') # magic, version, record size, reserved
+log_header_size = log_header_struct.size # 16 bytes - records start right after the header
+default_buffered_rounds = 4096 # rounds written to the file at a time
+
+num_of_table_seats = 7
+max_round_cards = 96 # a round with more cards or actions than this can't be logged
+max_round_actions = 96
+
+# (field name, struct/NumPy type code, count) - per-seat fields are indexed by table seat number - 1
+round_record_fields = [
+    ('round_number', 'Q', 1), # rounds already in the log before this one
+    ('shoe_number', 'I', 1), # shuffles since the log was started (0 - before the first shuffle, and always with a CSM)
+    ('shoe_position', 'H', 1), # cards dealt from the shoe before this round, burn card included (0 with a CSM)
+    ('first_cut_index', 'H', 1), # cards moved from the front of the shoe to the back by the first cut
+    ('cut_card_index', 'H', 1), # cards in front of the cut card placed by the second cut (0 - no cut card)
+    ('pen_percentage', 'B', 1),
+    ('burn_card', 'B', 1), # card bytes (see get_card_byte) - 0 is no card
+    ('dealer_up_card', 'B', 1),
+    ('dealer_score', 'b', 1), # -1 - bust, 0 - unknown
+    ('num_of_cards', 'B', 1),
+    ('num_of_actions', 'B', 1),
+    ('true_count', 'f', 1), # Hi-Lo true count at deal time (see card_counting)
+    ('table_id', 'H', 1), # table_id of the table that played the round - player ids are only unique within a table
+    ('player_ids', 'h', num_of_table_seats), # index of the seat's player in known_players, -1 - no bet
+    ('main_bets_cents', 'i', num_of_table_seats),
+    ('net_cents', 'i', num_of_table_seats), # won (+) or lost (-) over every hand played from the seat
+    ('cards', 'B', max_round_cards), # every card dealt this round, in the order it came out of the shoe
+    ('actions', 'B', max_round_actions) # action codes in the order they were taken (early surrender responses first)
+]
+round_record_struct = struct.Struct('<' + ''.join(f"{count}{type_code}" for field_name, type_code, count in round_record_fields))
+round_record_size = round_record_struct.size
+if np != None:
+    round_record_dtype = np.dtype([(field_name, '<'+type_code) if (count == 1) else (field_name, '<'+type_code, (count,))
+                                   for field_name, type_code, count in round_record_fields])
+
+# Actions are stored as one byte each
+action_names = [None, 'stand', 'hit', 'double', 'split', 'surrender', 'no_surrender']
+action_codes = {action_name: action_code for action_code, action_name in enumerate(action_names) if action_name != None}
+
+
+### Card Bytes ###
+# Card codes (see bjo) take 10 bits - a logged card keeps its rank and suit bits only, plus 1 so that 0 means no card
+card_rank_and_suit_mask = (1 << bjo.card_value_shift) - 1
+card_byte_codes = [0]*(card_rank_and_suit_mask + 2) # card byte to card code
+for card_code in bjo.card_codes.values():
+    card_byte_codes[(card_code & card_rank_and_suit_mask) + 1] = card_code
+
+
+def get_card_byte(card):
+    # Card name or card code to its logged byte
+    return (bjo.encode_card(card) & card_rank_and_suit_mask) + 1
+
+
+def get_card_code(card_byte):
+    return card_byte_codes[card_byte]
+
+
+### Writing ###
+class RoundLogWriter:
+    # Appends to the log at path (a new log is started if there's no file there yet). Attach it to a table as its
+    # round_log and the table feeds it on every state transition (see BlackjackStateMachine.transition).
+    def __init__(self, path, buffered_rounds=default_buffered_rounds):
+        self.path = path
+        self.buffered_rounds = buffered_rounds
+        self.num_of_rounds = 0
+        self.shoe_number = 0
+        self.first_cut_index = 0
+        self.cut_card_index = 0
+        self.pen_percentage = 0
+        self.burn_card = 0
+        if os.path.isfile(path) and (os.path.getsize(path) > 0):
+            self.read_log_end()
+        self.log_file = open(path, 'ab')
+        if self.log_file.tell() == 0:
+            self.log_file.write(log_header_struct.pack(log_magic, log_version, round_record_size, 0))
+        self.buffer = bytearray(round_record_size*buffered_rounds)
+        self.num_of_buffered_rounds = 0
+        self.round_in_progress = False
+
+    def read_log_end(self):
+        # Picks round and shoe numbering up from the last whole record of an existing log
+        with open(self.path, 'rb') as log_file:
+            check_log_header(log_file.read(log_header_size))
+            self.num_of_rounds = (os.path.getsize(self.path) - log_header_size) // round_record_size
+            if self.num_of_rounds > 0:
+                log_file.seek(log_header_size + (self.num_of_rounds - 1)*round_record_size)
+                last_round_record = round_record_struct.unpack(log_file.read(round_record_size))
+                self.shoe_number = last_round_record[1]
+                self.first_cut_index, self.cut_card_index, self.pen_percentage, self.burn_card = last_round_record[3:7]
+        if os.path.getsize(self.path) != log_header_size + self.num_of_rounds*round_record_size:
+            os.truncate(self.path, log_header_size + self.num_of_rounds*round_record_size) # drop a record cut off mid-write
+
+    # Table Hooks #
+    def on_transition(self, machine, next_state):
+        # Called by the table right before it moves from machine.state to next_state
+        state = machine.state
+        if (state == GameState.SHUFFLING) and (next_state == GameState.BETTING):
+            self.begin_shoe(machine)
+        elif next_state == GameState.DEALING:
+            self.begin_round(machine)
+        elif (next_state == GameState.FINAL_SCORING) and self.round_in_progress:
+            self.record_dealer_hand(machine.get_dealer_hand(), machine.get_dealer_hand_score())
+        elif (next_state in (GameState.BETTING, GameState.SHUFFLING)) and self.round_in_progress:
+            self.end_round(machine)
+
+    def begin_shoe(self, machine):
+        self.shoe_number += 1
+        self.first_cut_index = machine.first_cut_index if (machine.first_cut_index != None) else 0
+        self.cut_card_index = machine.shoe.cut_card_index if (machine.shoe.cut_card_index != None) else 0
+        self.pen_percentage = machine.pen if (machine.pen != None) else 0
+        self.burn_card = get_card_byte(machine.discard[0]) if (len(machine.discard) > 0) else 0
+
+    def begin_round(self, machine):
+        shoe = machine.shoe
+        self.round_in_progress = True
+        self.round_start_position = shoe.cards_dealt()
+        if not isinstance(shoe, bjo.Shoe):
+            shoe.dealt_cards = [] # a continuous shuffling machine has no card order to read back - it keeps what it deals
+        self.true_count = machine.card_counter.get_true_count()
+        self.table_id = machine.table_id
+        self.player_ids = [-1]*num_of_table_seats
+        self.main_bets_cents = [0]*num_of_table_seats
+        self.net_cents = [0]*num_of_table_seats
+        self.actions = []
+        self.dealer_up_card = 0
+        self.dealer_score = 0
+        for seat_number, player_id, main_bet_cents in machine.get_round_main_bets():
+            self.player_ids[seat_number - 1] = player_id
+            self.main_bets_cents[seat_number - 1] = main_bet_cents
+
+    def record_action(self, action_name):
+        self.actions.append(action_codes[action_name])
+
+    def record_payout(self, seat_number, net_cents):
+        self.net_cents[seat_number - 1] += net_cents
+
+    def record_dealer_hand(self, dealer_hand, dealer_score):
+        self.dealer_up_card = get_card_byte(dealer_hand[0]) if (len(dealer_hand) > 0) else 0
+        self.dealer_score = dealer_score if (dealer_score != None) else 0
+
+    def end_round(self, machine):
+        shoe = machine.shoe
+        if isinstance(shoe, bjo.Shoe):
+            shoe_position = self.round_start_position
+            round_cards = shoe.cards[self.round_start_position:shoe.cursor]
+        else:
+            shoe_position = 0
+            round_cards = shoe.dealt_cards
+            shoe.dealt_cards = None
+        if (len(round_cards) > max_round_cards) or (len(self.actions) > max_round_actions):
+            raise ValueError(f"Round #{self.num_of_rounds} dealt {len(round_cards)} cards and took {len(self.actions)} actions - "
+                             f"only up to {max_round_cards} cards and {max_round_actions} actions fit in a round record")
+        card_bytes = [get_card_byte(card) for card in round_cards]
+        round_record_struct.pack_into(self.buffer, self.num_of_buffered_rounds*round_record_size,
+                                      self.num_of_rounds, self.shoe_number, shoe_position, self.first_cut_index, self.cut_card_index,
+                                      self.pen_percentage, self.burn_card, self.dealer_up_card, self.dealer_score, len(card_bytes),
+                                      len(self.actions), self.true_count, self.table_id, *self.player_ids, *self.main_bets_cents, *self.net_cents,
+                                      *card_bytes, *([0]*(max_round_cards - len(card_bytes))),
+                                      *self.actions, *([0]*(max_round_actions - len(self.actions))))
+        self.num_of_rounds += 1
+        self.num_of_buffered_rounds += 1
+        self.round_in_progress = False
+        if self.num_of_buffered_rounds == self.buffered_rounds:
+            self.flush()
+
+    # File #
+    def flush(self):
+        if self.num_of_buffered_rounds > 0:
+            self.log_file.write(memoryview(self.buffer)[:self.num_of_buffered_rounds*round_record_size])
+            self.num_of_buffered_rounds = 0
+        self.log_file.flush()
+
+    def close(self):
+        if not self.log_file.closed:
+            self.flush()
+            self.log_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+### Reading ###
+def check_log_header(header_bytes):
+    if len(header_bytes) < log_header_size:
+        raise ValueError("Round log is missing its header")
+    magic, version, record_size, reserved = log_header_struct.unpack(header_bytes)
+    if magic != log_magic:
+        raise ValueError("Not a round log")
+    if (version != log_version) or (record_size != round_record_size):
+        raise ValueError(f"Round log version {version} with {record_size} byte records can't be read - "
+                         f"expected version {log_version} with {round_record_size} byte records")
+
+
+def read_round_log(path):
+    # Memory-maps the log as a read-only array of round records (round_record_dtype) - nothing is read until it's used
+    if np == None:
+        raise ImportError("Reading round logs needs numpy")
+    with open(path, 'rb') as log_file:
+        check_log_header(log_file.read(log_header_size))
+    num_of_rounds = (os.path.getsize(path) - log_header_size) // round_record_size
+    if num_of_rounds == 0:
+        return np.zeros(0, dtype=round_record_dtype)
+    return np.memmap(path, dtype=round_record_dtype, mode='r', offset=log_header_size, shape=(num_of_rounds,))
+
+
+def iter_round_chunks(round_records, chunk_size=1 << 20):
+    # Consecutive views of chunk_size records at a time - only the chunk being worked on gets paged in
+    for chunk_start in range(0, len(round_records), chunk_size):
+        yield round_records[chunk_start:chunk_start + chunk_size]
+
+
+def get_round_cards(round_record):
+    # Card codes dealt in one round, in order
+    return [card_byte_codes[card_byte] for card_byte in round_record['cards'][:round_record['num_of_cards']].tolist()]
+
+
+def get_round_actions(round_record):
+    return [action_names[action_code] for action_code in round_record['actions'][:round_record['num_of_actions']].tolist()]
+
+
+def get_main_bet_columns(round_records):
+    # (player_ids, main_bets_cents, true_counts) of every main bet placed in round_records, one entry per bet - the
+    # columns advantage_detection works on, with players keyed by table (see get_player_key) so logs of many tables mix
+    placed_bets = round_records['player_ids'] >= 0
+    table_ids = np.broadcast_to(round_records['table_id'][:, None].astype(np.int64), placed_bets.shape)
+    true_counts = np.broadcast_to(round_records['true_count'][:, None], placed_bets.shape)
+    player_ids = bjadv.get_player_key(table_ids[placed_bets], round_records['player_ids'][placed_bets].astype(np.int64))
+    return player_ids, round_records['main_bets_cents'][placed_bets], true_counts[placed_bets]
@@ -0,0 +1,184 @@
+"""
+File: round_replay.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import collections
+try:
+    import numpy as np
+except ImportError:
+    np = None # logged rounds can only be read back with numpy (see round_log)
+
+# Local Imports #
+from . import blackjack_fsm as bjfsm
+from . import blackjack_game_objects as bjo
+from . import blackjack_policies as bjpol
+from . import blackjack_simulator as bjsim
+from . import chip_ledger as bjcl
+from . import round_log as bjlog
+
+GameState = bjfsm.GameState
+
+
+### Round Replay ###
+# Logged rounds (see round_log) are played again through the table's own step() - the shoe is loaded with the logged
+# cards in place of shuffling and cutting, and every seat places its logged bet and takes its logged actions in place
+# of a policy. Each replayed round is then checked against its record: cards dealt, actions taken (each one has to be
+# allowed where it was taken), dealer up card and score, true count at deal time, every seat's payout and whether the
+# shoe ended. A round that doesn't match is reported and replay picks up again from the next round's own cards.
+replay_buy_in = 100000 # dollars of chips every replayed seat buys, so that no logged bet is ever out of reach
+replay_cash = 1000*replay_buy_in # dollars of cash every replayed seat sits down with, enough for any number of rebuys a log needs
+
+RoundMismatch = collections.namedtuple('RoundMismatch', ['round_number', 'field_name', 'logged_value', 'replayed_value'])
+
+
+class ReplayPolicy(bjpol.SeatPolicy):
+    # Bets and plays whatever the replaying table has logged for the seat
+    def __init__(self, name):
+        super().__init__(name, 0, replay_buy_in, True, False, replay_cash)
+
+    def get_main_bet(self, machine, player, seat_name):
+        return machine.get_replay_main_bet(player.get_seat(seat_name).seat_number)
+
+    def get_early_surrender_response(self, machine, player, seat_name, hand):
+        return machine.get_next_replay_action() == 'surrender'
+
+    def get_action(self, machine, player, seat_name, hand, allowed_actions):
+        return machine.get_next_replay_action()
+
+
+class ReplayBlackjackStateMachine(bjsim.SimulatedBlackjackStateMachine):
+    # round_records - records read from a round log (see bjlog.read_round_log), table_rules - attribute: value of every
+    # table rule the log was played under that isn't the default (such as {'seventeen_rule': 'S17'})
+    def __init__(self, num_of_decks, round_records, table_rules=None):
+        if np == None:
+            raise ImportError("Replaying round logs needs numpy")
+        replayed_seat_numbers = np.nonzero((round_records['player_ids'] >= 0).any(axis=0))[0] + 1
+        seat_policies = {int(seat_number): ReplayPolicy(f"Seat #{seat_number}") for seat_number in replayed_seat_numbers}
+        super().__init__(num_of_decks, seat_policies, counting_system_names=['Hi-Lo']) # logged true counts are checked
+        if table_rules != None:
+            for rule_name, rule_value in table_rules.items():
+                setattr(self, rule_name, rule_value)
+        self.replay_records = round_records
+        self.replay_index = 0 # record of the round being replayed
+        self.replay_shoe_number = None # shoe the table's cards were last loaded from (None - reload with the next round)
+        self.replay_counts_synced = False # the card counter has seen the replayed shoe from its burn card
+        self.replay_actions = []
+        self.replay_action_index = 0
+        self.replay_round_start = 0
+        self.replay_true_count = None
+        self.replay_mismatches = [] # RoundMismatches in the order they were found
+
+    # Feeding Logged Rounds #
+    def load_replay_round(self):
+        # Loads the table's shoe with the cards of the round about to be replayed
+        round_record = self.replay_records[self.replay_index]
+        shoe_number, shoe_position = int(round_record['shoe_number']), int(round_record['shoe_position'])
+        round_cards = bjlog.get_round_cards(round_record)
+        if (shoe_number > 0) and (shoe_number == self.replay_shoe_number) and (shoe_position == self.shoe.cursor):
+            self.shoe.extend(round_cards) # next round of the shoe being replayed
+        elif (shoe_number > 0) and (shoe_position == 1):
+            # First round of a shoe - burn card, then the round's cards, with the cut card where it was placed
+            self.shoe = bjo.Shoe([bjlog.get_card_code(round_record['burn_card'])] + round_cards)
+            self.shoe.cut_card_index = int(round_record['cut_card_index'])
+            self.first_cut_index = int(round_record['first_cut_index'])
+            self.pen = int(round_record['pen_percentage'])
+            self.card_counter.reset()
+            self.discard = [self.shoe.draw()]
+            self.card_counter.observe_face_down()
+            self.replay_counts_synced = True
+        else:
+            # A continuous shuffling machine round, or the first logged round of a shoe that had already been dealt
+            # from - the shoe is made up of the round's cards only
+            self.shoe = bjo.Shoe(round_cards)
+            self.shoe.cut_card_index = (int(round_record['cut_card_index']) - shoe_position) if (shoe_number > 0) else None
+            self.card_counter.reset()
+            self.discard = []
+            self.replay_counts_synced = (shoe_number == 0) # a CSM's counter starts over every round
+        self.replay_shoe_number = shoe_number
+        self.replay_actions = bjlog.get_round_actions(round_record)
+        self.replay_action_index = 0
+        self.replay_round_start = self.shoe.cursor
+        self.replay_true_count = self.card_counter.get_true_count()
+
+    def get_replay_main_bet(self, seat_number):
+        return bjcl.cents_to_dollars(int(self.replay_records[self.replay_index]['main_bets_cents'][seat_number - 1]))
+
+    def get_next_replay_action(self):
+        if self.replay_action_index >= len(self.replay_actions):
+            raise ValueError(f"Round #{self.get_replay_round_number()} took more actions than the {len(self.replay_actions)} logged")
+        action = self.replay_actions[self.replay_action_index]
+        self.replay_action_index += 1
+        return action
+
+    def get_replay_round_number(self):
+        return int(self.replay_records[self.replay_index]['round_number'])
+
+    # Table Overrides #
+    def shuffle_cut_and_burn(self, cut_percentage):
+        # The logged cards are loaded round by round instead (see load_replay_round)
+        self.simulation_stats['shuffles'] += 1
+        self.replay_shoe_number = None
+        self.transition(GameState.BETTING)
+
+    def get_all_simulated_players_bets(self):
+        self.load_replay_round()
+        super().get_all_simulated_players_bets()
+
+    def end_simulated_round(self):
+        self.check_replayed_round()
+        super().end_simulated_round()
+        if (self.state == GameState.SHUFFLING) and (self.replay_index + 1 < len(self.replay_records)):
+            next_round_record = self.replay_records[self.replay_index + 1]
+            if next_round_record['shoe_number'] == self.replay_records[self.replay_index]['shoe_number']:
+                self.add_replay_mismatch('shoe_end', False, True)
+
+    # Verification #
+    def add_replay_mismatch(self, field_name, logged_value, replayed_value):
+        self.replay_mismatches.append(RoundMismatch(self.get_replay_round_number(), field_name, logged_value, replayed_value))
+        self.replay_shoe_number = None # pick up again from the next round's own cards
+
+    def check_replayed_round(self):
+        round_record = self.replay_records[self.replay_index]
+        replayed_values = {
+            'num_of_cards': self.shoe.cursor - self.replay_round_start,
+            'num_of_actions': self.replay_action_index,
+            'dealer_up_card': bjlog.get_card_byte(self.dealer_seat.hand[0]),
+            'dealer_score': self.dealer_seat.hand_score
+        }
+        for field_name, replayed_value in replayed_values.items():
+            if replayed_value != round_record[field_name]:
+                self.add_replay_mismatch(field_name, int(round_record[field_name]), replayed_value)
+        if self.replay_counts_synced and (np.float32(self.replay_true_count) != round_record['true_count']):
+            self.add_replay_mismatch('true_count', float(round_record['true_count']), self.replay_true_count)
+        replayed_net_cents = [0]*bjlog.num_of_table_seats
+        for round_hand in self.current_round_hands:
+            replayed_net_cents[round_hand.seat.seat_number - 1] += round_hand.net_cents
+        if replayed_net_cents != round_record['net_cents'].tolist():
+            self.add_replay_mismatch('net_cents', round_record['net_cents'].tolist(), replayed_net_cents)
+
+    def abandon_replay_round(self, error):
+        # A round that couldn't be played out as logged (such as a logged action that wasn't allowed) is cleared off the table
+        self.add_replay_mismatch('round', None, str(error))
+        for round_hand in self.current_round_hands:
+            round_hand.seat.clear_hand()
+        self.dealer_seat.clear_hand()
+        self.current_round_hands = []
+        self.reset_natural_blackjack_tracking()
+        self.simulation_stats['rounds'] += 1
+        self.transition(GameState.BETTING)
+
+    def replay(self):
+        # Replays every round of replay_records - returns a report of the rounds replayed and every mismatch found
+        while self.replay_index < len(self.replay_records):
+            try:
+                self.play_round()
+            except (ValueError, IndexError) as error:
+                self.abandon_replay_round(error)
+            self.replay_index += 1
+        return {'rounds': self.replay_index, 'mismatches': list(self.replay_mismatches)}
+
+
+def replay_round_log(log_path, num_of_decks, table_rules=None):
+    return ReplayBlackjackStateMachine(num_of_decks, bjlog.read_round_log(log_path), table_rules).replay()
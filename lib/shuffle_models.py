@@ -0,0 +1,132 @@
+"""
+File: shuffle_models.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+try:
+    import numpy as np
+except ImportError:
+    np = None # shuffle models and their analytics need numpy - tables fall back to the 'perfect' shuffle without it
+
+
+### Shuffle Models ###
+# A real dealer never produces a perfectly random order - riffles only interleave two packets and strips keep each packet
+# in order, so runs of cards survive a shuffle (clumping). Each model below permutes a whole batch of shoes at once: a
+# batch is an int array of shape (num_of_shuffles, num_of_cards) whose rows list the pre-shuffle positions of the cards
+# in their new order, so rows can be pushed through several models in a row and then compared to where cards started.
+def check_numpy():
+    if np == None:
+        raise ImportError("Shuffle models require numpy - use the 'perfect' shuffle model instead")
+
+
+def riffle(batch, generator):
+    # Gilbert-Shannon-Reeds riffle - the shoe is split into two packets with a binomial cut, which then drop together
+    # into a uniformly random interleaving (each output position is fed from the top packet with probability 1/2)
+    num_of_shuffles, num_of_cards = batch.shape
+    from_bottom_packet = generator.random((num_of_shuffles, num_of_cards)) < 0.5
+    top_packet_sizes = num_of_cards - from_bottom_packet.sum(axis=1, keepdims=True)
+    source_positions = np.where(from_bottom_packet,
+                                top_packet_sizes + np.cumsum(from_bottom_packet, axis=1) - 1,
+                                np.cumsum(~from_bottom_packet, axis=1) - 1)
+    return np.take_along_axis(batch, source_positions, axis=1)
+
+
+def strip(batch, generator, mean_packet_size=8):
+    # Packets are stripped off the top one at a time onto a new pile, which reverses the order of the packets while
+    # keeping the cards within each packet in order. Packet sizes are geometric with mean_packet_size.
+    num_of_shuffles, num_of_cards = batch.shape
+    packet_starts = generator.random((num_of_shuffles, num_of_cards)) < 1/mean_packet_size
+    packet_starts[:, 0] = True
+    packet_numbers = np.cumsum(packet_starts, axis=1)
+    sort_keys = (packet_numbers.max(axis=1, keepdims=True) - packet_numbers)*num_of_cards + np.arange(num_of_cards)
+    return np.take_along_axis(batch, np.argsort(sort_keys, axis=1, kind='stable'), axis=1)
+
+
+def wash(batch, generator, spread=None):
+    # Cards are swirled face down across the table - each card drifts from its place by a normal offset of spread
+    # positions (None - a quarter of the shoe), so a small spread leaves neighbours close together
+    num_of_shuffles, num_of_cards = batch.shape
+    if spread == None:
+        spread = num_of_cards/4
+    sort_keys = np.arange(num_of_cards) + generator.normal(0, spread, (num_of_shuffles, num_of_cards))
+    return np.take_along_axis(batch, np.argsort(sort_keys, axis=1), axis=1)
+
+
+def perfect(batch, generator):
+    return generator.permuted(batch, axis=1)
+
+
+# Each model is a sequence of passes - 'casino' is a wash followed by the common riffle-strip-riffle procedure
+shuffle_models = {
+    'perfect': [perfect],
+    'riffle': [riffle],
+    'strip': [strip],
+    'wash': [wash],
+    'casino': [wash, riffle, strip, riffle]
+}
+
+def get_shuffle_batch(model_name, num_of_cards, num_of_shuffles, generator):
+    # Shuffles num_of_shuffles shoes of num_of_cards with a model, returning rows of pre-shuffle card positions
+    check_numpy()
+    if model_name not in shuffle_models:
+        raise ValueError(f"Shuffle model '{model_name}' is not supported! Supported shuffle models are {list(shuffle_models.keys())}")
+    batch = np.broadcast_to(np.arange(num_of_cards, dtype=np.int32), (num_of_shuffles, num_of_cards))
+    for shuffle_pass in shuffle_models[model_name]:
+        batch = shuffle_pass(batch, generator)
+    return batch
+
+
+def get_numpy_generator(rng):
+    # Backends from rng_backends that already hold a numpy Generator share it, any other rng seeds a new one
+    if hasattr(rng, 'generator'):
+        return rng.generator
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+class ShuffleModel:
+    # Shuffler with the same shuffle(cards) method as an rng, so that Shoe.shuffle() can be handed one in place of it
+    def __init__(self, model_name, rng):
+        check_numpy()
+        if model_name not in shuffle_models:
+            raise ValueError(f"Shuffle model '{model_name}' is not supported! Supported shuffle models are {list(shuffle_models.keys())}")
+        self.model_name = model_name
+        self.generator = get_numpy_generator(rng)
+
+    def shuffle(self, cards):
+        card_order = get_shuffle_batch(self.model_name, len(cards), 1, self.generator)[0].tolist()
+        cards[:] = [cards[card_index] for card_index in card_order]
+
+
+### Shuffle-Tracking Analytics ###
+# Measures how much of the pre-shuffle order survives a model, which is what a shuffle tracker follows slugs of cards by.
+# Shuffles are generated and measured chunk by chunk, so millions of them never have to be held in memory at once.
+def get_residual_clumping(model_name, num_of_cards, num_of_shuffles, generator, slug_size=20, chunk_size=10000):
+    # Returns averages over every shuffle of:
+    #   adjacent_pairs_kept - share of cards still directly followed by the card that followed them before the shuffle
+    #   rising_sequences - number of rising sequences (a perfect shuffle of n cards averages (n+1)/2)
+    #   slug_span - share of the shoe spanned by the slug_size cards that were on top before the shuffle
+    #   slug_cards_in_top_half - share of the slug's cards landing in the top half of the shoe
+    # along with the same measures expected from a perfect shuffle, to compare against
+    check_numpy()
+    totals = {'adjacent_pairs_kept': 0.0, 'rising_sequences': 0.0, 'slug_span': 0.0, 'slug_cards_in_top_half': 0.0}
+    num_of_shuffles_left = num_of_shuffles
+    while num_of_shuffles_left > 0:
+        num_of_chunk_shuffles = min(chunk_size, num_of_shuffles_left)
+        batch = get_shuffle_batch(model_name, num_of_cards, num_of_chunk_shuffles, generator)
+        new_positions = np.argsort(batch, axis=1) # new_positions[row, card] - where the card at pre-shuffle position card ended up
+        position_steps = np.diff(new_positions, axis=1)
+        totals['adjacent_pairs_kept'] += (position_steps == 1).sum()/(num_of_cards-1)
+        totals['rising_sequences'] += (position_steps < 0).sum() + num_of_chunk_shuffles
+        slug_positions = new_positions[:, :slug_size]
+        totals['slug_span'] += ((slug_positions.max(axis=1) - slug_positions.min(axis=1))/(num_of_cards-1)).sum()
+        totals['slug_cards_in_top_half'] += (slug_positions < num_of_cards/2).sum()/slug_size
+        num_of_shuffles_left -= num_of_chunk_shuffles
+    clumping = {measure_name: float(total/num_of_shuffles) for measure_name, total in totals.items()}
+    clumping['perfect_shuffle'] = {
+        'adjacent_pairs_kept': 1/num_of_cards,
+        'rising_sequences': (num_of_cards+1)/2,
+        'slug_span': (slug_size-1)*(num_of_cards+1)/((slug_size+1)*(num_of_cards-1)),
+        'slug_cards_in_top_half': (num_of_cards//2)/num_of_cards
+    }
+    return clumping
@@ -0,0 +1,188 @@
+"""
+File: side_bet_calculator.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import functools
+
+# Local Imports #
+from . import blackjack_game_logic as bjl
+from . import blackjack_game_objects as bjo
+
+
+### Exact Side Bet Odds ###
+# Side bets are settled on the first few cards out of a freshly shuffled shoe, so their odds are found exactly by
+# enumerating the 52 distinct cards (each present num_of_decks times) as ordered draws without replacement,
+# rather than by simulation. Payouts are quoted 'to 1' and a losing side bet forfeits the bet. Outcome probabilities
+# only depend on the number of decks, so each side bet's are worked out once per deck count and priced against any
+# payout table from then on - validating a table's side bets every time one is created costs a lookup.
+unique_card_codes = [bjo.card_codes[card] for card in bjo.base_deck]
+
+def get_ordered_card_pair_probabilities(num_of_decks):
+    # Yields (first_card, second_card, probability) for every ordered pair of card codes drawn off the top of the shoe
+    num_of_cards = 52*num_of_decks
+    for first_card in unique_card_codes:
+        first_card_probability = num_of_decks/num_of_cards
+        for second_card in unique_card_codes:
+            second_card_copies = num_of_decks - (second_card == first_card)
+            if second_card_copies > 0:
+                yield first_card, second_card, first_card_probability*second_card_copies/(num_of_cards-1)
+
+
+def get_dealer_blackjack_probability(num_of_decks, removed_cards):
+    # Chance that the dealer is dealt an Ace and a 10-value card once removed_cards are out of the shoe
+    remaining_cards = 52*num_of_decks - len(removed_cards)
+    remaining_aces = 4*num_of_decks - sum(bjo.card_high_value(card) == 11 for card in removed_cards)
+    remaining_tens = 16*num_of_decks - sum(bjo.card_high_value(card) == 10 for card in removed_cards)
+    return 2*remaining_aces*remaining_tens/(remaining_cards*(remaining_cards-1))
+
+
+def summarize_side_bet_outcomes(outcome_probabilities, payout_table):
+    # Turn {outcome: probability} into each outcome's probability, payout and EV contribution, plus the side bet's house edge
+    outcomes = {}
+    expected_value = 0.0
+    winning_probability = 0.0
+    for outcome, payout in payout_table.items():
+        probability = outcome_probabilities.get(outcome, 0.0)
+        outcomes[outcome] = {'probability': probability, 'payout': payout, 'ev': probability*payout}
+        expected_value += probability*payout
+        winning_probability += probability
+    losing_probability = max(1.0 - winning_probability, 0.0)
+    outcomes['Loss'] = {'probability': losing_probability, 'payout': -1, 'ev': -losing_probability}
+    expected_value -= losing_probability
+    return {'outcomes': outcomes, 'expected_value': expected_value, 'house_edge': -expected_value}
+
+
+@functools.lru_cache(maxsize=None)
+def get_perfect_pairs_outcome_probabilities(num_of_decks):
+    outcome_probabilities = {}
+    for first_card, second_card, probability in get_ordered_card_pair_probabilities(num_of_decks):
+        outcome = bjl.get_perfect_pairs_outcome(first_card, second_card)
+        if outcome != None:
+            outcome_probabilities[outcome] = outcome_probabilities.get(outcome, 0.0) + probability
+    return outcome_probabilities
+
+
+def get_perfect_pairs_odds(num_of_decks, payout_table):
+    return summarize_side_bet_outcomes(get_perfect_pairs_outcome_probabilities(num_of_decks), payout_table)
+
+
+@functools.lru_cache(maxsize=None)
+def get_match_the_dealer_outcome_probabilities(num_of_decks):
+    # Suits are interchangeable here, so only dealer up cards of one suit are enumerated and weighed 4 times over
+    num_of_cards = 52*num_of_decks
+    outcome_probabilities = {}
+    for dealer_up_card in [bjo.card_codes[card_name+'S'] for card_name in bjo.card_names]:
+        dealer_up_card_probability = 4*num_of_decks/num_of_cards
+        for first_card in unique_card_codes:
+            first_card_copies = num_of_decks - (first_card == dealer_up_card)
+            for second_card in unique_card_codes:
+                second_card_copies = num_of_decks - (second_card == dealer_up_card) - (second_card == first_card)
+                if (first_card_copies <= 0) or (second_card_copies <= 0):
+                    continue
+                outcome = bjl.get_match_the_dealer_outcome(first_card, second_card, dealer_up_card)
+                if outcome != None:
+                    probability = (dealer_up_card_probability*first_card_copies/(num_of_cards-1)
+                                   *second_card_copies/(num_of_cards-2))
+                    outcome_probabilities[outcome] = outcome_probabilities.get(outcome, 0.0) + probability
+    return outcome_probabilities
+
+
+def get_match_the_dealer_odds(num_of_decks, payout_table):
+    return summarize_side_bet_outcomes(get_match_the_dealer_outcome_probabilities(num_of_decks), payout_table)
+
+
+@functools.lru_cache(maxsize=None)
+def get_dealer_blackjack_dependent_outcome_probabilities(num_of_decks, get_outcome):
+    # Lucky Ladies and King's Bounty - the top pair's payout depends on whether the dealer goes on to have Blackjack
+    outcome_probabilities = {}
+    for first_card, second_card, probability in get_ordered_card_pair_probabilities(num_of_decks):
+        outcome = get_outcome(first_card, second_card, False)
+        if outcome == None:
+            continue
+        outcome_with_dealer_blackjack = get_outcome(first_card, second_card, True)
+        if outcome_with_dealer_blackjack != outcome:
+            dealer_blackjack_probability = get_dealer_blackjack_probability(num_of_decks, [first_card, second_card])
+            outcome_probabilities[outcome_with_dealer_blackjack] = (outcome_probabilities.get(outcome_with_dealer_blackjack, 0.0)
+                                                                    + probability*dealer_blackjack_probability)
+            probability *= (1 - dealer_blackjack_probability)
+        outcome_probabilities[outcome] = outcome_probabilities.get(outcome, 0.0) + probability
+    return outcome_probabilities
+
+
+def get_dealer_blackjack_dependent_side_bet_odds(num_of_decks, payout_table, get_outcome):
+    return summarize_side_bet_outcomes(get_dealer_blackjack_dependent_outcome_probabilities(num_of_decks, get_outcome), payout_table)
+
+
+def get_lucky_ladies_odds(num_of_decks, payout_table):
+    return get_dealer_blackjack_dependent_side_bet_odds(num_of_decks, payout_table, bjl.get_lucky_ladies_outcome)
+
+
+def get_kings_bounty_odds(num_of_decks, payout_table):
+    return get_dealer_blackjack_dependent_side_bet_odds(num_of_decks, payout_table, bjl.get_kings_bounty_outcome)
+
+
+def get_dealer_bust_card_count_probabilities(num_of_decks, seventeen_rule='H17'):
+    # Chance of the dealer busting with exactly 3, 4, ... cards (index 8 holds 8 or more) out of a full shoe,
+    # found by recursing over every draw with the remaining card counts tracked by value (2-9, 10, A)
+    card_values = list(range(2, 12))
+    full_value_counts = tuple(16*num_of_decks if (value == 10) else 4*num_of_decks for value in card_values)
+    dealer_hit_threshold = 17 if (seventeen_rule == 'H17') else 16 # dealer hits soft totals up to this score
+
+    @functools.lru_cache(maxsize=None)
+    def get_bust_probabilities(hand_state, num_of_dealt_cards, value_counts):
+        bust_probabilities = [0.0]*9
+        hand_score = bjl.hand_state_score(hand_state)
+        if hand_score == -1:
+            bust_probabilities[min(num_of_dealt_cards, 8)] = 1.0
+            return tuple(bust_probabilities)
+        is_drawing = (num_of_dealt_cards < 2) or (hand_score < 17) or ((hand_score <= dealer_hit_threshold) and bjl.hand_state_is_soft(hand_state))
+        if not is_drawing:
+            return tuple(bust_probabilities)
+        num_of_remaining_cards = sum(value_counts)
+        for value_index, value_count in enumerate(value_counts):
+            if value_count == 0:
+                continue
+            next_value_counts = value_counts[:value_index] + (value_count-1,) + value_counts[value_index+1:]
+            next_hand_state = bjl.hand_state_transitions[hand_state][card_values[value_index]]
+            next_bust_probabilities = get_bust_probabilities(next_hand_state, num_of_dealt_cards+1, next_value_counts)
+            for card_count_index in range(0, 9):
+                bust_probabilities[card_count_index] += next_bust_probabilities[card_count_index]*value_count/num_of_remaining_cards
+        return tuple(bust_probabilities)
+
+    return list(get_bust_probabilities(bjl.empty_hand_state, 0, full_value_counts))
+
+
+def get_buster_blackjack_odds(num_of_decks, payout_table, seventeen_rule='H17'):
+    bust_probabilities = get_dealer_bust_card_count_probabilities(num_of_decks, seventeen_rule)
+    outcome_probabilities = {
+        '3 or 4 Cards': bust_probabilities[3] + bust_probabilities[4],
+        '5 Cards': bust_probabilities[5],
+        '6 Cards': bust_probabilities[6],
+        '7 Cards': bust_probabilities[7],
+        '8 or More Cards': bust_probabilities[8]
+    }
+    return summarize_side_bet_outcomes(outcome_probabilities, payout_table)
+
+
+side_bet_odds_calculators = {
+    "Perfect Pairs": lambda num_of_decks, payout_table, seventeen_rule: get_perfect_pairs_odds(num_of_decks, payout_table),
+    "Match the Dealer": lambda num_of_decks, payout_table, seventeen_rule: get_match_the_dealer_odds(num_of_decks, payout_table),
+    "Lucky Ladies": lambda num_of_decks, payout_table, seventeen_rule: get_lucky_ladies_odds(num_of_decks, payout_table),
+    "King's Bounty": lambda num_of_decks, payout_table, seventeen_rule: get_kings_bounty_odds(num_of_decks, payout_table),
+    "Buster Blackjack": lambda num_of_decks, payout_table, seventeen_rule: get_buster_blackjack_odds(num_of_decks, payout_table, seventeen_rule)
+}
+
+def get_side_bet_odds(side_bet_name, num_of_decks, payout_table, seventeen_rule='H17'):
+    if side_bet_name not in side_bet_odds_calculators:
+        raise ValueError(f"Side bet '{side_bet_name}' is not supported! Supported side bets are {list(side_bet_odds_calculators.keys())}")
+    return side_bet_odds_calculators[side_bet_name](num_of_decks, payout_table, seventeen_rule)
+
+
+def validate_side_bet_payout_table(side_bet_name, num_of_decks, payout_table, seventeen_rule='H17'):
+    # A payout table that hands the player an edge can't be offered at a casino table
+    side_bet_odds = get_side_bet_odds(side_bet_name, num_of_decks, payout_table, seventeen_rule)
+    if side_bet_odds['house_edge'] <= 0:
+        raise ValueError(f"Payout table of '{side_bet_name}' gives players an edge of {-side_bet_odds['house_edge']:.2%} with {num_of_decks} decks")
+    return side_bet_odds
@@ -0,0 +1,95 @@
+"""
+File: simulation_runner.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import concurrent.futures
+import copy
+import os
+import random
+
+# Local Imports #
+from . import blackjack_simulator as bjsim
+from . import rng_backends as bjrng
+
+
+### Parallel Simulation Runner ###
+# A run of num_of_shoes shoes is split into one shard of consecutive shoes per worker process. Every worker plays its
+# shard on its own table with its own RNG backend (see rng_backends), seeded from the master seed and the worker's index, so the merged
+# report of a run only depends on (master_seed, num_of_workers) - not on process scheduling or the global random state.
+def get_worker_seeds(master_seed, num_of_workers):
+    seed_rng = random.Random(master_seed)
+    return [seed_rng.getrandbits(64) for worker_index in range(0, num_of_workers)]
+
+
+def get_shard_sizes(num_of_shoes, num_of_workers):
+    # As even as possible, with the first workers taking one extra shoe each when it doesn't divide evenly
+    shard_size, num_of_larger_shards = divmod(num_of_shoes, num_of_workers)
+    return [shard_size + (worker_index < num_of_larger_shards) for worker_index in range(0, num_of_workers)]
+
+
+def get_player_wealth(player):
+    # In cents - buy-ins only move money from cash to chips, so wealth changes by exactly what was won or lost at the table
+    return player.cash_cents + player.chip_pool_cents
+
+
+def run_simulation_shard(num_of_decks, seat_policies, num_of_shoes, worker_seed, pen_percentage=None, rng_backend='python'):
+    # Module-level (rather than a method) so that it can be pickled over to worker processes
+    seed_rng = random.Random(worker_seed)
+    rng = bjrng.create_rng(rng_backend, seed_rng.getrandbits(64))
+    seat_policies = copy.deepcopy(seat_policies)
+    for policy in seat_policies.values():
+        if hasattr(policy, 'rng'):
+            policy.rng = random.Random(seed_rng.getrandbits(64)) # policies that make random choices get their own stream too
+    machine = bjsim.SimulatedBlackjackStateMachine(num_of_decks, seat_policies, pen_percentage, rng)
+    machine.step() # seat every player (WAITING)
+    starting_wealth = {seat_number: get_player_wealth(machine.seated_players[seat_number]) for seat_number in seat_policies}
+    for shoe_number in range(0, num_of_shoes):
+        machine.play_shoe()
+    seat_results = {}
+    for seat_number, starting_player_wealth in starting_wealth.items():
+        player = machine.seated_players[seat_number]
+        seat_results[seat_number] = {
+            'name': player.name,
+            'chip_pool_cents': player.chip_pool_cents,
+            'net_winnings_cents': get_player_wealth(player) - starting_player_wealth
+        }
+    return {'shoes': num_of_shoes, 'simulation_stats': machine.simulation_stats, 'seat_results': seat_results}
+
+
+def merge_shard_reports(shard_reports):
+    # Counters add up across shards - per-seat chip pools and winnings are summed over every worker's table
+    merged_report = {'shoes': 0, 'simulation_stats': bjsim.new_simulation_stats(), 'seat_results': {}}
+    for shard_report in shard_reports:
+        merged_report['shoes'] += shard_report['shoes']
+        for stat_name, stat_value in shard_report['simulation_stats'].items():
+            merged_report['simulation_stats'][stat_name] = merged_report['simulation_stats'].get(stat_name, 0) + stat_value
+        for seat_number, seat_result in shard_report['seat_results'].items():
+            if seat_number not in merged_report['seat_results']:
+                merged_report['seat_results'][seat_number] = {'name': seat_result['name'], 'chip_pool_cents': 0, 'net_winnings_cents': 0}
+            merged_report['seat_results'][seat_number]['chip_pool_cents'] += seat_result['chip_pool_cents']
+            merged_report['seat_results'][seat_number]['net_winnings_cents'] += seat_result['net_winnings_cents']
+    return merged_report
+
+
+def run_parallel_simulation(num_of_decks, seat_policies, num_of_shoes, master_seed, num_of_workers=None, pen_percentage=None,
+                            rng_backend='python'):
+    # Plays num_of_shoes shoes with seat_policies (seat_number: SeatPolicy, must be picklable) across num_of_workers
+    # processes (None - one per CPU) and returns the merged report. With 1 worker everything runs in this process.
+    if num_of_workers == None:
+        num_of_workers = os.cpu_count() or 1
+    num_of_workers = max(min(num_of_workers, num_of_shoes), 1)
+    worker_seeds = get_worker_seeds(master_seed, num_of_workers)
+    shard_sizes = get_shard_sizes(num_of_shoes, num_of_workers)
+    if num_of_workers == 1:
+        shard_reports = [run_simulation_shard(num_of_decks, seat_policies, shard_sizes[0], worker_seeds[0], pen_percentage, rng_backend)]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=num_of_workers) as executor:
+            futures = [executor.submit(run_simulation_shard, num_of_decks, seat_policies, shard_size, worker_seed, pen_percentage, rng_backend)
+                       for shard_size, worker_seed in zip(shard_sizes, worker_seeds)]
+            # Merged in worker order, so that reports list seats and stats the same way on every run
+            shard_reports = [future.result() for future in futures]
+    merged_report = merge_shard_reports(shard_reports)
+    merged_report['workers'] = num_of_workers
+    return merged_report
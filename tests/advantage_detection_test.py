@@ -0,0 +1,126 @@
+"""
+File: advantage_detection_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import random
+import statistics
+import pytest
+
+# Local Imports #
+import lib.advantage_detection as bjadv
+import lib.blackjack_policies as bjpol
+import lib.blackjack_simulator as bjsim
+
+
+def get_test_rounds(num_of_rounds, seed):
+    # Player 0 ramps 1-8 units with the true count, players 1 and 2 bet flat and at random
+    rng = random.Random(seed)
+    player_ids, main_bets_cents, true_counts = [], [], []
+    for round_number in range(0, num_of_rounds):
+        player_id = rng.randrange(0, 3)
+        true_count = rng.gauss(0, 2)
+        if player_id == 0:
+            main_bet_cents = 1000*min(max(int(true_count), 1), 8)
+        elif player_id == 1:
+            main_bet_cents = 2500
+        else:
+            main_bet_cents = rng.choice([500, 1000, 2500, 5000])
+        player_ids.append(player_id)
+        main_bets_cents.append(main_bet_cents)
+        true_counts.append(true_count)
+    return player_ids, main_bets_cents, true_counts
+
+
+class TestBetCountStatistics:
+    def test_chunked_statistics_match_whole_session_statistics(self):
+        # Setup
+        player_ids, main_bets_cents, true_counts = get_test_rounds(5000, 1)
+        test_detector = bjadv.AdvantagePlayDetector(chunk_size=333)
+        # Test
+        test_detector.add_rounds(player_ids, main_bets_cents, true_counts)
+        for player_id in range(0, 3):
+            player_bets = [main_bet_cents for round_player_id, main_bet_cents in zip(player_ids, main_bets_cents) if round_player_id == player_id]
+            player_counts = [true_count for round_player_id, true_count in zip(player_ids, true_counts) if round_player_id == player_id]
+            player_report = test_detector.get_player_report(player_id)
+            assert player_report['rounds'] == len(player_bets)
+            assert player_report['mean_bet_cents'] == pytest.approx(statistics.fmean(player_bets))
+            if player_id != 1:
+                assert player_report['correlation'] == pytest.approx(statistics.correlation(player_counts, player_bets))
+            assert player_report['bet_per_true_count_cents'] == pytest.approx(statistics.linear_regression(player_counts, player_bets).slope, abs=1e-6)
+
+    def test_pure_python_statistics_match_numpy_statistics(self, monkeypatch):
+        # Setup
+        player_ids, main_bets_cents, true_counts = get_test_rounds(3000, 2)
+        numpy_report = bjadv.analyze_round_chunks([(player_ids, main_bets_cents, true_counts)]).get_report()
+        monkeypatch.setattr(bjadv, 'np', None)
+        # Test
+        test_detector = bjadv.AdvantagePlayDetector()
+        for player_id, main_bet_cents, true_count in zip(player_ids, main_bets_cents, true_counts):
+            test_detector.record(player_id, main_bet_cents, true_count)
+        python_report = test_detector.get_report()
+        for player_id, player_report in numpy_report.items():
+            for statistic_name, statistic_value in player_report.items():
+                assert python_report[player_id][statistic_name] == pytest.approx(statistic_value)
+
+    def test_negative_player_id_is_rejected(self):
+        with pytest.raises(ValueError):
+            bjadv.AdvantagePlayDetector().add_rounds([-1], [500], [0.0])
+
+
+class TestAlerts:
+    def test_only_the_player_ramping_with_the_count_is_flagged(self):
+        # Setup
+        player_ids, main_bets_cents, true_counts = get_test_rounds(6000, 3)
+        test_detector = bjadv.AdvantagePlayDetector()
+        # Test
+        bjadv.analyze_round_chunks([(player_ids[:3000], main_bets_cents[:3000], true_counts[:3000]),
+                                    (player_ids[3000:], main_bets_cents[3000:], true_counts[3000:])], test_detector)
+        alerts = test_detector.get_alerts()
+        assert [alert.player_id for alert in alerts] == [0] # flagged once, on the first chunk
+        assert alerts[0].rounds < 2000
+        assert test_detector.get_player_report(1)['bet_ramp'] == 1.0
+
+    def test_player_is_not_flagged_before_min_rounds(self):
+        # Setup
+        test_detector = bjadv.AdvantagePlayDetector(min_rounds=100, chunk_size=10)
+        # Test
+        for round_number in range(0, 99):
+            test_detector.record(0, 500 if (round_number % 2) else 5000, -1 if (round_number % 2) else 4)
+        assert test_detector.get_alerts() == []
+        test_detector.record(0, 5000, 4)
+        assert test_detector.get_alerts()[0].rounds == 100
+
+
+class TestTableDetection:
+    def test_simulated_counter_is_flagged_and_flat_bettor_is_not(self):
+        # Setup
+        seat_policies = {2: bjpol.CardCountingPolicy('Alex', main_bet=10), 5: bjpol.BasicStrategyPolicy('Kim', main_bet=25)}
+        test_detector = bjadv.AdvantagePlayDetector()
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, seat_policies, rng=random.Random(5), advantage_detector=test_detector)
+        # Test
+        test_machine.run(3000)
+        advantage_play_report = test_machine.get_advantage_play_report()
+        assert [alert.player_id for alert in test_detector.get_alerts()] == [0]
+        assert advantage_play_report[0]['name'] == 'Alex'
+        assert advantage_play_report[0]['rounds'] == 3000
+        assert advantage_play_report[1]['correlation'] == 0.0
+
+    def test_tables_sharing_a_detector_keep_their_players_apart(self):
+        # Setup - the counter and the flat bettor are each player #0 at their own table
+        test_detector = bjadv.AdvantagePlayDetector()
+        test_machines = [bjsim.SimulatedBlackjackStateMachine(6, {2: bjpol.CardCountingPolicy('Alex', main_bet=10)}, rng=random.Random(6),
+                                                              advantage_detector=test_detector, table_id=1),
+                         bjsim.SimulatedBlackjackStateMachine(6, {2: bjpol.BasicStrategyPolicy('Kim', main_bet=25)}, rng=random.Random(7),
+                                                              advantage_detector=test_detector, table_id=2)]
+        # Test
+        for test_machine in test_machines:
+            test_machine.run(2000)
+        assert [alert.player_id for alert in test_detector.get_alerts()] == [bjadv.get_player_key(1, 0)]
+        counter_report, flat_bettor_report = [test_machine.get_advantage_play_report() for test_machine in test_machines]
+        assert list(counter_report) == [0]
+        assert list(flat_bettor_report) == [0]
+        assert (counter_report[0]['name'], counter_report[0]['rounds']) == ('Alex', 2000)
+        assert (flat_bettor_report[0]['name'], flat_bettor_report[0]['rounds']) == ('Kim', 2000)
+        assert flat_bettor_report[0]['correlation'] == 0.0
@@ -0,0 +1,112 @@
+"""
+File: bankroll_stats_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import math
+import random
+import statistics
+import pytest
+
+# Local Imports #
+import lib.bankroll_stats as bjbank
+import lib.blackjack_policies as bjpol
+import lib.blackjack_simulator as bjsim
+
+
+class TestRunningMoments:
+    def test_moments_match_two_pass_statistics(self):
+        # Setup
+        rng = random.Random(1)
+        values = [rng.gauss(1e9, 3) for value_number in range(0, 5000)] # large offset - summing squares would lose it
+        test_moments = bjbank.RunningMoments()
+        # Test
+        for value in values:
+            test_moments.add(value)
+        assert test_moments.count == 5000
+        assert test_moments.mean == pytest.approx(statistics.fmean(values), abs=1e-6)
+        assert test_moments.get_variance() == pytest.approx(statistics.variance(values), rel=1e-6)
+        assert (test_moments.min, test_moments.max) == (min(values), max(values))
+
+    def test_merged_moments_match_one_stream(self):
+        # Setup
+        rng = random.Random(2)
+        values = [rng.expovariate(0.1) for value_number in range(0, 3000)]
+        whole_moments, first_moments, second_moments = bjbank.RunningMoments(), bjbank.RunningMoments(), bjbank.RunningMoments()
+        for value_index, value in enumerate(values):
+            whole_moments.add(value)
+            (first_moments if (value_index < 1000) else second_moments).add(value)
+        # Test
+        first_moments.merge(second_moments)
+        assert first_moments.count == whole_moments.count
+        assert first_moments.mean == pytest.approx(whole_moments.mean)
+        assert first_moments.get_variance() == pytest.approx(whole_moments.get_variance())
+        assert (first_moments.min, first_moments.max) == (whole_moments.min, whole_moments.max)
+
+
+class TestP2Quantile:
+    @pytest.mark.parametrize("quantile", [0.05, 0.5, 0.95])
+    def test_quantile_estimates_are_close_to_exact_quantiles(self, quantile):
+        # Setup
+        rng = random.Random(3)
+        values = [rng.gauss(0, 1) for value_number in range(0, 20000)]
+        test_quantile = bjbank.P2Quantile(quantile)
+        # Test
+        for value in values:
+            test_quantile.add(value)
+        exact_quantile = sorted(values)[int(quantile*len(values))]
+        assert test_quantile.get_quantile() == pytest.approx(exact_quantile, abs=0.05)
+        assert len(test_quantile.heights) == 5
+
+    def test_few_values_give_exact_quantile(self):
+        # Setup
+        test_quantile = bjbank.P2Quantile(0.5)
+        # Test
+        assert test_quantile.get_quantile() == None
+        for value in [7, 3, 5]:
+            test_quantile.add(value)
+        assert test_quantile.get_quantile() == 5
+
+    def test_quantile_outside_zero_to_one_is_rejected(self):
+        with pytest.raises(ValueError):
+            bjbank.P2Quantile(1)
+
+
+class TestBankrollTracker:
+    def test_risk_of_ruin_and_n0_follow_round_moments(self):
+        # Setup - win 2 or lose 1 with equal chances, so EV is 0.5 and variance 2.25*n/(n-1)
+        test_tracker = bjbank.BankrollTracker()
+        for round_number in range(0, 1000):
+            test_tracker.add_round(2 if (round_number % 2) else -1, 1, 100)
+        variance = test_tracker.round_results.get_variance()
+        # Test
+        assert test_tracker.get_risk_of_ruin(10) == pytest.approx(math.exp(-2*0.5*10/variance))
+        assert test_tracker.get_n0() == pytest.approx(variance/0.25)
+        assert test_tracker.get_report()['sd_per_hand_units'] == pytest.approx(1.5, rel=1e-3)
+
+    def test_losing_session_is_certain_ruin(self):
+        # Setup
+        test_tracker = bjbank.BankrollTracker()
+        for round_number in range(0, 10):
+            test_tracker.add_round(-5, 5, 100 - 5*round_number)
+        # Test
+        assert test_tracker.get_risk_of_ruin(1000000) == 1.0
+        assert test_tracker.get_report()['bankroll_min_cents'] == 55
+
+    def test_simulated_table_tracks_every_round_of_every_seat(self):
+        # Setup
+        seat_policies = {3: bjpol.BasicStrategyPolicy('Alex', main_bet=10), 6: bjpol.MimicTheDealerPolicy('Kim', main_bet=25)}
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, seat_policies, rng=random.Random(9), track_bankrolls=True)
+        test_machine.step()
+        starting_wealths = dict(test_machine.round_start_wealths)
+        # Test
+        test_machine.run(5000)
+        for seat_number, bankroll_tracker in test_machine.bankroll_trackers.items():
+            player = test_machine.seated_players[seat_number]
+            bankroll_report = bankroll_tracker.get_report()
+            assert bankroll_report['rounds'] == test_machine.simulation_stats['rounds']
+            assert bankroll_report['ev_per_round_cents']*bankroll_report['rounds'] == pytest.approx(
+                player.cash_cents + player.chip_pool_cents - starting_wealths[seat_number])
+            assert 0.9 < bankroll_report['sd_per_hand_units'] < 1.4 # blackjack's SD is about 1.15 units per hand
+        assert test_machine.bankroll_trackers[6].get_report()['average_initial_bet_cents'] == 2500
@@ -5,12 +5,34 @@ Author: Alexander Bulanov
 
 # Global Imports
 from enum import Enum
+import os
 import pytest
 
 # Local Imports #
 import lib.blackjack_fsm as bjfsm
 import lib.blackjack_game_settings as bjs
 import lib.blackjack_game_objects as bjo
+import lib.blackjack_players as bjp
+import lib.card_counting as bjcount
+import lib.chip_ledger as bjcl
+import lib.round_log as bjlog
+
+
+def get_dealt_table(monkeypatch, num_of_decks, simulated_char_inputs, dealer_hand=None):
+    # Seats 'Alex' at seat 2 (skipping WAITING) and steps the table through STARTING, SHUFFLING, BETTING and DEALING -
+    # simulated_char_inputs are every key pressed from BETTING on
+    test_machine = bjfsm.BlackjackStateMachine(num_of_decks)
+    test_machine.seated_players[2] = bjp.Player.create_new_player_from_template('Alex', 2)
+    test_machine.transition(bjfsm.GameState.STARTING)
+    iterable_simulated_char_inputs = iter(simulated_char_inputs)
+    monkeypatch.setattr('msvcrt.getch', lambda: next(iterable_simulated_char_inputs))
+    test_machine.step() # executes start_game() in STARTING and transitions to SHUFFLING
+    test_machine.step() # executes shuffle_cut_and_burn() in SHUFFLING and transitions to BETTING
+    test_machine.step() # executes get_all_players_bets() in BETTING and transitions to DEALING
+    test_machine.step() # executes deal() in DEALING and transitions to PRE_SCORING
+    if dealer_hand != None:
+        test_machine.dealer.hands['center_seat'] = dealer_hand
+    return test_machine, iterable_simulated_char_inputs
 
 
 class Test_WAITING_Seat_Count_Independent:
@@ -284,11 +306,11 @@ class Test_SHUFFLING:
         test_machine.step() # executes shuffle_cut_and_burn() in SHUFFLING and transitions to BETTING
         ## Shoe Integrity Test ##
         # Verify deck size and pen percentage is in-bounds for a single deck shoe
-        assert len(test_machine.shoe) == 1+52*1
+        assert len(test_machine.shoe) == 52*1-1 # burned card is in discard
         assert test_machine.pen in range(50, 71)
-        # Verify cut cards are present and are placed correctly in-bounds for a single deck shoe
-        assert 'front_cut_card' in test_machine.shoe[26:37]
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly in-bounds for a single deck shoe
+        assert test_machine.shoe.cut_card_index in range(26, 37)
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 1 copy of each non-cut card across shoe and discard, for a single deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -312,11 +334,11 @@ class Test_SHUFFLING:
         test_machine.step() # executes shuffle_cut_and_burn() in SHUFFLING and transitions to BETTING
         ## Shoe Integrity Test ##
         # Verify deck size and pen percentage is in-bounds for an eight-deck shoe
-        assert len(test_machine.shoe) == 1+52*8
+        assert len(test_machine.shoe) == 52*8-1 # burned card is in discard
         assert test_machine.pen in range(70, 91)
-        # Verify cut cards are present and are placed correctly in-bounds for an eight-deck shoe
-        assert 'front_cut_card' in test_machine.shoe[291:375]
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly in-bounds for an eight-deck shoe
+        assert test_machine.shoe.cut_card_index in range(291, 375)
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 8 copies of each non-cut card across shoe and discard, for an eight-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -341,11 +363,11 @@ class Test_SHUFFLING:
         test_machine.shuffle_cut_and_burn(min_cut_percentage_one_deck_shoe) # manually executes SHUFFLING /w 50% pen
         ## Shoe Integrity Test ##
         # Verify deck size and minimum (50%) pen percentage for a one-deck shoe
-        assert len(test_machine.shoe) == 1+52*1
+        assert len(test_machine.shoe) == 52*1-1 # burned card is in discard
         assert test_machine.pen == 50
-        # Verify cut cards are present and are placed correctly at minimum (50%) pen for a one-deck shoe
-        assert test_machine.shoe[26] == 'front_cut_card'
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly at minimum (50%) pen for a one-deck shoe
+        assert test_machine.shoe.cut_card_index == 26
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 1 copy of each non-cut card across shoe and discard, for a one-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -370,11 +392,11 @@ class Test_SHUFFLING:
         test_machine.shuffle_cut_and_burn(min_cut_percentage_one_deck_shoe) # manually execute SHUFFLING /w 70% pen
         ## Shoe Integrity Test ##
         # Verify deck size and maximum (70%) pen percentage for a one-deck shoe
-        assert len(test_machine.shoe) == 1+52*1
+        assert len(test_machine.shoe) == 52*1-1 # burned card is in discard
         assert test_machine.pen == 70
-        # Verify cut cards are present and are placed correctly at maximum (70%) pen for a one-deck shoe
-        assert test_machine.shoe[36] == 'front_cut_card'
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly at maximum (70%) pen for a one-deck shoe
+        assert test_machine.shoe.cut_card_index == 36
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 1 copy of each non-cut card across shoe and discard, for a one-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -399,11 +421,11 @@ class Test_SHUFFLING:
         test_machine.shuffle_cut_and_burn(min_cut_percentage_two_deck_shoe) # manually execute SHUFFLING /w 55% pen
         ## Shoe Integrity Test ##
         # Verify deck size and minimum (55%) pen percentage for a two-deck shoe
-        assert len(test_machine.shoe) == 1+52*2
+        assert len(test_machine.shoe) == 52*2-1 # burned card is in discard
         assert test_machine.pen == 55
-        # Verify cut cards are present and are placed correctly at minimum (55%) pen for a two-deck shoe
-        assert test_machine.shoe[57] == 'front_cut_card'
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly at minimum (55%) pen for a two-deck shoe
+        assert test_machine.shoe.cut_card_index == 57
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 2 copies of each non-cut card across shoe and discard, for a two-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -428,11 +450,11 @@ class Test_SHUFFLING:
         test_machine.shuffle_cut_and_burn(min_cut_percentage_two_deck_shoe) # manually execute SHUFFLING /w 75% pen
         ## Shoe Integrity Test ##
         # Verify deck size and maximum (75%) pen percentage for a two-deck shoe
-        assert len(test_machine.shoe) == 1+52*2
+        assert len(test_machine.shoe) == 52*2-1 # burned card is in discard
         assert test_machine.pen == 75
-        # Verify cut cards are present and are placed correctly at maximum (75%) pen for a two-deck shoe
-        assert test_machine.shoe[78] == 'front_cut_card'
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly at maximum (75%) pen for a two-deck shoe
+        assert test_machine.shoe.cut_card_index == 78
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 2 copies of each non-cut card across shoe and discard, for a two-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -457,11 +479,11 @@ class Test_SHUFFLING:
         test_machine.shuffle_cut_and_burn(min_cut_percentage_four_deck_shoe) # manually execute SHUFFLING /w 60% pen
         ## Shoe Integrity Test ##
         # Verify deck size and minimum (60%) pen percentage for a four-deck shoe
-        assert len(test_machine.shoe) == 1+52*4
+        assert len(test_machine.shoe) == 52*4-1 # burned card is in discard
         assert test_machine.pen == 60
-        # Verify cut cards are present and are placed correctly at minimum (60%) pen for a four-deck shoe
-        assert test_machine.shoe[124] == 'front_cut_card'
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly at minimum (60%) pen for a four-deck shoe
+        assert test_machine.shoe.cut_card_index == 125
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 4 copies of each non-cut card across shoe and discard, for a four-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -486,11 +508,11 @@ class Test_SHUFFLING:
         test_machine.shuffle_cut_and_burn(min_cut_percentage_four_deck_shoe) # manually execute SHUFFLING /w 80% pen
         ## Shoe Integrity Test ##
         # Verify deck size and maximum (80%) pen percentage for a four-deck shoe
-        assert len(test_machine.shoe) == 1+52*4
+        assert len(test_machine.shoe) == 52*4-1 # burned card is in discard
         assert test_machine.pen == 80
-        # Verify cut cards are present and are placed correctly at maximum (80%) pen for a four-deck shoe
-        assert test_machine.shoe[166] == 'front_cut_card'
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly at maximum (80%) pen for a four-deck shoe
+        assert test_machine.shoe.cut_card_index == 166
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 4 copies of each non-cut card across shoe and discard, for a four-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -515,11 +537,11 @@ class Test_SHUFFLING:
         test_machine.shuffle_cut_and_burn(min_cut_percentage_six_deck_shoe) # manually execute SHUFFLING /w 65% pen
         ## Shoe Integrity Test ##
         # Verify deck size and minimum (65%) pen percentage for a six-deck shoe
-        assert len(test_machine.shoe) == 1+52*6
+        assert len(test_machine.shoe) == 52*6-1 # burned card is in discard
         assert test_machine.pen == 65
-        # Verify cut cards are present and are placed correctly at minimum (65%) pen for a six-deck shoe
-        assert test_machine.shoe[202] == 'front_cut_card'
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly at minimum (65%) pen for a six-deck shoe
+        assert test_machine.shoe.cut_card_index == 203
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 6 copies of each non-cut card across shoe and discard, for a six-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -544,11 +566,11 @@ class Test_SHUFFLING:
         test_machine.shuffle_cut_and_burn(min_cut_percentage_six_deck_shoe) # manually execute SHUFFLING /w 85% pen
         ## Shoe Integrity Test ##
         # Verify deck size and maximum (85%) pen percentage for a six-deck shoe
-        assert len(test_machine.shoe) == 1+52*6
+        assert len(test_machine.shoe) == 52*6-1 # burned card is in discard
         assert test_machine.pen == 85
-        # Verify cut cards are present and are placed correctly at maximum (85%) pen for a six-deck shoe
-        assert test_machine.shoe[265] == 'front_cut_card'
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly at maximum (85%) pen for a six-deck shoe
+        assert test_machine.shoe.cut_card_index == 265
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 6 copies of each non-cut card across shoe and discard, for a six-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -573,11 +595,11 @@ class Test_SHUFFLING:
         test_machine.shuffle_cut_and_burn(min_cut_percentage_eight_deck_shoe) # manually execute SHUFFLING /w 70% pen
         ## Shoe Integrity Test ##
         # Verify deck size and minimum (70%) pen percentage for an eight-deck shoe
-        assert len(test_machine.shoe) == 1+52*8
+        assert len(test_machine.shoe) == 52*8-1 # burned card is in discard
         assert test_machine.pen == 70
-        # Verify cut cards are present and are placed correctly at minimum (70%) pen for an eight-deck shoe
-        assert test_machine.shoe[291] == 'front_cut_card'
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly at minimum (70%) pen for an eight-deck shoe
+        assert test_machine.shoe.cut_card_index == 291
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 8 copies of each non-cut card across shoe and discard, for an eight-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -602,11 +624,11 @@ class Test_SHUFFLING:
         test_machine.shuffle_cut_and_burn(min_cut_percentage_eight_deck_shoe) # manually execute SHUFFLING /w 90% pen
         ## Shoe Integrity Test ##
         # Verify deck size and maximum (90%) pen percentage for an eight-deck shoe
-        assert len(test_machine.shoe) == 1+52*8
+        assert len(test_machine.shoe) == 52*8-1 # burned card is in discard
         assert test_machine.pen == 90
-        # Verify cut cards are present and are placed correctly at maximum (90%) pen for an eight-deck shoe
-        assert test_machine.shoe[374] == 'front_cut_card'
-        assert test_machine.shoe[-1] == 'back_cut_card'
+        # Verify cut card is placed correctly at maximum (90%) pen for an eight-deck shoe
+        assert test_machine.shoe.cut_card_index == 374
+        assert test_machine.shoe.cards_dealt() == 1
         # Verify there's 8 copies of each non-cut card across shoe and discard, for an eight-deck shoe
         card_occurrence_counts = dict.fromkeys(bjo.base_deck, 0)
         card_occurrence_counts[test_machine.discard[0]] += 1
@@ -878,7 +900,7 @@ class Test_DEALING_One_Hand_per_Player:
         assert playerDealer.hands['center_seat'][0] in bjo.base_deck
         assert playerDealer.hands['center_seat'][1] in bjo.base_deck
 
-    def test_one_deck_shoe_has_49_cards_left_after_one_player_and_dealer_are_dealt_one_hand_each(self, monkeypatch):
+    def test_one_deck_shoe_has_47_cards_left_after_one_player_and_dealer_are_dealt_one_hand_each(self, monkeypatch):
         # Setup
         num_of_decks = 1
         test_machine = bjfsm.BlackjackStateMachine(num_of_decks)
@@ -895,9 +917,9 @@ class Test_DEALING_One_Hand_per_Player:
         test_machine.step() # executes get_all_players_bets() in BETTING and transitions to DEALING
         # Test
         test_machine.step() # executes deal() in DEALING and transitions to INITIAL_SCORING
-        assert len(test_machine.shoe) == 49
+        assert len(test_machine.shoe) == 47
 
-    def test_one_deck_shoe_has_47_cards_left_after_two_players_and_dealer_are_dealt_one_hand_each(self, monkeypatch):
+    def test_one_deck_shoe_has_45_cards_left_after_two_players_and_dealer_are_dealt_one_hand_each(self, monkeypatch):
         # Setup
         num_of_decks = 1
         test_machine = bjfsm.BlackjackStateMachine(num_of_decks)
@@ -916,9 +938,9 @@ class Test_DEALING_One_Hand_per_Player:
         test_machine.step() # executes get_all_players_bets() in BETTING and transitions to DEALING
         # Test
         test_machine.step() # executes deal() in DEALING and transitions to INITIAL_SCORING
-        assert len(test_machine.shoe) == 47
+        assert len(test_machine.shoe) == 45
 
-    def test_eight_deck_shoe_has_413_cards_left_after_one_player_and_dealer_are_dealt_one_hand_each(self, monkeypatch):
+    def test_eight_deck_shoe_has_411_cards_left_after_one_player_and_dealer_are_dealt_one_hand_each(self, monkeypatch):
         # Setup
         num_of_decks = 8
         test_machine = bjfsm.BlackjackStateMachine(num_of_decks)
@@ -935,9 +957,9 @@ class Test_DEALING_One_Hand_per_Player:
         test_machine.step() # executes get_all_players_bets() in BETTING and transitions to DEALING
         # Test
         test_machine.step() # executes deal() in DEALING and transitions to INITIAL_SCORING
-        assert len(test_machine.shoe) == 413
+        assert len(test_machine.shoe) == 411
 
-    def test_eight_deck_shoe_has_411_cards_left_after_two_players_and_dealer_are_dealt_one_hand_each(self, monkeypatch):
+    def test_eight_deck_shoe_has_409_cards_left_after_two_players_and_dealer_are_dealt_one_hand_each(self, monkeypatch):
         # Setup
         num_of_decks = 8
         test_machine = bjfsm.BlackjackStateMachine(num_of_decks)
@@ -956,7 +978,7 @@ class Test_DEALING_One_Hand_per_Player:
         test_machine.step() # executes get_all_players_bets() in BETTING and transitions to DEALING
         # Test
         test_machine.step() # executes deal() in DEALING and transitions to INITIAL_SCORING
-        assert len(test_machine.shoe) == 411
+        assert len(test_machine.shoe) == 409
 
 class Test_DEALING_Multiple_Hands_per_Player:
     def test_player_Alex_in_seats_2_and_3_is_dealt_two_hands_correctly(self, monkeypatch):
@@ -1857,7 +1879,7 @@ class TestNaturalBlackjacks_INITIAL_SCORING:
         assert test_machine.state == bjfsm.GameState.BETTING
         assert first_player.White == 50
         assert first_player.Blue == 20
-        assert len(test_machine.shoe) == 49
+        assert len(test_machine.shoe) == 47
 
     def test_first_player_with_blackjack_regular_blackjack_is_handled_correctly_against_dealer_blackjack(self):
         pass
@@ -1931,7 +1953,7 @@ class TestMiscellaneous:
 
 class TestReshuffling:
     def test_single_deck_shoe_not_reshuffled_at_or_before_min_pen_bound_of_fifty_percent(self, monkeypatch):
-        # Shuffle single-deck shoe at 50% pen ('front_cut_card' is at index 26)
+        # Shuffle single-deck shoe at 50% pen (cut card is placed behind the first 26 cards)
         num_of_decks = 1
         test_machine = bjfsm.BlackjackStateMachine(num_of_decks)
         test_machine.step() # executes start_game() in STARTING, assigning active player
@@ -1946,13 +1968,14 @@ class TestReshuffling:
             elif test_machine.state == bjfsm.GameState.PLAYER_PLAYING:
                 monkeypatch.setattr('builtins.input', lambda _: 'stand')
                 test_machine.step() # executes play() in GameState.PLAYING /w supplied user input of 'stand'
-        # Check that next card to be dealt is 'front_cut_card' and we haven't reshuffled yet
-        assert test_machine.shoe[0] == 'front_cut_card'
-        assert len(test_machine.shoe) == 27
+        # Check that the cut card is next in the shoe and we haven't reshuffled yet
+        assert test_machine.shoe.cards_dealt() == test_machine.shoe.cut_card_index
+        assert not test_machine.shoe.cut_card_reached()
+        assert len(test_machine.shoe) == 26
         assert test_machine.state == bjfsm.GameState.DEALING
     
     def test_single_deck_shoe_is_reshuffled_only_after_min_pen_bound_of_fifty_percent(self, monkeypatch):
-        # Shuffle single-deck shoe at 50% pen ('front_cut_card' is at index 26)
+        # Shuffle single-deck shoe at 50% pen (cut card is placed behind the first 26 cards)
         num_of_decks = 1
         test_machine = bjfsm.BlackjackStateMachine(num_of_decks)
         test_machine.shuffle_cut_and_burn(50)
@@ -1967,4 +1990,83 @@ class TestReshuffling:
                 monkeypatch.setattr('builtins.input', lambda _: 'stand')
                 test_machine.step() # executes play() in GameState.PLAYING /w supplied user input of 'stand'
         # Verify state machine is reshuffling at round end after dealing 28 cards
-        assert test_machine.state == bjfsm.GameState.SHUFFLING
\ No newline at end of file
+        assert test_machine.state == bjfsm.GameState.SHUFFLING
+
+
+class Test_INITIAL_SCORING_Early_Surrender:
+    def test_early_surrender_is_offered_against_dealer_face_ten_up_card_dealt_from_string_card_shoe(self, monkeypatch):
+        ## Setup ##
+        simulated_char_inputs = [b'1', b'f', b'n', b'n', b'n'] # $1 main bet, no side bets, no early surrender
+        test_machine, iterable_simulated_char_inputs = get_dealt_table(monkeypatch, 6, simulated_char_inputs, ['KD', '9C'])
+        test_machine.surrender_rule = 'ES10'
+        test_machine.step() # executes side bet handling in PRE_SCORING and transitions to INITIAL_SCORING
+        ## Test ##
+        assert test_machine.state == bjfsm.GameState.INITIAL_SCORING
+        assert isinstance(test_machine.seated_players[2].hands['center_seat'][0], str)
+        test_machine.score_all_hands_in_play()
+        test_machine.offer_early_surrender_if_used_at_table_to_all_players()
+        assert next(iterable_simulated_char_inputs, None) == None # early surrender was offered (and declined)
+        assert test_machine.dealer.hand_scores['center_seat'] == 19
+        assert test_machine.state == bjfsm.GameState.INITIAL_SCORING
+
+    def test_early_surrender_is_not_offered_against_dealer_non_ten_up_card_dealt_from_string_card_shoe(self, monkeypatch):
+        ## Setup ##
+        simulated_char_inputs = [b'1', b'f', b'n', b'n'] # $1 main bet, no side bets
+        test_machine, iterable_simulated_char_inputs = get_dealt_table(monkeypatch, 6, simulated_char_inputs, ['9C', 'KD'])
+        test_machine.surrender_rule = 'ES10'
+        test_machine.step() # executes side bet handling in PRE_SCORING and transitions to INITIAL_SCORING
+        ## Test ##
+        test_machine.score_all_hands_in_play()
+        test_machine.offer_early_surrender_if_used_at_table_to_all_players()
+        assert test_machine.state == bjfsm.GameState.INITIAL_SCORING
+
+
+class Test_Payouts_Chip_Ledger:
+    def test_3_to_2_blackjack_on_1_usd_bet_swaps_White_for_Pink_and_logs_winnings(self, monkeypatch, tmp_path):
+        ## Setup ##
+        simulated_char_inputs = [b'1', b'f', b'n', b'n'] # $1 main bet, no side bets
+        test_machine, iterable_simulated_char_inputs = get_dealt_table(monkeypatch, 6, simulated_char_inputs)
+        player_Alex = test_machine.seated_players[2]
+        starting_dealer_cents = test_machine.dealer.chip_pool_cents
+        with bjlog.RoundLogWriter(os.path.join(tmp_path, 'rounds.bin')) as round_log:
+            test_machine.round_log = round_log
+            round_log.begin_round(test_machine)
+            ## Test ##
+            test_machine.pay_winning_player_bet(player_Alex, 'center_seat', None, 150)
+            assert round_log.net_cents[2 - 1] == 150
+            test_machine.round_log = None
+        assert player_Alex.main_bets['center_seat'] == dict(bjcl.chip_counts_to_dict([0]*9), Pink=1)
+        assert player_Alex.main_bet_cents['center_seat'] == 100
+        assert player_Alex.main_bet_winnings_cents['center_seat'] == 150
+        assert test_machine.dealer.chips['White'] == 1001 and test_machine.dealer.chips['Pink'] == 999
+        assert test_machine.dealer.chip_pool_cents == starting_dealer_cents - 150
+
+    def test_3_to_2_blackjack_on_5_usd_bet_pays_winnings_next_to_the_bet(self, monkeypatch):
+        ## Setup ##
+        simulated_char_inputs = [b'3', b'f', b'n', b'n'] # $5 main bet, no side bets
+        test_machine, iterable_simulated_char_inputs = get_dealt_table(monkeypatch, 6, simulated_char_inputs)
+        player_Alex = test_machine.seated_players[2]
+        starting_dealer_cents = test_machine.dealer.chip_pool_cents
+        ## Test ##
+        test_machine.pay_winning_player_bet(player_Alex, 'center_seat', None, 750)
+        assert player_Alex.main_bets['center_seat'] == dict(bjcl.chip_counts_to_dict([0]*9), Red=1)
+        assert player_Alex.main_bet_winnings['center_seat'] == dict(bjcl.chip_counts_to_dict([0]*9), Pink=1, Red=1)
+        assert player_Alex.main_bet_winnings_cents['center_seat'] == 750
+        assert test_machine.dealer.chip_pool_cents == starting_dealer_cents - 750
+
+
+class Test_DEALING_Card_Counting:
+    def test_dealer_hole_card_is_only_counted_once_it_is_revealed(self, monkeypatch):
+        ## Setup ##
+        simulated_char_inputs = [b'1', b'f', b'n', b'n'] # $1 main bet, no side bets
+        test_machine, iterable_simulated_char_inputs = get_dealt_table(monkeypatch, 6, simulated_char_inputs)
+        test_counter = test_machine.card_counter
+        hi_lo_tags = bjcount.counting_systems['Hi-Lo']['tags']
+        seen_cards = test_machine.seated_players[2].hands['center_seat'] + test_machine.get_dealer_hand()[:1]
+        ## Test ##
+        assert (test_counter.cards_dealt, test_counter.cards_seen) == (5, 3) # burn card and the hole card are face down
+        assert test_counter.get_running_count() == sum(hi_lo_tags[bjo.card_high_value(bjo.encode_card(card))] for card in seen_cards)
+        test_machine.reveal_dealer_hand()
+        seen_cards.append(test_machine.get_dealer_hand()[1])
+        assert (test_counter.cards_dealt, test_counter.cards_seen) == (5, 4)
+        assert test_counter.get_running_count() == sum(hi_lo_tags[bjo.card_high_value(bjo.encode_card(card))] for card in seen_cards)
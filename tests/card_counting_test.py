@@ -0,0 +1,142 @@
+"""
+File: card_counting_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import random
+import pytest
+
+# Local Imports #
+import lib.advantage_detection as bjadv
+import lib.blackjack_fsm as bjfsm
+import lib.blackjack_game_objects as bjo
+import lib.blackjack_policies as bjpol
+import lib.blackjack_simulator as bjsim
+import lib.card_counting as bjcount
+
+
+class TestCountingSystems:
+    @pytest.mark.parametrize("counting_system_name", ['Hi-Lo', 'Omega II', 'Wong Halves'])
+    def test_balanced_systems_count_a_whole_shoe_back_to_zero(self, counting_system_name):
+        # Setup
+        test_counter = bjcount.CardCounter(6)
+        # Test
+        for card in bjo.get_encoded_shoe_of_n_decks(6, random.Random(1)):
+            test_counter.observe(card)
+        assert test_counter.get_running_count(counting_system_name) == 0
+
+    def test_ko_starts_below_zero_and_ends_at_four(self):
+        # Setup
+        test_counter = bjcount.CardCounter(6, ['KO'])
+        # Test
+        assert test_counter.get_running_count('KO') == -20
+        for card in bjo.get_shoe_of_n_decks(6, random.Random(2)):
+            test_counter.observe(card)
+        assert test_counter.get_running_count('KO') == 4
+
+    def test_card_names_and_codes_are_counted_alike(self):
+        # Setup
+        name_counter, code_counter = bjcount.CardCounter(1), bjcount.CardCounter(1)
+        # Test
+        for card in ['5H', 'AS', '2C', '10D', '9H']:
+            name_counter.observe(card)
+            code_counter.observe(bjo.encode_card(card))
+        assert name_counter.get_counts() == code_counter.get_counts()
+        assert name_counter.get_running_count('Hi-Lo') == 0
+        assert name_counter.get_running_count('Wong Halves') == -0.5
+
+    def test_unsupported_counting_system_is_rejected(self):
+        with pytest.raises(ValueError):
+            bjcount.CardCounter(6, ['Red 7'])
+
+
+class TestTrueCount:
+    def test_true_count_divides_by_decks_remaining(self):
+        # Setup
+        test_counter = bjcount.CardCounter(6)
+        # Test - two decks' worth of cards dealt, running count of +8
+        for card_number in range(0, 104):
+            test_counter.observe('5S' if (card_number < 8) else '8S')
+        assert test_counter.get_decks_remaining() == 4
+        assert test_counter.get_true_count('Hi-Lo') == 2
+
+    def test_face_down_cards_leave_the_shoe_without_being_counted(self):
+        # Setup
+        test_counter = bjcount.CardCounter(1)
+        # Test
+        test_counter.observe_face_down()
+        assert (test_counter.cards_dealt, test_counter.cards_seen, test_counter.get_running_count()) == (1, 0, 0)
+        test_counter.reveal('3D')
+        assert (test_counter.cards_dealt, test_counter.cards_seen, test_counter.get_running_count()) == (1, 1, 1)
+
+
+class TestTableCounting:
+    def test_simulated_counts_match_a_rescan_of_the_cards_seen(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(2, {3: bjpol.RandomActionPolicy('Alex', rng=random.Random(1))},
+                                                            rng=random.Random(4), counting_system_names=list(bjcount.counting_systems))
+        test_counter = test_machine.card_counter
+        # Test - between rounds every dealt card is face up in the discard tray, except for the burn card
+        for round_number in range(0, 200):
+            test_machine.play_round()
+            seen_cards = test_machine.discard[1:]
+            assert test_counter.cards_dealt == len(test_machine.discard)
+            assert test_counter.cards_seen == len(seen_cards)
+            for counting_system_name in bjcount.counting_systems:
+                initial_running_count = bjcount.get_initial_running_count(counting_system_name, 2)
+                tags = bjcount.counting_systems[counting_system_name]['tags']
+                assert test_counter.get_running_count(counting_system_name) == initial_running_count + sum(
+                    tags[bjo.card_high_value(card)] for card in seen_cards)
+            if test_machine.state == bjfsm.GameState.SHUFFLING:
+                test_machine.step()
+                assert test_counter.cards_dealt == 1 # counter reset along with the shuffle, then the burn card
+                assert test_counter.cards_seen == 0
+
+    def test_hole_card_is_only_counted_after_the_round(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.MimicTheDealerPolicy('Alex')}, rng=random.Random(3))
+        while test_machine.state != bjfsm.GameState.DEALING:
+            test_machine.step()
+        # Test
+        test_machine.step()
+        assert test_machine.card_counter.cards_dealt == 5 # burn card, two player cards and two dealer cards
+        assert test_machine.card_counter.cards_seen == 3
+
+    def test_csm_table_count_resets_every_round(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.MimicTheDealerPolicy('Alex')}, rng=random.Random(3),
+                                                            card_storage='csm')
+        # Test
+        test_machine.run(20)
+        assert test_machine.card_counter.cards_dealt == 0
+
+    def test_counting_policy_ramps_bet_with_true_count(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.CardCountingPolicy('Alex', main_bet=5, bet_spread=4)})
+        test_policy = test_machine.seat_policies[1]
+        # Test
+        assert test_policy.get_main_bet(test_machine, None, 'center_seat') == 5
+        for card_number in range(0, 52):
+            test_machine.card_counter.observe('4C')
+        assert test_machine.card_counter.get_true_count() == pytest.approx(52/5)
+        assert test_policy.get_main_bet(test_machine, None, 'center_seat') == 20
+
+    def test_table_follows_only_the_counting_systems_it_is_asked_for(self):
+        # Setup
+        seat_policies = {1: bjpol.BasicStrategyPolicy('Alex'), 4: bjpol.CardCountingPolicy('Kim', counting_system_name='KO')}
+        # Test
+        assert bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.BasicStrategyPolicy('Alex')}).card_counter.counting_system_names == []
+        assert bjsim.SimulatedBlackjackStateMachine(6, seat_policies).card_counter.counting_system_names == ['KO']
+        assert bjsim.SimulatedBlackjackStateMachine(6, seat_policies, advantage_detector=bjadv.AdvantagePlayDetector()
+                                                    ).card_counter.counting_system_names == ['KO', 'Hi-Lo']
+        with pytest.raises(ValueError):
+            bjsim.SimulatedBlackjackStateMachine(6, seat_policies).card_counter.get_true_count('Hi-Lo')
+
+    def test_uncounted_table_still_tracks_the_cards_dealt(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.MimicTheDealerPolicy('Alex')}, rng=random.Random(3))
+        # Test
+        test_machine.run(20)
+        assert test_machine.card_counter.running_counts == []
+        assert test_machine.card_counter.cards_dealt == len(test_machine.discard)
@@ -0,0 +1,191 @@
+"""
+File: chip_ledger_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import random
+import pytest
+
+# Local Imports #
+import lib.blackjack_game_logic as bjl
+import lib.blackjack_policies as bjpol
+import lib.blackjack_simulator as bjsim
+import lib.chip_ledger as bjcl
+
+
+class TestCentConversions:
+    def test_chip_values_are_exact_cents(self):
+        assert bjcl.chip_cents['Pink'] == 250
+        assert bjcl.chip_cents['Brown'] == 500000
+        assert all(type(chip_value_cents) == int for chip_value_cents in bjcl.chip_values_cents)
+
+    def test_dollars_convert_to_cents_and_back_exactly(self):
+        assert bjcl.dollars_to_cents(37.5) == 3750
+        assert bjcl.dollars_to_cents(0.1) == 10
+        assert bjcl.cents_to_dollars(3750) == 37.5
+        assert bjcl.cents_to_dollars(3500) == 35
+        assert type(bjcl.cents_to_dollars(3500)) == int
+
+    def test_fractions_of_a_cent_are_rejected(self):
+        with pytest.raises(ValueError):
+            bjcl.dollars_to_cents(1.005)
+
+
+class TestChipBreakdown:
+    def test_half_dollar_amounts_use_exactly_one_pink_chip(self):
+        assert bjcl.get_chip_counts_for_cents(750) == [0, 1, 1, 0, 0, 0, 0, 0, 0]
+        assert bjcl.get_chip_counts_for_cents(350) == [1, 1, 0, 0, 0, 0, 0, 0, 0]
+
+    def test_whole_dollar_amounts_are_broken_down_largest_first(self):
+        assert bjcl.chip_counts_to_dict(bjcl.get_chip_counts_for_cents(13800)) == {
+            'White': 3, 'Pink': 0, 'Red': 0, 'Blue': 1, 'Green': 1, 'Black': 1, 'Purple': 0, 'Yellow': 0, 'Brown': 0}
+
+    def test_unpayable_amounts_return_none(self):
+        assert bjcl.get_chip_counts_for_cents(150) == None # $1.5 - less than a Pink chip
+        assert bjcl.get_chip_counts_for_cents(325) == None # not a multiple of 50 cents
+        assert bjcl.get_chip_counts_for_cents(750, bjcl.chip_dict_to_counts({'Red': 3})) == None # no Pink available
+        assert bjcl.get_chip_counts_for_cents(1000, bjcl.chip_dict_to_counts({'Red': 1, 'White': 4})) == None
+
+    def test_breakdown_respects_available_chips(self):
+        available_chip_counts = bjcl.chip_dict_to_counts({'White': 10, 'Red': 1})
+        assert bjcl.get_chip_counts_for_cents(1000, available_chip_counts) == bjcl.chip_dict_to_counts({'White': 5, 'Red': 1})
+
+    def test_breakdown_matches_amount_for_every_half_dollar_up_to_1000(self):
+        for amount_cents in range(250, 100001, 50):
+            amount_chip_counts = bjcl.get_chip_counts_for_cents(amount_cents)
+            assert bjcl.get_chip_counts_value_cents(amount_chip_counts) == amount_cents
+            assert amount_chip_counts[bjcl.pink_chip_index] == amount_cents % 100 // 50
+
+    def test_dollar_wrapper_matches_ledger(self):
+        assert bjl.get_chips_for_amount(7.5) == bjcl.chip_counts_to_dict(bjcl.get_chip_counts_for_cents(750))
+        assert bjl.get_chips_for_amount(1.5) == None
+
+
+class TestChangeMaking:
+    def test_payout_table_is_minimal_for_every_amount_up_to_300(self):
+        # Setup - an unlimited rack, so the bounded DP is free to find any combination
+        unlimited_chip_counts = [10000]*len(bjcl.chip_values_cents)
+        # Test
+        for amount_cents in range(250, 30001, 50):
+            table_chip_counts = bjcl.get_chip_counts_for_cents(amount_cents)
+            assert sum(table_chip_counts) == sum(bjcl.get_bounded_chip_counts(amount_cents, unlimited_chip_counts))
+
+    def test_largest_side_bet_win_is_a_table_lookup(self):
+        max_payout_cents = bjcl.max_payout_table_dollars*bjcl.cents_per_dollar
+        assert bjcl.get_chip_counts_for_cents(max_payout_cents) == bjcl.chip_dict_to_counts({'Brown': 20})
+        assert len(bjcl.payout_table) == (bjcl.max_payout_table_dollars+1)*len(bjcl.chip_values_cents)
+        assert bjcl.get_chip_counts_for_cents(max_payout_cents + 650) == bjcl.chip_dict_to_counts({'Brown': 20, 'White': 4, 'Pink': 1})
+
+    def test_short_rack_pays_with_fewest_available_chips(self):
+        # Setup - no Reds left, so $7.5 takes three Pinks and $30 takes a Green and a pair of Pinks rather than five Whites
+        available_chip_counts = bjcl.chip_dict_to_counts({'White': 20, 'Pink': 20, 'Blue': 1, 'Green': 1})
+        # Test
+        assert bjcl.get_chip_counts_for_cents(750, available_chip_counts) == bjcl.chip_dict_to_counts({'Pink': 3})
+        assert bjcl.get_chip_counts_for_cents(3000, available_chip_counts) == bjcl.chip_dict_to_counts({'Green': 1, 'Pink': 2})
+        assert bjcl.get_chip_counts_for_cents(4000, available_chip_counts) == bjcl.chip_dict_to_counts({'Green': 1, 'Blue': 1, 'Pink': 2})
+
+    def test_pure_python_fallback_matches_numpy(self, monkeypatch):
+        # Setup
+        available_chip_counts = bjcl.chip_dict_to_counts({'White': 7, 'Pink': 5, 'Red': 2, 'Blue': 3, 'Green': 4, 'Black': 1})
+        amounts_cents = range(0, 30001, 50)
+        numpy_chip_counts = [bjcl.get_bounded_chip_counts(amount_cents, available_chip_counts) for amount_cents in amounts_cents]
+        numpy_payout_table = bjcl.build_payout_table(2000)
+        monkeypatch.setattr(bjcl, 'np', None)
+        # Test
+        assert [bjcl.get_bounded_chip_counts(amount_cents, available_chip_counts) for amount_cents in amounts_cents] == numpy_chip_counts
+        assert bjcl.build_payout_table(2000).tolist() == numpy_payout_table.tolist()
+
+
+class TestChipExchanges:
+    def test_color_up_trades_for_fewest_chips_of_same_value(self):
+        # Setup
+        chip_counts = bjcl.chip_dict_to_counts({'White': 7, 'Pink': 3, 'Red': 9, 'Green': 6})
+        dealer_chip_counts = [100]*len(bjcl.chip_values_cents)
+        # Test
+        new_chip_counts = bjcl.get_color_up_chip_counts(chip_counts, dealer_chip_counts)
+        bjcl.exchange_chips(chip_counts, dealer_chip_counts, list(chip_counts), new_chip_counts)
+        assert chip_counts == bjcl.chip_dict_to_counts({'White': 2, 'Pink': 1, 'Red': 1, 'Black': 2})
+        assert bjcl.get_chip_counts_value_cents(chip_counts) == 20950
+        assert bjcl.get_chip_counts_value_cents(dealer_chip_counts) == 100*sum(bjcl.chip_values_cents)
+
+    def test_break_down_only_uses_requested_colors(self):
+        # Setup
+        black_chip = bjcl.chip_dict_to_counts({'Black': 1})
+        dealer_chip_counts = bjcl.chip_dict_to_counts({'Red': 50, 'Blue': 50, 'Green': 1})
+        # Test
+        assert bjcl.get_break_down_chip_counts(black_chip, ['Green', 'Red'], dealer_chip_counts) == bjcl.chip_dict_to_counts({'Green': 1, 'Red': 15})
+        assert bjcl.get_break_down_chip_counts(black_chip, ['Red'], dealer_chip_counts) == bjcl.chip_dict_to_counts({'Red': 20})
+        assert bjcl.get_break_down_chip_counts(black_chip, ['Green'], dealer_chip_counts) == None
+
+    def test_exchange_rejects_unequal_or_uncovered_trades(self):
+        # Setup
+        chip_counts = bjcl.chip_dict_to_counts({'Red': 2})
+        dealer_chip_counts = bjcl.chip_dict_to_counts({'White': 3})
+        # Test
+        with pytest.raises(ValueError):
+            bjcl.exchange_chips(chip_counts, dealer_chip_counts, bjcl.chip_dict_to_counts({'Red': 1}), bjcl.chip_dict_to_counts({'White': 4}))
+        with pytest.raises(ValueError):
+            bjcl.exchange_chips(chip_counts, dealer_chip_counts, bjcl.chip_dict_to_counts({'Red': 1}), bjcl.chip_dict_to_counts({'White': 5}))
+        assert chip_counts == bjcl.chip_dict_to_counts({'Red': 2})
+        assert dealer_chip_counts == bjcl.chip_dict_to_counts({'White': 3})
+
+    def test_batch_color_up_matches_coloring_up_one_player_at_a_time(self):
+        # Setup
+        chip_counts_batch = [bjcl.chip_dict_to_counts({'White': 30, 'Pink': 5}), bjcl.chip_dict_to_counts({'Red': 40, 'Green': 7}),
+                             bjcl.chip_dict_to_counts({'Blue': 12})]
+        dealer_chip_counts = [50]*len(bjcl.chip_values_cents)
+        # Test
+        expected_chip_counts_batch = [bjcl.get_color_up_chip_counts(chip_counts, dealer_chip_counts) for chip_counts in chip_counts_batch]
+        new_chip_counts_batch = bjcl.get_color_up_batch(chip_counts_batch, dealer_chip_counts)
+        bjcl.exchange_chips_batch(chip_counts_batch, dealer_chip_counts, new_chip_counts_batch)
+        assert chip_counts_batch == expected_chip_counts_batch
+        assert bjcl.get_chip_counts_value_cents(dealer_chip_counts) == 50*sum(bjcl.chip_values_cents)
+
+    def test_batch_color_up_falls_back_to_one_player_at_a_time(self):
+        # Setup - two players want a Black each but only one is at the table
+        chip_counts_batch = [bjcl.chip_dict_to_counts({'Green': 4}), bjcl.chip_dict_to_counts({'Green': 4})]
+        dealer_chip_counts = bjcl.chip_dict_to_counts({'Black': 1})
+        # Test
+        new_chip_counts_batch = bjcl.get_color_up_batch(chip_counts_batch, dealer_chip_counts)
+        bjcl.exchange_chips_batch(chip_counts_batch, dealer_chip_counts, new_chip_counts_batch)
+        assert chip_counts_batch == [bjcl.chip_dict_to_counts({'Black': 1}), bjcl.chip_dict_to_counts({'Green': 4})]
+        assert dealer_chip_counts == bjcl.chip_dict_to_counts({'Green': 4})
+
+    def test_simulated_players_color_up_at_round_end(self):
+        # Setup
+        seat_policies = {
+            1: bjpol.BasicStrategyPolicy('Alex', main_bet=5, color_up=True),
+            6: bjpol.RandomActionPolicy('Kim', main_bet=25, rng=random.Random(5), color_up=True)
+        }
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, seat_policies, rng=random.Random(2))
+        # Test
+        test_machine.run(500)
+        assert test_machine.simulation_stats['color_ups'] > 0
+        for seat_number in seat_policies:
+            player = test_machine.seated_players[seat_number]
+            assert bjcl.get_chip_counts_value_cents(player.chips) == player.chip_pool_cents
+            if test_machine.current_round_hands == []:
+                assert list(player.chips) == bjcl.get_chip_counts_for_cents(player.chip_pool_cents)
+
+
+class TestLedgerDrift:
+    def test_no_drift_after_long_simulation_with_half_dollar_payouts(self):
+        # Setup - $5 bets pay $7.5 on a Blackjack, so Pink chips change hands all the time
+        seat_policies = {
+            2: bjpol.BasicStrategyPolicy('Alex', main_bet=5),
+            5: bjpol.RandomActionPolicy('Kim', main_bet=5, rng=random.Random(3))
+        }
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, seat_policies, rng=random.Random(11))
+        test_machine.step()
+        players = [test_machine.seated_players[seat_number] for seat_number in seat_policies]
+        starting_wealth_cents = sum(player.chip_pool_cents + player.cash_cents for player in players)
+        # Test
+        test_machine.run(20000)
+        stats = test_machine.simulation_stats
+        wealth_cents = sum(player.chip_pool_cents + player.cash_cents for player in players)
+        assert stats['player_blackjacks'] > 0
+        assert wealth_cents - starting_wealth_cents == stats['total_won_cents'] - stats['total_lost_cents']
+        for participant in players + [test_machine.dealer]:
+            assert type(participant.chip_pool_cents) == int
+            assert bjcl.get_chip_counts_value_cents(participant.chips) == participant.chip_pool_cents
@@ -113,4 +113,29 @@ class TestSecondCut:
         shoe = bjo.get_shoe_of_n_decks(1)
         cut.first_cut(shoe)
         cut.second_cut(shoe, None)
-        assert 'back_cut_card' == shoe[-1]
\ No newline at end of file
+        assert 'back_cut_card' == shoe[-1]
+
+
+class TestShoeCuts:
+    def test_first_cut_rotates_shoe_without_adding_a_cut_card(self, monkeypatch):
+        shoe = bjo.Shoe(bjo.get_shoe_of_n_decks(1))
+        first_fifteen = shoe[0:15]
+        # Forcing first_cut_card_index to be 15
+        monkeypatch.setattr('random.randrange', lambda first, last, step: 15)
+        cut.first_cut(shoe)
+        assert len(shoe) == 52
+        assert shoe[-15:] == first_fifteen
+
+    def test_second_cut_places_cut_card_index_at_min_pen_depth_for_single_deck(self):
+        shoe = bjo.Shoe(bjo.get_shoe_of_n_decks(1))
+        cut.first_cut(shoe)
+        cut.second_cut(shoe, bjs.casino_deck_pen_percentage_bounds[1][0], verbose=False)
+        assert len(shoe) == 52
+        assert shoe.cut_card_index == 26
+
+    def test_second_cut_places_cut_card_index_in_valid_range_for_eight_decks(self):
+        shoe = bjo.Shoe(bjo.get_shoe_of_n_decks(8))
+        cut.first_cut(shoe)
+        pen = cut.second_cut(shoe, None, verbose=False)
+        assert pen in range(70, 91)
+        assert shoe.cut_card_index in range(291, 375)
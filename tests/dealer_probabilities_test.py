@@ -0,0 +1,97 @@
+"""
+File: dealer_probabilities_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import json
+import os
+import pytest
+
+# Local Imports #
+import lib.dealer_probabilities as bjdp
+
+
+class TestDealerOutcomeProbabilities:
+    def test_outcome_probabilities_add_up_to_one_for_every_up_card(self):
+        # Setup
+        dealer_probability_table = bjdp.build_dealer_probability_table(6, 'H17', True)
+        # Test
+        for up_card_name in bjdp.dealer_up_card_names:
+            assert sum(dealer_probability_table[up_card_name].values()) == pytest.approx(1.0)
+
+    def test_peeking_dealer_never_ends_with_blackjack(self):
+        # Setup
+        dealer_probability_table = bjdp.build_dealer_probability_table(2, 'S17', True)
+        # Test
+        for up_card_name in bjdp.dealer_up_card_names:
+            assert dealer_probability_table[up_card_name]['Blackjack'] == 0.0
+
+    def test_non_peeking_dealer_blackjack_chance_matches_hole_card_odds(self):
+        # Setup
+        dealer_probability_table = bjdp.build_dealer_probability_table(1, 'H17', False)
+        # Test
+        assert dealer_probability_table['A']['Blackjack'] == pytest.approx(16/51)
+        assert dealer_probability_table['10']['Blackjack'] == pytest.approx(4/51)
+        assert dealer_probability_table['9']['Blackjack'] == 0.0
+
+    def test_six_deck_bust_chances_match_published_figures(self):
+        # Setup
+        s17_table = bjdp.build_dealer_probability_table(6, 'S17', True)
+        h17_table = bjdp.build_dealer_probability_table(6, 'H17', True)
+        # Test
+        assert s17_table['6']['Bust'] == pytest.approx(0.4228, abs=0.0001)
+        assert h17_table['6']['Bust'] == pytest.approx(0.4393, abs=0.0001)
+        assert s17_table['7'] == h17_table['7'] # soft 17 can't be made around a 7 up card
+
+    def test_removed_cards_change_remaining_shoe_composition(self):
+        # Setup
+        full_value_counts = bjdp.get_shoe_value_counts(1)
+        # Test
+        assert full_value_counts == (4, 4, 4, 4, 4, 4, 4, 4, 16, 4)
+        assert bjdp.get_shoe_value_counts(1, ['AS', 'KH', '10D']) == (4, 4, 4, 4, 4, 4, 4, 4, 14, 3)
+        with pytest.raises(ValueError):
+            bjdp.get_shoe_value_counts(1, ['AS', 'AH', 'AD', 'AC', 'AS'])
+
+
+class TestDealerProbabilityCache:
+    def test_table_is_only_kept_in_memory_by_default(self, monkeypatch):
+        # Setup
+        bjdp.dealer_probability_tables.clear()
+        monkeypatch.setattr(bjdp, 'save_dealer_probability_table', lambda dealer_probability_table, cache_file_path: pytest.fail(cache_file_path))
+        # Test
+        dealer_probability_table = bjdp.get_dealer_probability_table(2, 'S17', True)
+        assert bjdp.get_dealer_probability_table(2, 'S17', True) is dealer_probability_table
+        bjdp.dealer_probability_tables.clear()
+
+    def test_table_is_saved_to_cache_dir_and_loaded_back(self, tmp_path):
+        # Setup
+        bjdp.dealer_probability_tables.clear()
+        built_table = bjdp.get_dealer_probability_table(4, 'S17', False, cache_dir=str(tmp_path))
+        bjdp.dealer_probability_tables.clear()
+        # Test
+        assert os.listdir(tmp_path) == ['4D_S17_no_peek.json']
+        assert bjdp.get_dealer_probability_table(4, 'S17', False, cache_dir=str(tmp_path)) == built_table
+
+    def test_cached_table_is_read_instead_of_rebuilt(self, tmp_path):
+        # Setup
+        bjdp.dealer_probability_tables.clear()
+        cached_table = bjdp.build_dealer_probability_table(8, 'H17', True)
+        cached_table['2']['Bust'] = 0.5 # marker that can only come from the file
+        with open(os.path.join(tmp_path, '8D_H17_peek.json'), 'w') as cache_file:
+            json.dump(cached_table, cache_file)
+        # Test
+        assert bjdp.get_dealer_probability_table(8, 'H17', True, cache_dir=str(tmp_path))['2']['Bust'] == 0.5
+        bjdp.dealer_probability_tables.clear()
+
+    def test_corrupt_cache_file_is_rebuilt(self, tmp_path):
+        # Setup
+        bjdp.dealer_probability_tables.clear()
+        with open(os.path.join(tmp_path, '1D_S17_peek.json'), 'w') as cache_file:
+            cache_file.write('{"2": ')
+        # Test
+        dealer_probability_table = bjdp.get_dealer_probability_table(1, 'S17', True, cache_dir=str(tmp_path))
+        assert dealer_probability_table == bjdp.build_dealer_probability_table(1, 'S17', True)
+        with open(os.path.join(tmp_path, '1D_S17_peek.json'), 'r') as cache_file:
+            assert json.load(cache_file) == dealer_probability_table
+        bjdp.dealer_probability_tables.clear()
@@ -0,0 +1,129 @@
+"""
+File: dealer_rack_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import random
+import pytest
+
+# Local Imports #
+import lib.blackjack_fsm as bjfsm
+import lib.blackjack_policies as bjpol
+import lib.blackjack_simulator as bjsim
+import lib.chip_ledger as bjcl
+import lib.dealer_rack as bjrack
+
+
+class TestRackThresholds:
+    def test_color_below_fill_level_is_filled_back_to_par(self):
+        # Setup
+        test_rack = bjrack.DealerRack([100]*9, [20]*9, [300]*9)
+        chip_counts = [100]*9
+        # Test
+        chip_counts[2] = 15
+        rack_change_cents = test_rack.record(chip_counts, bjcl.chip_dict_to_counts({'Red': 85}), 7)
+        assert chip_counts[2] == 100
+        assert rack_change_cents == 85*500
+        assert list(test_rack.events) == [bjrack.RackEvent(7, 'fill', 'Red', 85)]
+
+    def test_color_above_credit_level_is_credited_down_to_par(self):
+        # Setup
+        test_rack = bjrack.DealerRack([100]*9, [20]*9, [300]*9)
+        chip_counts = [100]*9
+        # Test
+        chip_counts[5] = 301
+        rack_change_cents = test_rack.record(chip_counts)
+        assert chip_counts[5] == 100
+        assert rack_change_cents == -201*10000
+        assert test_rack.get_report()['Black']['credits'] == 1
+
+    def test_fill_to_cover_brings_enough_chips_for_a_large_payout(self):
+        # Setup
+        test_rack = bjrack.DealerRack()
+        chip_counts = [1000]*9
+        # Test
+        filled_cents = test_rack.fill_to_cover(chip_counts, bjcl.chip_dict_to_counts({'Brown': 1200}))
+        assert chip_counts[8] == 2200
+        assert filled_cents == 1200*500000
+        assert test_rack.total_fills == 1
+
+    def test_event_log_keeps_only_latest_events(self):
+        # Setup
+        test_rack = bjrack.DealerRack([10]*9, [5]*9, [20]*9, max_logged_events=3)
+        chip_counts = [10]*9
+        # Test
+        for round_number in range(0, 10):
+            chip_counts[0] = 1
+            test_rack.record(chip_counts, None, round_number)
+        assert test_rack.total_fills == 10
+        assert [rack_event.round_number for rack_event in test_rack.events] == [7, 8, 9]
+
+
+class TestRackStatistics:
+    def test_mean_levels_match_recording_every_color_every_time(self):
+        # Setup
+        rng = random.Random(4)
+        lazy_rack = bjrack.DealerRack([1000]*9, [0]*9, [10**9]*9)
+        full_rack = bjrack.DealerRack([1000]*9, [0]*9, [10**9]*9)
+        chip_counts = [1000]*9
+        # Test
+        for record_number in range(0, 2000):
+            changed_chip_counts = [0]*9
+            chip_index = rng.randrange(0, 9)
+            changed_chip_counts[chip_index] = rng.randrange(1, 5)
+            chip_counts[chip_index] += rng.choice([-1, 1])*changed_chip_counts[chip_index]
+            lazy_rack.record(chip_counts, changed_chip_counts)
+            full_rack.record(chip_counts)
+        lazy_report, full_report = lazy_rack.get_report(), full_rack.get_report()
+        for chip_name in bjcl.chip_cents:
+            assert lazy_report[chip_name]['mean_level'] == pytest.approx(full_report[chip_name]['mean_level'])
+            assert lazy_report[chip_name]['min_level'] == full_report[chip_name]['min_level']
+            assert lazy_report[chip_name]['max_level'] == full_report[chip_name]['max_level']
+
+    def test_rack_depth_needed_to_never_fill_is_reported(self):
+        # Setup
+        test_rack = bjrack.DealerRack([100]*9, [50]*9, [300]*9)
+        chip_counts = [100]*9
+        # Test - 70 Reds paid out, filled back to 100, then 40 more paid out
+        chip_counts[2] = 30
+        test_rack.record(chip_counts)
+        chip_counts[2] -= 40
+        test_rack.record(chip_counts)
+        assert test_rack.get_report()['Red']['chips_to_never_fill'] == 110
+        assert test_rack.get_report()['Red']['fills'] == 1
+
+
+class TestTableRacks:
+    def test_simulated_rack_fills_and_credits_keep_chips_conserved(self):
+        # Setup - a shallow rack, so fills and credits happen all the time
+        seat_policies = {
+            2: bjpol.BasicStrategyPolicy('Alex', main_bet=25),
+            5: bjpol.RandomActionPolicy('Kim', main_bet=10, rng=random.Random(8))
+        }
+        test_rack = bjrack.DealerRack([20]*9, [10]*9, [30]*9)
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, seat_policies, rng=random.Random(6), dealer_rack=test_rack)
+        starting_dealer_cents = test_machine.dealer.chip_pool_cents
+        # Test
+        test_machine.run(3000)
+        stats = test_machine.simulation_stats
+        rack_report = test_rack.get_report()
+        filled_cents = sum(rack_report[chip_name]['chips_filled']*chip_cents for chip_name, chip_cents in bjcl.chip_cents.items())
+        credited_cents = sum(rack_report[chip_name]['chips_credited']*chip_cents for chip_name, chip_cents in bjcl.chip_cents.items())
+        players = [test_machine.seated_players[seat_number] for seat_number in seat_policies]
+        assert stats['rack_fills'] > 0 and stats['rack_credits'] > 0
+        assert stats['rack_fills'] == test_rack.total_fills and stats['rack_credits'] == test_rack.total_credits
+        assert bjcl.get_chip_counts_value_cents(test_machine.dealer.chips) == test_machine.dealer.chip_pool_cents
+        assert (test_machine.dealer.chip_pool_cents + sum(player.chip_pool_cents for player in players)
+                == starting_dealer_cents + filled_cents - credited_cents)
+
+    def test_interactive_dealer_rack_credits_chips_over_credit_level(self):
+        # Setup
+        test_machine = bjfsm.BlackjackStateMachine(8)
+        test_machine.dealer_rack = bjrack.DealerRack([1000]*9, [250]*9, [1005]*9)
+        test_machine.dealer.chips['Green'] += 10
+        test_machine.dealer.chip_pool_cents += 25000
+        # Test
+        test_machine.record_dealer_rack()
+        assert test_machine.dealer.chips['Green'] == 1000
+        assert test_machine.dealer.chip_pool_cents == 1000*sum(bjcl.chip_values_cents)
@@ -0,0 +1,136 @@
+"""
+File: ev_solver_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import random
+import time
+import pytest
+
+# Local Imports #
+import lib.ev_solver as bjev
+import lib.blackjack_game_objects as bjo
+import lib.blackjack_simulator as bjsim
+import lib.blackjack_policies as bjpol
+
+
+def get_mid_shoe_value_counts(num_of_decks, table_cards, num_of_dealt_cards, seed=1):
+    # Unseen cards of a shuffled shoe once num_of_dealt_cards and the cards on the table are out of it
+    shoe = bjo.get_shoe_of_n_decks(num_of_decks)
+    for card in table_cards:
+        shoe.remove(card)
+    random.Random(seed).shuffle(shoe)
+    return bjev.get_value_counts(shoe[num_of_dealt_cards:])
+
+
+class TestLRUCache:
+    def test_least_recently_used_entry_is_evicted_first(self):
+        # Setup
+        test_cache = bjev.LRUCache(2)
+        test_cache['a'] = 1
+        test_cache['b'] = 2
+        # Test
+        assert test_cache.get('a') == 1
+        test_cache['c'] = 3
+        assert ('b' not in test_cache) and ('a' in test_cache) and ('c' in test_cache)
+        assert len(test_cache) == 2
+        assert test_cache.get('b') == None
+        assert (test_cache.hits, test_cache.misses) == (1, 1)
+
+
+class TestCompositionDependentSolver:
+    def test_full_shoe_evs_match_known_values(self):
+        # Setup
+        test_solver = bjev.CompositionDependentSolver('S17')
+        value_counts = get_mid_shoe_value_counts(6, ['AH', '7D', '9C'], 0)
+        # Test - soft 18 against a 9 is worth about -0.10 to hit and -0.18 to stand
+        action_evs = test_solver.get_action_evs(['AH', '7D'], '9C', value_counts)
+        assert action_evs['hit'] == pytest.approx(-0.10, abs=0.01)
+        assert action_evs['stand'] == pytest.approx(-0.18, abs=0.01)
+        assert action_evs['double'] == pytest.approx(-0.29, abs=0.01)
+        assert action_evs['surrender'] == -0.5
+        assert 'split' not in action_evs
+
+    @pytest.mark.parametrize('hand, dealer_up_card', [(['8H', '8D'], 'AC'), (['2H', '2D'], '6C'), (['AH', 'AD'], '10C'),
+                                                      (['AH', '10D'], '9C'), (['2H', '3D', 'AS'], '7C')])
+    def test_vectorized_dealer_outcomes_match_dealer_recursion(self, monkeypatch, hand, dealer_up_card):
+        pytest.importorskip('numpy')
+        # Setup
+        value_counts = get_mid_shoe_value_counts(1, hand + [dealer_up_card], 25)
+        fast_action_evs = bjev.CompositionDependentSolver().get_action_evs(hand, dealer_up_card, value_counts)
+        monkeypatch.setattr(bjev, 'np', None)
+        slow_action_evs = bjev.CompositionDependentSolver().get_action_evs(hand, dealer_up_card, value_counts)
+        # Test
+        for action, action_ev in slow_action_evs.items():
+            assert fast_action_evs[action] == pytest.approx(action_ev, abs=1e-12)
+
+    def test_removed_tens_make_standing_on_stiff_hand_worse(self):
+        # Setup
+        test_solver = bjev.CompositionDependentSolver()
+        value_counts = list(get_mid_shoe_value_counts(6, ['10H', '6D', '6C'], 0))
+        ten_poor_value_counts = list(value_counts)
+        ten_poor_value_counts[8] -= 60
+        # Test - the dealer busts a 6 far less often once most 10s are gone
+        full_shoe_stand_ev = test_solver.get_action_evs(['10H', '6D'], '6C', value_counts)['stand']
+        ten_poor_stand_ev = test_solver.get_action_evs(['10H', '6D'], '6C', ten_poor_value_counts)['stand']
+        assert ten_poor_stand_ev < full_shoe_stand_ev - 0.1
+
+    def test_repeated_query_is_answered_from_memo(self):
+        # Setup
+        test_solver = bjev.CompositionDependentSolver()
+        value_counts = get_mid_shoe_value_counts(6, ['10H', '2D', '4C'], 150)
+        first_action_evs = test_solver.get_action_evs(['10H', '2D'], '4C', value_counts)
+        num_of_memo_entries = len(test_solver.memo)
+        # Test
+        assert test_solver.get_action_evs(['10H', '2D'], '4C', value_counts) == first_action_evs
+        assert len(test_solver.memo) == num_of_memo_entries
+        assert test_solver.memo.hits > 0
+
+    def test_bounded_memo_gives_same_evs(self):
+        # Setup
+        value_counts = get_mid_shoe_value_counts(6, ['5H', '4D', '7C'], 100)
+        unbounded_action_evs = bjev.CompositionDependentSolver().get_action_evs(['5H', '4D'], '7C', value_counts)
+        bounded_solver = bjev.CompositionDependentSolver(cache_size=50)
+        # Test
+        assert bounded_solver.get_action_evs(['5H', '4D'], '7C', value_counts) == pytest.approx(unbounded_action_evs)
+        assert len(bounded_solver.memo) <= 50
+
+    def test_best_action_respects_allowed_actions(self):
+        # Setup
+        test_solver = bjev.CompositionDependentSolver()
+        value_counts = get_mid_shoe_value_counts(6, ['6H', '5D', '6C'], 80)
+        # Test
+        assert test_solver.get_best_action(['6H', '5D'], '6C', value_counts, ['stand', 'hit', 'double']) == 'double'
+        assert test_solver.get_best_action(['6H', '5D'], '6C', value_counts, ['stand', 'hit']) == 'hit'
+
+    @pytest.mark.parametrize('hand, dealer_up_card', [(['2H', '2D'], '2C'), (['2H', '2D'], 'AC'), (['3H', '3D'], '2C'),
+                                                      (['AH', 'AD'], 'AC')])
+    def test_mid_shoe_decision_on_six_decks_takes_under_50ms(self, hand, dealer_up_card):
+        pytest.importorskip('numpy')
+        # Setup - dealer draw multisets are built once per up card and rule set, outside of any one decision
+        for up_card_value in range(2, 12):
+            bjev.get_dealer_draw_multiset_contraction(up_card_value, 'H17', True)
+        value_counts = get_mid_shoe_value_counts(6, hand + [dealer_up_card], 100)
+        # Test - low pairs against a 2 or an Ace are the slowest decisions (the most cards to draw, split or not and
+        # for the dealer), each timed on a new solver - best of 3, so that a busy machine doesn't fail the test
+        decision_times = []
+        for _ in range(0, 3):
+            test_solver = bjev.CompositionDependentSolver()
+            start_time = time.perf_counter()
+            test_solver.get_action_evs(hand, dealer_up_card, value_counts)
+            decision_times.append(time.perf_counter() - start_time)
+        assert min(decision_times) < 0.05
+
+
+class TestUnseenCards:
+    def test_unseen_cards_are_undealt_shoe_and_dealer_hole_card(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(2, {1: bjpol.NeverBustPolicy('Alex')})
+        while test_machine.state != bjsim.GameState.PRE_SCORING:
+            test_machine.step()
+        # Test
+        value_counts = bjev.get_unseen_value_counts(test_machine)
+        assert sum(value_counts) == len(test_machine.shoe) + 1
+        hole_card = test_machine.get_dealer_hand()[1]
+        assert list(value_counts) == list(bjev.get_value_counts(list(test_machine.shoe) + [hole_card]))
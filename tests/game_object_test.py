@@ -105,4 +105,78 @@ class TestDeckBuilder:
         assert len(built_shoe) == 52*8
         # Check each card is encountered only once for a single deck shoe
         for card in card_occurrences.keys():
-            assert card_occurrences[card] == 8
\ No newline at end of file
+            assert card_occurrences[card] == 8
+
+
+class TestCardEncoding:
+    def test_every_card_round_trips_through_its_card_code(self):
+        for card in bjo.base_deck:
+            assert bjo.decode_card(bjo.encode_card(card)) == card
+
+    def test_card_codes_carry_rank_suit_and_value(self):
+        # Setup
+        ten_of_hearts = bjo.encode_card('10H')
+        ace_of_spades = bjo.encode_card('AS')
+        # Test
+        assert bjo.card_rank_name(ten_of_hearts) == '10'
+        assert bjo.card_suits[bjo.card_suit_index(ten_of_hearts)] == 'H'
+        assert bjo.card_high_value(ten_of_hearts) == bjo.card_low_value(ten_of_hearts) == 10
+        assert bjo.card_color(ten_of_hearts) == 'Red'
+        assert bjo.card_rank_index(ace_of_spades) == bjo.ace_rank_index
+        assert bjo.card_high_value(ace_of_spades) == 11
+        assert bjo.card_low_value(ace_of_spades) == 1
+        assert bjo.card_color(ace_of_spades) == 'Black'
+
+    def test_encoded_six_deck_shoe_built_correctly(self):
+        built_shoe = bjo.get_encoded_shoe_of_n_decks(6)
+        assert len(built_shoe) == 52*6
+        assert sorted(bjo.decode_hand(built_shoe)) == sorted(bjo.base_deck*6)
+
+
+class TestShoe:
+    def test_drawing_advances_cursor_without_moving_remaining_cards(self):
+        # Setup
+        cards = bjo.get_shoe_of_n_decks(1)
+        shoe = bjo.Shoe(cards)
+        # Test
+        assert shoe.draw() == cards[0]
+        assert shoe.pop(0) == cards[1]
+        assert len(shoe) == 50
+        assert shoe[0] == cards[2]
+        assert shoe[-1] == cards[-1]
+        assert list(shoe) == cards[2:]
+        assert shoe.cards_dealt() == 2
+
+    def test_cut_card_is_reached_once_first_card_behind_it_is_dealt(self):
+        # Setup
+        shoe = bjo.Shoe(bjo.get_shoe_of_n_decks(1))
+        shoe.place_cut_card(26)
+        # Test
+        for x in range(0, 26):
+            shoe.draw()
+        assert not shoe.cut_card_reached()
+        shoe.draw()
+        assert shoe.cut_card_reached()
+        assert round(shoe.penetration()) == 52
+
+    def test_pulling_a_card_in_front_of_cut_card_keeps_cut_card_behind_same_cards(self):
+        # Setup
+        shoe = bjo.Shoe(bjo.get_shoe_of_n_decks(1))
+        shoe.place_cut_card(26)
+        card_behind_cut_card = shoe[26]
+        # Test
+        shoe.remove(shoe[3])
+        assert len(shoe) == 51
+        assert shoe[shoe.cut_card_index] == card_behind_cut_card
+
+    def test_shuffle_gathers_remaining_cards_and_removes_cut_card(self):
+        # Setup
+        shoe = bjo.Shoe(bjo.get_shoe_of_n_decks(1))
+        shoe.place_cut_card(26)
+        discard = [shoe.draw() for x in range(0, 30)]
+        # Test
+        shoe.extend(discard)
+        shoe.shuffle()
+        assert shoe.cut_card_index == None
+        assert shoe.cards_dealt() == 0
+        assert sorted(shoe) == sorted(bjo.base_deck)
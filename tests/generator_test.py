@@ -4,6 +4,7 @@ Author: Alexander Bulanov
 """
 
 ### Imports ###
+import math
 import lib.blackjack_game_objects as bjo
 import lib.blackjack_game_logic as bjl
 
@@ -34,4 +35,39 @@ def test_all_three_card_combinations_created_correctly():
     # Iterate over counts of how many times each card has been used in a combination (expected value is 51 for each)
     for card in card_occurrence_counts:
         #print(card, 'has been used', card_occurrence_counts[card], 'times; 51 expected')
-        assert card_occurrence_counts[card] == 1275 #1275 is equivalent to 1 Choose 1 * 51 Choose 2
\ No newline at end of file
+        assert card_occurrence_counts[card] == 1275 #1275 is equivalent to 1 Choose 1 * 51 Choose 2
+
+
+### Multi-Deck and Rank-Multiset Generators ###
+def test_two_card_combinations_of_two_deck_shoe_count_every_physical_pair():
+    generated_pair_count = 0
+    matching_ace_of_spades_pairs = 0
+    for card_pair in bjl.all_card_combinations(2, num_of_decks=2):
+        generated_pair_count += 1
+        if card_pair == ('AS', 'AS'):
+            matching_ace_of_spades_pairs += 1
+    assert generated_pair_count == math.comb(104, 2)
+    assert matching_ace_of_spades_pairs == 1
+
+
+def test_card_combination_generator_streams_without_enumerating_whole_shoe():
+    card_triples = bjl.all_card_combinations(3, num_of_decks=8)
+    assert len(next(card_triples)) == 3
+
+
+def test_rank_combination_weights_add_up_to_all_card_combinations():
+    for num_of_decks in [1, 6, 8]:
+        for combination_size in [2, 3]:
+            total_weight = sum(weight for ranks, weight in bjl.all_rank_combinations(combination_size, num_of_decks))
+            assert total_weight == math.comb(52*num_of_decks, combination_size)
+
+
+def test_rank_combinations_match_single_deck_card_combinations():
+    # Tally physical three-card combinations by rank multiset and compare against the yielded weights
+    rank_combination_counts = {}
+    for card_triple in bjl.all_three_card_combinations_single_deck():
+        ranks = tuple(sorted((card[:-1] for card in card_triple), key=bjo.card_names.index))
+        rank_combination_counts[ranks] = rank_combination_counts.get(ranks, 0) + 1
+    for ranks, weight in bjl.all_rank_combinations(3):
+        assert rank_combination_counts.pop(ranks) == weight
+    assert rank_combination_counts == {}
@@ -4,11 +4,12 @@ Author: Alexander Bulanov
 """
 
 # Global Imports #
-
+import tracemalloc
 
 # Local Imports #
 import lib.blackjack_players as bjp
 import lib.blackjack_game_objects as bjo
+import lib.chip_ledger as bjcl
 
 
 class TestPlayerCreation:
@@ -17,9 +18,9 @@ class TestPlayerCreation:
         tri_seat_player_attributes = [
             'occupied_seats',
             'main_bets',
-            'main_bet_amounts',
+            'main_bet_cents',
             'side_bets',
-            'side_bet_amounts',
+            'side_bet_cents',
             'hands',
             'hand_scores'
             ]
@@ -46,9 +47,9 @@ class TestPlayerCreation:
         tri_seat_player_attributes = [
             'occupied_seats',
             'main_bets',
-            'main_bet_amounts',
+            'main_bet_cents',
             'side_bets',
-            'side_bet_amounts',
+            'side_bet_cents',
             'hands',
             'hand_scores'
             ]
@@ -92,14 +93,24 @@ class TestPlayerCreation:
         assert test_player.player_has_no_side_bets_in_play()
         assert test_player.player_has_no_cards_in_play()
 
+    def test_new_players_share_no_seat_lists(self):
+        # Setup
+        test_player = bjp.Player.create_new_player_from_template('abulanov', 1)
+        other_test_player = bjp.Player.create_new_player_from_template('Alex', 2)
+        # Test
+        test_player.side_bets['center_seat'].append({'Red': 1})
+        assert test_player.side_bets['right_seat'] == []
+        assert other_test_player.side_bets['center_seat'] == []
+        assert other_test_player.occupied_seats == {'right_seat': None, 'center_seat': 2, 'left_seat': None}
+
 class TestPlayerBetting:
     def test_initial_bet_is_empty(self):
         # Setup
         tri_seat_player_bet_attributes = [
             'main_bets',
-            'main_bet_amounts',
+            'main_bet_cents',
             'side_bets',
-            'side_bet_amounts',
+            'side_bet_cents',
             ]
         test_username = 'abulanov'
         test_seat = 1
@@ -162,7 +173,7 @@ class TestPlayerBetting:
         # Verify test_player chip_pool_balance has been reduced by $5
         assert test_player.chip_pool_balance == 500-101
         # Verify center_seat spot of test_player has main_bet value of $5
-        assert test_player.main_bet_amounts['center_seat'] == 101
+        assert test_player.main_bet_cents['center_seat'] == 10100
 
     def test_single_seat_adding_one_Pink_chip_prints_fractional_bet_error_message_and_moves_Pink_chip_correctly(self, monkeypatch, capfd):
         ## Setup ##
@@ -197,7 +208,7 @@ class TestPlayerBetting:
         # Verify test_player chip_pool_balance has been reduced by $5
         assert test_player.chip_pool_balance == 500-2.5
         # Verify center_seat spot of test_player has main_bet value of $5
-        assert test_player.main_bet_amounts['center_seat'] == 2.5
+        assert test_player.main_bet_cents['center_seat'] == 250
 
     def test_single_seat_adding_two_Pink_chips_submits_a_valid_5_usd_bet(self, monkeypatch):
         ## Setup ##
@@ -229,7 +240,7 @@ class TestPlayerBetting:
         # Verify test_player chip_pool_balance has been reduced by $5
         assert test_player.chip_pool_balance == 500-5
         # Verify center_seat spot of test_player has main_bet value of $5
-        assert test_player.main_bet_amounts['center_seat'] == 5
+        assert test_player.main_bet_cents['center_seat'] == 500
 
     def test_single_seat_adding_one_of_each_White_Red_Blue_Green_chips_handled_correctly(self, monkeypatch):
         ## Setup ##
@@ -273,7 +284,7 @@ class TestPlayerBetting:
         # Verify test_player chip_pool_balance has been reduced by $41
         assert test_player.chip_pool_balance == 500-41
         # Verify center_seat spot of test_player has main_bet value of $41
-        assert test_player.main_bet_amounts['center_seat'] == 41
+        assert test_player.main_bet_cents['center_seat'] == 4100
 
     def test_single_seat_adding_one_of_each_non_Pink_chip_only_adds_White_Red_Blue_Green_for_template_player(self, monkeypatch):
         ## Setup ##
@@ -317,7 +328,7 @@ class TestPlayerBetting:
         # Verify test_player chip_pool_balance has been reduced by $41
         assert test_player.chip_pool_balance == 500-41
         # Verify center_seat spot of test_player has main_bet value of $41
-        assert test_player.main_bet_amounts['center_seat'] == 41
+        assert test_player.main_bet_cents['center_seat'] == 4100
 
     def test_single_seat_adding_one_of_each_chip_then_removing_all_but_one_White_handled_correctly(self, monkeypatch):
         ## Setup ##
@@ -362,7 +373,7 @@ class TestPlayerBetting:
         # Verify test_player chip_pool_balance has been reduced by $1
         assert test_player.chip_pool_balance == 500-1
         # Verify center_seat spot of test_player has main_bet value of $1
-        assert test_player.main_bet_amounts['center_seat'] == 1
+        assert test_player.main_bet_cents['center_seat'] == 100
         
     def test_single_seat_adding_one_of_each_chip_then_resetting_bet_and_adding_two_Green_handled_correctly(self, monkeypatch):
         ## Setup ##
@@ -406,7 +417,7 @@ class TestPlayerBetting:
         # Verify test_player chip_pool_balance has been reduced by $50
         assert test_player.chip_pool_balance == 500-50
         # Verify center_seat spot of test_player has main_bet value of $50
-        assert test_player.main_bet_amounts['center_seat'] == 50
+        assert test_player.main_bet_cents['center_seat'] == 5000
 
     def test_single_seat_betting_one_Red_two_Pink_chips_has_correct_chip_pool_balance_and_bet_amounts_as_ints(self, monkeypatch):
         ## Setup ##
@@ -427,8 +438,8 @@ class TestPlayerBetting:
         assert test_player.chip_pool_balance == 500-10
         assert type(test_player.chip_pool_balance) == int
         # Verify center_seat spot of test_player has main_bet value of $10 and is an int() datatype
-        assert test_player.main_bet_amounts['center_seat'] == 10
-        assert type(test_player.main_bet_amounts['center_seat']) == int
+        assert test_player.main_bet_cents['center_seat'] == 1000
+        assert type(test_player.main_bet_cents['center_seat']) == int
 
     def test_single_seat_betting_one_Blue_Green_Pink_remove_Pink_has_correct_chip_pool_balance_and_bet_amounts_as_ints(self, monkeypatch):
         ## Setup ##
@@ -449,8 +460,8 @@ class TestPlayerBetting:
         assert test_player.chip_pool_balance == 500-35
         assert type(test_player.chip_pool_balance) == int
         # Verify center_seat spot of test_player has main_bet value of $35 and is an int() datatype
-        assert test_player.main_bet_amounts['center_seat'] == 35
-        assert type(test_player.main_bet_amounts['center_seat']) == int
+        assert test_player.main_bet_cents['center_seat'] == 3500
+        assert type(test_player.main_bet_cents['center_seat']) == int
 
     def test_single_seat_betting_one_Blue_Green_Pink_reset_then_betting_one_Green_has_correct_chip_pool_balance_and_bet_amounts_as_ints(self, monkeypatch):
         ## Setup ##
@@ -471,5 +482,88 @@ class TestPlayerBetting:
         assert test_player.chip_pool_balance == 500-25
         assert type(test_player.chip_pool_balance) == int
         # Verify center_seat spot of test_player has main_bet value of $25 and is an int() datatype
-        assert test_player.main_bet_amounts['center_seat'] == 25
-        assert type(test_player.main_bet_amounts['center_seat']) == int
+        assert test_player.main_bet_cents['center_seat'] == 2500
+        assert type(test_player.main_bet_cents['center_seat']) == int
+
+    def test_pink_chip_bets_are_kept_in_whole_cents(self):
+        # Setup
+        test_player = bjp.Player.create_new_player_from_template('abulanov', 1)
+        test_player.init_main_bet_fields('center_seat')
+        for key in ['2', '2', '2']:
+            test_player.increase_current_bet('center_seat', None, key)
+        test_player.decrease_current_bet('center_seat', None, '@')
+        # Test
+        assert test_player.main_bet_cents['center_seat'] == 500
+        assert test_player.chip_pool_cents == 50000-500
+        assert test_player.main_bet_cents['center_seat'] == 500
+        assert test_player.chip_pool_balance == 495
+        test_player.reset_current_bet('center_seat', None)
+        assert test_player.main_bet_cents['center_seat'] == 0
+        assert test_player.chip_pool_cents == bjcl.get_chip_counts_value_cents(bjcl.chip_dict_to_counts(test_player.chips))
+
+
+class TestSimulatedPlayers:
+    def test_simulated_player_seats_and_chip_counts_created_correctly(self):
+        # Setup
+        test_player = bjp.SimulatedPlayer('Alex', 3)
+        test_dealer = bjp.SimulatedPlayer.create_casino_dealer()
+        # Test
+        assert [seat.seat_number for seat in test_player.seats] == [None, 3, None]
+        assert test_player.get_occupied_seats() == [test_player.get_seat('center_seat')]
+        assert len(test_player.chips) == len(bjo.chip_names) and sum(test_player.chips) == 0
+        assert test_dealer.get_seat('center_seat').seat_number == 8
+        assert test_dealer.get_chips_dict()['Pink'] == 1000
+        assert test_dealer.chip_pool_balance == 1000*(1+2.5+5+10+25+100+500+1000+5000)
+
+    def test_simulated_player_takes_under_one_kilobyte(self):
+        # Setup
+        tracemalloc.start()
+        starting_memory = tracemalloc.get_traced_memory()[0]
+        test_players = [bjp.SimulatedPlayer(f"Player {player_number}", 1) for player_number in range(0, 10000)]
+        memory_per_player = (tracemalloc.get_traced_memory()[0] - starting_memory)/len(test_players)
+        tracemalloc.stop()
+        # Test
+        assert memory_per_player < 1024
+
+
+class TestPlayerChipExchanges:
+    def test_player_colors_up_and_breaks_down_chips_with_dealer(self):
+        # Setup
+        test_player = bjp.Player.create_new_player_from_template('Alex', 2)
+        test_dealer = bjp.Player.create_casino_dealer()
+        starting_chip_pool_balances = (test_player.chip_pool_balance, test_dealer.chip_pool_balance)
+        # Test
+        test_player.color_up(test_dealer)
+        assert test_player.chips == {**dict.fromkeys(bjo.chip_names, 0), 'Purple': 1} # $500 template chip pool
+        test_player.break_down(test_dealer)
+        assert test_player.chips['Purple'] == 0 and test_player.chips['Black'] == 5
+        test_player.break_down(test_dealer, 'Black', ['Green', 'Red'])
+        assert test_player.chips['Black'] == 4 and test_player.chips['Green'] == 4
+        assert (test_player.chip_pool_balance, test_dealer.chip_pool_balance) == starting_chip_pool_balances
+
+    def test_player_buys_chips_from_dealer_with_cash(self):
+        # Setup
+        test_player = bjp.Player.create_new_player_from_template('Alex', 2)
+        test_dealer = bjp.Player.create_casino_dealer()
+        starting_chip_pool_balance = test_player.chip_pool_balance
+        # Test
+        test_player.get_chips(test_dealer, 37.5)
+        assert test_player.cash_balance == 62.5
+        assert test_player.chip_pool_balance == starting_chip_pool_balance + 37.5
+        assert test_dealer.cash_balance == 10037.5
+
+    def test_betting_keys_exchange_chips_with_the_dealer_handed_over(self, monkeypatch):
+        # Setup
+        test_player = bjp.Player.create_new_player_from_template('Alex', 2)
+        test_dealer = bjp.Player.create_casino_dealer()
+        test_player.init_main_bet_fields('center_seat')
+        iterable_simulated_char_inputs = iter([b'g', b'c', b'b'])
+        monkeypatch.setattr('msvcrt.getch', lambda: next(iterable_simulated_char_inputs))
+        # Test
+        test_player.get_bet_input_character(1, 100, 'center_seat', None, test_dealer, 10)
+        assert (test_player.cash_balance, test_player.chip_pool_balance) == (90, 510)
+        test_player.get_bet_input_character(1, 100, 'center_seat', None, test_dealer, 10)
+        assert test_player.chips == {**dict.fromkeys(bjo.chip_names, 0), 'Purple': 1, 'Blue': 1}
+        test_player.get_bet_input_character(1, 100, 'center_seat', None, test_dealer, 10)
+        assert test_player.chips['Purple'] == 0 and test_player.chips['Black'] == 5
+        assert test_player.chip_pool_balance == 510
@@ -0,0 +1,87 @@
+"""
+File: rng_backends_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import time
+import pytest
+
+# Local Imports #
+import lib.rng_backends as bjrng
+import lib.blackjack_game_objects as bjo
+import lib.blackjack_game_settings as bjs
+import lib.blackjack_simulator as bjsim
+import lib.blackjack_policies as bjpol
+
+
+class TestRandomBackends:
+    def test_backend_missing_a_method_is_rejected_when_created(self):
+        # Setup
+        class ShuffleOnlyBackend(bjrng.RandomBackend):
+            def shuffle(self, cards):
+                cards.reverse()
+        # Test
+        with pytest.raises(TypeError):
+            ShuffleOnlyBackend()
+
+    @pytest.mark.parametrize('backend_name', ['python', 'numpy'])
+    def test_seeded_backend_replays_same_shoe(self, backend_name):
+        if backend_name == 'numpy':
+            pytest.importorskip('numpy')
+        # Setup
+        first_shoe = bjo.get_encoded_shoe_of_n_decks(8, bjrng.create_rng(backend_name, 99))
+        second_shoe = bjo.get_encoded_shoe_of_n_decks(8, bjrng.create_rng(backend_name, 99))
+        # Test
+        assert first_shoe == second_shoe
+        assert sorted(first_shoe) == sorted(bjo.encode_hand(bjo.base_deck*8))
+        assert first_shoe != bjo.get_encoded_shoe_of_n_decks(8, bjrng.create_rng(backend_name, 100))
+
+    @pytest.mark.parametrize('backend_name', ['python', 'numpy'])
+    def test_randrange_stays_within_bounds(self, backend_name):
+        if backend_name == 'numpy':
+            pytest.importorskip('numpy')
+        # Setup
+        rng = bjrng.create_rng(backend_name, 1)
+        # Test
+        drawn_values = {rng.randrange(65, 85) for draw in range(0, 2000)}
+        assert drawn_values == set(range(65, 85))
+        assert {rng.randrange(0, 10, 5) for draw in range(0, 100)} == {0, 5}
+        assert 0 <= rng.getrandbits(64) < 2**64
+
+    def test_numpy_backend_shuffles_eight_deck_shoe_in_microseconds(self):
+        pytest.importorskip('numpy')
+        # Setup
+        rng = bjrng.create_rng('numpy', 5)
+        shoe = bjo.get_encoded_shoe_of_n_decks(8, rng)
+        # Test
+        start_time = time.perf_counter()
+        for shuffle_number in range(0, 1000):
+            rng.shuffle(shoe)
+        assert (time.perf_counter() - start_time)/1000 < 200e-6
+
+    def test_unsupported_backend_raises_error(self):
+        with pytest.raises(ValueError):
+            bjrng.create_rng('dice', 1)
+
+    def test_seeded_table_with_numpy_backend_is_replayable(self):
+        pytest.importorskip('numpy')
+        # Setup
+        first_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.BasicStrategyPolicy('Alex')}, rng=bjrng.create_rng('numpy', 3))
+        second_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.BasicStrategyPolicy('Alex')}, rng=bjrng.create_rng('numpy', 3))
+        # Test
+        assert first_machine.run(200) == second_machine.run(200)
+        assert first_machine.pen == second_machine.pen
+
+
+class TestImportTimeRandomness:
+    def test_base_deck_is_in_fixed_order(self):
+        assert bjo.base_deck[:3] == ['2C', '3C', '4C']
+        assert bjo.base_deck[-1] == 'AS'
+
+    def test_pen_percentage_is_drawn_within_bounds_from_given_rng(self):
+        # Setup
+        first_pen_percentage = bjs.get_random_pen_percentage(6, bjrng.create_rng('python', 8))
+        # Test
+        assert first_pen_percentage == bjs.get_random_pen_percentage(6, bjrng.create_rng('python', 8))
+        assert 65 <= first_pen_percentage < 85
@@ -0,0 +1,154 @@
+"""
+File: round_log_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import os
+import random
+import numpy as np
+import pytest
+
+# Local Imports #
+import lib.advantage_detection as bjadv
+import lib.blackjack_game_objects as bjo
+import lib.blackjack_policies as bjpol
+import lib.blackjack_simulator as bjsim
+import lib.round_log as bjlog
+
+
+def get_test_seat_policies():
+    return {
+        1: bjpol.RandomActionPolicy('Alex', main_bet=10, rng=random.Random(1)),
+        4: bjpol.CardCountingPolicy('Kim', main_bet=5),
+        7: bjpol.BasicStrategyPolicy('Ahmed', main_bet=25)
+    }
+
+
+def play_logged_rounds(log_path, num_of_rounds, seed, card_storage='shoe'):
+    with bjlog.RoundLogWriter(log_path, buffered_rounds=100) as round_log:
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, get_test_seat_policies(), rng=random.Random(seed),
+                                                            card_storage=card_storage, round_log=round_log)
+        test_machine.step()
+        starting_wealths = {seat_number: player.cash_cents + player.chip_pool_cents
+                            for seat_number, player in test_machine.seated_players.items() if player != None}
+        test_machine.run(num_of_rounds)
+    return test_machine, starting_wealths
+
+
+class TestRoundRecords:
+    def test_record_layout_matches_numpy_dtype(self):
+        assert bjlog.round_record_dtype.itemsize == bjlog.round_record_size
+
+    def test_every_card_survives_a_round_trip_through_its_byte(self):
+        for card_name, card_code in bjo.card_codes.items():
+            card_byte = bjlog.get_card_byte(card_name)
+            assert 0 < card_byte < 256
+            assert bjlog.get_card_code(card_byte) == card_code
+
+    def test_file_that_is_not_a_round_log_is_rejected(self, tmp_path):
+        # Setup
+        log_path = os.path.join(tmp_path, 'rounds.bin')
+        with open(log_path, 'wb') as log_file:
+            log_file.write(b'NOTALOG!' + bytes(100))
+        # Test
+        with pytest.raises(ValueError):
+            bjlog.read_round_log(log_path)
+        with pytest.raises(ValueError):
+            bjlog.RoundLogWriter(log_path)
+
+
+class TestSimulatedRoundLog:
+    def test_logged_payouts_add_up_to_every_players_winnings(self, tmp_path):
+        # Setup
+        log_path = os.path.join(tmp_path, 'rounds.bin')
+        test_machine, starting_wealths = play_logged_rounds(log_path, 2000, 3)
+        # Test
+        round_records = bjlog.read_round_log(log_path)
+        assert isinstance(round_records, np.memmap)
+        assert list(round_records['round_number']) == list(range(0, 2000))
+        for seat_number, starting_wealth in starting_wealths.items():
+            player = test_machine.seated_players[seat_number]
+            assert round_records['net_cents'][:, seat_number - 1].sum() == player.cash_cents + player.chip_pool_cents - starting_wealth
+        assert set(round_records['main_bets_cents'][:, 0]) == {1000}
+        assert set(round_records['player_ids'][:, 1]) == {-1} # empty seat
+        assert (round_records['dealer_up_card'] > 0).all()
+
+    def test_logged_cards_rebuild_the_shoe_in_dealing_order(self, tmp_path):
+        # Setup
+        log_path = os.path.join(tmp_path, 'rounds.bin')
+        test_machine, starting_wealths = play_logged_rounds(log_path, 500, 4)
+        round_records = bjlog.read_round_log(log_path)
+        # Test - rounds of the last shoe, which is still in the shoe's card list
+        last_shoe_records = round_records[round_records['shoe_number'] == round_records['shoe_number'][-1]]
+        shoe_cards = [bjlog.get_card_code(last_shoe_records[0]['burn_card'])]
+        for round_record in last_shoe_records:
+            assert round_record['shoe_position'] == len(shoe_cards)
+            shoe_cards.extend(bjlog.get_round_cards(round_record))
+        assert shoe_cards == test_machine.shoe.cards[:test_machine.shoe.cursor]
+        assert last_shoe_records[0]['first_cut_index'] == test_machine.first_cut_index
+        assert last_shoe_records[0]['cut_card_index'] == test_machine.shoe.cut_card_index
+        assert last_shoe_records[0]['pen_percentage'] == test_machine.pen
+
+    def test_continuous_shuffling_machine_rounds_are_logged(self, tmp_path):
+        # Setup
+        log_path = os.path.join(tmp_path, 'rounds.bin')
+        test_machine, starting_wealths = play_logged_rounds(log_path, 300, 5, 'csm')
+        round_records = bjlog.read_round_log(log_path)
+        # Test
+        assert set(round_records['shoe_number']) == {0}
+        assert round_records['num_of_cards'].sum() == test_machine.shoe.cards_dealt()
+        for round_record in round_records[:20]:
+            round_actions = bjlog.get_round_actions(round_record)
+            assert len(round_actions) == round_record['num_of_actions']
+            assert set(round_actions) <= {'stand', 'hit', 'double', 'split', 'surrender'}
+
+    def test_appending_to_a_log_carries_on_its_numbering(self, tmp_path):
+        # Setup
+        log_path = os.path.join(tmp_path, 'rounds.bin')
+        play_logged_rounds(log_path, 300, 6)
+        first_session_shoes = int(bjlog.read_round_log(log_path)['shoe_number'][-1])
+        with open(log_path, 'ab') as log_file:
+            log_file.write(bytes(10)) # a record cut off mid-write
+        # Test
+        play_logged_rounds(log_path, 200, 7)
+        round_records = bjlog.read_round_log(log_path)
+        assert os.path.getsize(log_path) == bjlog.log_header_size + 500*bjlog.round_record_size
+        assert list(round_records['round_number']) == list(range(0, 500))
+        assert round_records['shoe_number'][300] == first_session_shoes + 1
+
+    def test_main_bet_columns_feed_advantage_detection(self, tmp_path):
+        # Setup
+        log_path = os.path.join(tmp_path, 'rounds.bin')
+        test_detector = bjadv.AdvantagePlayDetector()
+        with bjlog.RoundLogWriter(log_path) as round_log:
+            test_machine = bjsim.SimulatedBlackjackStateMachine(6, get_test_seat_policies(), rng=random.Random(8),
+                                                                advantage_detector=test_detector, round_log=round_log)
+            test_machine.run(2000)
+        # Test - the log's float32 true counts give the same picture as the live detector
+        log_detector = bjadv.analyze_round_chunks(bjlog.get_main_bet_columns(round_records)
+                                                  for round_records in bjlog.iter_round_chunks(bjlog.read_round_log(log_path), 700))
+        live_report, log_report = test_detector.get_report(), log_detector.get_report()
+        for player_id, player_report in live_report.items():
+            assert log_report[player_id]['rounds'] == player_report['rounds']
+            assert log_report[player_id]['correlation'] == pytest.approx(player_report['correlation'], abs=1e-5)
+        assert [alert.player_id for alert in log_detector.get_alerts()] == [1]
+
+    def test_logs_of_two_tables_keep_their_players_apart(self, tmp_path):
+        # Setup - the counter and the flat bettor are each player #0 at their own table
+        log_paths = [os.path.join(tmp_path, 'table_1.bin'), os.path.join(tmp_path, 'table_2.bin')]
+        for table_id, log_path, policy in [(1, log_paths[0], bjpol.CardCountingPolicy('Kim', main_bet=5)),
+                                           (2, log_paths[1], bjpol.BasicStrategyPolicy('Ahmed', main_bet=25))]:
+            with bjlog.RoundLogWriter(log_path) as round_log:
+                test_machine = bjsim.SimulatedBlackjackStateMachine(6, {3: policy}, rng=random.Random(table_id),
+                                                                    round_log=round_log, table_id=table_id)
+                test_machine.run(1500)
+        # Test
+        log_detector = bjadv.analyze_round_chunks(bjlog.get_main_bet_columns(bjlog.read_round_log(log_path)) for log_path in log_paths)
+        log_report = log_detector.get_report()
+        counter_key, flat_bettor_key = bjadv.get_player_key(1, 0), bjadv.get_player_key(2, 0)
+        assert sorted(log_report) == [counter_key, flat_bettor_key]
+        assert log_report[counter_key]['rounds'] == 1500
+        assert log_report[flat_bettor_key]['rounds'] == 1500
+        assert log_report[flat_bettor_key]['mean_bet_cents'] == 2500
+        assert [alert.player_id for alert in log_detector.get_alerts()] == [counter_key]
@@ -0,0 +1,100 @@
+"""
+File: round_replay_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import os
+import random
+import numpy as np
+
+# Local Imports #
+import lib.blackjack_game_objects as bjo
+import lib.blackjack_policies as bjpol
+import lib.blackjack_simulator as bjsim
+import lib.round_log as bjlog
+import lib.round_replay as bjreplay
+
+
+def get_logged_round_records(log_path, num_of_rounds, seed, card_storage='shoe', table_rules=None):
+    seat_policies = {
+        2: bjpol.RandomActionPolicy('Alex', main_bet=10, rng=random.Random(seed)),
+        3: bjpol.CardCountingPolicy('Kim', main_bet=5),
+        6: bjpol.BasicStrategyPolicy('Ahmed', main_bet=25)
+    }
+    with bjlog.RoundLogWriter(log_path) as round_log:
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, seat_policies, rng=random.Random(seed), card_storage=card_storage,
+                                                            round_log=round_log)
+        if table_rules != None:
+            for rule_name, rule_value in table_rules.items():
+                setattr(test_machine, rule_name, rule_value)
+        test_machine.run(num_of_rounds)
+    return bjlog.read_round_log(log_path)
+
+
+def get_card_value(card_byte):
+    return bjo.card_high_value(bjlog.get_card_code(int(card_byte)))
+
+
+class TestFaithfulReplay:
+    def test_logged_shoes_replay_without_mismatches(self, tmp_path):
+        # Setup
+        round_records = get_logged_round_records(os.path.join(tmp_path, 'rounds.bin'), 1500, 1)
+        # Test
+        replay_report = bjreplay.ReplayBlackjackStateMachine(6, round_records).replay()
+        assert replay_report == {'rounds': 1500, 'mismatches': []}
+
+    def test_logged_csm_rounds_replay_without_mismatches(self, tmp_path):
+        # Setup
+        log_path = os.path.join(tmp_path, 'rounds.bin')
+        get_logged_round_records(log_path, 800, 2, 'csm')
+        # Test
+        assert bjreplay.replay_round_log(log_path, 6)['mismatches'] == []
+
+    def test_log_starting_part_way_into_a_shoe_replays_without_mismatches(self, tmp_path):
+        # Setup
+        round_records = get_logged_round_records(os.path.join(tmp_path, 'rounds.bin'), 300, 3)
+        # Test
+        assert bjreplay.ReplayBlackjackStateMachine(6, round_records[7:]).replay()['mismatches'] == []
+
+    def test_table_rules_are_replayed_as_logged(self, tmp_path):
+        # Setup
+        round_records = get_logged_round_records(os.path.join(tmp_path, 'rounds.bin'), 1000, 4, table_rules={'seventeen_rule': 'S17'})
+        # Test
+        assert bjreplay.ReplayBlackjackStateMachine(6, round_records, {'seventeen_rule': 'S17'}).replay()['mismatches'] == []
+        assert bjreplay.ReplayBlackjackStateMachine(6, round_records).replay()['mismatches'] != [] # dealer hits soft 17 on H17
+
+
+class TestTamperedLogs:
+    def test_altered_payout_is_reported_for_its_round_only(self, tmp_path):
+        # Setup
+        round_records = np.array(get_logged_round_records(os.path.join(tmp_path, 'rounds.bin'), 200, 5))
+        round_records['net_cents'][40, 5] += 500
+        # Test
+        replay_report = bjreplay.ReplayBlackjackStateMachine(6, round_records).replay()
+        assert len(replay_report['mismatches']) == 1
+        assert replay_report['mismatches'][0].round_number == 40
+        assert replay_report['mismatches'][0].field_name == 'net_cents'
+
+    def test_swapped_cards_are_caught_and_replay_recovers(self, tmp_path):
+        # Setup - swap the player's and the dealer's first cards in a round where they differ in value
+        round_records = np.array(get_logged_round_records(os.path.join(tmp_path, 'rounds.bin'), 200, 6))
+        round_index = next(round_index for round_index in range(100, 200)
+                           if (round_records['player_ids'][round_index] >= 0).sum() == 3
+                           and (get_card_value(round_records['cards'][round_index, 0]) != get_card_value(round_records['cards'][round_index, 3])))
+        first_cards = round_records['cards'][round_index, [0, 3]]
+        round_records['cards'][round_index, [0, 3]] = first_cards[::-1]
+        # Test
+        replay_report = bjreplay.ReplayBlackjackStateMachine(6, round_records).replay()
+        assert replay_report['rounds'] == 200
+        assert {mismatch.round_number for mismatch in replay_report['mismatches']} == {round_index}
+        assert 'dealer_up_card' in [mismatch.field_name for mismatch in replay_report['mismatches']]
+
+    def test_missing_actions_abandon_the_round(self, tmp_path):
+        # Setup
+        round_records = np.array(get_logged_round_records(os.path.join(tmp_path, 'rounds.bin'), 200, 7))
+        round_index = int(np.nonzero(round_records['num_of_actions'] > 0)[0][50])
+        round_records['num_of_actions'][round_index] = 0
+        # Test
+        replay_report = bjreplay.ReplayBlackjackStateMachine(6, round_records).replay()
+        assert [(mismatch.round_number, mismatch.field_name) for mismatch in replay_report['mismatches']] == [(round_index, 'round')]
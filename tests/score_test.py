@@ -4,7 +4,10 @@ Author: Alexander Bulanov
 """
 
 ### Imports ###
+import itertools
+import pytest
 import lib.blackjack_game_logic as bjl
+import lib.blackjack_game_objects as bjo
 
 
 ### Explicit Testing - Edge Cases (Hands /w Aces) for a 1D Blackjack ###
@@ -152,6 +155,60 @@ def test_hand_score_king_queen_expect_twenty():
     print(result)
 
 
+## Integer-Encoded Hands ##
+def test_encoded_hand_scores_match_shorthand_hand_scores():
+    test_hands = [['AS'], ['AH', 'JC'], ['AH', 'AC'], ['7C', '2D', 'AH', 'AS'], ['JH', 'QD', 'AH', 'AS'], ['3D', '2C', 'AH', '4S', 'AD']]
+    for test_hand in test_hands:
+        encoded_hand = bjo.encode_hand(test_hand)
+        assert bjl.highest_hand_score(encoded_hand) == bjl.highest_hand_score(test_hand)
+        assert bjl.is_soft_hand(encoded_hand) == bjl.is_soft_hand(test_hand)
+
+
+## Incremental Hand States ##
+def test_hand_state_built_card_by_card_matches_full_hand_score():
+    test_hands = [['AS'], ['8H', 'AC'], ['AH', 'AC', 'AS'], ['7D', '2S', 'AS', 'AD'], ['AH', 'AC', 'JH', 'QD'], ['2H', '2C', '2D', '2S', 'AD']]
+    for test_hand in test_hands:
+        hand_state = bjl.empty_hand_state
+        for card_count in range(1, len(test_hand)+1):
+            hand_state = bjl.add_card(hand_state, test_hand[card_count-1])
+            assert bjl.hand_state_score(hand_state) == bjl.highest_hand_score(test_hand[:card_count])
+
+def test_hand_state_soft_flag_matches_is_soft_hand():
+    test_hands = [['AS', '6D'], ['AH', 'AC', '5D'], ['6S', 'AH', 'KC'], ['AH', '5H', '4C', '2D'], ['9H', '8C']]
+    for test_hand in test_hands:
+        assert bjl.hand_state_is_soft(bjl.get_hand_state(test_hand)) == bjl.is_soft_hand(test_hand)
+
+def test_blackjack_and_bust_hand_states_are_absorbing():
+    blackjack_hand_state = bjl.get_hand_state(['AH', 'JC'])
+    bust_hand_state = bjl.get_hand_state(['JH', 'QD', '5C'])
+    assert bjl.hand_state_score(bjl.add_card(blackjack_hand_state, '5S')) == 21
+    assert bjl.add_card(bust_hand_state, 'AS') == bjl.bust_hand_state
+    assert bjl.hand_state_score(bust_hand_state) == -1
+
+
+## Batch Scoring ##
+def test_batch_scores_match_scalar_scores_for_all_three_card_rank_combinations():
+    np = pytest.importorskip('numpy')
+    rank_cards = [bjo.card_codes[card_name+'S'] for card_name in bjo.card_names]
+    test_hands = [list(rank_combination) for rank_combination in itertools.product(rank_cards, repeat=3)]
+    hand_lengths = [1 + (hand_index % 3) for hand_index in range(0, len(test_hands))]
+    hand_scores, soft_flags, bust_mask, blackjack_mask = bjl.highest_hand_scores_batch(np.array(test_hands), np.array(hand_lengths))
+    for test_hand, hand_length, hand_score, soft_flag, is_bust, is_blackjack in zip(test_hands, hand_lengths, hand_scores, soft_flags, bust_mask, blackjack_mask):
+        hand_state = bjl.get_hand_state(test_hand[:hand_length])
+        assert hand_score == bjl.highest_hand_score(test_hand[:hand_length])
+        assert soft_flag == bjl.hand_state_is_soft(hand_state)
+        assert is_bust == (hand_score == -1)
+        assert is_blackjack == ((hand_length == 2) and (hand_score == 21))
+
+def test_batch_scores_ignore_out_of_range_padding():
+    np = pytest.importorskip('numpy')
+    test_hands = np.array([[bjo.card_codes['AS'], bjo.card_codes['KD'], 65535, -1],
+                           [bjo.card_codes['9C'], 65535, 65535, 65535]])
+    hand_scores, soft_flags, bust_mask, blackjack_mask = bjl.highest_hand_scores_batch(test_hands, np.array([2, 1]))
+    assert hand_scores.tolist() == [21, 9]
+    assert blackjack_mask.tolist() == [True, False]
+
+
 """
 ### Implicit Testing - General Cases for a 1D Blackjack ###
 ## Two-Card Hands ##
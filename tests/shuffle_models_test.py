@@ -0,0 +1,65 @@
+"""
+File: shuffle_models_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import random
+import pytest
+
+# Local Imports #
+import lib.shuffle_models as shm
+import lib.blackjack_game_objects as bjo
+import lib.blackjack_simulator as bjsim
+import lib.blackjack_policies as bjpol
+
+np = pytest.importorskip('numpy')
+
+
+class TestShuffleModels:
+    @pytest.mark.parametrize('model_name', list(shm.shuffle_models.keys()))
+    def test_every_model_permutes_the_whole_shoe(self, model_name):
+        # Setup
+        generator = np.random.default_rng(1)
+        # Test
+        batch = shm.get_shuffle_batch(model_name, 312, 50, generator)
+        assert batch.shape == (50, 312)
+        assert (np.sort(batch, axis=1) == np.arange(312)).all()
+
+    def test_single_riffle_leaves_two_rising_sequences(self):
+        # Setup
+        clumping = shm.get_residual_clumping('riffle', 312, 2000, np.random.default_rng(2))
+        # Test
+        assert clumping['rising_sequences'] <= 2
+        assert clumping['adjacent_pairs_kept'] == pytest.approx(0.5, abs=0.01)
+
+    def test_perfect_shuffle_clumping_matches_expected_values(self):
+        # Setup
+        clumping = shm.get_residual_clumping('perfect', 312, 20000, np.random.default_rng(3), chunk_size=3000)
+        # Test
+        for measure_name, expected_value in clumping['perfect_shuffle'].items():
+            assert clumping[measure_name] == pytest.approx(expected_value, rel=0.02)
+
+    def test_casino_shuffle_keeps_slugs_together_more_than_perfect_shuffle(self):
+        # Setup
+        clumping = shm.get_residual_clumping('casino', 312, 5000, np.random.default_rng(4))
+        # Test
+        assert abs(clumping['slug_cards_in_top_half'] - 0.5) > 0.1
+
+    def test_unsupported_model_raises_error(self):
+        with pytest.raises(ValueError):
+            shm.ShuffleModel('overhand', random.Random(1))
+
+
+class TestShuffleModelTables:
+    def test_table_with_shuffle_model_keeps_every_card_and_is_replayable(self):
+        # Setup
+        test_machines = []
+        for machine_number in range(0, 2):
+            test_machine = bjsim.SimulatedBlackjackStateMachine(2, {1: bjpol.NeverBustPolicy('Alex')}, rng=random.Random(6))
+            test_machine.shuffle_model = 'casino'
+            test_machines.append(test_machine)
+        # Test
+        assert test_machines[0].run(200) == test_machines[1].run(200)
+        all_cards = list(test_machines[0].shoe) + test_machines[0].discard
+        assert sorted(all_cards) == sorted(bjo.get_encoded_shoe_of_n_decks(2))
@@ -0,0 +1,113 @@
+"""
+File: side_bet_calculator_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import time
+import pytest
+
+# Local Imports #
+import lib.blackjack_fsm as bjfsm
+import lib.blackjack_game_logic as bjl
+import lib.side_bet_calculator as sbc
+
+
+class TestSideBetOutcomes:
+    def test_perfect_pairs_outcomes_classified_correctly(self):
+        assert bjl.get_perfect_pairs_outcome('7H', '7H') == 'Perfect Pair'
+        assert bjl.get_perfect_pairs_outcome('7H', '7D') == 'Colored Pair'
+        assert bjl.get_perfect_pairs_outcome('7H', '7S') == 'Red/Black Pair'
+        assert bjl.get_perfect_pairs_outcome('7H', '8H') == None
+
+    def test_match_the_dealer_outcomes_classified_correctly(self):
+        assert bjl.get_match_the_dealer_outcome('KS', 'KS', 'KS') == '2 Suited Matches'
+        assert bjl.get_match_the_dealer_outcome('KS', 'KD', 'KS') == '1 Non-Suited & 1 Suited Match'
+        assert bjl.get_match_the_dealer_outcome('2C', 'KS', 'KS') == '1 Suited Match'
+        assert bjl.get_match_the_dealer_outcome('KD', 'KH', 'KS') == '2 Non-Suited Matches'
+        assert bjl.get_match_the_dealer_outcome('KD', '2H', 'KS') == '1 Non-Suited Match'
+        assert bjl.get_match_the_dealer_outcome('QS', 'JS', 'KS') == None
+
+    def test_lucky_ladies_outcomes_classified_correctly(self):
+        assert bjl.get_lucky_ladies_outcome('QH', 'QH', dealer_has_blackjack=True) == 'Queen of Hearts Pair (with Dealer Blackjack)'
+        assert bjl.get_lucky_ladies_outcome('QH', 'QH') == 'Queen of Hearts Pair'
+        assert bjl.get_lucky_ladies_outcome('JC', 'JC') == 'Matched 20'
+        assert bjl.get_lucky_ladies_outcome('AH', '9H') == 'Suited 20'
+        assert bjl.get_lucky_ladies_outcome('10H', 'KS') == 'Unsuited 20'
+        assert bjl.get_lucky_ladies_outcome('AH', 'AH') == None
+
+    def test_kings_bounty_outcomes_classified_correctly(self):
+        assert bjl.get_kings_bounty_outcome('KS', 'KS', dealer_has_blackjack=True) == 'King of Spades Pair (with Dealer Blackjack)'
+        assert bjl.get_kings_bounty_outcome('KS', 'KS') == 'King of Spades Pair'
+        assert bjl.get_kings_bounty_outcome('KH', 'KH') == 'Suited Kings Pair (not spades)'
+        assert bjl.get_kings_bounty_outcome('QD', 'QD') == 'Suited Qs, Js, or 10s Pair'
+        assert bjl.get_kings_bounty_outcome('QD', 'JD') == 'Suited 20'
+        assert bjl.get_kings_bounty_outcome('KD', 'KC') == 'Unsuited Kings Pair'
+        assert bjl.get_kings_bounty_outcome('KD', 'QC') == 'Unsuited 20'
+        assert bjl.get_kings_bounty_outcome('KD', '9D') == None
+
+    def test_buster_blackjack_outcomes_classified_correctly(self):
+        assert bjl.get_buster_blackjack_outcome(['10H', '6D', 'KS']) == '3 or 4 Cards'
+        assert bjl.get_buster_blackjack_outcome(['2H', '2D', '2S', '5C', '6C', 'KS']) == '6 Cards'
+        assert bjl.get_buster_blackjack_outcome(['AH', 'AD', 'AS', 'AC', '2C', '2S', '2D', '8C', 'KS']) == '8 or More Cards'
+        assert bjl.get_buster_blackjack_outcome(['10H', '7D']) == None
+
+
+class TestSideBetOdds:
+    def test_perfect_pairs_odds_match_closed_form_for_eight_decks(self):
+        # Setup
+        payout_table = {'Perfect Pair': 25, 'Colored Pair': 12, 'Red/Black Pair': 6}
+        # Test
+        side_bet_odds = sbc.get_perfect_pairs_odds(8, payout_table)
+        assert side_bet_odds['outcomes']['Perfect Pair']['probability'] == pytest.approx(7/415)
+        assert side_bet_odds['outcomes']['Colored Pair']['probability'] == pytest.approx(8/415)
+        assert side_bet_odds['outcomes']['Red/Black Pair']['probability'] == pytest.approx(16/415)
+        assert side_bet_odds['house_edge'] == pytest.approx((384 - 25*7 - 12*8 - 6*16)/415)
+
+    def test_every_supported_side_bet_has_outcome_probabilities_adding_up_to_one(self):
+        # Setup
+        test_machine = bjfsm.BlackjackStateMachine(6)
+        # Test
+        for side_bet_name, payout_table in zip(test_machine.supported_side_bet_names, test_machine.supported_side_bet_payout_tables):
+            side_bet_odds = sbc.get_side_bet_odds(side_bet_name, 6, payout_table)
+            assert sum(outcome['probability'] for outcome in side_bet_odds['outcomes'].values()) == pytest.approx(1.0)
+            assert side_bet_odds['expected_value'] == pytest.approx(sum(outcome['ev'] for outcome in side_bet_odds['outcomes'].values()))
+            assert 0 < side_bet_odds['house_edge'] < 0.3
+
+    def test_dealer_bust_probabilities_match_known_total_bust_rate(self):
+        # Dealer busts about 28.6% of the time under H17 and 28.2% under S17 with 6 decks
+        assert sum(sbc.get_dealer_bust_card_count_probabilities(6, 'H17')) == pytest.approx(0.2858, abs=0.001)
+        assert sum(sbc.get_dealer_bust_card_count_probabilities(6, 'S17')) == pytest.approx(0.2819, abs=0.001)
+
+    def test_all_supported_side_bets_calculated_in_under_a_second_for_eight_decks(self):
+        # Setup
+        test_machine = bjfsm.BlackjackStateMachine(8)
+        # Test
+        start_time = time.perf_counter()
+        for side_bet_name, payout_table in zip(test_machine.supported_side_bet_names, test_machine.supported_side_bet_payout_tables):
+            sbc.get_side_bet_odds(side_bet_name, 8, payout_table)
+        assert time.perf_counter() - start_time < 1
+
+    def test_payout_table_favoring_players_fails_validation(self):
+        generous_payout_table = {'Perfect Pair': 250, 'Colored Pair': 12, 'Red/Black Pair': 6}
+        with pytest.raises(ValueError):
+            sbc.validate_side_bet_payout_table("Perfect Pairs", 6, generous_payout_table)
+
+    def test_table_active_side_bets_pass_validation(self):
+        # Setup
+        test_machine = bjfsm.BlackjackStateMachine(6)
+        # Test
+        table_active_side_bet_odds = test_machine.validate_table_active_side_bets()
+        assert list(table_active_side_bet_odds.keys()) == test_machine.table_active_side_bet_names
+        assert test_machine.table_active_side_bet_odds == table_active_side_bet_odds # validated when the table was created
+
+    def test_custom_preset_favoring_players_is_rejected_before_it_is_set(self):
+        # Setup
+        test_machine = bjfsm.BlackjackStateMachine(6)
+        generous_payout_table = {'Perfect Pair': 250, 'Colored Pair': 12, 'Red/Black Pair': 6}
+        # Test
+        with pytest.raises(ValueError):
+            test_machine.set_table_active_side_bets(["Perfect Pairs"], [(1, 100)], [generous_payout_table])
+        assert test_machine.table_active_side_bet_names == ["Perfect Pairs", "Match the Dealer"]
+        test_machine.set_table_active_side_bets(["Lucky Ladies"], [(5, 50)], [test_machine.supported_side_bet_payout_tables[2]])
+        assert list(test_machine.table_active_side_bet_odds.keys()) == ["Lucky Ladies"]
@@ -0,0 +1,77 @@
+"""
+File: simulation_runner_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import random
+
+# Local Imports #
+import lib.simulation_runner as bjrun
+import lib.blackjack_simulator as bjsim
+import lib.blackjack_policies as bjpol
+import lib.blackjack_game_objects as bjo
+import lib.cut_helper as cut
+
+
+class TestSeededTables:
+    def test_same_seed_deals_same_shoe(self):
+        # Setup
+        first_shoe = bjo.get_shoe_of_n_decks(6, random.Random(7))
+        second_shoe = bjo.get_shoe_of_n_decks(6, random.Random(7))
+        # Test
+        assert first_shoe == second_shoe
+        assert first_shoe != bjo.get_shoe_of_n_decks(6, random.Random(8))
+
+    def test_seeded_cuts_are_reproducible(self):
+        # Setup
+        first_shoe = bjo.Shoe(bjo.get_encoded_shoe_of_n_decks(6, random.Random(3)))
+        second_shoe = bjo.Shoe(bjo.get_encoded_shoe_of_n_decks(6, random.Random(3)))
+        first_rng = random.Random(11)
+        second_rng = random.Random(11)
+        # Test
+        cut.first_cut(first_shoe, first_rng)
+        cut.first_cut(second_shoe, second_rng)
+        assert cut.second_cut(first_shoe, None, False, first_rng) == cut.second_cut(second_shoe, None, False, second_rng)
+        assert list(first_shoe) == list(second_shoe)
+        assert first_shoe.cut_card_index == second_shoe.cut_card_index
+
+    def test_seeded_simulated_tables_play_identical_rounds(self):
+        # Setup
+        first_machine = bjsim.SimulatedBlackjackStateMachine(2, {1: bjpol.NeverBustPolicy('Alex')}, rng=random.Random(5))
+        second_machine = bjsim.SimulatedBlackjackStateMachine(2, {1: bjpol.NeverBustPolicy('Alex')}, rng=random.Random(5))
+        # Test
+        assert first_machine.run(300) == second_machine.run(300)
+
+
+class TestParallelSimulation:
+    def test_shoes_are_split_evenly_across_workers(self):
+        assert bjrun.get_shard_sizes(10, 4) == [3, 3, 2, 2]
+        assert sum(bjrun.get_shard_sizes(1001, 8)) == 1001
+
+    def test_worker_seeds_depend_only_on_master_seed(self):
+        assert bjrun.get_worker_seeds(42, 4) == bjrun.get_worker_seeds(42, 4)
+        assert len(set(bjrun.get_worker_seeds(42, 4))) == 4
+        assert bjrun.get_worker_seeds(42, 4) != bjrun.get_worker_seeds(43, 4)
+
+    def test_run_is_reproducible_for_same_master_seed_and_worker_count(self):
+        # Setup
+        seat_policies = {1: bjpol.BasicStrategyPolicy('Alex'), 3: bjpol.RandomActionPolicy('Ben')}
+        # Test
+        first_report = bjrun.run_parallel_simulation(2, seat_policies, 6, master_seed=2024, num_of_workers=2)
+        second_report = bjrun.run_parallel_simulation(2, seat_policies, 6, master_seed=2024, num_of_workers=2)
+        assert first_report == second_report
+        assert first_report['shoes'] == 6
+        assert first_report['simulation_stats']['shuffles'] >= 6
+
+    def test_merged_report_adds_up_shard_reports(self):
+        # Setup
+        seat_policies = {2: bjpol.MimicTheDealerPolicy('Alex')}
+        worker_seeds = bjrun.get_worker_seeds(7, 2)
+        shard_reports = [bjrun.run_simulation_shard(1, seat_policies, 3, worker_seed) for worker_seed in worker_seeds]
+        # Test
+        merged_report = bjrun.run_parallel_simulation(1, seat_policies, 6, master_seed=7, num_of_workers=2)
+        assert merged_report['simulation_stats']['rounds'] == sum(shard_report['simulation_stats']['rounds'] for shard_report in shard_reports)
+        assert merged_report['seat_results'][2]['net_winnings_cents'] == sum(shard_report['seat_results'][2]['net_winnings_cents'] for shard_report in shard_reports)
+        stats = merged_report['simulation_stats']
+        assert stats['wins'] + stats['losses'] + stats['pushes'] == stats['hands']
@@ -0,0 +1,240 @@
+"""
+File: simulator_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import random
+import pytest
+
+# Local Imports #
+import lib.blackjack_simulator as bjsim
+import lib.blackjack_policies as bjpol
+import lib.blackjack_game_objects as bjo
+import lib.blackjack_game_logic as bjl
+import lib.chip_ledger as bjcl
+import lib.dealer_rack as bjrack
+
+
+def total_chip_value(chips):
+    return sum(bjo.chips[chip_color]*chip_count for chip_color, chip_count in chips.items())
+
+
+class AlwaysSplitPolicy(bjpol.SeatPolicy):
+    def get_action(self, machine, player, seat_name, hand, allowed_actions):
+        for action in ['split', 'double', 'stand']:
+            if action in allowed_actions:
+                return action
+
+
+class IllegalActionPolicy(bjpol.SeatPolicy):
+    def get_action(self, machine, player, seat_name, hand, allowed_actions):
+        return 'dance'
+
+
+class TestSimulatedStateTransitions:
+    def test_simulated_table_seats_policies_in_WAITING_and_transitions_to_STARTING(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {2: bjpol.MimicTheDealerPolicy('Alex')})
+        # Test
+        test_machine.step()
+        assert test_machine.seated_players[2].name == 'Alex'
+        assert test_machine.seated_players[2].chip_pool_balance == 500
+        assert test_machine.state == bjsim.GameState.STARTING
+
+    def test_simulated_table_goes_from_WAITING_to_FINAL_SCORING_without_console_output(self, capsys):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.MimicTheDealerPolicy('Alex')})
+        # Test
+        visited_states = [test_machine.state]
+        while test_machine.state != bjsim.GameState.FINAL_SCORING:
+            test_machine.step()
+            visited_states.append(test_machine.state)
+        assert visited_states[:4] == [bjsim.GameState.WAITING, bjsim.GameState.STARTING,
+                                      bjsim.GameState.SHUFFLING, bjsim.GameState.BETTING]
+        assert capsys.readouterr().out == ''
+
+    def test_simulated_round_ends_in_BETTING_or_SHUFFLING(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(1, {1: bjpol.NeverBustPolicy('Alex')})
+        # Test
+        test_machine.play_round()
+        assert test_machine.simulation_stats['rounds'] == 1
+        assert test_machine.state in [bjsim.GameState.BETTING, bjsim.GameState.SHUFFLING]
+
+
+class TestSimulatedHandStates:
+    def test_hand_states_carried_through_round_match_full_hand_scores(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: AlwaysSplitPolicy('Alex'), 5: bjpol.RandomActionPolicy('Kim')})
+        # Test
+        for round_number in range(0, 200):
+            while test_machine.state != bjsim.GameState.FINAL_SCORING:
+                test_machine.step()
+            for round_hand in test_machine.current_round_hands:
+                assert round_hand.hand_state == bjl.get_hand_state(round_hand.cards)
+            dealer_hand_state = test_machine.dealer_seat.hand_state
+            assert bjl.hand_state_score(dealer_hand_state) == bjl.highest_hand_score(test_machine.get_dealer_hand())
+            test_machine.step()
+
+
+class TestSimulatedRounds:
+    def test_chips_are_conserved_between_players_and_dealer_over_many_rounds(self):
+        # Setup
+        seat_policies = {
+            1: bjpol.MimicTheDealerPolicy('Alex'),
+            4: bjpol.RandomActionPolicy('Kim'),
+            7: AlwaysSplitPolicy('Jim', main_bet=25)
+        }
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, seat_policies)
+        starting_dealer_balance = test_machine.dealer.chip_pool_balance
+        starting_cash_balance = test_machine.dealer.cash_balance + sum(policy.cash for policy in seat_policies.values())
+        # Test - players buy their chips from the dealer, so both chips and cash only change hands
+        test_machine.run(2000)
+        players = [player for player in test_machine.seated_players.values() if player != None]
+        table_chip_value = test_machine.dealer.chip_pool_balance + sum(player.chip_pool_balance for player in players)
+        table_cash_value = test_machine.dealer.cash_balance + sum(player.cash_balance for player in players)
+        assert test_machine.simulation_stats['rack_fills'] == 0
+        assert table_chip_value == starting_dealer_balance
+        assert table_cash_value == starting_cash_balance
+        for participant in players + [test_machine.dealer]:
+            assert total_chip_value(participant.get_chips_dict()) == participant.chip_pool_balance
+            assert min(participant.chips) >= 0
+
+    def test_cards_are_conserved_across_shoe_and_discard_between_rounds(self):
+        # Setup
+        num_of_decks = 2
+        test_machine = bjsim.SimulatedBlackjackStateMachine(num_of_decks, {3: bjpol.RandomActionPolicy('Alex')})
+        # Test
+        for round_number in range(0, 300):
+            test_machine.play_round()
+            dealt_cards = list(test_machine.shoe) + test_machine.discard
+            assert len(dealt_cards) == 52*num_of_decks
+
+    def test_stats_tally_every_settled_hand(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: AlwaysSplitPolicy('Alex'), 2: bjpol.MimicTheDealerPolicy('Jim')})
+        # Test
+        stats = test_machine.run(500)
+        assert stats['hands'] == stats['wins'] + stats['losses'] + stats['pushes']
+        assert stats['hands'] >= 2*500
+        assert stats['splits'] > 0
+
+    def test_policy_choosing_action_outside_allowed_actions_raises(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: IllegalActionPolicy('Alex')})
+        # Test
+        with pytest.raises(ValueError):
+            test_machine.run(50)
+
+    def test_policy_without_get_action_is_rejected_when_created(self):
+        # Setup
+        class BetOnlyPolicy(bjpol.SeatPolicy):
+            def get_main_bet(self, machine, player, seat_name):
+                return 10
+        # Test
+        with pytest.raises(TypeError):
+            BetOnlyPolicy('Alex')
+
+
+class TestCentsChipModel:
+    chip_stat_names = ['chip_exchanges', 'color_ups', 'rack_fills', 'rack_credits']
+
+    def play_test_tables(self, card_storage, rules):
+        # Same seed, same policies and rules at a 'chips' table and a 'cents' table
+        test_machines = []
+        for chip_model in ['chips', 'cents']:
+            seat_policies = {1: bjpol.RandomActionPolicy('Alex', main_bet=10, rng=random.Random(2)), 3: AlwaysSplitPolicy('Jim', main_bet=25),
+                             5: bjpol.CardCountingPolicy('Kim', main_bet=5), 7: bjpol.MimicTheDealerPolicy('Ben')}
+            test_machine = bjsim.SimulatedBlackjackStateMachine(6, seat_policies, rng=random.Random(3), card_storage=card_storage,
+                                                                track_bankrolls=True, chip_model=chip_model)
+            for rule_name, rule in rules.items():
+                setattr(test_machine, rule_name, rule)
+            test_machine.run(3000)
+            test_machines.append(test_machine)
+        return test_machines
+
+    @pytest.mark.parametrize('card_storage, rules', [('shoe', {}), ('shoe', {'surrender_rule': 'ES', 'seventeen_rule': 'S17'}),
+                                                     ('shoe', {'blackjack_ratio': 1.2, 'double_after_split_rule': 'NDAS'}), ('csm', {})])
+    def test_cents_table_plays_every_round_like_a_chips_table(self, card_storage, rules):
+        # Setup
+        chips_machine, cents_machine = self.play_test_tables(card_storage, rules)
+        # Test
+        for stat_name, stat in chips_machine.simulation_stats.items():
+            if stat_name not in self.chip_stat_names:
+                assert cents_machine.simulation_stats[stat_name] == stat
+        for seat_number, player in chips_machine.seated_players.items():
+            if player != None:
+                cents_player = cents_machine.seated_players[seat_number]
+                assert (cents_player.cash_cents, cents_player.chip_pool_cents) == (player.cash_cents, player.chip_pool_cents)
+        assert cents_machine.card_counter.get_counts() == chips_machine.card_counter.get_counts()
+        assert cents_machine.shoe.cards_dealt() == chips_machine.shoe.cards_dealt()
+
+    def test_cents_table_without_counting_systems_still_counts_cards_dealt(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.MimicTheDealerPolicy('Alex'), 2: AlwaysSplitPolicy('Jim')},
+                                                            rng=random.Random(4), counting_system_names=[], chip_model='cents')
+        # Test
+        for round_number in range(0, 300):
+            test_machine.play_round()
+            if test_machine.state == bjsim.GameState.BETTING:
+                assert test_machine.card_counter.cards_dealt == test_machine.shoe.cards_dealt()
+                assert test_machine.card_counter.cards_seen == test_machine.shoe.cards_dealt() - 1 # all but the burn card
+
+    def test_cents_table_has_no_chips_to_rack_or_log(self):
+        with pytest.raises(ValueError):
+            bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.NeverBustPolicy('Alex')}, chip_model='cents', dealer_rack=bjrack.DealerRack())
+        with pytest.raises(ValueError):
+            bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.NeverBustPolicy('Alex')}, chip_model='beans')
+        assert bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.NeverBustPolicy('Alex')}, chip_model='cents').dealer_rack == None
+
+
+class TestContinuousShufflingMachine:
+    def test_csm_draws_every_loaded_card_once(self):
+        # Setup
+        test_csm = bjo.ContinuousShufflingMachine(bjo.get_encoded_shoe_of_n_decks(1), random.Random(4))
+        # Test
+        drawn_cards = [test_csm.draw() for draw_number in range(0, 52)]
+        assert sorted(drawn_cards) == sorted(bjo.encode_hand(bjo.base_deck))
+        assert len(test_csm) == 0
+        with pytest.raises(IndexError):
+            test_csm.draw()
+
+    def test_csm_table_never_shuffles_and_keeps_every_card_in_play(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(2, {1: bjpol.BasicStrategyPolicy('Alex'), 4: bjpol.NeverBustPolicy('Ben')},
+                                                            rng=random.Random(9), card_storage='csm')
+        # Test
+        for round_number in range(0, 300):
+            test_machine.play_round()
+            assert test_machine.state == bjsim.GameState.BETTING
+            assert len(test_machine.shoe) == 104 and len(test_machine.discard) == 0
+        assert test_machine.simulation_stats['shuffles'] == 0
+
+    def test_unsupported_card_storage_raises_error(self):
+        with pytest.raises(ValueError):
+            bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.NeverBustPolicy('Alex')}, card_storage='hopper')
+
+
+class TestSimulatedBuyIns:
+    def test_players_buy_chips_from_the_dealer_with_cash(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.MimicTheDealerPolicy('Alex', buy_in=300)})
+        starting_dealer_cents = (test_machine.dealer.cash_cents, test_machine.dealer.chip_pool_cents)
+        # Test
+        test_machine.step()
+        test_player = test_machine.seated_players[1]
+        assert (test_player.cash_cents, test_player.chip_pool_cents) == (bjcl.dollars_to_cents(10000 - 300), bjcl.dollars_to_cents(300))
+        assert (test_machine.dealer.cash_cents, test_machine.dealer.chip_pool_cents) == (starting_dealer_cents[0] + 30000,
+                                                                                         starting_dealer_cents[1] - 30000)
+
+    def test_buy_in_is_capped_at_the_players_cash(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.MimicTheDealerPolicy('Alex', buy_in=500, cash=120)})
+        # Test
+        test_machine.step()
+        test_player = test_machine.seated_players[1]
+        assert (test_player.cash_cents, test_player.chip_pool_cents) == (0, 12000)
+        assert not test_machine.buy_in(test_player, 50000)
+        test_machine.run(2000)
+        assert test_player.cash_cents == 0 and test_player.chip_pool_cents >= 0
@@ -0,0 +1,104 @@
+"""
+File: strategy_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import pytest
+
+# Local Imports #
+import lib.blackjack_strategy as bjstrat
+import lib.blackjack_simulator as bjsim
+import lib.blackjack_policies as bjpol
+import lib.blackjack_game_logic as bjl
+
+
+def get_hand_state(score, is_soft=False):
+    return (score << 1) | int(is_soft)
+
+
+class TestBasicStrategyCharts:
+    def test_six_deck_S17_DAS_LS_chart_matches_published_chart(self):
+        # Setup
+        strategy = bjstrat.get_basic_strategy(6, 'S17', 'DA2', 'DAS', 'SP4', 'LS')
+        chart = strategy.get_chart()
+        # Test - rows by up card 2 to A
+        assert chart['hard'][9] == ['H', 'Dh', 'Dh', 'Dh', 'Dh', 'H', 'H', 'H', 'H', 'H']
+        assert chart['hard'][11] == ['Dh', 'Dh', 'Dh', 'Dh', 'Dh', 'Dh', 'Dh', 'Dh', 'Dh', 'H']
+        assert chart['hard'][12] == ['H', 'H', 'S', 'S', 'S', 'H', 'H', 'H', 'H', 'H']
+        assert chart['hard'][16] == ['S', 'S', 'S', 'S', 'S', 'H', 'H', 'Rh', 'Rh', 'Rh']
+        assert chart['soft'][18] == ['S', 'Ds', 'Ds', 'Ds', 'Ds', 'S', 'S', 'H', 'H', 'H']
+        assert chart['pairs'][4] == ['H', 'H', 'H', 'P', 'P', 'H', 'H', 'H', 'H', 'H']
+        assert chart['pairs'][9] == ['P', 'P', 'P', 'P', 'P', 'S', 'P', 'P', 'S', 'S']
+        assert chart['pairs'][10] == ['S']*10
+        assert chart['pairs'][11] == ['P']*10
+
+    def test_H17_changes_the_expected_cells(self):
+        # Setup
+        chart = bjstrat.get_basic_strategy(6, 'H17', 'DA2', 'DAS', 'SP4', 'LS').get_chart()
+        # Test
+        assert chart['hard'][11][-1] == 'Dh'
+        assert chart['hard'][15][-1] == 'Rh'
+        assert chart['hard'][17][-1] == 'Rs'
+        assert chart['soft'][18][0] == 'Ds'
+        assert chart['soft'][19][4] == 'Ds'
+        assert chart['pairs'][8][-1] == 'Rp'
+
+    def test_doubling_and_surrender_rules_limit_ranked_actions(self):
+        # Setup
+        strategy = bjstrat.get_basic_strategy(6, 'S17', 'D10', 'NDAS', 'SP4', 'NS')
+        # Test
+        assert strategy.two_card_actions[get_hand_state(9)][5] == ('hit', 'stand')
+        assert strategy.two_card_actions[get_hand_state(11)][5][0] == 'double'
+        assert 'surrender' not in strategy.two_card_actions[get_hand_state(16)][10]
+        assert strategy.get_chart()['pairs'][4] == ['H']*10 # 4-4 is never split without doubling after
+
+    def test_soft_hand_hit_evs_count_hands_that_turn_hard(self):
+        # Setup
+        strategy = bjstrat.get_basic_strategy(6, 'S17', 'DA2', 'DAS', 'SP4', 'LS')
+        # Test - soft 18 against a 9 is worth about -0.10 to hit and -0.18 to stand
+        assert strategy.two_card_action_evs[get_hand_state(18, is_soft=True)][9]['hit'] == pytest.approx(-0.101, abs=0.002)
+        assert strategy.two_card_action_evs[get_hand_state(18, is_soft=True)][9]['stand'] == pytest.approx(-0.184, abs=0.002)
+
+    def test_strategy_is_built_once_per_rule_set(self):
+        assert bjstrat.get_basic_strategy(2, 'H17') is bjstrat.get_basic_strategy(2, 'H17')
+        assert bjstrat.get_basic_strategy(2, 'H17') is not bjstrat.get_basic_strategy(2, 'S17')
+
+
+class TestBasicStrategyLookups:
+    def test_get_action_falls_back_to_next_best_allowed_action(self):
+        # Setup
+        strategy = bjstrat.get_basic_strategy(6, 'S17', 'DA2', 'DAS', 'SP4', 'LS')
+        hand_state = bjl.get_hand_state(['6H', '5D'])
+        # Test
+        assert strategy.get_action(hand_state, 2, None, 6, ['stand', 'hit', 'double']) == 'double'
+        assert strategy.get_action(hand_state, 2, None, 6, ['stand', 'hit']) == 'hit'
+        assert strategy.get_action(bjl.get_hand_state(['10H', '6D']), 2, None, 10, ['stand', 'hit']) == 'hit'
+        assert strategy.get_action(bjl.get_hand_state(['10H', '2D', '4S']), 3, None, 10, ['stand', 'hit']) == 'hit'
+
+    def test_pair_value_follows_split_10s_rule(self):
+        assert bjstrat.get_pair_value(['KH', 'KD']) == 10
+        assert bjstrat.get_pair_value(['KH', 'QD']) == None
+        assert bjstrat.get_pair_value(['KH', 'QD'], 'Value') == 10
+        assert bjstrat.get_pair_value(['AH', 'AD', 'AS']) == None
+
+    def test_early_surrender_only_given_up_against_ten_or_ace(self):
+        # Setup
+        strategy = bjstrat.get_basic_strategy(6, 'S17', 'DA2', 'DAS', 'SP4', 'ES')
+        # Test
+        assert strategy.should_surrender_early(get_hand_state(16), None, 11)
+        assert strategy.should_surrender_early(get_hand_state(16), None, 10)
+        assert not strategy.should_surrender_early(get_hand_state(16), None, 6)
+        assert not strategy.should_surrender_early(get_hand_state(20), None, 11)
+
+
+class TestBasicStrategyPolicy:
+    def test_basic_strategy_seat_plays_only_allowed_actions(self):
+        # Setup
+        test_machine = bjsim.SimulatedBlackjackStateMachine(6, {1: bjpol.BasicStrategyPolicy('Alex', buy_in=100000)})
+        # Test
+        stats = test_machine.run(3000)
+        assert stats['doubles'] > 0
+        assert stats['splits'] > 0
+        assert stats['surrenders'] > 0
+        assert stats['hands'] == stats['wins'] + stats['losses'] + stats['pushes']
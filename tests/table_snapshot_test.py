@@ -0,0 +1,114 @@
+"""
+File: table_snapshot_test.py
+Author: Alexander Bulanov
+"""
+
+# Global Imports #
+import os
+import random
+import pytest
+
+# Local Imports #
+import lib.blackjack_fsm as bjfsm
+import lib.blackjack_policies as bjpol
+import lib.blackjack_simulator as bjsim
+import lib.round_log as bjlog
+
+
+def get_test_machine(seed, card_storage='shoe', rng=True):
+    seat_policies = {
+        1: bjpol.RandomActionPolicy('Alex', main_bet=10, rng=random.Random(seed)),
+        4: bjpol.CardCountingPolicy('Kim', main_bet=5),
+        7: bjpol.BasicStrategyPolicy('Ahmed', main_bet=25)
+    }
+    return bjsim.SimulatedBlackjackStateMachine(6, seat_policies, rng=random.Random(seed) if rng else None,
+                                                card_storage=card_storage, track_bankrolls=True)
+
+
+def get_table_outcome(test_machine):
+    return (test_machine.simulation_stats, test_machine.shoe.cards_dealt(), list(test_machine.shoe.cards),
+            [(player.cash_cents, player.chip_pool_cents) for player in test_machine.seated_players.values() if player != None])
+
+
+class TestCheckpoints:
+    @pytest.mark.parametrize('card_storage', ['shoe', 'csm'])
+    def test_table_resumed_from_snapshot_plays_on_like_the_original(self, card_storage):
+        # Setup
+        test_machine = get_test_machine(1, card_storage)
+        test_machine.run(300)
+        snapshot = test_machine.save_snapshot()
+        # Test
+        test_machine.run(500)
+        resumed_machine = bjfsm.load_snapshot(snapshot)
+        assert isinstance(resumed_machine, bjsim.SimulatedBlackjackStateMachine)
+        resumed_machine.run(500)
+        assert get_table_outcome(resumed_machine) == get_table_outcome(test_machine)
+
+    def test_snapshot_taken_mid_round_keeps_hands_and_players_shared(self):
+        # Setup
+        test_machine = get_test_machine(2)
+        test_machine.run(50)
+        while test_machine.state != bjfsm.GameState.PLAYERS_PLAYING:
+            test_machine.step()
+        # Test
+        forked_machine = test_machine.fork()
+        for round_hand in forked_machine.current_round_hands:
+            assert forked_machine.seated_players[round_hand.seat.seat_number] is round_hand.player
+        test_machine.run(100)
+        forked_machine.run(100)
+        assert get_table_outcome(forked_machine) == get_table_outcome(test_machine)
+
+    def test_table_on_the_global_random_state_can_be_snapshot(self):
+        # Setup
+        test_machine = get_test_machine(3, 'csm', rng=False)
+        test_machine.run(20)
+        # Test
+        forked_machine = test_machine.fork()
+        assert forked_machine.rng is random
+        assert forked_machine.shoe.rng is random
+        forked_machine.run(20)
+
+
+class TestForking:
+    def test_playing_a_fork_leaves_the_original_untouched(self):
+        # Setup
+        test_machine = get_test_machine(4)
+        test_machine.run(100)
+        original_outcome = get_table_outcome(test_machine)
+        # Test
+        forked_machine = test_machine.fork()
+        forked_machine.run(200)
+        assert forked_machine.simulation_stats['rounds'] == 300
+        assert get_table_outcome(test_machine) == original_outcome
+
+    def test_forked_side_bet_handlers_act_on_the_fork(self):
+        # Setup
+        test_machine = bjfsm.BlackjackStateMachine(6)
+        # Test
+        forked_machine = test_machine.fork()
+        for side_bet_handler in forked_machine.side_bet_handlers.values():
+            assert side_bet_handler.__closure__[0].cell_contents is forked_machine
+
+    def test_table_rolled_back_in_place_detaches_its_round_log(self, tmp_path):
+        # Setup
+        log_path = os.path.join(tmp_path, 'rounds.bin')
+        test_machine = get_test_machine(5)
+        test_machine.run(100)
+        snapshot = test_machine.save_snapshot()
+        with bjlog.RoundLogWriter(log_path) as round_log:
+            test_machine.round_log = round_log
+            test_machine.run(50)
+            # Test - the rounds played again from the snapshot aren't logged a second time
+            test_machine.restore_snapshot(snapshot)
+            assert test_machine.simulation_stats['rounds'] == 100
+            assert test_machine.round_log == None
+            test_machine.run(50)
+        round_records = bjlog.read_round_log(log_path)
+        assert len(round_records) == 50
+
+    def test_snapshot_of_another_table_class_is_rejected(self):
+        # Setup
+        test_machine = get_test_machine(6)
+        # Test
+        with pytest.raises(TypeError):
+            test_machine.restore_snapshot(bjfsm.BlackjackStateMachine(6).save_snapshot())